@@ -0,0 +1,105 @@
+"""Benchmark: HABoard cold start.
+
+Measures:
+- Import time of the integration package vs the full database/API stack
+  (fresh interpreter per measurement)
+- Database.connect() on a new database (schema template vs scripted
+  schema) and on an existing one
+- Post-startup warm-up (FTS integrity check + cache priming) on 10k tasks
+"""
+import asyncio
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from custom_components.haboard.database import Database  # noqa: E402
+from custom_components.haboard.database.models import Task  # noqa: E402
+from custom_components.haboard.database.repository import TaskRepository  # noqa: E402
+
+RUNS = 5
+WARM_UP_TASKS = 10_000
+
+
+def import_time(statement: str) -> float:
+    """Median wall time in ms of an import, excluding Home Assistant core."""
+    code = (
+        "import time, homeassistant.config_entries, homeassistant.components.http, "
+        "homeassistant.components.websocket_api\n"
+        f"start = time.perf_counter()\n{statement}\n"
+        "print((time.perf_counter() - start) * 1000)"
+    )
+    samples = [
+        float(subprocess.check_output([sys.executable, "-c", code], cwd=ROOT, text=True))
+        for _ in range(RUNS)
+    ]
+    return statistics.median(samples)
+
+
+class ScriptedDatabase(Database):
+    """Database that always creates its schema statement by statement."""
+
+    def _is_new_database(self) -> bool:
+        return False
+
+
+async def connect_time(db_path: Path, db_class: type[Database] = Database) -> float:
+    """Wall time in ms of Database.connect()."""
+    db = db_class(db_path)
+    start = time.perf_counter()
+    await db.connect()
+    elapsed = (time.perf_counter() - start) * 1000
+    await db.disconnect()
+    return elapsed
+
+
+async def run_benchmark():
+    """Run cold start benchmark."""
+    print("=" * 70)
+    print("BENCHMARK: Cold start")
+    print("=" * 70)
+
+    package = import_time("import custom_components.haboard")
+    full = import_time(
+        "import custom_components.haboard.api, custom_components.haboard.database.repository"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fresh = []
+        for i in range(RUNS):
+            fresh.append(await connect_time(Path(tmp_dir) / f"fresh-{i}.db"))
+        scripted = []
+        for i in range(RUNS):
+            scripted.append(
+                await connect_time(Path(tmp_dir) / f"scripted-{i}.db", ScriptedDatabase)
+            )
+        existing = [await connect_time(Path(tmp_dir) / "fresh-0.db") for _ in range(RUNS)]
+
+        db = Database(Path(tmp_dir) / "warm.db")
+        await db.connect()
+        await TaskRepository(db.conn).bulk_create(
+            [
+                Task(title=f"Task {i}", notes="Notes", device_id="bench")
+                for i in range(WARM_UP_TASKS)
+            ]
+        )
+        warm_up = await db.async_warm_up()
+        await db.disconnect()
+
+    print(f"\n  Import integration package:      {package:8.1f}ms")
+    print(f"  Import database + API stack:     {full:8.1f}ms (deferred to executor)")
+    print(f"  Connect, new database:           {statistics.median(fresh):8.1f}ms (template)")
+    print(f"  Connect, new database:           {statistics.median(scripted):8.1f}ms (scripted)")
+    print(f"  Connect, existing database:      {statistics.median(existing):8.1f}ms")
+    for step, elapsed in warm_up.items():
+        print(f"  Warm-up {step + ',':24} {elapsed:8.1f}ms ({WARM_UP_TASKS:,} tasks, background)")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
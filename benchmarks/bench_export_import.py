@@ -0,0 +1,128 @@
+"""Benchmark: export/import round trip.
+
+Measures, per format, for 100,000 tasks:
+- Export time (cursor -> encoded file)
+- Import time (incremental parse -> batched bulk inserts)
+- Peak resident memory of the whole run (stays flat because both
+  directions work batch by batch)
+"""
+import asyncio
+import random
+import sys
+import tempfile
+import time
+import resource
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.haboard.api.formats import (  # noqa: E402
+    EXPORT_FORMATS,
+    IMPORT_PARSERS,
+)
+from custom_components.haboard.api.views import IMPORT_BATCH_SIZE  # noqa: E402
+from custom_components.haboard.database import Database  # noqa: E402
+from custom_components.haboard.database.models import Task  # noqa: E402
+from custom_components.haboard.database.repository import TaskRepository  # noqa: E402
+
+TASK_COUNT = 100_000
+SAMPLE_TAGS = ["grocery", "work", "urgent", "home", "family"]
+
+
+async def read_lines(path: Path):
+    """Yield raw lines from a file, like a request body stream."""
+    with open(path, "rb") as f:
+        for line in f:
+            yield line
+
+
+async def export_to(repo: TaskRepository, fmt: str, path: Path) -> None:
+    """Export all tasks to a file."""
+    export_format = EXPORT_FORMATS[fmt]
+    with open(path, "wb") as f:
+        f.write(export_format.header)
+        async for tasks in repo.iter_all():
+            f.write(export_format.encode(tasks))
+        f.write(export_format.footer)
+
+
+async def import_from(repo: TaskRepository, fmt: str, path: Path) -> int:
+    """Import tasks from a file in batches."""
+    imported = 0
+    batch = []
+    async for task in IMPORT_PARSERS[fmt](read_lines(path)):
+        batch.append(task)
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            imported += await repo.bulk_create(batch)
+            batch = []
+    imported += await repo.bulk_create(batch)
+    return imported
+
+
+async def timed(coro) -> tuple[float, object]:
+    """Run a coroutine and return (seconds, result)."""
+    start = time.perf_counter()
+    result = await coro
+    return time.perf_counter() - start, result
+
+
+async def run_benchmark():
+    """Run export/import benchmark."""
+    print("=" * 70)
+    print(f"BENCHMARK: Export/import round trip ({TASK_COUNT:,} tasks)")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        source = Database(tmp / "source.db")
+        await source.connect()
+        source_repo = TaskRepository(source.conn)
+
+        print(f"\nSeeding {TASK_COUNT:,} tasks...")
+        seed_time, _ = await timed(
+            source_repo.bulk_create(
+                [
+                    Task(
+                        title=f"Task {i}",
+                        notes=random.choice([None, "Some notes about this task"]),
+                        due_date=random.choice([None, "2025-01-15"]),
+                        priority=random.randint(0, 3),
+                        device_id="bench",
+                        tags=random.sample(SAMPLE_TAGS, random.randint(0, 3)),
+                    )
+                    for i in range(TASK_COUNT)
+                ]
+            )
+        )
+        print(f"  Seeded in {seed_time:.2f}s")
+
+        rss_after_seed = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+        print(f"\n  {'format':8}{'export':>10}{'import':>10}{'size':>12}")
+        for fmt in EXPORT_FORMATS:
+            path = tmp / f"export.{fmt}"
+            export_time, _ = await timed(export_to(source_repo, fmt, path))
+
+            target = Database(tmp / f"target-{fmt}.db")
+            await target.connect()
+            import_time, imported = await timed(
+                import_from(TaskRepository(target.conn), fmt, path)
+            )
+            await target.disconnect()
+            assert imported == TASK_COUNT
+
+            print(
+                f"  {fmt:8}{export_time:>9.2f}s{import_time:>9.2f}s"
+                f"{path.stat().st_size / 1024 / 1024:>9.1f}MiB"
+            )
+
+        await source.disconnect()
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"\n  Max RSS after seeding: {rss_after_seed:.0f}MiB, after round trips: {rss:.0f}MiB")
+
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,97 @@
+"""Benchmark: random (UUIDv4) vs time-ordered (UUIDv7) task IDs.
+
+Measures, for 100k tasks with 3 tags each inserted in batches:
+- Insert throughput (tasks/sec) of bulk_create()
+- Insert throughput of single create() calls for 1k more tasks,
+  on top of the 100k already in the table
+- Database file size before and after VACUUM
+"""
+import asyncio
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.haboard.database import Database  # noqa: E402
+from custom_components.haboard.database.models import Task, uuid7  # noqa: E402
+from custom_components.haboard.database.repository import TaskRepository  # noqa: E402
+
+TASK_COUNT = 100_000
+SINGLE_INSERTS = 1_000
+BATCH_SIZE = 1000
+
+
+def uuid4() -> str:
+    """Random UUID, the previous default."""
+    return str(uuid.uuid4())
+
+
+def file_size(db_path: Path) -> int:
+    """Size of the database and its WAL in bytes."""
+    wal = db_path.with_name(db_path.name + "-wal")
+    return db_path.stat().st_size + (wal.stat().st_size if wal.exists() else 0)
+
+
+async def run_case(tmp_dir: str, name: str, new_id) -> tuple[float, float, int, int]:
+    """Insert tasks with the given ID generator."""
+    db_path = Path(tmp_dir) / f"ids-{name}.db"
+    db = Database(db_path)
+    await db.connect()
+    repo = TaskRepository(db.conn)
+
+    start = time.perf_counter()
+    for offset in range(0, TASK_COUNT, BATCH_SIZE):
+        await repo.bulk_create(
+            [
+                Task(
+                    id=new_id(),
+                    title=f"Task {i}",
+                    tags=[f"tag{(i + j) % 50}" for j in range(3)],
+                    device_id="bench",
+                )
+                for i in range(offset, offset + BATCH_SIZE)
+            ]
+        )
+    bulk_rate = TASK_COUNT / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(SINGLE_INSERTS):
+        await repo.create(Task(id=new_id(), title=f"Single {i}", device_id="bench"))
+    single_rate = SINGLE_INSERTS / (time.perf_counter() - start)
+
+    cursor = await db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    await cursor.fetchall()
+    size = file_size(db_path)
+    await db.execute("VACUUM")
+    cursor = await db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    await cursor.fetchall()
+    vacuumed = file_size(db_path)
+    await db.disconnect()
+    return bulk_rate, single_rate, size, vacuumed
+
+
+async def run_benchmark():
+    """Run ID ordering benchmark."""
+    print("=" * 70)
+    print(f"BENCHMARK: UUIDv4 vs UUIDv7 task IDs ({TASK_COUNT:,} tasks)")
+    print("=" * 70)
+    print(
+        f"\n  {'IDs':<8} {'bulk tasks/s':>13} {'single tasks/s':>15}"
+        f" {'file':>9} {'vacuumed':>9}"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, new_id in (("uuid4", uuid4), ("uuid7", uuid7)):
+            bulk, single, size, vacuumed = await run_case(tmp_dir, name, new_id)
+            print(
+                f"  {name:<8} {bulk:>13,.0f} {single:>15,.0f}"
+                f" {size / 1e6:>7.1f}MB {vacuumed / 1e6:>7.1f}MB"
+            )
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,91 @@
+"""Benchmark: lazy expansion of recurring tasks into agenda windows.
+
+Measures, for 1k, 5k and 20k recurring series with a mix of daily,
+weekly, monthly and yearly rules whose stored occurrence lies up to a
+year in the past:
+- Expansion of a 7-day and a 31-day window with a cold cache
+- The same windows again, served from the per-window cache
+- The cached windows limited to the first 500 occurrences, as the
+  agenda endpoint requests them
+"""
+import gc
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.haboard.database.models import Task  # noqa: E402
+from custom_components.haboard.database.recurrence import (  # noqa: E402
+    clear_expansion_cache,
+    expand_occurrences,
+)
+
+SERIES_COUNTS = (1_000, 5_000, 20_000)
+AGENDA_LIMIT = 500
+WINDOWS = (("2025-06-02", "2025-06-08"), ("2025-06-01", "2025-07-01"))
+RULES = (
+    "FREQ=DAILY",
+    "FREQ=DAILY;INTERVAL=2",
+    "FREQ=DAILY;BYDAY=MO,TU,WE,TH,FR",
+    "FREQ=WEEKLY",
+    "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH",
+    "FREQ=MONTHLY",
+    "FREQ=MONTHLY;BYMONTHDAY=1,15,-1",
+    "FREQ=YEARLY",
+    "FREQ=WEEKLY;COUNT=80",
+)
+
+
+def make_series(count: int) -> list[Task]:
+    """Build recurring tasks with varied rules and start dates."""
+    rng = random.Random(count)
+    return [
+        Task(
+            title=f"Series {i}",
+            due_date=f"2024-{rng.randint(6, 12):02d}-{rng.randint(1, 28):02d}",
+            recurrence=RULES[i % len(RULES)],
+            priority=i % 4,
+            device_id="bench",
+        )
+        for i in range(count)
+    ]
+
+
+def timed_ms(
+    tasks: list[Task], start: str, end: str, limit: int | None = None
+) -> tuple[float, int]:
+    """Expand once and return (elapsed ms, occurrences)."""
+    gc.collect()
+    begin = time.perf_counter()
+    occurrences = expand_occurrences(tasks, start, end, limit)
+    return (time.perf_counter() - begin) * 1000, len(occurrences)
+
+
+def run_benchmark():
+    """Run recurrence expansion benchmark."""
+    print("=" * 70)
+    print("BENCHMARK: Recurring task expansion per agenda window")
+    print("=" * 70)
+    print(
+        f"\n  {'Series':>7} {'Window':>23} {'Occurrences':>12}"
+        f" {'Cold':>9} {'Cached':>9} {'Limited':>9}"
+    )
+
+    for count in SERIES_COUNTS:
+        tasks = make_series(count)
+        for start, end in WINDOWS:
+            clear_expansion_cache()
+            cold, occurrences = timed_ms(tasks, start, end)
+            cached, _ = timed_ms(tasks, start, end)
+            limited, _ = timed_ms(tasks, start, end, AGENDA_LIMIT)
+            print(
+                f"  {count:>7,} {start + '..' + end:>23} {occurrences:>12,}"
+                f" {cold:>7.1f}ms {cached:>7.1f}ms {limited:>7.1f}ms"
+            )
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_benchmark()
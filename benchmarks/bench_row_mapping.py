@@ -0,0 +1,155 @@
+"""Benchmark: database row to Task mapping.
+
+Measures:
+- Rows/sec for the positional row mapper vs by-name indexing into plain
+  (non-slotted) dataclasses, as the repository did before
+- Peak Python memory while mapping a full result set (tracemalloc)
+- End-to-end TaskRepository.list() throughput
+"""
+import asyncio
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+import uuid
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.haboard.database import Database  # noqa: E402
+from custom_components.haboard.database.models import Task  # noqa: E402
+from custom_components.haboard.database.repository import (  # noqa: E402
+    TASK_COLUMNS,
+    TaskRepository,
+)
+
+ROW_COUNT = 5000
+ITERATIONS = 10
+
+
+@dataclass
+class LegacyTask:
+    """Task model as it was before slots (for comparison only)."""
+
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    title: str = ""
+    notes: Optional[str] = None
+    due_date: Optional[str] = None
+    due_time: Optional[str] = None
+    priority: int = 0
+    completed: bool = False
+    completed_at: Optional[str] = None
+    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    modified_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    device_id: str = ""
+    version: int = 1
+    tags: list[str] = field(default_factory=list)
+
+
+def legacy_row_to_task(row) -> LegacyTask:
+    """Map a row by column name, as the repository used to."""
+    tags = row["tags"].split(",") if row["tags"] else []
+    return LegacyTask(
+        id=row["id"],
+        title=row["title"],
+        notes=row["notes"],
+        due_date=row["due_date"],
+        due_time=row["due_time"],
+        priority=row["priority"],
+        completed=bool(row["completed"]),
+        completed_at=row["completed_at"],
+        created_at=row["created_at"],
+        modified_at=row["modified_at"],
+        device_id=row["device_id"],
+        version=row["version"],
+        tags=tags,
+    )
+
+
+def measure_mapping(mapper, rows) -> tuple[float, int]:
+    """Return (rows/sec, peak bytes) for mapping all rows."""
+    best = float("inf")
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        [mapper(row) for row in rows]
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    mapped = [mapper(row) for row in rows]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del mapped
+
+    return len(rows) / best, peak
+
+
+async def run_benchmark():
+    """Run row mapping benchmark."""
+    print("=" * 70)
+    print(f"BENCHMARK: Row mapping ({ROW_COUNT} rows)")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(Path(tmp_dir) / "bench.db")
+        await db.connect()
+        repo = TaskRepository(db.conn)
+
+        print(f"\nGenerating {ROW_COUNT} tasks...")
+        for i in range(ROW_COUNT):
+            await repo.create(
+                Task(
+                    title=f"Task {i}",
+                    notes=random.choice([None, "Some notes"]),
+                    priority=random.randint(0, 3),
+                    device_id="bench",
+                    tags=random.sample(["home", "work", "grocery"], random.randint(0, 2)),
+                )
+            )
+
+        # Column names match the field names, so the same rows serve both
+        # the by-name and the positional mapper
+        cursor = await db.execute(
+            f"""
+            SELECT {TASK_COLUMNS}, GROUP_CONCAT(tag.name) AS tags
+            FROM tasks t
+            LEFT JOIN task_tags tt ON t.id = tt.task_id
+            LEFT JOIN tags tag ON tt.tag_id = tag.id
+            GROUP BY t.id
+            """
+        )
+        rows = await cursor.fetchall()
+
+        legacy_rate, legacy_peak = measure_mapping(legacy_row_to_task, rows)
+        new_rate, new_peak = measure_mapping(repo._row_to_task, rows)
+
+        start = time.perf_counter()
+        tasks = await repo.list(limit=ROW_COUNT)
+        list_elapsed = time.perf_counter() - start
+
+        await db.disconnect()
+
+    print("\n" + "=" * 70)
+    print("RESULTS")
+    print("=" * 70)
+    print(f"  {'':24}{'legacy':>14}{'slotted':>14}{'ratio':>10}")
+    print(
+        f"  {'mapping (rows/s)':24}{legacy_rate:>14.0f}{new_rate:>14.0f}"
+        f"{new_rate / legacy_rate:>10.2f}"
+    )
+    print(
+        f"  {'peak memory (KiB)':24}{legacy_peak / 1024:>14.0f}{new_peak / 1024:>14.0f}"
+        f"{new_peak / legacy_peak:>10.2f}"
+    )
+    print(
+        f"\n  TaskRepository.list(limit={ROW_COUNT}): {len(tasks)} tasks in "
+        f"{list_elapsed * 1000:.1f}ms ({len(tasks) / list_elapsed:.0f} rows/s)"
+    )
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
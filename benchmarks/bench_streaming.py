@@ -0,0 +1,87 @@
+"""Benchmark: buffered vs streamed task list serialization.
+
+Measures, for a limit=10000 list:
+- Peak Python memory (tracemalloc) of list() + one json encode vs
+  iter_list() with per-batch encoding
+- Time to first encoded chunk and total time
+"""
+import asyncio
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.haboard.database import Database  # noqa: E402
+from custom_components.haboard.database.models import Task  # noqa: E402
+from custom_components.haboard.database.repository import TaskRepository  # noqa: E402
+
+TASK_COUNT = 10000
+
+
+async def buffered(repo: TaskRepository) -> tuple[float, float]:
+    """Materialize all tasks and encode them in one go."""
+    start = time.perf_counter()
+    tasks = await repo.list(limit=TASK_COUNT)
+    body = json.dumps([task.to_dict() for task in tasks]).encode()
+    elapsed = time.perf_counter() - start
+    assert body
+    return elapsed, elapsed
+
+
+async def streamed(repo: TaskRepository) -> tuple[float, float]:
+    """Encode tasks batch by batch, discarding each chunk after 'writing' it."""
+    start = time.perf_counter()
+    first_chunk = None
+    async for tasks in repo.iter_list(limit=TASK_COUNT):
+        chunk = json.dumps([task.to_dict() for task in tasks]).encode()
+        if first_chunk is None:
+            first_chunk = time.perf_counter() - start
+        del chunk
+    return first_chunk, time.perf_counter() - start
+
+
+async def run_benchmark():
+    """Run streaming benchmark."""
+    print("=" * 70)
+    print(f"BENCHMARK: Buffered vs streamed list ({TASK_COUNT} tasks)")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(Path(tmp_dir) / "bench.db")
+        await db.connect()
+        repo = TaskRepository(db.conn)
+
+        print(f"\nGenerating {TASK_COUNT} tasks...")
+        for i in range(TASK_COUNT):
+            await repo.create(
+                Task(title=f"Task {i}", notes="Some notes", device_id="bench", tags=["home"])
+            )
+
+        results = {}
+        for name, func in (("buffered", buffered), ("streamed", streamed)):
+            tracemalloc.start()
+            first, total = await func(repo)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[name] = (first, total, peak)
+
+        await db.disconnect()
+
+    print("\n" + "=" * 70)
+    print("RESULTS")
+    print("=" * 70)
+    print(f"  {'':12}{'first chunk':>14}{'total':>12}{'peak memory':>16}")
+    for name, (first, total, peak) in results.items():
+        print(
+            f"  {name:12}{first * 1000:>12.1f}ms{total * 1000:>10.1f}ms"
+            f"{peak / 1024 / 1024:>13.2f}MiB"
+        )
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
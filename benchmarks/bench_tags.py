@@ -0,0 +1,126 @@
+"""Benchmark: task list latency with joined vs denormalized tags.
+
+Measures, at 10k and 100k tasks with 0, 3 and 10 tags per task:
+- First page of open tasks (limit=100), the common UI request
+- Full list of every task (limit=task count)
+
+Each is run with the previous query shape (LEFT JOIN task_tags/tags,
+GROUP_CONCAT, GROUP BY t.id) and with the current repository query
+reading the tags_json column.
+"""
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.haboard.database import Database  # noqa: E402
+from custom_components.haboard.database.models import Task  # noqa: E402
+from custom_components.haboard.database.repository import (  # noqa: E402
+    TASK_COLUMNS,
+    TaskRepository,
+)
+
+TASK_COUNTS = (10_000, 100_000)
+TAGS_PER_TASK = (0, 3, 10)
+TAG_POOL = 50
+RUNS = 5
+INSERT_BATCH = 5000
+
+JOINED_QUERY = f"""
+    SELECT {TASK_COLUMNS}, GROUP_CONCAT(tag.name) as tags
+    FROM tasks t
+    LEFT JOIN task_tags tt ON t.id = tt.task_id
+    LEFT JOIN tags tag ON tt.tag_id = tag.id
+    {{where}}
+    GROUP BY t.id ORDER BY t.due_date ASC, t.created_at DESC
+    LIMIT ?
+"""
+
+
+async def joined_list(repo: TaskRepository, open_only: bool, limit: int) -> int:
+    """List tasks with the join + GROUP_CONCAT query shape."""
+    query = JOINED_QUERY.format(where="WHERE t.completed = 0" if open_only else "")
+    cursor = await repo.conn.execute(query, (limit,))
+    rows = await cursor.fetchall()
+    tasks = [
+        Task(*row[:13], row[13].split(",") if row[13] else [])  # Old decoder
+        for row in rows
+    ]
+    return len(tasks)
+
+
+async def denormalized_list(repo: TaskRepository, open_only: bool, limit: int) -> int:
+    """List tasks through the repository (tags_json)."""
+    return len(await repo.list(completed=False if open_only else None, limit=limit))
+
+
+async def median_ms(func, *args) -> float:
+    """Median wall time in ms over RUNS calls."""
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        await func(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def run_case(tmp_dir: str, task_count: int, tags_per_task: int) -> tuple:
+    """Build one database and time both query shapes on it."""
+    db = Database(Path(tmp_dir) / f"tags-{task_count}-{tags_per_task}.db")
+    await db.connect()
+    repo = TaskRepository(db.conn)
+
+    for start in range(0, task_count, INSERT_BATCH):
+        await repo.bulk_create(
+            [
+                Task(
+                    title=f"Task {i}",
+                    due_date=f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                    completed=i % 3 == 0,
+                    tags=[f"tag{(i + j) % TAG_POOL}" for j in range(tags_per_task)],
+                    device_id="bench",
+                )
+                for i in range(start, min(start + INSERT_BATCH, task_count))
+            ]
+        )
+    await db.execute("ANALYZE")
+
+    result = (
+        await median_ms(joined_list, repo, True, 100),
+        await median_ms(denormalized_list, repo, True, 100),
+        await median_ms(joined_list, repo, False, task_count),
+        await median_ms(denormalized_list, repo, False, task_count),
+    )
+    await db.disconnect()
+    return result
+
+
+async def run_benchmark():
+    """Run tag denormalization benchmark."""
+    print("=" * 70)
+    print("BENCHMARK: Task list latency, joined vs denormalized tags")
+    print("=" * 70)
+    print(
+        f"\n  {'Tasks':>7} {'Tags':>5} | {'Page joined':>12} {'Page json':>10}"
+        f" | {'All joined':>11} {'All json':>10}"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for task_count in TASK_COUNTS:
+            for tags_per_task in TAGS_PER_TASK:
+                page_joined, page_json, all_joined, all_json = await run_case(
+                    tmp_dir, task_count, tags_per_task
+                )
+                print(
+                    f"  {task_count:>7,} {tags_per_task:>5} | {page_joined:>10.1f}ms"
+                    f" {page_json:>8.1f}ms | {all_joined:>9.1f}ms {all_json:>8.1f}ms"
+                )
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
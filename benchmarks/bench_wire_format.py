@@ -0,0 +1,109 @@
+"""Benchmark: JSON vs columnar wire format for task payloads.
+
+Measures:
+- Raw and gzip-compressed payload size for list responses
+- Encode and decode throughput (tasks/sec)
+"""
+import gzip
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.haboard.database.models import (  # noqa: E402
+    Task,
+    decode_columnar,
+    encode_columnar,
+)
+
+TASK_COUNTS = [100, 1000, 5000]
+ITERATIONS = 20
+
+SAMPLE_TITLES = [
+    "Buy milk",
+    "Call dentist for appointment",
+    "Fix leaky faucet in bathroom",
+    "Pay electricity bill",
+    "Water plants in garden",
+]
+SAMPLE_TAGS = ["grocery", "work", "urgent", "home", "family"]
+
+
+def generate_tasks(count: int) -> list[Task]:
+    """Generate realistic tasks."""
+    return [
+        Task(
+            title=f"{random.choice(SAMPLE_TITLES)} #{i}",
+            notes=random.choice([None, "Remember to check the list"]),
+            due_date=random.choice([None, "2025-01-15"]),
+            priority=random.randint(0, 3),
+            completed=random.random() < 0.3,
+            device_id="bench",
+            tags=random.sample(SAMPLE_TAGS, random.randint(0, 3)),
+        )
+        for i in range(count)
+    ]
+
+
+def measure(func, iterations: int = ITERATIONS) -> float:
+    """Return the best wall time in seconds over several runs."""
+    best = float("inf")
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark():
+    """Run wire format benchmark."""
+    print("=" * 70)
+    print("BENCHMARK: Task wire formats (JSON objects vs columnar)")
+    print("=" * 70)
+
+    for count in TASK_COUNTS:
+        tasks = generate_tasks(count)
+
+        json_body = json.dumps([task.to_dict() for task in tasks]).encode()
+        columnar_body = json.dumps(encode_columnar(tasks)).encode()
+
+        json_encode = measure(
+            lambda tasks=tasks: json.dumps([task.to_dict() for task in tasks])
+        )
+        columnar_encode = measure(lambda tasks=tasks: json.dumps(encode_columnar(tasks)))
+        json_decode = measure(
+            lambda json_body=json_body: [Task.from_dict(item) for item in json.loads(json_body)]
+        )
+        columnar_decode = measure(
+            lambda columnar_body=columnar_body: decode_columnar(json.loads(columnar_body))
+        )
+
+        print(f"\n{count} tasks")
+        print(f"  {'':18}{'json':>14}{'columnar':>14}{'ratio':>10}")
+        print(
+            f"  {'size (bytes)':18}{len(json_body):>14}{len(columnar_body):>14}"
+            f"{len(columnar_body) / len(json_body):>10.2f}"
+        )
+        json_gz = len(gzip.compress(json_body))
+        columnar_gz = len(gzip.compress(columnar_body))
+        print(
+            f"  {'gzip (bytes)':18}{json_gz:>14}{columnar_gz:>14}"
+            f"{columnar_gz / json_gz:>10.2f}"
+        )
+        print(
+            f"  {'encode (tasks/s)':18}{count / json_encode:>14.0f}"
+            f"{count / columnar_encode:>14.0f}{json_encode / columnar_encode:>10.2f}"
+        )
+        print(
+            f"  {'decode (tasks/s)':18}{count / json_decode:>14.0f}"
+            f"{count / columnar_decode:>14.0f}{json_decode / columnar_decode:>10.2f}"
+        )
+
+    print("\n" + "=" * 70)
+
+
+if __name__ == "__main__":
+    run_benchmark()
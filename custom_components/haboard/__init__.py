@@ -1,60 +1,255 @@
 """HABoard - Home Assistant To-Do App Integration."""
 from __future__ import annotations
 
+import asyncio
+from datetime import datetime, timedelta
+from functools import partial
 import logging
 from pathlib import Path
+import time
+from typing import TYPE_CHECKING
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.const import Platform
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.start import async_at_started
+from homeassistant.util import dt as dt_util
 import voluptuous as vol
 
-from .const import DOMAIN
-from .database import get_database, Database
-from .database.repository import TaskRepository, TagRepository
-from .database.models import Task, Tag
-from .api import setup_api, setup_websocket, WebSocketManager
+from .const import (
+    CONF_ARCHIVE_AFTER_DAYS,
+    CONF_DATABASE,
+    DEFAULT_ARCHIVE_AFTER_DAYS,
+    DEFAULT_DATABASE,
+    DOMAIN,
+)
+
+# The database and API stack are imported in the executor on first setup
+# (see _import_modules), keeping them off the integration loading path.
+if TYPE_CHECKING:
+    from .api import WebSocketManager
+    from .database import Database
+    from .database.repository import TaskRepository
 
 _LOGGER = logging.getLogger(__name__)
 
+# Seconds between backfill and archival batches, leaving room for
+# interactive requests
+BACKFILL_PAUSE = 0.05
+
+# How often to check whether the database is idle enough for maintenance
+MAINTENANCE_INTERVAL = timedelta(hours=1)
+
+PLATFORMS = [Platform.SENSOR, Platform.TODO]
+
+# Set once the views, WebSocket commands and services are registered; they
+# serve every config entry and stay registered until Home Assistant stops
+DATA_REGISTERED = f"{DOMAIN}_registered"
+
+# Services act on the first config entry unless given an entry_id
+ENTRY_SCHEMA = {vol.Optional("entry_id"): cv.string}
+
 # Service schemas
 SERVICE_CREATE_TASK_SCHEMA = vol.Schema({
+    **ENTRY_SCHEMA,
     vol.Required("title"): cv.string,
     vol.Optional("notes"): cv.string,
     vol.Optional("due_date"): cv.string,
     vol.Optional("priority", default=0): vol.All(vol.Coerce(int), vol.Range(min=0, max=3)),
+    vol.Optional("recurrence"): cv.string,
     vol.Optional("tags"): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional("board_id"): cv.string,
+    vol.Optional("list_id"): cv.string,
+    vol.Optional("parent_id"): cv.string,
 })
 
+# Batch services select tasks by ID list, tag, full-text query and/or
+# board; all selectors given must match
+SELECTOR_SCHEMA = {
+    **ENTRY_SCHEMA,
+    vol.Optional("task_ids"): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional("tag"): cv.string,
+    vol.Optional("query"): cv.string,
+    vol.Optional("board_id"): cv.string,
+}
+SELECTOR_KEYS = ("task_ids", "tag", "query", "board_id")
+
+SERVICE_COMPLETE_ITEMS_SCHEMA = vol.All(
+    vol.Schema({**SELECTOR_SCHEMA, vol.Optional("completed", default=True): cv.boolean}),
+    cv.has_at_least_one_key(*SELECTOR_KEYS),
+)
+
+SERVICE_UPDATE_ITEMS_SCHEMA = vol.All(
+    vol.Schema({
+        **SELECTOR_SCHEMA,
+        vol.Optional("title"): cv.string,
+        vol.Optional("notes"): vol.Any(None, cv.string),
+        vol.Optional("due_date"): vol.Any(None, cv.string),
+        vol.Optional("due_time"): vol.Any(None, cv.string),
+        vol.Optional("priority"): vol.All(vol.Coerce(int), vol.Range(min=0, max=3)),
+    }),
+    cv.has_at_least_one_key(*SELECTOR_KEYS),
+    cv.has_at_least_one_key("title", "notes", "due_date", "due_time", "priority"),
+)
+
+SERVICE_DELETE_ITEMS_SCHEMA = vol.All(
+    vol.Schema(SELECTOR_SCHEMA),
+    cv.has_at_least_one_key(*SELECTOR_KEYS),
+)
+
+SERVICE_TAG_ITEMS_SCHEMA = vol.All(
+    vol.Schema({
+        **SELECTOR_SCHEMA,
+        vol.Optional("add", default=[]): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("remove", default=[]): vol.All(cv.ensure_list, [cv.string]),
+    }),
+    cv.has_at_least_one_key(*SELECTOR_KEYS),
+    cv.has_at_least_one_key("add", "remove"),
+)
+
+
+def _import_modules() -> None:
+    """Import the database and API modules (runs in the import executor)."""
+    from . import api, database, reminders, sensor, stats, todo  # noqa: F401
+    from .database import models, repository  # noqa: F401
+
+
+def _elapsed_ms(start: float) -> float:
+    """Return milliseconds elapsed since a time.monotonic() timestamp."""
+    return (time.monotonic() - start) * 1000
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up HABoard from a config entry."""
     _LOGGER.info("Setting up HABoard integration")
+    timings: dict[str, float] = {}
+    setup_start = start = time.monotonic()
 
-    # Initialize database
-    config_dir = Path(hass.config.path())
-    db = await get_database(config_dir)
+    await hass.async_add_import_executor_job(_import_modules)
+    from .api import WebSocketManager, setup_api, setup_websocket
+    from .database import get_database
+    from .database.repository import BoardRepository, TagRepository, TaskRepository
+    from .reminders import ReminderScheduler
+    from .stats import TaskStats
 
-    # Set up WebSocket support
-    ws_manager = setup_websocket(hass)
+    timings["imports"] = _elapsed_ms(start)
 
-    # Set up REST API
-    setup_api(hass)
+    # Initialize database (directory creation and schema loading run in the
+    # executor, SQLite itself on aiosqlite's thread). Every entry has its own
+    # file, so entries never wait on each other's writes.
+    start = time.monotonic()
+    config_dir = Path(hass.config.path())
+    db = await get_database(config_dir, entry.data.get(CONF_DATABASE, DEFAULT_DATABASE))
+    timings["database"] = _elapsed_ms(start)
+
+    # Set up WebSocket support, REST API and services for the first entry
+    start = time.monotonic()
+    if not hass.data.get(DATA_REGISTERED):
+        setup_websocket(hass)
+        setup_api(hass)
+        _register_services(hass)
+        hass.data[DATA_REGISTERED] = True
+    timings["api"] = _elapsed_ms(start)
 
     # Store database in hass.data
+    task_repo = TaskRepository(
+        db.conn, dt_util.get_time_zone(hass.config.time_zone) or dt_util.UTC
+    )
+    reminders = ReminderScheduler(hass, task_repo, entry.entry_id)
     hass.data.setdefault(DOMAIN, {})
+    first_entry = not hass.data[DOMAIN]
     hass.data[DOMAIN][entry.entry_id] = {
         "db": db,
-        "task_repo": TaskRepository(db.conn),
+        "task_repo": task_repo,
         "tag_repo": TagRepository(db.conn),
-        "ws_manager": ws_manager,
+        "board_repo": BoardRepository(db.conn, task_repo),
+        "ws_manager": WebSocketManager(hass, entry.entry_id),
+        "reminders": reminders,
+        "stats": TaskStats(task_repo),
     }
 
-    # Register services
-    await _register_services(hass, entry)
+    # Set up the sensors and the to-do list entities (to-do items load in
+    # the background)
+    start = time.monotonic()
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    timings["platforms"] = _elapsed_ms(start)
+
+    # Register sidebar panel (one for all entries; the frontend switches
+    # between them)
+    start = time.monotonic()
+    if first_entry:
+        _register_panel(hass)
+    timings["panel"] = _elapsed_ms(start)
+
+    # Warm up the database and load due-task reminders once Home Assistant
+    # has finished starting, then run maintenance (and archival) whenever a
+    # full interval passes without writes
+    archive_after_days: int = entry.options.get(
+        CONF_ARCHIVE_AFTER_DAYS, DEFAULT_ARCHIVE_AFTER_DAYS
+    )
+    last_changes = -1
+
+    @callback
+    def _schedule_maintenance(now: datetime) -> None:
+        nonlocal last_changes
+        changes = db.conn.total_changes
+        if changes != last_changes:
+            last_changes = changes
+            return
+        entry.async_create_background_task(
+            hass,
+            _async_maintenance(
+                db, task_repo, hass.data[DOMAIN][entry.entry_id]["ws_manager"], archive_after_days
+            ),
+            f"{DOMAIN}_maintenance_{entry.entry_id}",
+        )
+
+    @callback
+    def _schedule_warm_up(hass: HomeAssistant) -> None:
+        entry.async_create_background_task(
+            hass, _async_warm_up(db, task_repo), f"{DOMAIN}_warm_up_{entry.entry_id}"
+        )
+        entry.async_create_background_task(
+            hass, reminders.async_start(), f"{DOMAIN}_reminders_{entry.entry_id}"
+        )
+        entry.async_on_unload(
+            async_track_time_interval(hass, _schedule_maintenance, MAINTENANCE_INTERVAL)
+        )
+
+    entry.async_on_unload(async_at_started(hass, _schedule_warm_up))
+    entry.async_on_unload(reminders.async_stop)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
+    _LOGGER.debug(
+        "HABoard setup phases: %s",
+        ", ".join(f"{phase}={elapsed:.1f}ms" for phase, elapsed in timings.items()),
+    )
+    _LOGGER.info(
+        "HABoard integration setup complete in %.1fms", _elapsed_ms(setup_start)
+    )
+    return True
+
+
+@callback
+def _register_panel(hass: HomeAssistant) -> None:
+    """Register the HABoard sidebar panel.
+
+    Args:
+        hass: Home Assistant instance
+    """
+    from homeassistant.components import frontend
 
-    # Register sidebar panel
-    await hass.components.frontend.async_register_built_in_panel(
+    frontend.async_register_built_in_panel(
+        hass,
         component_name="custom",
         sidebar_title="HABoard",
         sidebar_icon="mdi:clipboard-check",
@@ -70,68 +265,305 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         },
     )
 
-    _LOGGER.info("HABoard integration setup complete")
-    return True
+
+async def _async_warm_up(db: Database, task_repo: TaskRepository) -> None:
+    """Run post-startup database warm-up and pending migration backfills.
+
+    Args:
+        db: Connected database
+        task_repo: Task repository, for the completion history backfill
+    """
+    start = time.monotonic()
+    timings = await db.async_warm_up()
+    _LOGGER.debug(
+        "HABoard warm-up finished in %.1fms: %s",
+        _elapsed_ms(start),
+        ", ".join(f"{step}={elapsed:.1f}ms" for step, elapsed in timings.items()),
+    )
+
+    start = time.monotonic()
+    if await db.async_run_backfills(pause=BACKFILL_PAUSE):
+        _LOGGER.debug("HABoard backfills done in %.1fms", _elapsed_ms(start))
+
+    # Rolling up completions needs the time zone, which the migrations
+    # do not know, so this backfill runs through the repository
+    start = time.monotonic()
+    batches = 0
+    while await task_repo.backfill_completion_history():
+        batches += 1
+        await asyncio.sleep(BACKFILL_PAUSE)
+    if batches:
+        _LOGGER.debug(
+            "HABoard completion history backfilled in %.1fms", _elapsed_ms(start)
+        )
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the integration when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def _async_maintenance(
+    db: Database,
+    task_repo: TaskRepository,
+    ws_manager: WebSocketManager,
+    archive_after_days: int,
+) -> None:
+    """Archive old completed tasks, then run idle-time database maintenance.
+
+    Args:
+        db: Connected database
+        task_repo: Task repository
+        ws_manager: WebSocket manager, told about tasks given new sort keys
+        archive_after_days: Days after completion before archiving (0: never)
+    """
+    from .database.maintenance import DEFAULT_STEP_BUDGET
+
+    if archive_after_days:
+        start = time.monotonic()
+        # Epoch milliseconds, as completed_at is stored
+        cutoff = int((time.time() - timedelta(days=archive_after_days).total_seconds()) * 1000)
+        archived = 0
+        while moved := await task_repo.archive_completed(cutoff):
+            archived += moved
+            await asyncio.sleep(BACKFILL_PAUSE)
+        if archived:
+            _LOGGER.info(
+                "Archived %d tasks completed over %d days ago in %.1fms",
+                archived,
+                archive_after_days,
+                _elapsed_ms(start),
+            )
+
+    # Rewritten sort keys are new versions; clients replace the ones they hold
+    start = time.monotonic()
+    rekeyed = await task_repo.rebalance_sort_keys(start + DEFAULT_STEP_BUDGET)
+    if rekeyed:
+        ws_manager.broadcast_tasks_updated([task.to_dict() for task in rekeyed])
+        _LOGGER.debug(
+            "Rebalanced sort keys of %d tasks in %.1fms", len(rekeyed), _elapsed_ms(start)
+        )
+
+    steps = await db.async_run_maintenance()
+    _LOGGER.debug(
+        "HABoard maintenance: %s",
+        ", ".join(
+            f"{step.name}={step.elapsed_ms:.1f}ms/{step.work}"
+            f"{'' if step.complete else ' (budget exhausted)'}"
+            for step in steps
+        ),
+    )
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload HABoard config entry."""
     _LOGGER.info("Unloading HABoard integration")
 
-    # Remove sidebar panel
-    hass.components.frontend.async_remove_panel("haboard")
+    if not await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        return False
 
     # Disconnect database
     data = hass.data[DOMAIN].pop(entry.entry_id)
     db: Database = data["db"]
     await db.disconnect()
 
+    # Remove sidebar panel with the last entry
+    if not hass.data[DOMAIN]:
+        from homeassistant.components import frontend
+
+        frontend.async_remove_panel(hass, "haboard")
+
     _LOGGER.info("HABoard integration unloaded")
     return True
 
 
-async def _register_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
+@callback
+def _register_services(hass: HomeAssistant) -> None:
     """Register HABoard services.
 
     Args:
         hass: Home Assistant instance
-        entry: Config entry
     """
-
-    async def handle_create_task(call: ServiceCall) -> None:
-        """Handle create_task service call.
-
-        Args:
-            call: Service call with task data
-        """
-        data = hass.data[DOMAIN][entry.entry_id]
-        task_repo: TaskRepository = data["task_repo"]
-
-        # Create task from service data
-        task = Task(
-            title=call.data["title"],
-            notes=call.data.get("notes"),
-            due_date=call.data.get("due_date"),
-            priority=call.data.get("priority", 0),
-            tags=call.data.get("tags", []),
-            device_id="homeassistant",  # TODO: Get actual device ID
-        )
-
-        # Save to database
-        created_task = await task_repo.create(task)
-
-        _LOGGER.debug("Created task via service: %s", created_task.id)
-
-        # Broadcast task created event via WebSocket
-        ws_manager: WebSocketManager = data["ws_manager"]
-        ws_manager.broadcast_task_created(created_task.to_dict())
-
-    # Register services
     hass.services.async_register(
         DOMAIN,
         "create_task",
-        handle_create_task,
+        partial(_async_handle_create_task, hass),
         schema=SERVICE_CREATE_TASK_SCHEMA,
     )
+    for service, handler, schema in (
+        ("complete_items", _async_handle_complete_items, SERVICE_COMPLETE_ITEMS_SCHEMA),
+        ("update_items", _async_handle_update_items, SERVICE_UPDATE_ITEMS_SCHEMA),
+        ("delete_items", _async_handle_delete_items, SERVICE_DELETE_ITEMS_SCHEMA),
+        ("tag_items", _async_handle_tag_items, SERVICE_TAG_ITEMS_SCHEMA),
+    ):
+        hass.services.async_register(
+            DOMAIN,
+            service,
+            partial(handler, hass),
+            schema=schema,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
 
     _LOGGER.debug("Registered HABoard services")
+
+
+def _entry_data(hass: HomeAssistant, call: ServiceCall) -> dict:
+    """Data of the config entry a service call acts on."""
+    entries = hass.data.get(DOMAIN, {})
+    entry_id = call.data.get("entry_id") or next(iter(entries), None)
+    if entry_id not in entries:
+        raise HomeAssistantError(f"HABoard config entry not loaded: {entry_id}")
+    return entries[entry_id]
+
+
+def _device_id(call: ServiceCall) -> str:
+    """Device ID recorded for writes made by a service call."""
+    user_id = call.context.user_id
+    return f"homeassistant:{user_id}" if user_id else "homeassistant"
+
+
+def _selectors(call: ServiceCall) -> dict:
+    """Task selectors of a batch service call."""
+    return {key: call.data.get(key) for key in SELECTOR_KEYS}
+
+
+async def _async_handle_create_task(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Handle create_task service call.
+
+    Args:
+        hass: Home Assistant instance
+        call: Service call with task data
+    """
+    from .database.models import DEFAULT_BOARD_ID, Task
+
+    data = _entry_data(hass, call)
+    task_repo: TaskRepository = data["task_repo"]
+
+    # Create task from service data
+    task = Task(
+        title=call.data["title"],
+        notes=call.data.get("notes"),
+        due_date=call.data.get("due_date"),
+        priority=call.data.get("priority", 0),
+        recurrence=call.data.get("recurrence"),
+        tags=call.data.get("tags", []),
+        board_id=call.data.get("board_id", DEFAULT_BOARD_ID),
+        list_id=call.data.get("list_id"),
+        parent_id=call.data.get("parent_id"),
+        device_id=_device_id(call),
+    )
+
+    # Save to database
+    try:
+        created_task = await task_repo.create(task)
+    except ValueError as err:
+        raise HomeAssistantError(str(err)) from err
+
+    _LOGGER.debug("Created task via service: %s", created_task.id)
+
+    # Broadcast task created event via WebSocket
+    ws_manager: WebSocketManager = data["ws_manager"]
+    ws_manager.broadcast_task_created(created_task.to_dict())
+
+
+async def _async_handle_complete_items(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """Handle complete_items service call.
+
+    Args:
+        hass: Home Assistant instance
+        call: Service call with task selectors and completed flag
+
+    Returns:
+        Number of tasks changed
+    """
+    data = _entry_data(hass, call)
+    task_repo: TaskRepository = data["task_repo"]
+    try:
+        tasks = await task_repo.complete_many(
+            call.data["completed"], _device_id(call), **_selectors(call)
+        )
+    except ValueError as err:
+        raise HomeAssistantError(str(err)) from err
+
+    ws_manager: WebSocketManager = data["ws_manager"]
+    ws_manager.broadcast_tasks_updated([task.to_dict() for task in tasks])
+    return {"count": len(tasks)}
+
+
+async def _async_handle_update_items(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """Handle update_items service call.
+
+    Args:
+        hass: Home Assistant instance
+        call: Service call with task selectors and fields to set
+
+    Returns:
+        Number of tasks changed
+    """
+    from .database.repository import BATCH_UPDATE_FIELDS
+
+    data = _entry_data(hass, call)
+    task_repo: TaskRepository = data["task_repo"]
+    changes = {field: call.data[field] for field in BATCH_UPDATE_FIELDS if field in call.data}
+    try:
+        tasks = await task_repo.update_many(changes, _device_id(call), **_selectors(call))
+    except ValueError as err:
+        raise HomeAssistantError(str(err)) from err
+
+    ws_manager: WebSocketManager = data["ws_manager"]
+    ws_manager.broadcast_tasks_updated([task.to_dict() for task in tasks])
+    return {"count": len(tasks)}
+
+
+async def _async_handle_delete_items(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """Handle delete_items service call.
+
+    Args:
+        hass: Home Assistant instance
+        call: Service call with task selectors
+
+    Returns:
+        Number of tasks deleted
+    """
+    data = _entry_data(hass, call)
+    task_repo: TaskRepository = data["task_repo"]
+    try:
+        task_ids = await task_repo.delete_many(**_selectors(call))
+    except ValueError as err:
+        raise HomeAssistantError(str(err)) from err
+
+    ws_manager: WebSocketManager = data["ws_manager"]
+    ws_manager.broadcast_tasks_deleted(task_ids)
+    return {"count": len(task_ids)}
+
+
+async def _async_handle_tag_items(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """Handle tag_items service call.
+
+    Args:
+        hass: Home Assistant instance
+        call: Service call with task selectors and tags to add and remove
+
+    Returns:
+        Number of tasks changed
+    """
+    data = _entry_data(hass, call)
+    task_repo: TaskRepository = data["task_repo"]
+    try:
+        tasks = await task_repo.tag_many(
+            call.data["add"], call.data["remove"], _device_id(call), **_selectors(call)
+        )
+    except ValueError as err:
+        raise HomeAssistantError(str(err)) from err
+
+    ws_manager: WebSocketManager = data["ws_manager"]
+    ws_manager.broadcast_tasks_updated([task.to_dict() for task in tasks])
+    return {"count": len(tasks)}
@@ -0,0 +1,519 @@
+"""Export and import formats (NDJSON, CSV, iCalendar) for HABoard tasks.
+
+Encoders turn a batch of tasks into bytes so exports can be written chunk
+by chunk. Decoders consume an async iterator of raw lines (such as an
+aiohttp request body) and yield tasks one at a time, so neither direction
+needs the whole data set in memory.
+"""
+from __future__ import annotations
+
+import calendar
+import csv
+from dataclasses import dataclass
+import io
+import json
+import time
+from typing import AsyncIterator, Callable, Optional
+
+from ..database.models import TASK_WIRE_KEYS, Task
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+FORMAT_ICS = "ics"
+
+# iCalendar content lines should not exceed 75 octets
+ICS_LINE_LIMIT = 75
+
+# HABoard priority (0=none, 3=high) <-> iCalendar PRIORITY (0=undefined, 1=highest)
+_PRIORITY_TO_ICS = {0: 0, 1: 9, 2: 5, 3: 1}
+
+
+@dataclass(frozen=True, slots=True)
+class ExportFormat:
+    """Streaming export format."""
+
+    content_type: str
+    extension: str
+    header: bytes
+    footer: bytes
+    encode: Callable[[list[Task]], bytes]
+
+
+def _checked(task: Task) -> Task:
+    """Check the fields of a decoded task that the database constrains.
+
+    Args:
+        task: Decoded task
+
+    Returns:
+        The same task
+
+    Raises:
+        ValueError: If the title, priority or tags have the wrong type or range
+    """
+    if not isinstance(task.title, str):
+        raise ValueError(f"Task {task.id}: title must be a string")
+    if type(task.priority) is not int or not 0 <= task.priority <= 3:
+        raise ValueError(f"Task {task.id}: priority must be an integer from 0 to 3")
+    if not isinstance(task.tags, list) or not all(isinstance(tag, str) for tag in task.tags):
+        raise ValueError(f"Task {task.id}: tags must be a list of strings")
+    return task
+
+
+# ====================
+# NDJSON
+# ====================
+
+
+def encode_ndjson(tasks: list[Task]) -> bytes:
+    """Encode tasks as newline-delimited JSON, one task per line.
+
+    Args:
+        tasks: Tasks to encode
+
+    Returns:
+        Encoded bytes
+    """
+    return "".join(
+        json.dumps(task.to_dict(), ensure_ascii=False, separators=(",", ":")) + "\n"
+        for task in tasks
+    ).encode()
+
+
+async def iter_ndjson(lines: AsyncIterator[bytes]) -> AsyncIterator[Task]:
+    """Decode newline-delimited JSON tasks.
+
+    Args:
+        lines: Raw input lines
+
+    Yields:
+        Decoded tasks
+
+    Raises:
+        ValueError: If a line is not a JSON object or not a valid task
+    """
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as err:
+            raise ValueError(f"Line {line_number}: invalid JSON") from err
+        if not isinstance(data, dict):
+            raise ValueError(f"Line {line_number}: expected a JSON object")
+        try:
+            task = _checked(Task.from_dict(data))
+        except ValueError as err:
+            raise ValueError(f"Line {line_number}: {err}") from err
+        yield task
+
+
+# ====================
+# CSV
+# ====================
+
+
+def _csv_row(values: list) -> str:
+    """Render a single CSV record."""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\r\n").writerow(values)
+    return buffer.getvalue()
+
+
+def encode_csv(tasks: list[Task]) -> bytes:
+    """Encode tasks as CSV records (without header).
+
+    Booleans are written as ``true``/``false`` and tags as a JSON array so
+    tag names containing commas or semicolons survive a round trip.
+
+    Args:
+        tasks: Tasks to encode
+
+    Returns:
+        Encoded bytes
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\r\n")
+    for task in tasks:
+        row = task.to_wire_row()
+        row[TASK_WIRE_KEYS.index("completed")] = "true" if task.completed else "false"
+        row[TASK_WIRE_KEYS.index("tags")] = json.dumps(task.tags, ensure_ascii=False)
+        writer.writerow(row)
+    return buffer.getvalue().encode()
+
+
+async def iter_csv(lines: AsyncIterator[bytes]) -> AsyncIterator[Task]:
+    """Decode CSV tasks. The first record must be the header.
+
+    Quoted fields may span several lines; lines are buffered until the
+    record's quotes are balanced before it is parsed.
+
+    Args:
+        lines: Raw input lines
+
+    Yields:
+        Decoded tasks
+
+    Raises:
+        ValueError: If the header or a record is invalid
+    """
+    header: Optional[list[str]] = None
+    pending = ""
+
+    async for line in lines:
+        pending += line.decode("utf-8-sig" if header is None and not pending else "utf-8")
+        if pending.count('"') % 2:
+            # Inside a quoted field that continues on the next line
+            continue
+        record, pending = pending, ""
+        if not record.strip():
+            continue
+
+        values = next(csv.reader([record]))
+        if header is None:
+            header = values
+            if "title" not in header:
+                raise ValueError("CSV header must include a 'title' column")
+            continue
+
+        if len(values) != len(header):
+            raise ValueError(
+                f"CSV record has {len(values)} fields, expected {len(header)}"
+            )
+        yield _checked(
+            Task.from_dict(_csv_values_to_dict(dict(zip(header, values, strict=True))))
+        )
+
+    if pending.strip():
+        raise ValueError("CSV input ends inside a quoted field")
+
+
+def _csv_values_to_dict(values: dict[str, str]) -> dict:
+    """Convert CSV string values to task dictionary values.
+
+    Args:
+        values: Column name -> raw string value
+
+    Returns:
+        Task dictionary
+    """
+    data: dict = {}
+    for key, value in values.items():
+        if key not in TASK_WIRE_KEYS:
+            continue
+        if key in ("priority", "version", "subtask_count", "subtasks_done"):
+            if value:
+                data[key] = int(value)
+        elif key == "completed":
+            data[key] = value.strip().lower() in ("1", "true", "yes")
+        elif key == "tags":
+            data[key] = _parse_csv_tags(value)
+        elif key in ("id", "created_at", "modified_at"):
+            # Missing values fall back to generated defaults
+            if value:
+                data[key] = value
+        else:
+            data[key] = value or None
+    return data
+
+
+def _parse_csv_tags(value: str) -> list[str]:
+    """Parse a tags cell (JSON array, or a plain semicolon-separated list)."""
+    value = value.strip()
+    if not value:
+        return []
+    if value.startswith("["):
+        return [str(tag) for tag in json.loads(value)]
+    return [tag.strip() for tag in value.split(";") if tag.strip()]
+
+
+# ====================
+# iCalendar (VTODO)
+# ====================
+
+
+def _ics_escape(text: str) -> str:
+    """Escape a TEXT value (RFC 5545 3.3.11)."""
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _ics_unescape(text: str) -> str:
+    """Reverse _ics_escape."""
+    if "\\" not in text:
+        return text
+    result = []
+    chars = iter(text)
+    for char in chars:
+        if char == "\\":
+            escaped = next(chars, "")
+            result.append("\n" if escaped in ("n", "N") else escaped)
+        else:
+            result.append(char)
+    return "".join(result)
+
+
+def _ics_fold(line: str) -> str:
+    """Fold a content line at 75 octets without splitting UTF-8 sequences."""
+    if len(line) * 4 <= ICS_LINE_LIMIT or len(line.encode()) <= ICS_LINE_LIMIT:
+        return line + "\r\n"
+    parts = []
+    current = ""
+    size = 0
+    for char in line:
+        char_size = len(char.encode())
+        # Continuation lines start with a space that counts towards the limit
+        if size + char_size > ICS_LINE_LIMIT:
+            parts.append(current)
+            current = " "
+            size = 1
+        current += char
+        size += char_size
+    parts.append(current)
+    return "\r\n".join(parts) + "\r\n"
+
+
+def _ics_timestamp(value: int) -> str:
+    """Render epoch milliseconds as an iCalendar UTC date-time."""
+    return time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(value // 1000))
+
+
+def _parse_ics_timestamp(value: str) -> int:
+    """Parse an iCalendar UTC date-time into epoch milliseconds."""
+    return calendar.timegm(time.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")) * 1000
+
+
+def _ics_due_lines(task: Task) -> list[str]:
+    """Render the due date of a task, with DTSTART and RRULE if it recurs."""
+    due_date = task.due_date.replace("-", "")
+    if task.due_time:
+        due_time = task.due_time.replace(":", "")[:6].ljust(6, "0")
+        due = f"DUE:{due_date}T{due_time}\r\n"
+    else:
+        due = f"DUE;VALUE=DATE:{due_date}\r\n"
+    if not task.recurrence:
+        return [due]
+    # RRULE counts from DTSTART, which is the current occurrence
+    return [due, due.replace("DUE", "DTSTART", 1), _ics_fold(f"RRULE:{task.recurrence}")]
+
+
+def encode_ics(tasks: list[Task]) -> bytes:
+    """Encode tasks as VTODO components (without the VCALENDAR wrapper).
+
+    Args:
+        tasks: Tasks to encode
+
+    Returns:
+        Encoded bytes
+    """
+    lines = []
+    for task in tasks:
+        lines.append("BEGIN:VTODO\r\n")
+        lines.append(_ics_fold(f"UID:{task.id}"))
+        lines.append(f"DTSTAMP:{_ics_timestamp(task.modified_at)}\r\n")
+        lines.append(f"CREATED:{_ics_timestamp(task.created_at)}\r\n")
+        lines.append(f"LAST-MODIFIED:{_ics_timestamp(task.modified_at)}\r\n")
+        lines.append(f"SEQUENCE:{task.version - 1}\r\n")
+        lines.append(_ics_fold(f"SUMMARY:{_ics_escape(task.title)}"))
+        if task.notes:
+            lines.append(_ics_fold(f"DESCRIPTION:{_ics_escape(task.notes)}"))
+        if task.due_date:
+            lines.extend(_ics_due_lines(task))
+        if task.priority:
+            lines.append(f"PRIORITY:{_PRIORITY_TO_ICS[task.priority]}\r\n")
+        if task.completed:
+            lines.append("STATUS:COMPLETED\r\n")
+            if task.completed_at:
+                lines.append(f"COMPLETED:{_ics_timestamp(task.completed_at)}\r\n")
+        else:
+            lines.append("STATUS:NEEDS-ACTION\r\n")
+        if task.tags:
+            lines.append(
+                _ics_fold("CATEGORIES:" + ",".join(_ics_escape(tag) for tag in task.tags))
+            )
+        if task.parent_id:
+            # RELTYPE defaults to PARENT (RFC 5545 3.8.4.5)
+            lines.append(_ics_fold(f"RELATED-TO:{task.parent_id}"))
+        lines.append("END:VTODO\r\n")
+    return "".join(lines).encode()
+
+
+async def iter_ics(lines: AsyncIterator[bytes]) -> AsyncIterator[Task]:
+    """Decode VTODO components from an iCalendar stream.
+
+    Other components (VEVENT, VTIMEZONE, ...) are skipped.
+
+    Args:
+        lines: Raw input lines
+
+    Yields:
+        Decoded tasks
+    """
+    # Properties of the VTODO being read, None outside a VTODO
+    properties: Optional[list[tuple[str, str]]] = None
+
+    async for raw in _ics_unfold(lines):
+        name_part, _, value = raw.partition(":")
+        name = name_part.split(";", 1)[0].upper()
+
+        if name == "BEGIN" and value.upper() == "VTODO":
+            properties = []
+        elif name == "END" and value.upper() == "VTODO" and properties is not None:
+            yield _checked(_vtodo_to_task(properties))
+            properties = None
+        elif properties is not None:
+            properties.append((name_part.upper(), value))
+
+
+async def _ics_unfold(lines: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Join folded iCalendar content lines."""
+    pending: Optional[str] = None
+    async for line in lines:
+        text = line.decode("utf-8").rstrip("\r\n")
+        if text[:1] in (" ", "\t") and pending is not None:
+            pending += text[1:]
+            continue
+        if pending:
+            yield pending
+        pending = text
+    if pending:
+        yield pending
+
+
+def _split_ics_list(value: str) -> list[str]:
+    """Split an escaped comma-separated iCalendar list."""
+    if "\\" not in value:
+        return [item for item in value.split(",") if item]
+    items = []
+    current = ""
+    escaped = False
+    for char in value:
+        if escaped:
+            current += "\\" + char
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == ",":
+            items.append(current)
+            current = ""
+        else:
+            current += char
+    items.append(current)
+    return [_ics_unescape(item) for item in items if item]
+
+
+def _ics_due(value: str, _name_part: str) -> dict:
+    """Parse DUE into a due date and, for a DATE-TIME, a due time."""
+    data = {"due_date": f"{value[0:4]}-{value[4:6]}-{value[6:8]}"}
+    if "T" in value:
+        time_part = value.split("T", 1)[1]
+        data["due_time"] = f"{time_part[0:2]}:{time_part[2:4]}:{time_part[4:6]}"
+    return data
+
+
+def _ics_priority(value: str, _name_part: str) -> dict:
+    """Parse PRIORITY; 1-4 is high, 5 medium, 6-9 low (RFC 5545 3.8.1.9)."""
+    ics_priority = int(value)
+    if ics_priority == 0:
+        priority = 0
+    elif ics_priority <= 4:
+        priority = 3
+    elif ics_priority == 5:
+        priority = 2
+    else:
+        priority = 1
+    return {"priority": priority}
+
+
+def _ics_related_to(value: str, name_part: str) -> dict:
+    """Parse RELATED-TO; only parent links, as CHILD and SIBLING follow from them."""
+    parameters = name_part.upper().split(";")[1:]
+    if "RELTYPE=PARENT" in parameters or not any(
+        parameter.startswith("RELTYPE=") for parameter in parameters
+    ):
+        return {"parent_id": value}
+    return {}
+
+
+# VTODO property name -> parser of (value, name with parameters) into task fields
+_VTODO_PROPERTIES: dict[str, Callable[[str, str], dict]] = {
+    "UID": lambda value, _: {"id": value},
+    "SUMMARY": lambda value, _: {"title": _ics_unescape(value)},
+    "DESCRIPTION": lambda value, _: {"notes": _ics_unescape(value)},
+    "DUE": _ics_due,
+    "PRIORITY": _ics_priority,
+    "STATUS": lambda value, _: {"completed": value.upper() == "COMPLETED"},
+    "COMPLETED": lambda value, _: {"completed_at": _parse_ics_timestamp(value)},
+    "CREATED": lambda value, _: {"created_at": _parse_ics_timestamp(value)},
+    "LAST-MODIFIED": lambda value, _: {"modified_at": _parse_ics_timestamp(value)},
+    "SEQUENCE": lambda value, _: {"version": int(value) + 1},
+    "RRULE": lambda value, _: {"recurrence": value},
+    "RELATED-TO": _ics_related_to,
+}
+
+
+def _vtodo_to_task(properties: list[tuple[str, str]]) -> Task:
+    """Build a task from VTODO properties.
+
+    Args:
+        properties: (name with parameters, value) pairs
+
+    Returns:
+        Task
+    """
+    data: dict = {}
+    tags: list[str] = []
+    for name_part, value in properties:
+        name = name_part.split(";", 1)[0]
+        if name == "CATEGORIES":
+            # May be repeated; every occurrence adds tags
+            tags.extend(_split_ics_list(value))
+        elif (parse := _VTODO_PROPERTIES.get(name)) is not None:
+            data.update(parse(value, name_part))
+    data["tags"] = tags
+    return Task.from_dict(data)
+
+
+# ====================
+# REGISTRY
+# ====================
+
+EXPORT_FORMATS: dict[str, ExportFormat] = {
+    FORMAT_NDJSON: ExportFormat(
+        content_type="application/x-ndjson",
+        extension="ndjson",
+        header=b"",
+        footer=b"",
+        encode=encode_ndjson,
+    ),
+    FORMAT_CSV: ExportFormat(
+        content_type="text/csv",
+        extension="csv",
+        header=_csv_row(list(TASK_WIRE_KEYS)).encode(),
+        footer=b"",
+        encode=encode_csv,
+    ),
+    FORMAT_ICS: ExportFormat(
+        content_type="text/calendar",
+        extension="ics",
+        header=(
+            b"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+            b"PRODID:-//HABoard//HABoard Export//EN\r\n"
+        ),
+        footer=b"END:VCALENDAR\r\n",
+        encode=encode_ics,
+    ),
+}
+
+IMPORT_PARSERS: dict[str, Callable[[AsyncIterator[bytes]], AsyncIterator[Task]]] = {
+    FORMAT_NDJSON: iter_ndjson,
+    FORMAT_CSV: iter_csv,
+    FORMAT_ICS: iter_ics,
+}
@@ -1,51 +1,265 @@
 """REST API views for HABoard."""
 from __future__ import annotations
 
+from contextlib import aclosing
+from datetime import date, timedelta
+import heapq
+from itertools import groupby, islice
 import logging
-from typing import Any
+import sqlite3
+from typing import Any, AsyncIterator, Optional
 
-from aiohttp import web
+from aiohttp import hdrs, web
 import voluptuous as vol
 
 from homeassistant.components.http import HomeAssistantView
+from homeassistant.const import CONTENT_TYPE_JSON
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util import dt as dt_util
 
 from ..const import DOMAIN
-from ..database.repository import TaskRepository, TagRepository
-from ..database.models import Task, Tag
+from ..database.recurrence import agenda_key, expand_occurrences
+from ..database.repository import BoardRepository, TaskRepository, TagRepository
+from ..stats import BUCKET_DAY, BUCKETS, TaskStats, bucket_start, next_bucket
+from .formats import EXPORT_FORMATS, FORMAT_NDJSON, IMPORT_PARSERS
+from ..database.models import (
+    COLUMNAR_CONTENT_TYPE,
+    DEFAULT_BOARD_ID,
+    TASK_WIRE_KEYS,
+    Board,
+    BoardList,
+    Task,
+    Tag,
+    encode_columnar,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# Tasks inserted per transaction during imports
+IMPORT_BATCH_SIZE = 1000
+
+# Task fields a task update copies from the body as given; the board, list
+# and parent are placed by TaskDetailView._apply_placement
+TASK_UPDATE_FIELDS = (
+    "title",
+    "notes",
+    "due_date",
+    "due_time",
+    "priority",
+    "completed",
+    "recurrence",
+    "tags",
+)
+
+# Agenda window when no end date is given: the start date plus six days
+DEFAULT_AGENDA_DAYS = 7
+
+# Days of completion history in the stats response by default
+DEFAULT_STATS_DAYS = 30
+
+# Completion history window when no start date is given: a year up to the end
+DEFAULT_HISTORY_DAYS = 365
+
+# Longest completion history window
+MAX_HISTORY_DAYS = 3660
+
+# Endpoints scoped to one config entry live below this path
+ENTRY_URL_PREFIX = "/api/haboard/entry/{entry_id}"
+
+
+def entry_urls(path: str) -> list[str]:
+    """URLs of an endpoint scoped to one config entry.
+
+    Args:
+        path: Endpoint path below /api/haboard
+
+    Returns:
+        Extra URLs for the view
+    """
+    return [f"{ENTRY_URL_PREFIX}{path}"]
+
 
 class HABoardAPIView(HomeAssistantView):
-    """Base view for HABoard API."""
+    """Base view for HABoard API.
+
+    Every endpoint is also served below
+    ``/api/haboard/entry/{entry_id}``, addressing the database of that
+    config entry; the unprefixed URLs address the first entry.
+    """
 
     requires_auth = True
 
-    def _get_repos(self, request: web.Request) -> tuple[TaskRepository, TagRepository]:
+    def _get_entry_data(
+        self, request: web.Request, entry_id: Optional[str] = None
+    ) -> dict[str, Any]:
+        """Get the hass data of a config entry.
+
+        Args:
+            request: HTTP request
+            entry_id: Config entry from the URL, if any
+
+        Returns:
+            Entry data (repositories, statistics, WebSocket manager)
+
+        Raises:
+            web.HTTPNotFound: If the entry is not loaded
+        """
+        hass: HomeAssistant = request.app["hass"]
+        entries: dict[str, dict[str, Any]] = hass.data.get(DOMAIN, {})
+        if entry_id is None:
+            entry_id = next(iter(entries), None)
+        if entry_id not in entries:
+            raise web.HTTPNotFound(
+                text=json_bytes({"message": "Config entry not found"}).decode(),
+                content_type=CONTENT_TYPE_JSON,
+            )
+        return entries[entry_id]
+
+    def _get_repos(
+        self, request: web.Request, entry_id: Optional[str] = None
+    ) -> tuple[TaskRepository, TagRepository]:
         """Get repositories from hass data.
 
         Args:
             request: HTTP request
+            entry_id: Config entry from the URL, if any
 
         Returns:
             Tuple of (TaskRepository, TagRepository)
         """
-        hass: HomeAssistant = request.app["hass"]
-        # Get first config entry (we only support one instance for MVP)
-        entry_id = next(iter(hass.data[DOMAIN].keys()))
-        data = hass.data[DOMAIN][entry_id]
+        data = self._get_entry_data(request, entry_id)
         return data["task_repo"], data["tag_repo"]
 
+    def _get_board_repo(
+        self, request: web.Request, entry_id: Optional[str] = None
+    ) -> BoardRepository:
+        """Get the board repository from hass data.
+
+        Args:
+            request: HTTP request
+            entry_id: Config entry from the URL, if any
+
+        Returns:
+            BoardRepository instance
+        """
+        return self._get_entry_data(request, entry_id)["board_repo"]
+
+    def _get_stats(self, request: web.Request, entry_id: Optional[str] = None) -> TaskStats:
+        """Get the task statistics from hass data.
+
+        Args:
+            request: HTTP request
+            entry_id: Config entry from the URL, if any
+
+        Returns:
+            TaskStats instance
+        """
+        return self._get_entry_data(request, entry_id)["stats"]
+
+    def _wants_columnar(self, request: web.Request) -> bool:
+        """Check whether the client negotiated the columnar encoding.
+
+        Clients opt in by sending
+        ``Accept: application/vnd.haboard.columnar+json``.
+
+        Args:
+            request: HTTP request
+
+        Returns:
+            True if the columnar encoding should be used
+        """
+        return COLUMNAR_CONTENT_TYPE in request.headers.get(hdrs.ACCEPT, "")
+
+    def _tasks_response(self, request: web.Request, tasks: list[Task]) -> web.Response:
+        """Serialize a task list in the format negotiated via the Accept header.
+
+        Args:
+            request: HTTP request
+            tasks: Tasks to serialize
+
+        Returns:
+            HTTP response
+        """
+        if self._wants_columnar(request):
+            return web.Response(
+                body=json_bytes(encode_columnar(tasks)),
+                content_type=COLUMNAR_CONTENT_TYPE,
+            )
+        return self.json([task.to_dict() for task in tasks])
+
+    async def _stream_tasks(
+        self, request: web.Request, batches: AsyncIterator[list[Task]]
+    ) -> web.StreamResponse:
+        """Stream task batches as a JSON array (or columnar payload).
+
+        Each batch is encoded and written as one chunk as soon as it is
+        fetched, so memory stays flat regardless of the result size and the
+        first bytes go out before the query has finished.
+
+        Args:
+            request: HTTP request
+            batches: Async iterator of task batches
+
+        Returns:
+            Prepared and completed stream response
+        """
+        columnar = self._wants_columnar(request)
+
+        response = web.StreamResponse()
+        if columnar:
+            response.content_type = COLUMNAR_CONTENT_TYPE
+            head = b'{"keys":' + json_bytes(list(TASK_WIRE_KEYS)) + b',"rows":['
+            tail = b"]}"
+        else:
+            response.content_type = CONTENT_TYPE_JSON
+            head = b"["
+            tail = b"]"
+        await response.prepare(request)
+        await response.write(head)
+
+        separator = b""
+        async with aclosing(batches):
+            async for tasks in batches:
+                if columnar:
+                    items = [task.to_wire_row() for task in tasks]
+                else:
+                    items = [task.to_dict() for task in tasks]
+                # Encode the batch as one array and drop its brackets
+                await response.write(separator + json_bytes(items)[1:-1])
+                separator = b","
+
+        await response.write_eof(tail)
+        return response
+
+
+class EntryListView(HABoardAPIView):
+    """View to list the loaded config entries (task lists with their own database)."""
+
+    url = "/api/haboard/entries"
+    name = "api:haboard:entries"
+
+    async def get(self, request: web.Request) -> web.Response:
+        """List the loaded config entries, the default (unprefixed) one first."""
+        hass: HomeAssistant = request.app["hass"]
+        entries = []
+        for entry_id in hass.data.get(DOMAIN, {}):
+            entry = hass.config_entries.async_get_entry(entry_id)
+            entries.append(
+                {"entry_id": entry_id, "title": entry.title if entry else entry_id}
+            )
+        return self.json(entries)
+
 
 class TaskListView(HABoardAPIView):
     """View to list and create tasks."""
 
     url = "/api/haboard/tasks"
+    extra_urls = entry_urls("/tasks")
     name = "api:haboard:tasks"
 
-    async def get(self, request: web.Request) -> web.Response:
+    async def get(self, request: web.Request, entry_id: Optional[str] = None) -> web.StreamResponse:
         """List tasks with optional filters.
 
         Query parameters:
@@ -53,8 +267,22 @@ class TaskListView(HABoardAPIView):
             tag: Filter by tag name
             limit: Maximum number of results (default: 100)
             offset: Offset for pagination (default: 0)
+            include_archived: Also list archived tasks (true/false, default: false)
+            after: Keyset pagination: return tasks in ID (creation) order
+                after this task ID, ignoring offset; pass an empty value
+                for the first page
+            board_id: Only list tasks on this board
+            list_id: Only list tasks in this list
+            order: "due" (default: by due date, then newest first) or
+                "manual" (the board's drag-and-drop order; needs board_id
+                or list_id and cannot be combined with after)
+            top_level: Leave out subtasks (true/false, default: false)
+
+        Send ``Accept: application/vnd.haboard.columnar+json`` to receive
+        the columnar encoding instead of a list of task objects. The result
+        is streamed in batches straight from the database cursor.
         """
-        task_repo, _ = self._get_repos(request)
+        task_repo, _ = self._get_repos(request, entry_id)
 
         # Parse query parameters
         completed = request.query.get("completed")
@@ -66,15 +294,38 @@ class TaskListView(HABoardAPIView):
         tag = request.query.get("tag")
         limit = int(request.query.get("limit", 100))
         offset = int(request.query.get("offset", 0))
-
-        # Get tasks
-        tasks = await task_repo.list(
-            completed=completed, tag=tag, limit=limit, offset=offset
+        include_archived = request.query.get("include_archived", "").lower() == "true"
+        after = request.query.get("after")
+        board_id = request.query.get("board_id")
+        list_id = request.query.get("list_id")
+
+        # Checked here: the stream has started by the time the query is built
+        order = request.query.get("order", "due")
+        if order not in ("due", "manual"):
+            return self.json_message(f"Unknown order: {order}", status_code=400)
+        manual_order = order == "manual"
+        if manual_order and board_id is None and list_id is None:
+            return self.json_message("Manual order needs board_id or list_id", status_code=400)
+        if manual_order and after is not None:
+            return self.json_message("Manual order cannot be combined with after", status_code=400)
+
+        # Stream tasks
+        batches = task_repo.iter_list(
+            completed=completed,
+            tag=tag,
+            limit=limit,
+            offset=offset,
+            include_archived=include_archived,
+            after=after,
+            board_id=board_id,
+            list_id=list_id,
+            manual_order=manual_order,
+            top_level=request.query.get("top_level", "").lower() == "true",
         )
 
-        return self.json([task.to_dict() for task in tasks])
+        return await self._stream_tasks(request, batches)
 
-    async def post(self, request: web.Request) -> web.Response:
+    async def post(self, request: web.Request, entry_id: Optional[str] = None) -> web.Response:
         """Create a new task.
 
         Body:
@@ -84,10 +335,16 @@ class TaskListView(HABoardAPIView):
                 "due_date": "2024-12-31" (optional, ISO 8601),
                 "due_time": "14:30:00" (optional, ISO 8601),
                 "priority": 0-3 (optional, default: 0),
-                "tags": ["tag1", "tag2"] (optional)
+                "recurrence": "FREQ=WEEKLY;BYDAY=MO" (optional, RRULE,
+                    needs due_date),
+                "tags": ["tag1", "tag2"] (optional),
+                "board_id": "board ID" (optional, default: "default"),
+                "list_id": "list ID" (optional, on the same board),
+                "parent_id": "task ID" (optional, makes this a subtask on
+                    the parent's board)
             }
         """
-        task_repo, _ = self._get_repos(request)
+        task_repo, _ = self._get_repos(request, entry_id)
         hass: HomeAssistant = request.app["hass"]
 
         # Parse and validate request body
@@ -107,11 +364,18 @@ class TaskListView(HABoardAPIView):
             due_date=data.get("due_date"),
             due_time=data.get("due_time"),
             priority=data.get("priority", 0),
+            recurrence=data.get("recurrence"),
             tags=data.get("tags", []),
+            board_id=data.get("board_id") or DEFAULT_BOARD_ID,
+            list_id=data.get("list_id"),
+            parent_id=data.get("parent_id"),
             device_id="web_api",  # TODO: Get actual device ID from request
         )
 
-        created_task = await task_repo.create(task)
+        try:
+            created_task = await task_repo.create(task)
+        except ValueError as err:
+            return self.json_message(str(err), status_code=400)
 
         # TODO: Broadcast task created event via WebSocket
 
@@ -122,11 +386,14 @@ class TaskDetailView(HABoardAPIView):
     """View for single task operations."""
 
     url = "/api/haboard/tasks/{task_id}"
+    extra_urls = entry_urls("/tasks/{task_id}")
     name = "api:haboard:tasks:detail"
 
-    async def get(self, request: web.Request, task_id: str) -> web.Response:
+    async def get(
+        self, request: web.Request, task_id: str, entry_id: Optional[str] = None
+    ) -> web.Response:
         """Get a single task by ID."""
-        task_repo, _ = self._get_repos(request)
+        task_repo, _ = self._get_repos(request, entry_id)
 
         task = await task_repo.get(task_id)
         if not task:
@@ -134,12 +401,19 @@ class TaskDetailView(HABoardAPIView):
 
         return self.json(task.to_dict())
 
-    async def put(self, request: web.Request, task_id: str) -> web.Response:
+    async def put(
+        self, request: web.Request, task_id: str, entry_id: Optional[str] = None
+    ) -> web.Response:
         """Update a task.
 
-        Body: Same as POST /api/haboard/tasks
+        Body: Same as POST /api/haboard/tasks, plus "completed". Completing
+        a recurring task moves it on to its next occurrence. Changing
+        "board_id" or "list_id" moves the task; moving it to another board
+        without a "list_id" takes it out of its list. Changing "parent_id"
+        does the same (null makes the task a top-level task); a subtask is
+        always on its parent's board.
         """
-        task_repo, _ = self._get_repos(request)
+        task_repo, _ = self._get_repos(request, entry_id)
 
         # Get existing task
         task = await task_repo.get(task_id)
@@ -153,37 +427,49 @@ class TaskDetailView(HABoardAPIView):
             return self.json_message("Invalid JSON", status_code=400)
 
         # Update task fields
-        if "title" in data:
-            task.title = data["title"]
-        if "notes" in data:
-            task.notes = data["notes"]
-        if "due_date" in data:
-            task.due_date = data["due_date"]
-        if "due_time" in data:
-            task.due_time = data["due_time"]
-        if "priority" in data:
-            task.priority = data["priority"]
-        if "completed" in data:
-            task.completed = data["completed"]
-            if task.completed and not task.completed_at:
-                from datetime import datetime
-
-                task.completed_at = datetime.utcnow().isoformat()
-        if "tags" in data:
-            task.tags = data["tags"]
+        for field in TASK_UPDATE_FIELDS:
+            if field in data:
+                setattr(task, field, data[field])
+        self._apply_placement(task, data)
 
         task.device_id = "web_api"  # TODO: Get actual device ID
 
         # Save updated task
-        updated_task = await task_repo.update(task)
+        try:
+            updated_task = await task_repo.update(task)
+        except ValueError as err:
+            if await task_repo.get(task_id) is None:
+                return self.json_message("Task not found", status_code=404)
+            return self.json_message(str(err), status_code=400)
 
         # TODO: Broadcast task updated event via WebSocket
 
         return self.json(updated_task.to_dict())
 
-    async def delete(self, request: web.Request, task_id: str) -> web.Response:
-        """Delete a task."""
-        task_repo, _ = self._get_repos(request)
+    def _apply_placement(self, task: Task, data: dict[str, Any]) -> None:
+        """Move a task to the board, parent and list given in an update body.
+
+        A new board or parent takes the task out of its list unless the
+        body names one.
+
+        Args:
+            task: Task to update in place
+            data: Request body
+        """
+        if data.get("board_id") and data["board_id"] != task.board_id:
+            task.board_id = data["board_id"]
+            task.list_id = None
+        if "parent_id" in data and data["parent_id"] != task.parent_id:
+            task.parent_id = data["parent_id"]
+            task.list_id = None
+        if "list_id" in data:
+            task.list_id = data["list_id"]
+
+    async def delete(
+        self, request: web.Request, task_id: str, entry_id: Optional[str] = None
+    ) -> web.Response:
+        """Delete a task with its subtasks."""
+        task_repo, _ = self._get_repos(request, entry_id)
 
         deleted = await task_repo.delete(task_id)
         if not deleted:
@@ -194,21 +480,51 @@ class TaskDetailView(HABoardAPIView):
         return self.json_message("Task deleted", status_code=200)
 
 
+class TaskSubtasksView(HABoardAPIView):
+    """View to read a task with its subtasks."""
+
+    url = "/api/haboard/tasks/{task_id}/subtasks"
+    extra_urls = entry_urls("/tasks/{task_id}/subtasks")
+    name = "api:haboard:tasks:subtasks"
+
+    async def get(
+        self, request: web.Request, task_id: str, entry_id: Optional[str] = None
+    ) -> web.Response:
+        """Get a task and all its subtasks, depth first.
+
+        Each task is followed by its subtasks in manual order; "parent_id"
+        links them into a tree. Supports the columnar encoding.
+        """
+        task_repo, _ = self._get_repos(request, entry_id)
+
+        tasks = await task_repo.get_subtree(task_id)
+        if not tasks:
+            return self.json_message("Task not found", status_code=404)
+
+        return self._tasks_response(request, tasks)
+
+
 class TaskCompleteView(HABoardAPIView):
     """View to complete/uncomplete a task."""
 
     url = "/api/haboard/tasks/{task_id}/complete"
+    extra_urls = entry_urls("/tasks/{task_id}/complete")
     name = "api:haboard:tasks:complete"
 
-    async def post(self, request: web.Request, task_id: str) -> web.Response:
+    async def post(
+        self, request: web.Request, task_id: str, entry_id: Optional[str] = None
+    ) -> web.Response:
         """Complete or uncomplete a task.
 
+        Completing a recurring task moves it on to its next occurrence
+        instead; it stays open until the series ends.
+
         Body:
             {
                 "completed": true/false
             }
         """
-        task_repo, _ = self._get_repos(request)
+        task_repo, _ = self._get_repos(request, entry_id)
 
         # Get existing task
         task = await task_repo.get(task_id)
@@ -223,40 +539,91 @@ class TaskCompleteView(HABoardAPIView):
 
         completed = data.get("completed", True)
 
-        # Update completion status
+        # Update completion status; the repository stamps completed_at
         task.completed = completed
-        if completed:
-            from datetime import datetime
-
-            task.completed_at = datetime.utcnow().isoformat()
-        else:
-            task.completed_at = None
 
         task.device_id = "web_api"  # TODO: Get actual device ID
 
-        updated_task = await task_repo.update(task)
+        try:
+            updated_task = await task_repo.update(task)
+        except ValueError as err:
+            # The task, its parent or its board went away since it was read
+            if await task_repo.get(task_id) is None:
+                return self.json_message("Task not found", status_code=404)
+            return self.json_message(str(err), status_code=400)
 
         # TODO: Broadcast task updated event via WebSocket
 
         return self.json(updated_task.to_dict())
 
 
+class TaskMoveView(HABoardAPIView):
+    """View to move a task within its board's manual order."""
+
+    url = "/api/haboard/tasks/{task_id}/move"
+    extra_urls = entry_urls("/tasks/{task_id}/move")
+    name = "api:haboard:tasks:move"
+
+    async def post(
+        self, request: web.Request, task_id: str, entry_id: Optional[str] = None
+    ) -> web.Response:
+        """Move a task next to another task on its board.
+
+        Only the moved task is written, and one task update event is sent.
+
+        Body:
+            {
+                "after_id": "task ID" (optional, place right after this task),
+                "before_id": "task ID" (optional, place right before this
+                    task; used when after_id is not given)
+            }
+
+        With neither, the task moves to the top of the board.
+        """
+        task_repo, _ = self._get_repos(request, entry_id)
+
+        try:
+            data = await request.json()
+        except ValueError:
+            return self.json_message("Invalid JSON", status_code=400)
+
+        try:
+            task = await task_repo.move(
+                task_id,
+                after_id=data.get("after_id"),
+                before_id=data.get("before_id"),
+                device_id="web_api",  # TODO: Get actual device ID
+            )
+        except ValueError as err:
+            return self.json_message(str(err), status_code=400)
+        if task is None:
+            return self.json_message("Task not found", status_code=404)
+
+        ws_manager = self._get_entry_data(request, entry_id)["ws_manager"]
+        ws_manager.broadcast_task_updated(task.to_dict())
+
+        return self.json(task.to_dict())
+
+
 class TaskSearchView(HABoardAPIView):
     """View for full-text search."""
 
     url = "/api/haboard/tasks/search"
+    extra_urls = entry_urls("/tasks/search")
     name = "api:haboard:tasks:search"
 
-    async def post(self, request: web.Request) -> web.Response:
+    async def post(self, request: web.Request, entry_id: Optional[str] = None) -> web.Response:
         """Search tasks using full-text search.
 
         Body:
             {
                 "query": "search terms",
-                "limit": 50 (optional)
+                "limit": 50 (optional),
+                "include_archived": false (optional),
+                "board_id": "board ID" (optional)
             }
         """
-        task_repo, _ = self._get_repos(request)
+        task_repo, _ = self._get_repos(request, entry_id)
 
         # Parse request body
         try:
@@ -271,26 +638,270 @@ class TaskSearchView(HABoardAPIView):
         limit = data.get("limit", 50)
 
         # Search tasks
-        tasks = await task_repo.search(query, limit=limit)
+        tasks = await task_repo.search(
+            query,
+            limit=limit,
+            include_archived=bool(data.get("include_archived")),
+            board_id=data.get("board_id"),
+        )
 
-        return self.json([task.to_dict() for task in tasks])
+        return self._tasks_response(request, tasks)
+
+
+class AgendaView(HABoardAPIView):
+    """View for open tasks grouped by when they are due."""
+
+    url = "/api/haboard/agenda"
+    extra_urls = entry_urls("/agenda")
+    name = "api:haboard:agenda"
+
+    async def get(self, request: web.Request, entry_id: Optional[str] = None) -> web.Response:
+        """Get the overdue, today and upcoming buckets for a date window.
+
+        Query parameters:
+            from: First date (YYYY-MM-DD, default: today)
+            to: Last date, inclusive (YYYY-MM-DD, default: from + 6 days)
+            tz: IANA time zone that decides "today" and "now"
+                (default: the Home Assistant time zone)
+            overdue: Include the overdue bucket (true/false, default: true)
+            limit: Maximum tasks per bucket query (default: 500)
+            board_id: Only include tasks on this board
+
+        Due dates and times are local wall-clock values; a task due today
+        at a time that has passed is overdue, one without a time is not.
+        Each bucket is one index range scan already in agenda order (due
+        date, due time, highest priority first).
+
+        Recurring tasks appear on their stored due date and on every later
+        occurrence within the window; those later occurrences are expanded
+        on the fly and marked with "occurrence": true.
+
+        Returns:
+            {"now": ISO timestamp, "today": [tasks], "overdue": [tasks],
+             "upcoming": [{"date": "YYYY-MM-DD", "tasks": [tasks]}]}
+        """
+        task_repo, _ = self._get_repos(request, entry_id)
+
+        time_zone = dt_util.DEFAULT_TIME_ZONE
+        if tz_name := request.query.get("tz"):
+            if (time_zone := dt_util.get_time_zone(tz_name)) is None:
+                return self.json_message(f"Unknown time zone: {tz_name}", status_code=400)
+        now = dt_util.now(time_zone)
+        today = now.date()
+
+        try:
+            start = date.fromisoformat(request.query.get("from", today.isoformat()))
+            end = (
+                date.fromisoformat(request.query["to"])
+                if "to" in request.query
+                else start + timedelta(days=DEFAULT_AGENDA_DAYS - 1)
+            )
+            limit = int(request.query.get("limit", 500))
+        except ValueError as err:
+            return self.json_message(f"Invalid agenda parameter: {err}", status_code=400)
+        if end < start:
+            return self.json_message("'to' must not be before 'from'", status_code=400)
+
+        now_time = now.strftime("%H:%M:%S")
+        board_id = request.query.get("board_id")
+        overdue: list[Task] = []
+        if request.query.get("overdue", "true").lower() == "true":
+            overdue = await task_repo.list_overdue(
+                today.isoformat(), now_time, limit, board_id
+            )
+
+        # Open tasks due before now are in the overdue bucket already
+        due: list[Task] = []
+        virtual: set[int] = set()
+        if end >= today:
+            first = max(start, today)
+            due = await task_repo.list_due(
+                first.isoformat(),
+                end.isoformat(),
+                now_time if first == today else None,
+                limit,
+                board_id,
+            )
+            occurrences = [
+                task
+                for task in expand_occurrences(
+                    await task_repo.list_recurring(end.isoformat(), board_id),
+                    first.isoformat(),
+                    end.isoformat(),
+                    limit,
+                )
+                if first != today
+                or task.due_date != first.isoformat()
+                or not task.due_time
+                or task.due_time >= now_time
+            ]
+            if occurrences:
+                virtual = {id(task) for task in occurrences}
+                due = list(islice(heapq.merge(due, occurrences, key=agenda_key), limit))
+
+        def agenda_dict(task: Task) -> dict[str, Any]:
+            data = task.to_dict()
+            if id(task) in virtual:
+                data["occurrence"] = True
+            return data
+
+        buckets = {
+            day: [agenda_dict(task) for task in tasks]
+            for day, tasks in groupby(due, key=lambda task: task.due_date)
+        }
+        return self.json(
+            {
+                "now": now.isoformat(),
+                "overdue": [task.to_dict() for task in overdue],
+                "today": buckets.pop(today.isoformat(), []),
+                "upcoming": [
+                    {"date": day, "tasks": tasks} for day, tasks in buckets.items()
+                ],
+            }
+        )
+
+
+class StatsView(HABoardAPIView):
+    """View for aggregate task counts and completion history."""
+
+    url = "/api/haboard/stats"
+    extra_urls = entry_urls("/stats")
+    name = "api:haboard:stats"
+
+    async def get(self, request: web.Request, entry_id: Optional[str] = None) -> web.Response:
+        """Get task counts with their breakdowns and a completion series.
+
+        Query parameters:
+            tz: IANA time zone that decides "today" and the buckets
+                (default: the Home Assistant time zone)
+            days: Days of completion history (1-366, default: 30)
+            bucket: Completion bucket size: day, week or month (default: day)
+            board_id: Only count tasks on this board
+
+        Counts are cached until the next write (and, for counts that depend
+        on the time, the next minute), so frequent refreshes are cheap.
+
+        Returns:
+            {"now": ISO timestamp, "open", "overdue", "due_today",
+             "completed", "completed_today": counts,
+             "by_priority": {priority: {"open", "overdue"}},
+             "by_tag": {name: {"open", "completed"}},
+             "completions": {"bucket": size,
+                             "series": [{"start": "YYYY-MM-DD", "completed": n}]}}
+        """
+        stats = self._get_stats(request, entry_id)
+
+        time_zone = dt_util.DEFAULT_TIME_ZONE
+        if tz_name := request.query.get("tz"):
+            if (time_zone := dt_util.get_time_zone(tz_name)) is None:
+                return self.json_message(f"Unknown time zone: {tz_name}", status_code=400)
+        now = dt_util.now(time_zone)
+
+        board_id = request.query.get("board_id")
+        bucket = request.query.get("bucket", BUCKET_DAY)
+        try:
+            days = int(request.query.get("days", DEFAULT_STATS_DAYS))
+            series = await stats.async_series(now, days, bucket, board_id)
+        except ValueError as err:
+            return self.json_message(f"Invalid stats parameter: {err}", status_code=400)
+
+        return self.json(
+            {
+                "now": now.isoformat(),
+                **await stats.async_counts(now, board_id),
+                "completions": {"bucket": bucket, "series": series},
+            }
+        )
+
+
+class HistoryView(HABoardAPIView):
+    """View for completions over time, read from the daily rollup."""
+
+    url = "/api/haboard/history"
+    extra_urls = entry_urls("/history")
+    name = "api:haboard:history"
+
+    async def get(self, request: web.Request, entry_id: Optional[str] = None) -> web.Response:
+        """Get completions per day, week or month.
+
+        Query parameters:
+            from: First date (YYYY-MM-DD, default: a year before "to")
+            to: Last date, inclusive (YYYY-MM-DD, default: today)
+            tag: Only count tasks with this tag
+            bucket: day, week (starting Monday) or month (default: day)
+
+        Dates are in the Home Assistant time zone, which the rollup is kept
+        in. Only rollup rows are read, at most one per day in the window.
+
+        Returns:
+            {"from", "to", "bucket", "tag",
+             "series": [{"start": "YYYY-MM-DD", "completed": n}]}
+        """
+        task_repo, _ = self._get_repos(request, entry_id)
+
+        bucket = request.query.get("bucket", BUCKET_DAY)
+        if bucket not in BUCKETS:
+            return self.json_message(f"Unknown bucket: {bucket}", status_code=400)
+        try:
+            end = (
+                date.fromisoformat(request.query["to"])
+                if "to" in request.query
+                else dt_util.now(task_repo.time_zone).date()
+            )
+            start = (
+                date.fromisoformat(request.query["from"])
+                if "from" in request.query
+                else end - timedelta(days=DEFAULT_HISTORY_DAYS - 1)
+            )
+        except ValueError as err:
+            return self.json_message(f"Invalid history parameter: {err}", status_code=400)
+        if end < start:
+            return self.json_message("'to' must not be before 'from'", status_code=400)
+        if (end - start).days >= MAX_HISTORY_DAYS:
+            return self.json_message(
+                f"History is limited to {MAX_HISTORY_DAYS} days", status_code=400
+            )
+
+        tag = request.query.get("tag")
+        counts: dict[date, int] = {}
+        for day, completed in await task_repo.completion_history(
+            start.isoformat(), end.isoformat(), tag
+        ):
+            key = bucket_start(date.fromisoformat(day), bucket)
+            counts[key] = counts.get(key, 0) + completed
+
+        series = []
+        current = bucket_start(start, bucket)
+        while current <= end:
+            series.append({"start": current.isoformat(), "completed": counts.get(current, 0)})
+            current = next_bucket(current, bucket)
+        return self.json(
+            {
+                "from": start.isoformat(),
+                "to": end.isoformat(),
+                "bucket": bucket,
+                "tag": tag,
+                "series": series,
+            }
+        )
 
 
 class TagListView(HABoardAPIView):
     """View to list and create tags."""
 
     url = "/api/haboard/tags"
+    extra_urls = entry_urls("/tags")
     name = "api:haboard:tags"
 
-    async def get(self, request: web.Request) -> web.Response:
+    async def get(self, request: web.Request, entry_id: Optional[str] = None) -> web.Response:
         """List all tags."""
-        _, tag_repo = self._get_repos(request)
+        _, tag_repo = self._get_repos(request, entry_id)
 
         tags = await tag_repo.list()
 
         return self.json([tag.to_dict() for tag in tags])
 
-    async def post(self, request: web.Request) -> web.Response:
+    async def post(self, request: web.Request, entry_id: Optional[str] = None) -> web.Response:
         """Create a new tag.
 
         Body:
@@ -299,7 +910,7 @@ class TagListView(HABoardAPIView):
                 "color": "#FF5733" (optional)
             }
         """
-        _, tag_repo = self._get_repos(request)
+        _, tag_repo = self._get_repos(request, entry_id)
 
         # Parse request body
         try:
@@ -323,16 +934,374 @@ class TagListView(HABoardAPIView):
         return self.json(created_tag.to_dict(), status_code=201)
 
 
+class BoardListView(HABoardAPIView):
+    """View to list and create boards."""
+
+    url = "/api/haboard/boards"
+    extra_urls = entry_urls("/boards")
+    name = "api:haboard:boards"
+
+    async def get(self, request: web.Request, entry_id: Optional[str] = None) -> web.Response:
+        """List all boards, the default board first."""
+        board_repo = self._get_board_repo(request, entry_id)
+
+        boards = await board_repo.list()
+
+        return self.json([board.to_dict() for board in boards])
+
+    async def post(self, request: web.Request, entry_id: Optional[str] = None) -> web.Response:
+        """Create a new board.
+
+        Body:
+            {
+                "name": "Board name" (required)
+            }
+        """
+        board_repo = self._get_board_repo(request, entry_id)
+
+        # Parse request body
+        try:
+            data = await request.json()
+        except ValueError:
+            return self.json_message("Invalid JSON", status_code=400)
+
+        if "name" not in data or not data["name"]:
+            return self.json_message("Name is required", status_code=400)
+
+        created_board = await board_repo.create(Board(name=data["name"]))
+
+        return self.json(created_board.to_dict(), status_code=201)
+
+
+class BoardDetailView(HABoardAPIView):
+    """View for single board operations."""
+
+    url = "/api/haboard/boards/{board_id}"
+    extra_urls = entry_urls("/boards/{board_id}")
+    name = "api:haboard:boards:detail"
+
+    async def put(
+        self, request: web.Request, board_id: str, entry_id: Optional[str] = None
+    ) -> web.Response:
+        """Rename a board.
+
+        Body:
+            {
+                "name": "Board name" (required)
+            }
+        """
+        board_repo = self._get_board_repo(request, entry_id)
+
+        # Parse request body
+        try:
+            data = await request.json()
+        except ValueError:
+            return self.json_message("Invalid JSON", status_code=400)
+
+        if "name" not in data or not data["name"]:
+            return self.json_message("Name is required", status_code=400)
+
+        board = await board_repo.rename(board_id, data["name"])
+        if not board:
+            return self.json_message("Board not found", status_code=404)
+
+        return self.json(board.to_dict())
+
+    async def delete(
+        self, request: web.Request, board_id: str, entry_id: Optional[str] = None
+    ) -> web.Response:
+        """Delete a board with its lists and tasks.
+
+        The default board cannot be deleted.
+        """
+        board_repo = self._get_board_repo(request, entry_id)
+
+        try:
+            deleted = await board_repo.delete(board_id)
+        except ValueError as err:
+            return self.json_message(str(err), status_code=400)
+        if not deleted:
+            return self.json_message("Board not found", status_code=404)
+
+        return self.json_message("Board deleted", status_code=200)
+
+
+class BoardListsView(HABoardAPIView):
+    """View to list and create the lists of a board."""
+
+    url = "/api/haboard/boards/{board_id}/lists"
+    extra_urls = entry_urls("/boards/{board_id}/lists")
+    name = "api:haboard:boards:lists"
+
+    async def get(
+        self, request: web.Request, board_id: str, entry_id: Optional[str] = None
+    ) -> web.Response:
+        """List the lists of a board."""
+        board_repo = self._get_board_repo(request, entry_id)
+
+        if not await board_repo.get(board_id):
+            return self.json_message("Board not found", status_code=404)
+
+        board_lists = await board_repo.list_lists(board_id)
+
+        return self.json([board_list.to_dict() for board_list in board_lists])
+
+    async def post(
+        self, request: web.Request, board_id: str, entry_id: Optional[str] = None
+    ) -> web.Response:
+        """Create a new list on a board.
+
+        Body:
+            {
+                "name": "List name" (required)
+            }
+        """
+        board_repo = self._get_board_repo(request, entry_id)
+
+        # Parse request body
+        try:
+            data = await request.json()
+        except ValueError:
+            return self.json_message("Invalid JSON", status_code=400)
+
+        if "name" not in data or not data["name"]:
+            return self.json_message("Name is required", status_code=400)
+
+        try:
+            created_list = await board_repo.create_list(
+                BoardList(board_id=board_id, name=data["name"])
+            )
+        except ValueError as err:
+            return self.json_message(str(err), status_code=404)
+
+        return self.json(created_list.to_dict(), status_code=201)
+
+
+class ListDetailView(HABoardAPIView):
+    """View for single list operations."""
+
+    url = "/api/haboard/lists/{list_id}"
+    extra_urls = entry_urls("/lists/{list_id}")
+    name = "api:haboard:lists:detail"
+
+    async def delete(
+        self, request: web.Request, list_id: str, entry_id: Optional[str] = None
+    ) -> web.Response:
+        """Delete a list; its tasks stay on the board without a list."""
+        board_repo = self._get_board_repo(request, entry_id)
+
+        deleted = await board_repo.delete_list(list_id, "web_api")
+        if not deleted:
+            return self.json_message("List not found", status_code=404)
+
+        return self.json_message("List deleted", status_code=200)
+
+
+class ExportView(HABoardAPIView):
+    """View to export all tasks."""
+
+    url = "/api/haboard/export"
+    extra_urls = entry_urls("/export")
+    name = "api:haboard:export"
+
+    async def get(self, request: web.Request, entry_id: Optional[str] = None) -> web.StreamResponse:
+        """Export all tasks, including archived ones, with their tags.
+
+        Query parameters:
+            format: ndjson (default), csv or ics
+            board_id: Only export tasks on this board
+
+        Tasks are streamed from the database cursor in batches.
+        """
+        task_repo, _ = self._get_repos(request, entry_id)
+        board_id = request.query.get("board_id")
+
+        export_format = EXPORT_FORMATS.get(request.query.get("format", FORMAT_NDJSON))
+        if export_format is None:
+            return self.json_message(
+                f"Unsupported format, use one of: {', '.join(EXPORT_FORMATS)}",
+                status_code=400,
+            )
+
+        response = web.StreamResponse(
+            headers={
+                hdrs.CONTENT_DISPOSITION: (
+                    f'attachment; filename="haboard-export.{export_format.extension}"'
+                )
+            }
+        )
+        response.content_type = export_format.content_type
+        await response.prepare(request)
+
+        if export_format.header:
+            await response.write(export_format.header)
+        batches = task_repo.iter_all(include_archived=True, board_id=board_id)
+        async with aclosing(batches):
+            async for tasks in batches:
+                await response.write(export_format.encode(tasks))
+
+        await response.write_eof(export_format.footer)
+        return response
+
+
+class ImportView(HABoardAPIView):
+    """View to import tasks."""
+
+    url = "/api/haboard/import"
+    extra_urls = entry_urls("/import")
+    name = "api:haboard:import"
+
+    async def post(
+        self, request: web.Request, entry_id: Optional[str] = None
+    ) -> web.StreamResponse:
+        """Import tasks from an NDJSON, CSV or iCalendar upload.
+
+        Query parameters:
+            format: ndjson (default), csv or ics
+
+        The body is parsed incrementally and inserted in transactional
+        batches; tasks whose ID already exists are skipped. The response is
+        NDJSON with one progress line per batch and a final line with
+        ``"done": true`` (or ``"error"`` if the upload could not be parsed
+        or a batch could not be stored).
+        """
+        task_repo, _ = self._get_repos(request, entry_id)
+
+        parser = IMPORT_PARSERS.get(request.query.get("format", FORMAT_NDJSON))
+        if parser is None:
+            return self.json_message(
+                f"Unsupported format, use one of: {', '.join(IMPORT_PARSERS)}",
+                status_code=400,
+            )
+
+        tasks = parser(request.content)
+
+        # Parse the first task before responding so obviously malformed
+        # uploads still get a 400
+        try:
+            first_task = await anext(tasks, None)
+        except ValueError as err:
+            return self.json_message(f"Invalid import data: {err}", status_code=400)
+
+        response = web.StreamResponse()
+        response.content_type = "application/x-ndjson"
+        await response.prepare(request)
+
+        progress = {"imported": 0, "skipped": 0}
+        try:
+            if first_task is not None:
+                await self._import_batches(task_repo, first_task, tasks, response, progress)
+        except (ValueError, sqlite3.Error) as err:
+            # The response has started, so errors go in its last line
+            _LOGGER.warning("Task import stopped: %s", err)
+            await response.write_eof(json_bytes({**progress, "error": str(err)}) + b"\n")
+            return response
+
+        _LOGGER.info(
+            "Imported %d tasks (%d skipped)", progress["imported"], progress["skipped"]
+        )
+        await response.write_eof(json_bytes({**progress, "done": True}) + b"\n")
+        return response
+
+    async def _import_batches(
+        self,
+        task_repo: TaskRepository,
+        first_task: Task,
+        tasks: AsyncIterator[Task],
+        response: web.StreamResponse,
+        progress: dict[str, int],
+    ) -> None:
+        """Insert parsed tasks in batches, writing the progress after each.
+
+        Args:
+            task_repo: Task repository to insert into
+            first_task: Task parsed before the response started
+            tasks: The remaining parsed tasks
+            response: Response to write the progress lines to
+            progress: Imported and skipped counts, updated in place
+
+        Subtasks whose parent comes in a later batch are linked once the
+        last batch is in.
+
+        Raises:
+            ValueError: If a task cannot be parsed or has no title
+            sqlite3.Error: If a batch could not be stored
+        """
+        unlinked: dict[str, str] = {}
+        batch = [first_task]
+        async for task in tasks:
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await self._import_batch(task_repo, batch, response, progress, unlinked)
+                batch = []
+            batch.append(task)
+        await self._import_batch(task_repo, batch, response, progress, unlinked)
+        if unlinked:
+            await task_repo.link_parents(unlinked)
+
+    async def _import_batch(
+        self,
+        task_repo: TaskRepository,
+        batch: list[Task],
+        response: web.StreamResponse,
+        progress: dict[str, int],
+        unlinked: dict[str, str],
+    ) -> None:
+        """Insert one batch of tasks in a transaction and write the progress.
+
+        Args:
+            task_repo: Task repository to insert into
+            batch: Parsed tasks
+            response: Response to write the progress line to
+            progress: Imported and skipped counts, updated in place
+            unlinked: Subtask ID -> parent ID for parents not stored yet,
+                updated in place
+
+        Raises:
+            ValueError: If a task has no title
+            sqlite3.Error: If the batch could not be stored
+        """
+        for task in batch:
+            if not task.title:
+                raise ValueError(f"Task {task.id} has no title")
+            task.device_id = task.device_id or "import"
+        parents = {task.id: task.parent_id for task in batch if task.parent_id}
+        inserted = await task_repo.bulk_create(batch)
+        # bulk_create() drops links to parents it cannot find; those may
+        # still come in a later batch
+        unlinked.update(
+            (task.id, parents[task.id])
+            for task in batch
+            if task.id in parents and task.parent_id is None
+        )
+        progress["imported"] += inserted
+        progress["skipped"] += len(batch) - inserted
+        await response.write(json_bytes(progress) + b"\n")
+
+
 def setup_api(hass: HomeAssistant) -> None:
     """Set up HABoard API views.
 
+    The views serve every config entry, so this runs once.
+
     Args:
         hass: Home Assistant instance
     """
+    hass.http.register_view(EntryListView)
     hass.http.register_view(TaskListView)
     hass.http.register_view(TaskDetailView)
+    hass.http.register_view(TaskSubtasksView)
     hass.http.register_view(TaskCompleteView)
+    hass.http.register_view(TaskMoveView)
     hass.http.register_view(TaskSearchView)
+    hass.http.register_view(AgendaView)
+    hass.http.register_view(StatsView)
+    hass.http.register_view(HistoryView)
     hass.http.register_view(TagListView)
+    hass.http.register_view(BoardListView)
+    hass.http.register_view(BoardDetailView)
+    hass.http.register_view(BoardListsView)
+    hass.http.register_view(ListDetailView)
+    hass.http.register_view(ExportView)
+    hass.http.register_view(ImportView)
 
     _LOGGER.info("HABoard API views registered")
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 import asyncio
 
 from homeassistant.core import HomeAssistant, callback
@@ -10,6 +10,11 @@ from homeassistant.components import websocket_api
 import voluptuous as vol
 
 from ..const import DOMAIN
+from ..database.models import (
+    WIRE_FORMAT_COLUMNAR,
+    WIRE_FORMAT_JSON,
+    encode_columnar_dicts,
+)
 from ..database.repository import TaskRepository
 
 _LOGGER = logging.getLogger(__name__)
@@ -20,14 +25,71 @@ WS_TYPE_UNSUBSCRIBE = "haboard/unsubscribe"
 WS_TYPE_TASK_CREATED = "haboard/task_created"
 WS_TYPE_TASK_UPDATED = "haboard/task_updated"
 WS_TYPE_TASK_DELETED = "haboard/task_deleted"
+WS_TYPE_TASKS_UPDATED = "haboard/tasks_updated"
+WS_TYPE_TASKS_DELETED = "haboard/tasks_deleted"
 WS_TYPE_PING = "haboard/ping"
 WS_TYPE_PONG = "haboard/pong"
 
+# Key of a connection's HABoardSubscription in connection.subscriptions
+SUBSCRIPTION_KEY = "haboard_subscriptions"
+
+
+class HABoardSubscription:
+    """The HABoard subscription of one WebSocket connection.
+
+    It is stored in the connection's subscriptions, whose values Home
+    Assistant calls when the connection closes; calling it unregisters the
+    connection from every manager it was registered with.
+    """
+
+    def __init__(self, connection: websocket_api.ActiveConnection):
+        """Initialize subscription.
+
+        Args:
+            connection: WebSocket connection
+        """
+        self.connection = connection
+        self.device_ids: set[str] = set()
+        self.managers: set[WebSocketManager] = set()
+
+    def add(
+        self, manager: WebSocketManager, wire_format: str, board_id: Optional[str]
+    ) -> None:
+        """Register the connection with an entry's manager.
+
+        Args:
+            manager: WebSocket manager of the entry
+            wire_format: Encoding used for task payloads
+            board_id: Only send task events of this board
+        """
+        manager.register_connection(self.connection, wire_format, board_id)
+        self.managers.add(manager)
+
+    def remove(self, manager: WebSocketManager) -> None:
+        """Unregister the connection from an entry's manager.
+
+        Args:
+            manager: WebSocket manager of the entry
+        """
+        manager.unregister_connection(self.connection)
+        self.managers.discard(manager)
+
+    @callback
+    def __call__(self) -> None:
+        """Unregister the connection from every manager."""
+        for manager in list(self.managers):
+            self.remove(manager)
+
 
 @websocket_api.websocket_command(
     {
         vol.Required("type"): WS_TYPE_SUBSCRIBE,
         vol.Optional("device_id"): str,
+        vol.Optional("entry_id"): str,
+        vol.Optional("board_id"): str,
+        vol.Optional("format", default=WIRE_FORMAT_JSON): vol.In(
+            [WIRE_FORMAT_JSON, WIRE_FORMAT_COLUMNAR]
+        ),
     }
 )
 @websocket_api.async_response
@@ -41,20 +103,40 @@ async def websocket_subscribe(
     Args:
         hass: Home Assistant instance
         connection: WebSocket connection
-        msg: Subscribe message with optional device_id
+        msg: Subscribe message with optional device_id, entry_id, board_id
+            and wire format; without an entry_id, events of every entry are
+            sent, and with a board_id, task events of other boards are not
     """
     device_id = msg.get("device_id", connection.id)
+    wire_format = msg["format"]
+    entries = hass.data.get(DOMAIN, {})
+    if "entry_id" in msg:
+        if msg["entry_id"] not in entries:
+            connection.send_error(
+                msg["id"], websocket_api.ERR_NOT_FOUND, "Unknown entry_id"
+            )
+            return
+        entries = {msg["entry_id"]: entries[msg["entry_id"]]}
 
     _LOGGER.debug("WebSocket client %s subscribed (device: %s)", connection.id, device_id)
 
-    # Store subscription in connection context
-    if "haboard_subscriptions" not in connection.subscriptions:
-        connection.subscriptions["haboard_subscriptions"] = set()
+    # Store subscription in connection context; Home Assistant calls it
+    # when the connection closes
+    subscription = connection.subscriptions.get(SUBSCRIPTION_KEY)
+    if subscription is None:
+        subscription = HABoardSubscription(connection)
+        connection.subscriptions[SUBSCRIPTION_KEY] = subscription
+    subscription.device_ids.add(device_id)
 
-    connection.subscriptions["haboard_subscriptions"].add(device_id)
+    # Register with the managers of the selected entries so broadcasts use
+    # the negotiated format
+    for data in entries.values():
+        subscription.add(data["ws_manager"], wire_format, msg.get("board_id"))
 
     # Send success response
-    connection.send_result(msg["id"], {"subscribed": True, "device_id": device_id})
+    connection.send_result(
+        msg["id"], {"subscribed": True, "device_id": device_id, "format": wire_format}
+    )
 
     # TODO: Send initial sync data (all tasks modified since last sync)
 
@@ -62,6 +144,7 @@ async def websocket_subscribe(
 @websocket_api.websocket_command(
     {
         vol.Required("type"): WS_TYPE_UNSUBSCRIBE,
+        vol.Optional("entry_id"): str,
     }
 )
 @websocket_api.async_response
@@ -75,15 +158,23 @@ async def websocket_unsubscribe(
     Args:
         hass: Home Assistant instance
         connection: WebSocket connection
-        msg: Unsubscribe message
+        msg: Unsubscribe message with optional entry_id; without one, the
+            connection unsubscribes from every entry
     """
     _LOGGER.debug("WebSocket client %s unsubscribed", connection.id)
 
-    # Clear subscriptions
-    if "haboard_subscriptions" in connection.subscriptions:
-        connection.subscriptions.pop("haboard_subscriptions")
+    subscription = connection.subscriptions.get(SUBSCRIPTION_KEY)
+    if subscription is not None:
+        entry_data = hass.data.get(DOMAIN, {}).get(msg.get("entry_id"))
+        if entry_data is not None:
+            subscription.remove(entry_data["ws_manager"])
+        else:
+            subscription()
+        # Clear subscriptions once no entry is left
+        if not subscription.managers:
+            connection.subscriptions.pop(SUBSCRIPTION_KEY)
 
-    connection.send_result(msg["id"], {"subscribed": False})
+    connection.send_result(msg["id"], {"subscribed": SUBSCRIPTION_KEY in connection.subscriptions})
 
 
 @websocket_api.websocket_command(
@@ -111,25 +202,49 @@ async def websocket_ping(
 
 
 class WebSocketManager:
-    """Manages WebSocket connections for real-time sync."""
+    """Manages WebSocket connections for real-time sync of one config entry.
+
+    Every event carries the entry_id, so clients subscribed to several
+    entries can tell their tasks apart.
+    """
 
-    def __init__(self, hass: HomeAssistant):
+    def __init__(self, hass: HomeAssistant, entry_id: str):
         """Initialize WebSocket manager.
 
         Args:
             hass: Home Assistant instance
+            entry_id: Config entry whose tasks this manager broadcasts
         """
         self.hass = hass
-        self._connections: set[websocket_api.ActiveConnection] = set()
-
-    def register_connection(self, connection: websocket_api.ActiveConnection) -> None:
+        self.entry_id = entry_id
+        # Connection -> negotiated wire format
+        self._connections: dict[websocket_api.ActiveConnection, str] = {}
+        # Connection -> board whose task events it receives, for connections
+        # that subscribed to one board only
+        self._board_filters: dict[websocket_api.ActiveConnection, str] = {}
+
+    def register_connection(
+        self,
+        connection: websocket_api.ActiveConnection,
+        wire_format: str = WIRE_FORMAT_JSON,
+        board_id: Optional[str] = None,
+    ) -> None:
         """Register a WebSocket connection.
 
         Args:
             connection: WebSocket connection
+            wire_format: Encoding used for task payloads sent to this connection
+            board_id: Only send task events of this board; deletions are
+                sent regardless, as they do not name the board
         """
-        self._connections.add(connection)
-        _LOGGER.debug("Registered WebSocket connection: %s", connection.id)
+        self._connections[connection] = wire_format
+        if board_id is None:
+            self._board_filters.pop(connection, None)
+        else:
+            self._board_filters[connection] = board_id
+        _LOGGER.debug(
+            "Registered WebSocket connection: %s (format: %s)", connection.id, wire_format
+        )
 
     def unregister_connection(
         self, connection: websocket_api.ActiveConnection
@@ -139,7 +254,8 @@ class WebSocketManager:
         Args:
             connection: WebSocket connection
         """
-        self._connections.discard(connection)
+        self._connections.pop(connection, None)
+        self._board_filters.pop(connection, None)
         _LOGGER.debug("Unregistered WebSocket connection: %s", connection.id)
 
     @callback
@@ -149,7 +265,7 @@ class WebSocketManager:
         Args:
             task_dict: Task data as dictionary
         """
-        self._broadcast_event(WS_TYPE_TASK_CREATED, {"task": task_dict})
+        self._broadcast_task_event(WS_TYPE_TASK_CREATED, task_dict)
 
     @callback
     def broadcast_task_updated(self, task_dict: dict[str, Any]) -> None:
@@ -158,7 +274,7 @@ class WebSocketManager:
         Args:
             task_dict: Task data as dictionary
         """
-        self._broadcast_event(WS_TYPE_TASK_UPDATED, {"task": task_dict})
+        self._broadcast_task_event(WS_TYPE_TASK_UPDATED, task_dict)
 
     @callback
     def broadcast_task_deleted(self, task_id: str) -> None:
@@ -169,6 +285,72 @@ class WebSocketManager:
         """
         self._broadcast_event(WS_TYPE_TASK_DELETED, {"task_id": task_id})
 
+    @callback
+    def broadcast_tasks_updated(self, task_dicts: list[dict[str, Any]]) -> None:
+        """Broadcast one event for tasks changed by a batch operation.
+
+        Args:
+            task_dicts: Task data as dictionaries
+        """
+        if not task_dicts:
+            return
+        # Payloads per (board filter, wire format), each built once
+        messages: dict[tuple[Optional[str], str], Optional[dict[str, Any]]] = {}
+        for connection, wire_format in list(self._connections.items()):
+            board_id = self._board_filters.get(connection)
+            key = (board_id, wire_format)
+            if key not in messages:
+                tasks = task_dicts
+                if board_id is not None:
+                    tasks = [task for task in task_dicts if task.get("board_id") == board_id]
+                messages[key] = None
+                if tasks:
+                    messages[key] = {
+                        "type": WS_TYPE_TASKS_UPDATED,
+                        "entry_id": self.entry_id,
+                        "tasks": (
+                            encode_columnar_dicts(tasks)
+                            if wire_format == WIRE_FORMAT_COLUMNAR
+                            else tasks
+                        ),
+                    }
+            if messages[key]:
+                self._send(connection, messages[key])
+
+    @callback
+    def broadcast_tasks_deleted(self, task_ids: list[str]) -> None:
+        """Broadcast one event for tasks deleted by a batch operation.
+
+        Args:
+            task_ids: IDs of deleted tasks
+        """
+        if task_ids:
+            self._broadcast_event(WS_TYPE_TASKS_DELETED, {"task_ids": task_ids})
+
+    def _broadcast_task_event(self, event_type: str, task_dict: dict[str, Any]) -> None:
+        """Broadcast a task event, encoding the task per connection format.
+
+        The columnar payload is built at most once per broadcast.
+
+        Args:
+            event_type: Type of event
+            task_dict: Task data as dictionary
+        """
+        messages = {
+            WIRE_FORMAT_JSON: {"type": event_type, "entry_id": self.entry_id, "task": task_dict}
+        }
+        if WIRE_FORMAT_COLUMNAR in self._connections.values():
+            messages[WIRE_FORMAT_COLUMNAR] = {
+                "type": event_type,
+                "entry_id": self.entry_id,
+                "tasks": encode_columnar_dicts([task_dict]),
+            }
+
+        board_id = task_dict.get("board_id")
+        for connection, wire_format in list(self._connections.items()):
+            if self._board_filters.get(connection, board_id) == board_id:
+                self._send(connection, messages[wire_format])
+
     def _broadcast_event(self, event_type: str, data: dict[str, Any]) -> None:
         """Broadcast an event to all subscribed connections.
 
@@ -176,40 +358,45 @@ class WebSocketManager:
             event_type: Type of event
             data: Event data
         """
-        message = {"type": event_type, **data}
-
-        for connection in self._connections:
-            # Check if connection is subscribed
-            if "haboard_subscriptions" in connection.subscriptions:
-                try:
-                    connection.send_message(
-                        websocket_api.event_message(connection.id, message)
-                    )
-                except Exception as err:
-                    _LOGGER.error(
-                        "Error sending WebSocket message to %s: %s",
-                        connection.id,
-                        err,
-                    )
-
-
-def setup_websocket(hass: HomeAssistant) -> WebSocketManager:
+        message = {"type": event_type, "entry_id": self.entry_id, **data}
+
+        for connection in list(self._connections):
+            self._send(connection, message)
+
+    def _send(
+        self, connection: websocket_api.ActiveConnection, message: dict[str, Any]
+    ) -> None:
+        """Send a message to a connection if it is subscribed.
+
+        Args:
+            connection: WebSocket connection
+            message: Message to send
+        """
+        # Check if connection is subscribed
+        if SUBSCRIPTION_KEY not in connection.subscriptions:
+            return
+        try:
+            connection.send_message(websocket_api.event_message(connection.id, message))
+        except Exception as err:
+            _LOGGER.error(
+                "Error sending WebSocket message to %s: %s",
+                connection.id,
+                err,
+            )
+
+
+def setup_websocket(hass: HomeAssistant) -> None:
     """Set up WebSocket support for HABoard.
 
+    The commands serve every config entry, so this runs once; each entry
+    creates its own WebSocketManager.
+
     Args:
         hass: Home Assistant instance
-
-    Returns:
-        WebSocketManager instance
     """
     # Register WebSocket commands
     hass.components.websocket_api.async_register_command(websocket_subscribe)
     hass.components.websocket_api.async_register_command(websocket_unsubscribe)
     hass.components.websocket_api.async_register_command(websocket_ping)
 
-    # Create and return WebSocket manager
-    ws_manager = WebSocketManager(hass)
-
     _LOGGER.info("HABoard WebSocket support initialized")
-
-    return ws_manager
@@ -6,10 +6,37 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import CONF_NAME
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.util import slugify
 
-from .const import DOMAIN
+from .const import (
+    CONF_ARCHIVE_AFTER_DAYS,
+    CONF_DATABASE,
+    DEFAULT_ARCHIVE_AFTER_DAYS,
+    DEFAULT_DATABASE,
+    DEFAULT_NAME,
+    DOMAIN,
+)
+
+
+def database_name(slug: str, used: set[str]) -> str:
+    """Pick the database file of a new config entry.
+
+    The first entry keeps the original file name, so an existing database
+    is picked up again when the integration is re-added.
+
+    Args:
+        slug: Slugified entry name
+        used: Database files of the existing entries
+
+    Returns:
+        Database file name in .storage
+    """
+    if DEFAULT_DATABASE not in used:
+        return DEFAULT_DATABASE
+    return f"{DOMAIN}_{slug}.db"
 
 
 class HABoardConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -20,12 +47,70 @@ class HABoardConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
-        """Handle the initial step."""
+        """Handle the initial step.
+
+        Every entry gets its own database; the name decides its file.
+        """
+        errors: dict[str, str] = {}
         if user_input is not None:
-            # TODO: Week 3-4: Validate database setup
-            return self.async_create_entry(title="HABoard", data={})
+            name = user_input[CONF_NAME].strip()
+            slug = slugify(name)
+            if not slug:
+                errors[CONF_NAME] = "invalid_name"
+            else:
+                await self.async_set_unique_id(slug)
+                self._abort_if_unique_id_configured()
+                # Entries created before names were asked for have no
+                # database key and use the original file
+                used = {
+                    entry.data.get(CONF_DATABASE, DEFAULT_DATABASE)
+                    for entry in self._async_current_entries()
+                }
+                return self.async_create_entry(
+                    title=name, data={CONF_DATABASE: database_name(slug, used)}
+                )
 
         return self.async_show_form(
             step_id="user",
-            data_schema=vol.Schema({}),
+            data_schema=vol.Schema(
+                {vol.Required(CONF_NAME, default=DEFAULT_NAME): str}
+            ),
+            errors=errors,
+        )
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> HABoardOptionsFlow:
+        """Get the options flow for this handler."""
+        return HABoardOptionsFlow(config_entry)
+
+
+class HABoardOptionsFlow(config_entries.OptionsFlow):
+    """Handle HABoard options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        archive_after_days = self.config_entry.options.get(
+            CONF_ARCHIVE_AFTER_DAYS, DEFAULT_ARCHIVE_AFTER_DAYS
+        )
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_ARCHIVE_AFTER_DAYS, default=archive_after_days
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                }
+            ),
         )
@@ -1,3 +1,21 @@
 """Constants for the HABoard integration."""
 
 DOMAIN = "haboard"
+
+# Fired when an open task reaches its due date and time
+EVENT_TASK_DUE = f"{DOMAIN}_task_due"
+
+# Entry data: database file in .storage, one per config entry
+CONF_DATABASE = "database"
+
+# Database file of the first config entry (and of entries created before
+# multiple entries were supported)
+DEFAULT_DATABASE = "haboard.db"
+
+DEFAULT_NAME = "HABoard"
+
+# Options
+CONF_ARCHIVE_AFTER_DAYS = "archive_after_days"
+
+# Days after completion before a task moves to the archive (0: never)
+DEFAULT_ARCHIVE_AFTER_DAYS = 0
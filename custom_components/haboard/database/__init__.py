@@ -1,16 +1,27 @@
 """Database initialization and management for HABoard."""
 from __future__ import annotations
 
+import asyncio
+from functools import partial
 import logging
 from pathlib import Path
+import sqlite3
+import time
 from typing import Optional
 
 import aiosqlite
 
+from ..const import DEFAULT_DATABASE
+from .maintenance import DEFAULT_STEP_BUDGET, MaintenanceStep, async_run_maintenance
+from .migrations import MIGRATIONS, MigrationManager
+from .template import async_get_template, write_template
+
 _LOGGER = logging.getLogger(__name__)
 
 # Database file location (will be in HA config/.storage/)
-DB_NAME = "haboard.db"
+DB_NAME = DEFAULT_DATABASE
+
+SCHEMA_FILE = Path(__file__).parent / "schema.sql"
 
 
 class Database:
@@ -24,13 +35,22 @@ class Database:
         """
         self.db_path = db_path
         self._conn: Optional[aiosqlite.Connection] = None
+        self._migrations: Optional[MigrationManager] = None
 
     async def connect(self) -> None:
         """Connect to database and initialize schema if needed."""
         _LOGGER.debug("Connecting to database at %s", self.db_path)
 
-        # Create parent directory if it doesn't exist
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Create parent directory if it doesn't exist (blocking I/O, so
+        # keep it off the event loop)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None, partial(self.db_path.parent.mkdir, parents=True, exist_ok=True)
+        )
+
+        # New databases are copied from the schema template in one pass
+        if await loop.run_in_executor(None, self._is_new_database):
+            await self._create_from_template()
 
         # Connect to database
         self._conn = await aiosqlite.connect(str(self.db_path))
@@ -54,7 +74,11 @@ class Database:
             _LOGGER.debug("Database disconnected")
 
     async def _initialize_schema(self) -> None:
-        """Initialize database schema if not already created."""
+        """Initialize database schema and apply pending schema migrations.
+
+        Only the schema changes run here; data backfills are left to
+        async_run_backfills() so they never hold up startup.
+        """
         # Check if schema_version table exists
         cursor = await self._conn.execute(
             "SELECT name FROM sqlite_master WHERE type='table' AND name='schema_version'"
@@ -64,23 +88,43 @@ class Database:
         if not table_exists:
             _LOGGER.info("Initializing database schema...")
             await self._create_schema()
-        else:
-            # Check current schema version
-            cursor = await self._conn.execute(
-                "SELECT MAX(version) as version FROM schema_version"
-            )
-            row = await cursor.fetchone()
-            current_version = row["version"] if row else 0
-            _LOGGER.debug("Current schema version: %d", current_version)
 
-            # TODO: Run migrations if needed (Week 0 Day 4)
+        self._migrations = MigrationManager(self._conn)
+        for migration in MIGRATIONS:
+            self._migrations.register(migration)
+
+        current_version = await self._migrations.get_current_version()
+        _LOGGER.debug("Current schema version: %d", current_version)
+        await self._migrations.migrate_to_latest()
+
+    def _is_new_database(self) -> bool:
+        """Check whether the database file is missing or empty."""
+        return not self.db_path.exists() or self.db_path.stat().st_size == 0
+
+    async def _create_from_template(self) -> None:
+        """Write the schema template to the (new) database file.
+
+        On failure the file is left empty and the schema is created
+        statement by statement instead.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            schema_sql = await loop.run_in_executor(None, SCHEMA_FILE.read_text)
+            template = await async_get_template(schema_sql)
+            await loop.run_in_executor(None, write_template, template, self.db_path)
+        except (RuntimeError, sqlite3.Error) as err:
+            _LOGGER.warning("Could not use schema template (%s), creating schema", err)
+            await loop.run_in_executor(
+                None, partial(self.db_path.write_bytes, b"")
+            )
+            return
+        _LOGGER.info("Database created from schema template")
 
     async def _create_schema(self) -> None:
         """Create database schema from schema.sql file."""
-        schema_file = Path(__file__).parent / "schema.sql"
-
-        with open(schema_file, "r") as f:
-            schema_sql = f.read()
+        schema_sql = await asyncio.get_running_loop().run_in_executor(
+            None, SCHEMA_FILE.read_text
+        )
 
         # Execute schema in a transaction
         await self._conn.executescript(schema_sql)
@@ -88,6 +132,75 @@ class Database:
 
         _LOGGER.info("Database schema created successfully")
 
+    async def async_warm_up(self) -> dict[str, float]:
+        """Verify the FTS index and prime SQLite's page cache.
+
+        Meant to run in the background after Home Assistant has started; a
+        damaged FTS index is rebuilt from the tasks table.
+
+        Returns:
+            Duration in milliseconds of each warm-up step
+        """
+        timings: dict[str, float] = {}
+
+        start = time.monotonic()
+        try:
+            # rank=1 also compares the index against the content table
+            await self.conn.execute(
+                "INSERT INTO tasks_fts(tasks_fts, rank) VALUES('integrity-check', 1)"
+            )
+        except aiosqlite.DatabaseError as err:
+            _LOGGER.warning("FTS index integrity check failed (%s), rebuilding", err)
+            await self.conn.execute("INSERT INTO tasks_fts(tasks_fts) VALUES('rebuild')")
+            await self.conn.commit()
+        timings["fts_integrity_check"] = (time.monotonic() - start) * 1000
+
+        # Touch the table and index pages used by the hot list queries
+        start = time.monotonic()
+        for sql in (
+            "SELECT SUM(LENGTH(title)) FROM tasks",
+            "SELECT COUNT(*) FROM tasks WHERE completed = 0",
+            "SELECT COUNT(*) FROM task_tags",
+            "SELECT COUNT(*) FROM tags",
+        ):
+            cursor = await self.conn.execute(sql)
+            await cursor.fetchone()
+        timings["cache_priming"] = (time.monotonic() - start) * 1000
+
+        return timings
+
+    async def async_run_maintenance(
+        self, step_budget: float = DEFAULT_STEP_BUDGET
+    ) -> list[MaintenanceStep]:
+        """Merge FTS segments, refresh statistics, vacuum and checkpoint the WAL.
+
+        Args:
+            step_budget: Seconds each maintenance step may run
+
+        Returns:
+            Duration, work done and completion of each step
+        """
+        return await async_run_maintenance(self.conn, step_budget)
+
+    async def async_run_backfills(
+        self, max_batches: Optional[int] = None, pause: float = 0.0
+    ) -> bool:
+        """Run pending migration backfills in bounded batches.
+
+        Args:
+            max_batches: Stop after this many batches (None: run to completion)
+            pause: Seconds to sleep between batches
+
+        Returns:
+            True if all backfills are complete
+        """
+        if self._migrations is None:
+            raise RuntimeError("Database not connected. Call connect() first.")
+        if not await self._migrations.has_pending_backfills():
+            return True
+        _LOGGER.info("Running database backfills")
+        return await self._migrations.run_backfills(max_batches=max_batches, pause=pause)
+
     @property
     def conn(self) -> aiosqlite.Connection:
         """Get database connection.
@@ -137,16 +250,20 @@ class Database:
         await self.conn.rollback()
 
 
-async def get_database(config_dir: Path) -> Database:
+async def get_database(config_dir: Path, name: str = DB_NAME) -> Database:
     """Get database instance.
 
+    Each config entry has its own database file, and so its own
+    connection and writer thread.
+
     Args:
         config_dir: Home Assistant config directory
+        name: Database file name in .storage
 
     Returns:
         Connected database instance
     """
-    db_path = config_dir / ".storage" / DB_NAME
+    db_path = config_dir / ".storage" / name
     db = Database(db_path)
     await db.connect()
     return db
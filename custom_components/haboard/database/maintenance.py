@@ -0,0 +1,181 @@
+"""Idle-time database maintenance for HABoard.
+
+Each step does its work in small increments and stops once its time
+budget is spent, so a maintenance run never holds the connection for
+long. Whatever is left over is picked up by the next run.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+import time
+
+import aiosqlite
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds each maintenance step may run
+DEFAULT_STEP_BUDGET = 0.5
+
+# FTS5 pages merged per 'merge' command
+FTS_MERGE_PAGES = 500
+
+# FTS5 indexes merged, in order
+FTS_TABLES = ("tasks_fts", "tasks_archive_fts")
+
+# FTS5 automerge level (segments per level before they are merged on write)
+FTS_AUTOMERGE = 8
+
+# Rows sampled per index by ANALYZE
+ANALYSIS_LIMIT = 400
+
+# Free pages released per incremental_vacuum call
+VACUUM_PAGES = 256
+
+
+@dataclass(slots=True)
+class MaintenanceStep:
+    """Result of one maintenance step."""
+
+    name: str
+    elapsed_ms: float
+    work: int  # Step-specific unit (pages, frames, merges)
+    complete: bool  # False if the time budget ran out first
+
+
+async def async_merge_fts(conn: aiosqlite.Connection, deadline: float) -> tuple[int, bool]:
+    """Merge the segments of the live and archive FTS5 indexes.
+
+    Both indexes share the time budget; the live one goes first.
+
+    Args:
+        conn: Database connection
+        deadline: time.monotonic() value to stop at
+
+    Returns:
+        Number of merge commands run, and whether both indexes are fully merged
+    """
+    merges = 0
+    for table in FTS_TABLES:
+        await conn.execute(
+            f"INSERT INTO {table}({table}, rank) VALUES('automerge', ?)",
+            (FTS_AUTOMERGE,),
+        )
+        while True:
+            before = conn.total_changes
+            await conn.execute(
+                f"INSERT INTO {table}({table}, rank) VALUES('merge', ?)",
+                (FTS_MERGE_PAGES,),
+            )
+            await conn.commit()
+            merges += 1
+            # Fewer than two changes means there was nothing left to merge
+            if conn.total_changes - before < 2:
+                break
+            if time.monotonic() >= deadline:
+                return merges, False
+    return merges, True
+
+
+async def async_optimize(conn: aiosqlite.Connection, deadline: float) -> tuple[int, bool]:
+    """Refresh query planner statistics where they are stale.
+
+    Args:
+        conn: Database connection
+        deadline: Unused; ANALYZE is bounded by the analysis limit
+
+    Returns:
+        Zero work units, and True
+    """
+    await conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+    await conn.execute("PRAGMA optimize")
+    return 0, True
+
+
+async def async_incremental_vacuum(
+    conn: aiosqlite.Connection, deadline: float
+) -> tuple[int, bool]:
+    """Return free pages to the file system.
+
+    Only databases created with auto_vacuum = INCREMENTAL can do this;
+    older databases are left alone, as converting them needs a full VACUUM.
+
+    Args:
+        conn: Database connection
+        deadline: time.monotonic() value to stop at
+
+    Returns:
+        Number of pages released, and whether the free list is empty
+    """
+    cursor = await conn.execute("PRAGMA auto_vacuum")
+    if (await cursor.fetchone())[0] != 2:
+        return 0, True
+
+    released = 0
+    while True:
+        cursor = await conn.execute("PRAGMA freelist_count")
+        free_pages = (await cursor.fetchone())[0]
+        if not free_pages:
+            return released, True
+        if time.monotonic() >= deadline:
+            return released, False
+        cursor = await conn.execute(f"PRAGMA incremental_vacuum({VACUUM_PAGES})")
+        await cursor.fetchall()
+        await conn.commit()
+        released += min(free_pages, VACUUM_PAGES)
+
+
+async def async_checkpoint_wal(
+    conn: aiosqlite.Connection, deadline: float
+) -> tuple[int, bool]:
+    """Copy the WAL back into the database and truncate it.
+
+    A passive checkpoint runs first; the WAL is only truncated when that
+    copied every frame, so the truncate never has to wait on readers.
+
+    Args:
+        conn: Database connection
+        deadline: Unused; a checkpoint is bounded by the WAL size
+
+    Returns:
+        Number of WAL frames checkpointed, and whether the WAL was truncated
+    """
+    cursor = await conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+    busy, log_frames, checkpointed = await cursor.fetchone()
+    if busy or log_frames != checkpointed:
+        return max(checkpointed, 0), False
+    cursor = await conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    busy, _, _ = await cursor.fetchone()
+    return max(checkpointed, 0), not busy
+
+
+# Run in this order: the checkpoint goes last to pick up the pages the
+# earlier steps wrote.
+MAINTENANCE_STEPS = (
+    ("fts_merge", async_merge_fts),
+    ("optimize", async_optimize),
+    ("incremental_vacuum", async_incremental_vacuum),
+    ("wal_checkpoint", async_checkpoint_wal),
+)
+
+
+async def async_run_maintenance(
+    conn: aiosqlite.Connection, step_budget: float = DEFAULT_STEP_BUDGET
+) -> list[MaintenanceStep]:
+    """Run all maintenance steps, each within its time budget.
+
+    Args:
+        conn: Database connection
+        step_budget: Seconds each step may run
+
+    Returns:
+        Result of each step
+    """
+    results = []
+    for name, step in MAINTENANCE_STEPS:
+        start = time.monotonic()
+        work, complete = await step(conn, start + step_budget)
+        results.append(
+            MaintenanceStep(name, (time.monotonic() - start) * 1000, work, complete)
+        )
+    return results
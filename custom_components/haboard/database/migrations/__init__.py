@@ -1,17 +1,64 @@
-"""Database migration system for HABoard."""
+"""Database migration system for HABoard.
+
+A migration has two parts:
+
+- ``upgrade``: schema changes (DDL). These run during startup, each
+  migration in its own transaction, so they must be cheap.
+- ``backfills``: data rewrites over existing rows. These run later in the
+  background, one bounded batch per transaction, and record a checkpoint
+  in ``schema_version`` after every batch so they resume where they left
+  off after a restart or crash.
+"""
 from __future__ import annotations
 
+import asyncio
 import logging
-from pathlib import Path
-from typing import Callable, Awaitable
+from typing import Awaitable, Callable, Optional
 
 import aiosqlite
 
+from ..ordering import keys_between
+
 _LOGGER = logging.getLogger(__name__)
 
 # Migration function type
 MigrationFunc = Callable[[aiosqlite.Connection], Awaitable[None]]
 
+# Backfill step: (conn, checkpoint, batch_size) -> next checkpoint, or None
+# when there is nothing left to process. A checkpoint of None means "start
+# from the beginning".
+BackfillFunc = Callable[
+    [aiosqlite.Connection, Optional[str], int], Awaitable[Optional[str]]
+]
+
+# schema_version.status values
+STATUS_COMPLETE = "complete"
+STATUS_BACKFILLING = "backfilling"
+
+# Rows processed per backfill transaction
+DEFAULT_BACKFILL_BATCH_SIZE = 500
+
+
+class Backfill:
+    """Batched data backfill belonging to a migration."""
+
+    def __init__(
+        self,
+        name: str,
+        step: BackfillFunc,
+        batch_size: int = DEFAULT_BACKFILL_BATCH_SIZE,
+    ):
+        """Initialize backfill.
+
+        Args:
+            name: Unique name within the migration (stored as checkpoint key)
+            step: Function processing one batch after the given checkpoint
+            batch_size: Maximum rows per batch
+        """
+        self.name = name
+        self.step = step
+        self.batch_size = batch_size
+
 
 class Migration:
     """Database migration."""
@@ -22,19 +69,28 @@ class Migration:
         description: str,
         upgrade: MigrationFunc,
         downgrade: MigrationFunc | None = None,
+        backfills: list[Backfill] | None = None,
+        rebuilds_tables: bool = False,
     ):
         """Initialize migration.
 
         Args:
             version: Target schema version
             description: Migration description
-            upgrade: Function to upgrade to this version
+            upgrade: Function to upgrade to this version (schema changes only)
             downgrade: Optional function to downgrade from this version
+            backfills: Optional batched data backfills, run in order after
+                the upgrade
+            rebuilds_tables: The migration recreates tables that other
+                tables reference, so it runs with foreign key enforcement
+                off (checked with foreign_key_check before committing)
         """
         self.version = version
         self.description = description
         self.upgrade = upgrade
         self.downgrade = downgrade
+        self.backfills = backfills or []
+        self.rebuilds_tables = rebuilds_tables
 
 
 class MigrationManager:
@@ -79,6 +135,7 @@ class MigrationManager:
         Raises:
             ValueError: If target version is invalid
         """
+        await self._ensure_bookkeeping()
         current_version = await self.get_current_version()
 
         if current_version == target_version:
@@ -105,8 +162,7 @@ class MigrationManager:
                     migration.version - 1,
                     migration.description,
                 )
-                await migration.downgrade(self.conn)
-                await self._remove_version(migration.version)
+                await self._apply(migration, migration.downgrade, self._remove_version)
 
         else:
             # Upgrade
@@ -121,12 +177,52 @@ class MigrationManager:
                     migration.version,
                     migration.description,
                 )
-                await migration.upgrade(self.conn)
-                await self._add_version(migration.version, migration.description)
+                # Commit each step so a crash never leaves a half-applied chain
+                await self._apply(migration, migration.upgrade, self._add_version)
 
-        await self.conn.commit()
         _LOGGER.info("Migration complete. Current version: %d", target_version)
 
+    async def _apply(
+        self,
+        migration: Migration,
+        step: MigrationFunc,
+        record: Callable[[Migration], Awaitable[None]],
+    ) -> None:
+        """Run one migration step and its bookkeeping in a single transaction.
+
+        Args:
+            migration: Migration being applied
+            step: Its upgrade or downgrade function
+            record: Bookkeeping for schema_version (add or remove the version)
+
+        Raises:
+            RuntimeError: If a table rebuild left foreign key violations
+        """
+        foreign_keys = None
+        if migration.rebuilds_tables:
+            # Can only be changed outside a transaction
+            cursor = await self.conn.execute("PRAGMA foreign_keys")
+            foreign_keys = (await cursor.fetchone())[0]
+            await self.conn.execute("PRAGMA foreign_keys = OFF")
+        try:
+            await self._begin()
+            try:
+                await step(self.conn)
+                await record(migration)
+                if migration.rebuilds_tables:
+                    cursor = await self.conn.execute("PRAGMA foreign_key_check")
+                    if await cursor.fetchone() is not None:
+                        raise RuntimeError(
+                            f"Migration {migration.version} left foreign key violations"
+                        )
+                await self.conn.commit()
+            except Exception:
+                await self.conn.rollback()
+                raise
+        finally:
+            if foreign_keys is not None:
+                await self.conn.execute(f"PRAGMA foreign_keys = {foreign_keys}")
+
     async def migrate_to_latest(self) -> None:
         """Migrate database to latest version."""
         if not self._migrations:
@@ -136,53 +232,1218 @@ class MigrationManager:
         latest_version = max(m.version for m in self._migrations)
         await self.migrate_to(latest_version)
 
-    async def _add_version(self, version: int, description: str) -> None:
-        """Add version to schema_version table.
+    async def has_pending_backfills(self) -> bool:
+        """Check whether any applied migration still has backfills to run.
+
+        Returns:
+            True if run_backfills() has work to do
+        """
+        await self._ensure_bookkeeping()
+        cursor = await self.conn.execute(
+            "SELECT 1 FROM schema_version WHERE status = ? LIMIT 1",
+            (STATUS_BACKFILLING,),
+        )
+        return await cursor.fetchone() is not None
+
+    async def run_backfills(
+        self, max_batches: Optional[int] = None, pause: float = 0.0
+    ) -> bool:
+        """Run pending backfills in bounded batches.
+
+        Every batch runs in its own short transaction together with the
+        checkpoint update, so other writers are never blocked for longer
+        than one batch and an interrupted backfill resumes from the last
+        committed batch.
+
+        Args:
+            max_batches: Stop after this many batches (None: run to completion)
+            pause: Seconds to sleep between batches to leave room for
+                interactive requests
+
+        Returns:
+            True if all backfills are complete
+        """
+        await self._ensure_bookkeeping()
+        cursor = await self.conn.execute(
+            "SELECT version, backfill, checkpoint FROM schema_version "
+            "WHERE status = ? ORDER BY version",
+            (STATUS_BACKFILLING,),
+        )
+        pending = await cursor.fetchall()
+        migrations = {m.version: m for m in self._migrations}
+        batches = 0
+
+        for version, backfill_name, checkpoint in pending:
+            migration = migrations.get(version)
+            if migration is None:
+                _LOGGER.warning(
+                    "Skipping backfills of unknown migration version %d", version
+                )
+                continue
+
+            names = [backfill.name for backfill in migration.backfills]
+            start = names.index(backfill_name) if backfill_name in names else 0
+
+            for index in range(start, len(migration.backfills)):
+                backfill = migration.backfills[index]
+                if index != start:
+                    checkpoint = None
+
+                while True:
+                    if max_batches is not None and batches >= max_batches:
+                        return False
+
+                    checkpoint = await self._run_backfill_batch(migration, index, checkpoint)
+                    batches += 1
+
+                    if checkpoint is None:
+                        _LOGGER.info("Backfill %d/%s complete", version, backfill.name)
+                        break
+
+                    _LOGGER.debug(
+                        "Backfill %d/%s checkpoint: %s", version, backfill.name, checkpoint
+                    )
+                    await asyncio.sleep(pause)
+
+        return True
+
+    async def _run_backfill_batch(
+        self, migration: Migration, index: int, checkpoint: Optional[str]
+    ) -> Optional[str]:
+        """Run one backfill batch and record its progress in one transaction.
+
+        Args:
+            migration: Migration whose backfill runs
+            index: Position of the backfill in migration.backfills
+            checkpoint: Checkpoint the batch resumes from (None: start)
+
+        Returns:
+            Checkpoint to resume from, or None if the backfill is done
+        """
+        backfill = migration.backfills[index]
+        await self._begin()
+        try:
+            checkpoint = await backfill.step(self.conn, checkpoint, backfill.batch_size)
+            if checkpoint is not None:
+                await self._save_checkpoint(migration.version, backfill.name, checkpoint)
+            elif index + 1 < len(migration.backfills):
+                # This backfill is done; move on to the next one
+                await self._save_checkpoint(
+                    migration.version, migration.backfills[index + 1].name, None
+                )
+            else:
+                await self.conn.execute(
+                    "UPDATE schema_version "
+                    "SET status = ?, backfill = NULL, checkpoint = NULL "
+                    "WHERE version = ?",
+                    (STATUS_COMPLETE, migration.version),
+                )
+            await self.conn.commit()
+        except Exception:
+            await self.conn.rollback()
+            raise
+        return checkpoint
+
+    async def _begin(self) -> None:
+        """Start an explicit transaction so DDL and DML commit together."""
+        if not self.conn.in_transaction:
+            await self.conn.execute("BEGIN")
+
+    async def _ensure_bookkeeping(self) -> None:
+        """Add the backfill bookkeeping columns to older schema_version tables."""
+        cursor = await self.conn.execute("PRAGMA table_info(schema_version)")
+        columns = {row[1] for row in await cursor.fetchall()}
+        for column, definition in (
+            ("status", f"TEXT NOT NULL DEFAULT '{STATUS_COMPLETE}'"),
+            ("backfill", "TEXT"),
+            ("checkpoint", "TEXT"),
+        ):
+            if column not in columns:
+                await self.conn.execute(
+                    f"ALTER TABLE schema_version ADD COLUMN {column} {definition}"
+                )
+        await self.conn.commit()
+
+    async def _save_checkpoint(
+        self, version: int, backfill: str, checkpoint: Optional[str]
+    ) -> None:
+        """Record backfill progress for a migration.
 
         Args:
             version: Schema version
-            description: Migration description
+            backfill: Name of the backfill in progress
+            checkpoint: Last processed position (None: not started)
+        """
+        await self.conn.execute(
+            "UPDATE schema_version SET backfill = ?, checkpoint = ? WHERE version = ?",
+            (backfill, checkpoint, version),
+        )
+
+    async def _add_version(self, migration: Migration) -> None:
+        """Add version to schema_version table.
+
+        Migrations with backfills are recorded as still backfilling.
+
+        Args:
+            migration: Applied migration
         """
+        if migration.backfills:
+            status, backfill = STATUS_BACKFILLING, migration.backfills[0].name
+        else:
+            status, backfill = STATUS_COMPLETE, None
         await self.conn.execute(
-            "INSERT INTO schema_version (version, description) VALUES (?, ?)",
-            (version, description),
+            "INSERT INTO schema_version (version, description, status, backfill) "
+            "VALUES (?, ?, ?, ?)",
+            (migration.version, migration.description, status, backfill),
         )
 
-    async def _remove_version(self, version: int) -> None:
+    async def _remove_version(self, migration: Migration) -> None:
         """Remove version from schema_version table.
 
         Args:
-            version: Schema version to remove
+            migration: Migration being rolled back
         """
         await self.conn.execute(
-            "DELETE FROM schema_version WHERE version = ?", (version,)
+            "DELETE FROM schema_version WHERE version = ?", (migration.version,)
         )
 
 
-# Example migration (for future use)
-async def migrate_v2_add_boards_table(conn: aiosqlite.Connection) -> None:
-    """Add boards table for Beta phase.
+async def migrate_v2_add_tasks_archive(conn: aiosqlite.Connection) -> None:
+    """Add cold storage for completed tasks.
 
-    This is a placeholder for future Beta migration.
+    Archived tasks are read-only and keep their tag names in a column, so
+    the archive is self-contained and task_tags only covers live tasks.
     """
     await conn.execute(
         """
-        CREATE TABLE IF NOT EXISTS boards (
+        CREATE TABLE IF NOT EXISTS tasks_archive (
             id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            description TEXT,
+            title TEXT NOT NULL,
+            notes TEXT,
+            due_date TEXT,
+            due_time TEXT,
+            priority INTEGER DEFAULT 0,
+            completed BOOLEAN DEFAULT 1,
+            completed_at TEXT,
+            created_at TEXT NOT NULL,
+            modified_at TEXT NOT NULL,
+            device_id TEXT NOT NULL,
+            version INTEGER DEFAULT 1,
+            tags TEXT,  -- Comma-separated tag names at archive time
+            archived_at TEXT NOT NULL
+        )
+        """
+    )
+    # Finds archival candidates without scanning every completed task
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tasks_completed_at "
+        "ON tasks(completed, completed_at)"
+    )
+    await conn.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_archive_fts USING fts5(
+            title,
+            notes,
+            content=tasks_archive,
+            content_rowid=rowid,
+            tokenize='porter unicode61'
+        )
+        """
+    )
+    await conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_archive_fts_insert
+        AFTER INSERT ON tasks_archive BEGIN
+            INSERT INTO tasks_archive_fts(rowid, title, notes)
+            VALUES (new.rowid, new.title, new.notes);
+        END
+        """
+    )
+    await conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_archive_fts_delete
+        AFTER DELETE ON tasks_archive BEGIN
+            INSERT INTO tasks_archive_fts(tasks_archive_fts, rowid, title, notes)
+            VALUES ('delete', old.rowid, old.title, old.notes);
+        END
+        """
+    )
+
+
+async def migrate_v2_remove_tasks_archive(conn: aiosqlite.Connection) -> None:
+    """Drop the archive again, moving archived tasks back into tasks."""
+    await conn.execute(
+        """
+        INSERT OR IGNORE INTO tasks (
+            id, title, notes, due_date, due_time, priority, completed,
+            completed_at, created_at, modified_at, device_id, version
+        )
+        SELECT id, title, notes, due_date, due_time, priority, completed,
+            completed_at, created_at, modified_at, device_id, version
+        FROM tasks_archive
+        """
+    )
+    cursor = await conn.execute(
+        "SELECT id, tags FROM tasks_archive WHERE tags IS NOT NULL"
+    )
+    for task_id, tags in await cursor.fetchall():
+        for name in tags.split(","):
+            await conn.execute(
+                "INSERT OR IGNORE INTO tags (id, name) VALUES (lower(hex(randomblob(16))), ?)",
+                (name,),
+            )
+            await conn.execute(
+                "INSERT OR IGNORE INTO task_tags (task_id, tag_id) "
+                "SELECT ?, id FROM tags WHERE name = ?",
+                (task_id, name),
+            )
+    await conn.execute("DROP TABLE IF EXISTS tasks_archive_fts")
+    await conn.execute("DROP TABLE IF EXISTS tasks_archive")
+    await conn.execute("DROP INDEX IF EXISTS idx_tasks_completed_at")
+
+
+async def migrate_v3_hot_query_indexes(conn: aiosqlite.Connection) -> None:
+    """Replace the single-column task indexes with ones the hot queries use.
+
+    The list queries order by (due_date, created_at DESC), mostly over open
+    tasks, so they get a partial index for open tasks and a full one for
+    the other filters; either returns rows in order without a sort. The
+    dropped indexes were never chosen by those queries and only cost
+    writes.
+    """
+    for index in (
+        "idx_tasks_completed",
+        "idx_tasks_due_date",
+        "idx_tasks_priority",
+        "idx_tasks_completed_due",
+        "idx_tasks_completed_at",
+        "idx_task_tags_task_id",  # Covered by the task_tags primary key
+        "idx_task_tags_tag_id",
+    ):
+        await conn.execute(f"DROP INDEX IF EXISTS {index}")
+
+    for statement in (
+        # Open tasks in list order
+        "CREATE INDEX IF NOT EXISTS idx_tasks_open_due "
+        "ON tasks(due_date, created_at DESC) WHERE completed = 0",
+        # All tasks in list order; completed lets completed=1 filter in the index
+        "CREATE INDEX IF NOT EXISTS idx_tasks_due "
+        "ON tasks(due_date, created_at DESC, completed)",
+        # Archival candidates, oldest completion first
+        "CREATE INDEX IF NOT EXISTS idx_tasks_done_completed_at "
+        "ON tasks(completed_at) WHERE completed = 1",
+        # Tag filter: tag -> task IDs without touching the table
+        "CREATE INDEX IF NOT EXISTS idx_task_tags_tag_task "
+        "ON task_tags(tag_id, task_id)",
+    ):
+        await conn.execute(statement)
+
+
+async def migrate_v3_restore_indexes(conn: aiosqlite.Connection) -> None:
+    """Restore the version 2 indexes."""
+    for index in (
+        "idx_tasks_open_due",
+        "idx_tasks_due",
+        "idx_tasks_done_completed_at",
+        "idx_task_tags_tag_task",
+    ):
+        await conn.execute(f"DROP INDEX IF EXISTS {index}")
+
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks(completed)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks(due_date)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_completed_due ON tasks(completed, due_date)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_completed_at ON tasks(completed, completed_at)",
+        "CREATE INDEX IF NOT EXISTS idx_task_tags_task_id ON task_tags(task_id)",
+        "CREATE INDEX IF NOT EXISTS idx_task_tags_tag_id ON task_tags(tag_id)",
+    ):
+        await conn.execute(statement)
+
+
+async def migrate_v4_add_tags_json(conn: aiosqlite.Connection) -> None:
+    """Add the denormalized tag list column to tasks.
+
+    The column starts out NULL; readers fall back to task_tags for rows the
+    backfill has not reached yet. Archived tag lists switch from comma
+    separated names to the same JSON format.
+    """
+    await conn.execute("ALTER TABLE tasks ADD COLUMN tags_json TEXT")
+    await conn.execute(
+        """
+        UPDATE tasks_archive SET tags = CASE
+            WHEN tags IS NULL OR tags = '' THEN '[]'
+            ELSE json('["' || replace(replace(replace(tags, '\\', '\\\\'),
+                '"', '\\"'), ',', '","') || '"]')
+        END
+        """
+    )
+
+
+async def backfill_v4_tags_json(
+    conn: aiosqlite.Connection, checkpoint: Optional[str], batch_size: int
+) -> Optional[str]:
+    """Fill tags_json for one batch of tasks, in rowid order."""
+    cursor = await conn.execute(
+        "SELECT rowid FROM tasks WHERE rowid > ? ORDER BY rowid LIMIT ?",
+        (int(checkpoint or 0), batch_size),
+    )
+    rowids = [row[0] for row in await cursor.fetchall()]
+    if not rowids:
+        return None
+    await conn.execute(
+        f"""
+        UPDATE tasks SET tags_json = (
+            SELECT json_group_array(tag.name) FROM task_tags tt
+            JOIN tags tag ON tag.id = tt.tag_id WHERE tt.task_id = tasks.id
+        )
+        WHERE tags_json IS NULL AND rowid IN ({','.join('?' * len(rowids))})
+        """,
+        rowids,
+    )
+    return str(rowids[-1])
+
+
+async def migrate_v4_remove_tags_json(conn: aiosqlite.Connection) -> None:
+    """Drop the tag list column and restore comma separated archive tags."""
+    await conn.execute("ALTER TABLE tasks DROP COLUMN tags_json")
+    await conn.execute(
+        """
+        UPDATE tasks_archive SET tags = (
+            SELECT GROUP_CONCAT(value) FROM json_each(tasks_archive.tags)
+        )
+        """
+    )
+
+
+# Statements recreated whenever the tasks table is rebuilt
+TASKS_FTS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, notes)
+        VALUES (new.rowid, new.title, new.notes);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE ON tasks BEGIN
+        UPDATE tasks_fts
+        SET title = new.title, notes = new.notes
+        WHERE rowid = old.rowid;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        DELETE FROM tasks_fts WHERE rowid = old.rowid;
+    END
+    """,
+)
+
+TASK_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_tasks_open_due "
+    "ON tasks(due_date, created_at DESC) WHERE completed = 0",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_due "
+    "ON tasks(due_date, created_at DESC, completed)",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_done_completed_at "
+    "ON tasks(completed_at) WHERE completed = 1",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_modified_at ON tasks(modified_at)",
+)
+
+# Task columns other than the keys, shared by both table layouts
+_TASK_DATA_COLUMNS = (
+    "title, notes, due_date, due_time, priority, completed, completed_at, "
+    "created_at, modified_at, device_id, version, tags_json"
+)
+
+_TASK_DATA_DEFINITIONS = """
+    title TEXT NOT NULL,
+    notes TEXT,
+    due_date TEXT,
+    due_time TEXT,
+    priority INTEGER DEFAULT 0,
+    completed BOOLEAN DEFAULT 0,
+    completed_at TEXT,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    modified_at TEXT NOT NULL,
+    device_id TEXT NOT NULL,
+    version INTEGER DEFAULT 1,
+    tags_json TEXT,
+    CHECK (priority BETWEEN 0 AND 3),
+    CHECK (completed IN (0, 1))
+"""
+
+
+async def migrate_v5_integer_tag_keys(conn: aiosqlite.Connection) -> None:
+    """Key task_tags by integer task and tag keys instead of UUID text.
+
+    tasks and tags get an INTEGER PRIMARY KEY (pk) that takes over their
+    current rowid, so the FTS index (keyed by tasks.rowid) stays valid and
+    a VACUUM can no longer renumber it. The public UUIDs stay in id.
+    task_tags becomes a WITHOUT ROWID table of two integers.
+
+    Tables are rebuilt in one transaction. Any tags_json left NULL by the
+    version 4 backfill is filled during the copy, since that backfill
+    queries the old task_tags layout.
+    """
+    await conn.execute(
+        """
+        CREATE TABLE tags_new (
+            pk INTEGER PRIMARY KEY,
+            id TEXT NOT NULL UNIQUE,
+            name TEXT NOT NULL UNIQUE,
+            color TEXT,
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    await conn.execute(
+        "INSERT INTO tags_new (pk, id, name, color, created_at) "
+        "SELECT rowid, id, name, color, created_at FROM tags"
+    )
+
+    await conn.execute(
+        f"""
+        CREATE TABLE tasks_new (
+            pk INTEGER PRIMARY KEY,
+            id TEXT NOT NULL UNIQUE,
+            {_TASK_DATA_DEFINITIONS}
+        )
+        """
+    )
+    await conn.execute(
+        f"""
+        INSERT INTO tasks_new (pk, id, {_TASK_DATA_COLUMNS})
+        SELECT t.rowid, t.id, title, notes, due_date, due_time, priority,
+            completed, completed_at, t.created_at, modified_at, device_id,
+            version, COALESCE(tags_json, (
+                SELECT json_group_array(tag.name) FROM task_tags tt
+                JOIN tags tag ON tag.id = tt.tag_id WHERE tt.task_id = t.id
+            ))
+        FROM tasks t
+        """
+    )
+
+    await conn.execute(
+        """
+        CREATE TABLE task_tags_new (
+            task_pk INTEGER NOT NULL REFERENCES tasks_new(pk) ON DELETE CASCADE,
+            tag_pk INTEGER NOT NULL REFERENCES tags_new(pk) ON DELETE CASCADE,
+            PRIMARY KEY (task_pk, tag_pk)
+        ) WITHOUT ROWID
+        """
+    )
+    await conn.execute(
+        """
+        INSERT INTO task_tags_new (task_pk, tag_pk)
+        SELECT t.rowid, tag.rowid FROM task_tags tt
+        JOIN tasks t ON t.id = tt.task_id
+        JOIN tags tag ON tag.id = tt.tag_id
+        """
+    )
+
+    await conn.execute("DROP VIEW IF EXISTS tasks_with_tags")
+    for table in ("task_tags", "tasks", "tags"):
+        await conn.execute(f"DROP TABLE {table}")
+    for table in ("tags", "tasks", "task_tags"):
+        await conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+
+    # Secondary index rows also hold the primary key, so this covers
+    # tag -> task lookups
+    await conn.execute("CREATE INDEX IF NOT EXISTS idx_task_tags_tag ON task_tags(tag_pk)")
+    for statement in TASK_INDEXES + TASKS_FTS_TRIGGERS:
+        await conn.execute(statement)
+    await conn.execute(
+        """
+        CREATE VIEW IF NOT EXISTS tasks_with_tags AS
+        SELECT
+            t.id, t.title, t.notes, t.due_date, t.due_time, t.priority,
+            t.completed, t.completed_at, t.created_at, t.modified_at,
+            t.device_id, t.version,
+            GROUP_CONCAT(tag.name, ',') as tags,
+            GROUP_CONCAT(tag.color, ',') as tag_colors
+        FROM tasks t
+        LEFT JOIN task_tags tt ON t.pk = tt.task_pk
+        LEFT JOIN tags tag ON tt.tag_pk = tag.pk
+        GROUP BY t.pk
+        """
+    )
+
+    # Every tags_json is filled now
+    await conn.execute(
+        "UPDATE schema_version SET status = ?, backfill = NULL, checkpoint = NULL "
+        "WHERE version = 4",
+        (STATUS_COMPLETE,),
+    )
+
+
+async def migrate_v5_text_tag_keys(conn: aiosqlite.Connection) -> None:
+    """Restore the UUID text keyed task_tags of version 4."""
+    await conn.execute(
+        """
+        CREATE TABLE tags_old (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            color TEXT,
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    await conn.execute(
+        "INSERT INTO tags_old (rowid, id, name, color, created_at) "
+        "SELECT pk, id, name, color, created_at FROM tags"
+    )
+
+    await conn.execute(
+        f"""
+        CREATE TABLE tasks_old (
+            id TEXT PRIMARY KEY,
+            {_TASK_DATA_DEFINITIONS}
+        )
+        """
+    )
+    await conn.execute(
+        f"INSERT INTO tasks_old (rowid, id, {_TASK_DATA_COLUMNS}) "
+        f"SELECT pk, id, {_TASK_DATA_COLUMNS} FROM tasks"
+    )
+
+    await conn.execute(
+        """
+        CREATE TABLE task_tags_old (
+            task_id TEXT NOT NULL,
+            tag_id TEXT NOT NULL,
             created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-            modified_at TEXT NOT NULL
+            PRIMARY KEY (task_id, tag_id),
+            FOREIGN KEY (task_id) REFERENCES tasks_old(id) ON DELETE CASCADE,
+            FOREIGN KEY (tag_id) REFERENCES tags_old(id) ON DELETE CASCADE
         )
         """
     )
+    await conn.execute(
+        """
+        INSERT INTO task_tags_old (task_id, tag_id)
+        SELECT t.id, tag.id FROM task_tags tt
+        JOIN tasks t ON t.pk = tt.task_pk
+        JOIN tags tag ON tag.pk = tt.tag_pk
+        """
+    )
+
+    await conn.execute("DROP VIEW IF EXISTS tasks_with_tags")
+    for table in ("task_tags", "tasks", "tags"):
+        await conn.execute(f"DROP TABLE {table}")
+    for table in ("tags", "tasks", "task_tags"):
+        await conn.execute(f"ALTER TABLE {table}_old RENAME TO {table}")
+
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_task_tags_tag_task ON task_tags(tag_id, task_id)"
+    )
+    for statement in TASK_INDEXES + TASKS_FTS_TRIGGERS:
+        await conn.execute(statement)
+    await conn.execute(
+        """
+        CREATE VIEW IF NOT EXISTS tasks_with_tags AS
+        SELECT
+            t.id, t.title, t.notes, t.due_date, t.due_time, t.priority,
+            t.completed, t.completed_at, t.created_at, t.modified_at,
+            t.device_id, t.version,
+            GROUP_CONCAT(tag.name, ',') as tags,
+            GROUP_CONCAT(tag.color, ',') as tag_colors
+        FROM tasks t
+        LEFT JOIN task_tags tt ON t.id = tt.task_id
+        LEFT JOIN tags tag ON tt.tag_id = tag.id
+        GROUP BY t.id
+        """
+    )
+
+
+# Timestamp columns of tasks and tasks_archive
+_TIMESTAMP_COLUMNS = ("completed_at", "created_at", "modified_at", "archived_at")
+
+# Current time in epoch milliseconds, in SQL
+_NOW_MS = "CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)"
+
+# ISO 8601 / CURRENT_TIMESTAMP text -> epoch milliseconds. julianday()
+# reads both formats (and any UTC offset); unparseable values become the
+# migration time so the NOT NULL columns stay valid.
+_TEXT_TO_EPOCH_MS = (
+    "CASE WHEN {0} IS NULL THEN NULL ELSE COALESCE("
+    "CAST(ROUND((julianday({0}) - 2440587.5) * 86400000) AS INTEGER), "
+    f"{_NOW_MS}) END"
+)
+
+# Epoch milliseconds -> ISO 8601 text, as written before version 6
+_EPOCH_MS_TO_TEXT = "strftime('%Y-%m-%dT%H:%M:%f', {0} / 1000.0, 'unixepoch')"
+
+_TASK_EPOCH_DATA_DEFINITIONS = f"""
+    title TEXT NOT NULL,
+    notes TEXT,
+    due_date TEXT,
+    due_time TEXT,
+    priority INTEGER DEFAULT 0,
+    completed BOOLEAN DEFAULT 0,
+    completed_at INTEGER,
+    created_at INTEGER NOT NULL DEFAULT ({_NOW_MS}),
+    modified_at INTEGER NOT NULL,
+    device_id TEXT NOT NULL,
+    version INTEGER DEFAULT 1,
+    tags_json TEXT,
+    CHECK (priority BETWEEN 0 AND 3),
+    CHECK (completed IN (0, 1))
+"""
+
+_ARCHIVE_COLUMNS = (
+    "id, title, notes, due_date, due_time, priority, completed, completed_at, "
+    "created_at, modified_at, device_id, version, tags, archived_at"
+)
+
+ARCHIVE_FTS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_archive_fts_insert
+    AFTER INSERT ON tasks_archive BEGIN
+        INSERT INTO tasks_archive_fts(rowid, title, notes)
+        VALUES (new.rowid, new.title, new.notes);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_archive_fts_delete
+    AFTER DELETE ON tasks_archive BEGIN
+        INSERT INTO tasks_archive_fts(tasks_archive_fts, rowid, title, notes)
+        VALUES ('delete', old.rowid, old.title, old.notes);
+    END
+    """,
+)
+
+TASKS_WITH_TAGS_VIEW = """
+    CREATE VIEW IF NOT EXISTS tasks_with_tags AS
+    SELECT
+        t.id, t.title, t.notes, t.due_date, t.due_time, t.priority,
+        t.completed, t.completed_at, t.created_at, t.modified_at,
+        t.device_id, t.version,
+        GROUP_CONCAT(tag.name, ',') as tags,
+        GROUP_CONCAT(tag.color, ',') as tag_colors
+    FROM tasks t
+    LEFT JOIN task_tags tt ON t.pk = tt.task_pk
+    LEFT JOIN tags tag ON tt.tag_pk = tag.pk
+    GROUP BY t.pk
+"""
+
+
+def _convert_columns(columns: str, convert: str) -> str:
+    """Build a select list that converts the timestamp columns.
+
+    Args:
+        columns: Comma-separated column names
+        convert: SQL expression with ``{0}`` standing for the column
+
+    Returns:
+        Select list in the same column order
+    """
+    return ", ".join(
+        convert.format(column) if column in _TIMESTAMP_COLUMNS else column
+        for column in columns.split(", ")
+    )
+
+
+async def _rebuild_timestamp_tables(
+    conn: aiosqlite.Connection,
+    task_definitions: str,
+    timestamp_type: str,
+    convert: str,
+) -> None:
+    """Rebuild tasks and tasks_archive with converted timestamp columns.
+
+    Both tables keep their rowids, so the FTS indexes stay valid and
+    task_tags keeps pointing at the same tasks.
+
+    Args:
+        conn: Database connection
+        task_definitions: tasks column definitions other than the keys
+        timestamp_type: Column type of the tasks_archive timestamps
+        convert: SQL expression converting a timestamp column ``{0}``
+    """
+    await conn.execute(
+        f"""
+        CREATE TABLE tasks_new (
+            pk INTEGER PRIMARY KEY,
+            id TEXT NOT NULL UNIQUE,
+            {task_definitions}
+        )
+        """
+    )
+    await conn.execute(
+        f"INSERT INTO tasks_new (pk, id, {_TASK_DATA_COLUMNS}) "
+        f"SELECT pk, id, {_convert_columns(_TASK_DATA_COLUMNS, convert)} FROM tasks"
+    )
+
+    await conn.execute(
+        f"""
+        CREATE TABLE tasks_archive_new (
+            id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            notes TEXT,
+            due_date TEXT,
+            due_time TEXT,
+            priority INTEGER DEFAULT 0,
+            completed BOOLEAN DEFAULT 1,
+            completed_at {timestamp_type},
+            created_at {timestamp_type} NOT NULL,
+            modified_at {timestamp_type} NOT NULL,
+            device_id TEXT NOT NULL,
+            version INTEGER DEFAULT 1,
+            tags TEXT,  -- JSON array of tag names at archive time
+            archived_at {timestamp_type} NOT NULL
+        )
+        """
+    )
+    await conn.execute(
+        f"INSERT INTO tasks_archive_new (rowid, {_ARCHIVE_COLUMNS}) "
+        f"SELECT rowid, {_convert_columns(_ARCHIVE_COLUMNS, convert)} FROM tasks_archive"
+    )
+
+    await conn.execute("DROP VIEW IF EXISTS tasks_with_tags")
+    for table in ("tasks", "tasks_archive"):
+        await conn.execute(f"DROP TABLE {table}")
+        await conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+
+    for statement in (
+        TASK_INDEXES + TASKS_FTS_TRIGGERS + ARCHIVE_FTS_TRIGGERS + (TASKS_WITH_TAGS_VIEW,)
+    ):
+        await conn.execute(statement)
+
+
+async def migrate_v6_epoch_timestamps(conn: aiosqlite.Connection) -> None:
+    """Store task timestamps as integer epoch milliseconds.
+
+    The text columns mixed datetime.isoformat() values with the
+    CURRENT_TIMESTAMP format, which do not sort together, and every index
+    entry carried a 26 character string. Integers compare correctly and
+    index in at most 8 bytes. ISO 8601 is only rendered at the API edge
+    (Task.to_dict()).
+    """
+    await _rebuild_timestamp_tables(
+        conn, _TASK_EPOCH_DATA_DEFINITIONS, "INTEGER", _TEXT_TO_EPOCH_MS
+    )
+
+
+async def migrate_v6_text_timestamps(conn: aiosqlite.Connection) -> None:
+    """Restore the ISO 8601 text timestamps of version 5."""
+    await _rebuild_timestamp_tables(
+        conn, _TASK_DATA_DEFINITIONS, "TEXT", _EPOCH_MS_TO_TEXT
+    )
+
+
+async def migrate_v7_add_agenda_index(conn: aiosqlite.Connection) -> None:
+    """Add the index behind the agenda queries.
+
+    Open tasks in (due_date, due_time, priority DESC) order: due-date
+    windows are a range scan that already returns the agenda order, so no
+    sort is needed however many tasks are open.
+    """
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tasks_open_agenda "
+        "ON tasks(due_date, due_time, priority DESC) WHERE completed = 0"
+    )
+
+
+async def migrate_v7_remove_agenda_index(conn: aiosqlite.Connection) -> None:
+    """Drop the agenda index."""
+    await conn.execute("DROP INDEX IF EXISTS idx_tasks_open_agenda")
+
+
+async def migrate_v8_add_recurrence(conn: aiosqlite.Connection) -> None:
+    """Add the recurrence rule column to tasks and the archive.
+
+    Open recurring tasks get their own small index, so the agenda can find
+    the series to expand without scanning every open task.
+    """
+    await conn.execute("ALTER TABLE tasks ADD COLUMN recurrence TEXT")
+    await conn.execute("ALTER TABLE tasks_archive ADD COLUMN recurrence TEXT")
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tasks_open_recurring "
+        "ON tasks(due_date) WHERE completed = 0 AND recurrence IS NOT NULL"
+    )
+
+
+async def migrate_v8_remove_recurrence(conn: aiosqlite.Connection) -> None:
+    """Drop the recurrence rules; recurring tasks become one-off tasks."""
+    await conn.execute("DROP INDEX IF EXISTS idx_tasks_open_recurring")
+    await conn.execute("ALTER TABLE tasks DROP COLUMN recurrence")
+    await conn.execute("ALTER TABLE tasks_archive DROP COLUMN recurrence")
+
+
+async def migrate_v9_add_completion_daily(conn: aiosqlite.Connection) -> None:
+    """Add the daily completion rollup.
+
+    Completions are counted per local date and tag ('' counts every task),
+    so history charts read one row per day. Existing completions are
+    rolled up later by TaskRepository.backfill_completion_history(), which
+    needs the Home Assistant time zone to assign dates; the single row of
+    completion_backfill tracks its progress and only covers completions
+    before this migration, as later ones are counted as they happen.
+    """
+    await conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS completion_daily (
+            tag TEXT NOT NULL,
+            day TEXT NOT NULL,
+            completed INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (tag, day)
+        ) WITHOUT ROWID
+        """
+    )
+    await conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS completion_backfill (
+            cutoff INTEGER NOT NULL,
+            source TEXT NOT NULL,
+            after INTEGER NOT NULL
+        )
+        """
+    )
+    await conn.execute(
+        "INSERT INTO completion_backfill (cutoff, source, after) "
+        "VALUES (CAST(strftime('%s', 'now') AS INTEGER) * 1000, 'tasks', 0)"
+    )
+
+
+async def migrate_v9_remove_completion_daily(conn: aiosqlite.Connection) -> None:
+    """Drop the daily completion rollup."""
+    await conn.execute("DROP TABLE IF EXISTS completion_backfill")
+    await conn.execute("DROP TABLE IF EXISTS completion_daily")
+
+
+# tasks_fts with the board key as a third column, so searches can be
+# limited to one board inside the full-text index. Updates only touch the
+# index when an indexed column changes, and old values are removed with
+# the external-content 'delete' command.
+BOARD_FTS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, notes, board_pk)
+        VALUES (new.rowid, new.title, new.notes, new.board_pk);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_update
+    AFTER UPDATE OF title, notes, board_pk ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, notes, board_pk)
+        VALUES ('delete', old.rowid, old.title, old.notes, old.board_pk);
+        INSERT INTO tasks_fts(rowid, title, notes, board_pk)
+        VALUES (new.rowid, new.title, new.notes, new.board_pk);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, notes, board_pk)
+        VALUES ('delete', old.rowid, old.title, old.notes, old.board_pk);
+    END
+    """,
+)
+
+BOARD_INDEXES = (
+    # Board task lists in list order; completed is an equality, so both
+    # the open and the completed filter read rows in order
+    "CREATE INDEX IF NOT EXISTS idx_tasks_board_due "
+    "ON tasks(board_pk, completed, due_date, created_at DESC)",
+    # Board agenda windows, as idx_tasks_open_agenda
+    "CREATE INDEX IF NOT EXISTS idx_tasks_board_open_agenda "
+    "ON tasks(board_pk, due_date, due_time, priority DESC) WHERE completed = 0",
+    # List filter and clearing a deleted list; most tasks are on no list
+    "CREATE INDEX IF NOT EXISTS idx_tasks_list "
+    "ON tasks(list_pk, completed, due_date, created_at DESC) WHERE list_pk IS NOT NULL",
+)
+
+
+async def _rebuild_tasks_fts(
+    conn: aiosqlite.Connection, columns: str, triggers: tuple[str, ...]
+) -> None:
+    """Recreate tasks_fts with other columns and repopulate it from tasks.
+
+    Args:
+        conn: Database connection
+        columns: FTS5 column list
+        triggers: Triggers keeping the index in sync
+    """
+    for trigger in ("tasks_fts_insert", "tasks_fts_update", "tasks_fts_delete"):
+        await conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    await conn.execute("DROP TABLE IF EXISTS tasks_fts")
+    await conn.execute(
+        f"""
+        CREATE VIRTUAL TABLE tasks_fts USING fts5(
+            {columns},
+            content=tasks,
+            content_rowid=rowid,
+            tokenize='porter unicode61'
+        )
+        """
+    )
+    for statement in triggers:
+        await conn.execute(statement)
+    await conn.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+
+async def migrate_v10_add_boards(conn: aiosqlite.Connection) -> None:
+    """Add boards and lists, and put every task on a board.
+
+    Tasks and archived tasks reference their board and list by integer
+    key. Adding the columns with a constant default does not rewrite the
+    tables; existing tasks land on the default board (key 1), which the
+    migration creates. Board and list keys are never reused
+    (AUTOINCREMENT), so a stale key in the archive cannot point at a
+    different list.
+    """
+    await conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS boards (
+            pk INTEGER PRIMARY KEY AUTOINCREMENT,
+            id TEXT NOT NULL UNIQUE,
+            name TEXT NOT NULL,
+            created_at INTEGER NOT NULL,
+            modified_at INTEGER NOT NULL
+        )
+        """
+    )
+    await conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS lists (
+            pk INTEGER PRIMARY KEY AUTOINCREMENT,
+            id TEXT NOT NULL UNIQUE,
+            board_pk INTEGER NOT NULL REFERENCES boards(pk) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            created_at INTEGER NOT NULL
+        )
+        """
+    )
+    await conn.execute("CREATE INDEX IF NOT EXISTS idx_lists_board ON lists(board_pk, name)")
+    await conn.execute(
+        "INSERT INTO boards (pk, id, name, created_at, modified_at) VALUES (1, 'default', "
+        "'Tasks', CAST(strftime('%s', 'now') AS INTEGER) * 1000, "
+        "CAST(strftime('%s', 'now') AS INTEGER) * 1000)"
+    )
+    for table in ("tasks", "tasks_archive"):
+        await conn.execute(f"ALTER TABLE {table} ADD COLUMN board_pk INTEGER NOT NULL DEFAULT 1")
+        await conn.execute(f"ALTER TABLE {table} ADD COLUMN list_pk INTEGER")
+    for statement in BOARD_INDEXES:
+        await conn.execute(statement)
+    await _rebuild_tasks_fts(conn, "title, notes, board_pk", BOARD_FTS_TRIGGERS)
+
+
+async def migrate_v10_remove_boards(conn: aiosqlite.Connection) -> None:
+    """Drop boards and lists; the tasks of every board end up in one set."""
+    await _rebuild_tasks_fts(conn, "title, notes", TASKS_FTS_TRIGGERS)
+    for index in ("idx_tasks_board_due", "idx_tasks_board_open_agenda", "idx_tasks_list"):
+        await conn.execute(f"DROP INDEX IF EXISTS {index}")
+    for table in ("tasks", "tasks_archive"):
+        await conn.execute(f"ALTER TABLE {table} DROP COLUMN list_pk")
+        await conn.execute(f"ALTER TABLE {table} DROP COLUMN board_pk")
+    await conn.execute("DROP TABLE IF EXISTS lists")
+    await conn.execute("DROP TABLE IF EXISTS boards")
+
+
+ORDER_INDEXES = (
+    # Manual board order; moves look up a task's neighbours here
+    "CREATE INDEX IF NOT EXISTS idx_tasks_board_order ON tasks(board_pk, sort_key)",
+    # Manual order within a list
+    "CREATE INDEX IF NOT EXISTS idx_tasks_list_order "
+    "ON tasks(list_pk, sort_key) WHERE list_pk IS NOT NULL",
+)
+
+
+async def migrate_v11_add_sort_keys(conn: aiosqlite.Connection) -> None:
+    """Add fractional sort keys for manual task order.
+
+    The column starts out NULL; the backfill gives existing tasks keys in
+    creation order. Archived tasks keep their key so a restored task can
+    go back to its place.
+    """
+    for table in ("tasks", "tasks_archive"):
+        await conn.execute(f"ALTER TABLE {table} ADD COLUMN sort_key TEXT")
+    for statement in ORDER_INDEXES:
+        await conn.execute(statement)
+
+
+async def backfill_v11_sort_keys(
+    conn: aiosqlite.Connection, checkpoint: Optional[str], batch_size: int
+) -> Optional[str]:
+    """Give one batch of tasks sort keys, newest first.
+
+    Each batch is placed before the first key on its board, so every
+    board ends up in creation order and tasks created since the upgrade
+    (which are appended with a key) stay at the end.
+    """
+    cursor = await conn.execute(
+        "SELECT rowid, board_pk FROM tasks WHERE rowid < ? AND sort_key IS NULL "
+        "ORDER BY rowid DESC LIMIT ?",
+        (int(checkpoint) if checkpoint is not None else 1 << 62, batch_size),
+    )
+    rows = await cursor.fetchall()
+    if not rows:
+        return None
+    boards: dict[int, list[int]] = {}
+    for rowid, board_pk in rows:
+        boards.setdefault(board_pk, []).append(rowid)
+    for board_pk, rowids in boards.items():
+        cursor = await conn.execute(
+            "SELECT MIN(sort_key) FROM tasks WHERE board_pk = ?", (board_pk,)
+        )
+        first_key = (await cursor.fetchone())[0]
+        keys = keys_between(None, first_key, len(rowids))
+        await conn.executemany(
+            "UPDATE tasks SET sort_key = ? WHERE rowid = ?",
+            zip(keys, reversed(rowids), strict=True),
+        )
+    return str(rows[-1][0])
+
+
+async def migrate_v11_remove_sort_keys(conn: aiosqlite.Connection) -> None:
+    """Drop the sort keys; manual order is lost."""
+    for index in ("idx_tasks_board_order", "idx_tasks_list_order"):
+        await conn.execute(f"DROP INDEX IF EXISTS {index}")
+    for table in ("tasks", "tasks_archive"):
+        await conn.execute(f"ALTER TABLE {table} DROP COLUMN sort_key")
+
+
+SUBTASK_TRIGGERS = (
+    # Progress counters of the parent, kept in step with every write path
+    # (single and batch statements, deletes, archival). A counter UPDATE
+    # touches neither the indexed text nor completed/parent_pk, so it fires
+    # no other trigger.
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_subtask_insert
+    AFTER INSERT ON tasks WHEN NEW.parent_pk IS NOT NULL BEGIN
+        UPDATE tasks SET subtask_count = subtask_count + 1,
+            subtasks_done = subtasks_done + NEW.completed
+        WHERE pk = NEW.parent_pk;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_subtask_delete
+    AFTER DELETE ON tasks WHEN OLD.parent_pk IS NOT NULL BEGIN
+        UPDATE tasks SET subtask_count = subtask_count - 1,
+            subtasks_done = subtasks_done - OLD.completed
+        WHERE pk = OLD.parent_pk;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_subtask_update
+    AFTER UPDATE OF completed, parent_pk ON tasks
+    WHEN OLD.parent_pk IS NOT NEW.parent_pk OR OLD.completed != NEW.completed BEGIN
+        UPDATE tasks SET subtask_count = subtask_count - 1,
+            subtasks_done = subtasks_done - OLD.completed
+        WHERE pk = OLD.parent_pk;
+        UPDATE tasks SET subtask_count = subtask_count + 1,
+            subtasks_done = subtasks_done + NEW.completed
+        WHERE pk = NEW.parent_pk;
+    END
+    """,
+)
+
+
+async def migrate_v12_add_subtasks(conn: aiosqlite.Connection) -> None:
+    """Add subtasks: a parent key and progress counters on tasks.
+
+    Subtasks are task rows pointing at their parent by integer key, so a
+    checklist item is one row to tick rather than a line of the parent's
+    notes. Archived tasks keep the parent's public ID, as archive rows
+    have no integer key. No existing task has subtasks, so the counters
+    start out correct at zero.
+    """
+    await conn.execute("ALTER TABLE tasks ADD COLUMN parent_pk INTEGER")
+    await conn.execute("ALTER TABLE tasks_archive ADD COLUMN parent_id TEXT")
+    for table in ("tasks", "tasks_archive"):
+        for column in ("subtask_count", "subtasks_done"):
+            await conn.execute(
+                f"ALTER TABLE {table} ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"
+            )
+    # Children of a task in manual order, and each step of a subtree walk
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tasks_parent "
+        "ON tasks(parent_pk, sort_key) WHERE parent_pk IS NOT NULL"
+    )
+    for statement in SUBTASK_TRIGGERS:
+        await conn.execute(statement)
+
+
+async def migrate_v12_remove_subtasks(conn: aiosqlite.Connection) -> None:
+    """Drop subtasks; former subtasks become top-level tasks."""
+    for trigger in ("tasks_subtask_insert", "tasks_subtask_delete", "tasks_subtask_update"):
+        await conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    await conn.execute("DROP INDEX IF EXISTS idx_tasks_parent")
+    await conn.execute("ALTER TABLE tasks DROP COLUMN parent_pk")
+    await conn.execute("ALTER TABLE tasks_archive DROP COLUMN parent_id")
+    for table in ("tasks", "tasks_archive"):
+        for column in ("subtask_count", "subtasks_done"):
+            await conn.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
 
 
 # Register migrations (add more as needed)
 MIGRATIONS = [
-    # Migration(
-    #     version=2,
-    #     description="Add boards table for shared boards feature (Beta)",
-    #     upgrade=migrate_v2_add_boards_table,
-    # ),
+    Migration(
+        version=2,
+        description="Add tasks archive for completed tasks",
+        upgrade=migrate_v2_add_tasks_archive,
+        downgrade=migrate_v2_remove_tasks_archive,
+    ),
+    Migration(
+        version=3,
+        description="Replace task indexes with hot query indexes",
+        upgrade=migrate_v3_hot_query_indexes,
+        downgrade=migrate_v3_restore_indexes,
+    ),
+    Migration(
+        version=4,
+        description="Add denormalized tags_json column to tasks",
+        upgrade=migrate_v4_add_tags_json,
+        downgrade=migrate_v4_remove_tags_json,
+        backfills=[Backfill("tags_json", backfill_v4_tags_json)],
+    ),
+    Migration(
+        version=5,
+        description="Key task_tags by integer task and tag keys",
+        upgrade=migrate_v5_integer_tag_keys,
+        downgrade=migrate_v5_text_tag_keys,
+        rebuilds_tables=True,
+    ),
+    Migration(
+        version=6,
+        description="Store task timestamps as epoch milliseconds",
+        upgrade=migrate_v6_epoch_timestamps,
+        downgrade=migrate_v6_text_timestamps,
+        rebuilds_tables=True,
+    ),
+    Migration(
+        version=7,
+        description="Add agenda index on open tasks",
+        upgrade=migrate_v7_add_agenda_index,
+        downgrade=migrate_v7_remove_agenda_index,
+    ),
+    Migration(
+        version=8,
+        description="Add recurrence rules to tasks",
+        upgrade=migrate_v8_add_recurrence,
+        downgrade=migrate_v8_remove_recurrence,
+    ),
+    Migration(
+        version=9,
+        description="Add daily completion rollup",
+        upgrade=migrate_v9_add_completion_daily,
+        downgrade=migrate_v9_remove_completion_daily,
+    ),
+    Migration(
+        version=10,
+        description="Add boards and lists",
+        upgrade=migrate_v10_add_boards,
+        downgrade=migrate_v10_remove_boards,
+    ),
+    Migration(
+        version=11,
+        description="Add manual sort keys",
+        upgrade=migrate_v11_add_sort_keys,
+        downgrade=migrate_v11_remove_sort_keys,
+        backfills=[Backfill("sort_keys", backfill_v11_sort_keys)],
+    ),
+    Migration(
+        version=12,
+        description="Add subtasks",
+        upgrade=migrate_v12_add_subtasks,
+        downgrade=migrate_v12_remove_subtasks,
+    ),
 ]
@@ -2,32 +2,160 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+import os
+import threading
+import time
+from typing import Any, Iterable, Optional
 import uuid
 
+# Media type for the compact "keys once, rows as arrays" task encoding
+COLUMNAR_CONTENT_TYPE = "application/vnd.haboard.columnar+json"
 
-@dataclass
+# Wire formats clients can negotiate
+WIRE_FORMAT_JSON = "json"
+WIRE_FORMAT_COLUMNAR = "columnar"
+
+# Board of tasks created without one; it always exists and cannot be deleted
+DEFAULT_BOARD_ID = "default"
+
+# Field order of a task row in the columnar encoding (matches Task.to_dict)
+TASK_WIRE_KEYS = (
+    "id",
+    "title",
+    "notes",
+    "due_date",
+    "due_time",
+    "priority",
+    "completed",
+    "completed_at",
+    "created_at",
+    "modified_at",
+    "device_id",
+    "version",
+    "recurrence",
+    "board_id",
+    "list_id",
+    "sort_key",
+    "parent_id",
+    "subtask_count",
+    "subtasks_done",
+    "tags",
+)
+
+
+def now_ms() -> int:
+    """Current Unix time in milliseconds, the stored timestamp format.
+
+    Returns:
+        Milliseconds since the epoch (UTC)
+    """
+    return time.time_ns() // 1_000_000
+
+
+def to_epoch_ms(value: int | float | str) -> int:
+    """Convert an API or import timestamp to epoch milliseconds.
+
+    Args:
+        value: Epoch milliseconds, or an ISO 8601 timestamp. Timestamps
+            without an offset are taken as UTC, which is what earlier
+            versions wrote.
+
+    Returns:
+        Milliseconds since the epoch
+
+    Raises:
+        ValueError: If the value is not a timestamp
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid timestamp: {value!r}")
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return round(parsed.timestamp() * 1000)
+
+
+def to_iso(value: int) -> str:
+    """Render epoch milliseconds as an ISO 8601 UTC timestamp.
+
+    Args:
+        value: Milliseconds since the epoch
+
+    Returns:
+        Timestamp such as ``2024-12-20T10:00:00.000Z``
+    """
+    seconds, millis = divmod(value, 1000)
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds)) + f".{millis:03d}Z"
+
+
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+
+
+def uuid7() -> str:
+    """Generate a time-ordered UUID (version 7, RFC 9562).
+
+    The first 48 bits are the Unix time in milliseconds, so new IDs sort
+    after older ones and inserts append to the end of ID indexes instead
+    of landing at random pages. A 12-bit counter keeps IDs generated within
+    the same millisecond in order.
+
+    Returns:
+        UUID string in the standard 8-4-4-4-12 form
+    """
+    global _uuid7_last_ms, _uuid7_counter
+
+    with _uuid7_lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _uuid7_last_ms:
+            _uuid7_last_ms = ms
+            _uuid7_counter = 0
+        else:
+            _uuid7_counter += 1
+            if _uuid7_counter > 0xFFF:
+                # Counter exhausted: borrow the next millisecond
+                _uuid7_last_ms += 1
+                _uuid7_counter = 0
+        ms, counter = _uuid7_last_ms, _uuid7_counter
+
+    rand = int.from_bytes(os.urandom(8), "big") & 0x3FFF_FFFF_FFFF_FFFF
+    value = (ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | rand
+    return str(uuid.UUID(int=value))
+
+
+@dataclass(slots=True)
 class Task:
     """Task model."""
 
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = field(default_factory=uuid7)
     title: str = ""
     notes: Optional[str] = None
     due_date: Optional[str] = None  # ISO 8601 date (YYYY-MM-DD)
     due_time: Optional[str] = None  # ISO 8601 time (HH:MM:SS)
     priority: int = 0  # 0=none, 1=low, 2=medium, 3=high
     completed: bool = False
-    completed_at: Optional[str] = None
-    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
-    modified_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    completed_at: Optional[int] = None  # Epoch milliseconds
+    created_at: int = field(default_factory=now_ms)  # Epoch milliseconds
+    modified_at: int = field(default_factory=now_ms)  # Epoch milliseconds
     device_id: str = ""
     version: int = 1
+    recurrence: Optional[str] = None  # RRULE (RFC 5545), e.g. FREQ=WEEKLY
+    board_id: str = DEFAULT_BOARD_ID
+    list_id: Optional[str] = None  # List on the board, if any
+    sort_key: Optional[str] = None  # Manual position on the board (ordering.py)
+    parent_id: Optional[str] = None  # Task this is a subtask of
+    subtask_count: int = 0  # Direct subtasks; maintained by the database
+    subtasks_done: int = 0  # Completed direct subtasks; maintained by the database
     tags: list[str] = field(default_factory=list)  # Tag names
 
     def to_dict(self) -> dict:
         """Convert to dictionary.
 
+        Timestamps are rendered as ISO 8601 UTC strings.
+
         Returns:
             Dictionary representation
         """
@@ -39,46 +167,104 @@ class Task:
             "due_time": self.due_time,
             "priority": self.priority,
             "completed": self.completed,
-            "completed_at": self.completed_at,
-            "created_at": self.created_at,
-            "modified_at": self.modified_at,
+            "completed_at": (
+                to_iso(self.completed_at) if self.completed_at is not None else None
+            ),
+            "created_at": to_iso(self.created_at),
+            "modified_at": to_iso(self.modified_at),
             "device_id": self.device_id,
             "version": self.version,
+            "recurrence": self.recurrence,
+            "board_id": self.board_id,
+            "list_id": self.list_id,
+            "sort_key": self.sort_key,
+            "parent_id": self.parent_id,
+            "subtask_count": self.subtask_count,
+            "subtasks_done": self.subtasks_done,
             "tags": self.tags,
         }
 
+    def to_wire_row(self) -> list[Any]:
+        """Convert to a positional row in TASK_WIRE_KEYS order.
+
+        Timestamps are rendered as in to_dict().
+
+        Returns:
+            List of field values
+        """
+        return [
+            self.id,
+            self.title,
+            self.notes,
+            self.due_date,
+            self.due_time,
+            self.priority,
+            self.completed,
+            to_iso(self.completed_at) if self.completed_at is not None else None,
+            to_iso(self.created_at),
+            to_iso(self.modified_at),
+            self.device_id,
+            self.version,
+            self.recurrence,
+            self.board_id,
+            self.list_id,
+            self.sort_key,
+            self.parent_id,
+            self.subtask_count,
+            self.subtasks_done,
+            self.tags,
+        ]
+
     @classmethod
     def from_dict(cls, data: dict) -> Task:
         """Create from dictionary.
 
+        Timestamps may be ISO 8601 strings or epoch milliseconds.
+
         Args:
             data: Dictionary with task data
 
         Returns:
             Task instance
+
+        Raises:
+            ValueError: If a timestamp cannot be parsed
         """
+        completed_at = data.get("completed_at")
+        # Only generate ids/timestamps when the key is missing
         return cls(
-            id=data.get("id", str(uuid.uuid4())),
+            id=data["id"] if "id" in data else uuid7(),
             title=data.get("title", ""),
             notes=data.get("notes"),
             due_date=data.get("due_date"),
             due_time=data.get("due_time"),
             priority=data.get("priority", 0),
             completed=data.get("completed", False),
-            completed_at=data.get("completed_at"),
-            created_at=data.get("created_at", datetime.utcnow().isoformat()),
-            modified_at=data.get("modified_at", datetime.utcnow().isoformat()),
+            completed_at=to_epoch_ms(completed_at) if completed_at is not None else None,
+            created_at=(
+                to_epoch_ms(data["created_at"]) if "created_at" in data else now_ms()
+            ),
+            modified_at=(
+                to_epoch_ms(data["modified_at"]) if "modified_at" in data else now_ms()
+            ),
             device_id=data.get("device_id", ""),
             version=data.get("version", 1),
+            recurrence=data.get("recurrence"),
+            board_id=data.get("board_id") or DEFAULT_BOARD_ID,
+            list_id=data.get("list_id"),
+            sort_key=data.get("sort_key"),
+            parent_id=data.get("parent_id"),
+            subtask_count=data.get("subtask_count", 0),
+            subtasks_done=data.get("subtasks_done", 0),
             tags=data.get("tags", []),
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Tag:
     """Tag model."""
 
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = field(default_factory=uuid7)
     name: str = ""
     color: Optional[str] = None  # Hex color code
     created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
@@ -107,8 +293,120 @@ class Tag:
             Tag instance
         """
         return cls(
-            id=data.get("id", str(uuid.uuid4())),
+            id=data["id"] if "id" in data else uuid7(),
             name=data.get("name", ""),
             color=data.get("color"),
-            created_at=data.get("created_at", datetime.utcnow().isoformat()),
+            created_at=(
+                data["created_at"] if "created_at" in data else datetime.utcnow().isoformat()
+            ),
         )
+
+
+@dataclass(slots=True)
+class Board:
+    """Board model: a separate set of tasks, optionally split into lists."""
+
+    id: str = field(default_factory=uuid7)
+    name: str = ""
+    created_at: int = field(default_factory=now_ms)  # Epoch milliseconds
+    modified_at: int = field(default_factory=now_ms)  # Epoch milliseconds
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary.
+
+        Returns:
+            Dictionary representation
+        """
+        return {
+            "id": self.id,
+            "name": self.name,
+            "created_at": to_iso(self.created_at),
+            "modified_at": to_iso(self.modified_at),
+        }
+
+
+@dataclass(slots=True)
+class BoardList:
+    """List model: a named group of tasks on a board."""
+
+    id: str = field(default_factory=uuid7)
+    board_id: str = DEFAULT_BOARD_ID
+    name: str = ""
+    created_at: int = field(default_factory=now_ms)  # Epoch milliseconds
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary.
+
+        Returns:
+            Dictionary representation
+        """
+        return {
+            "id": self.id,
+            "board_id": self.board_id,
+            "name": self.name,
+            "created_at": to_iso(self.created_at),
+        }
+
+
+def encode_columnar(tasks: Iterable[Task]) -> dict[str, Any]:
+    """Encode tasks as a columnar payload.
+
+    Field names are sent once in ``keys`` and every task becomes a
+    positional array in ``rows``.
+
+    Args:
+        tasks: Tasks to encode
+
+    Returns:
+        Columnar payload
+    """
+    return {
+        "keys": list(TASK_WIRE_KEYS),
+        "rows": [task.to_wire_row() for task in tasks],
+    }
+
+
+def encode_columnar_dicts(task_dicts: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """Encode task dictionaries (as produced by Task.to_dict) as a columnar payload.
+
+    Args:
+        task_dicts: Task dictionaries to encode
+
+    Returns:
+        Columnar payload
+    """
+    return {
+        "keys": list(TASK_WIRE_KEYS),
+        "rows": [[data.get(key) for key in TASK_WIRE_KEYS] for data in task_dicts],
+    }
+
+
+def decode_columnar(payload: dict[str, Any]) -> list[Task]:
+    """Decode a columnar payload back into tasks.
+
+    Keys are read from the payload rather than assumed, so rows produced by
+    an older or newer encoder with a different field order still decode.
+
+    Args:
+        payload: Columnar payload with ``keys`` and ``rows``
+
+    Returns:
+        List of tasks
+
+    Raises:
+        ValueError: If the payload is malformed
+    """
+    try:
+        keys = payload["keys"]
+        rows = payload["rows"]
+    except (KeyError, TypeError) as err:
+        raise ValueError("Columnar payload requires 'keys' and 'rows'") from err
+
+    tasks = []
+    for row in rows:
+        if len(row) != len(keys):
+            raise ValueError(
+                f"Columnar row has {len(row)} values, expected {len(keys)}"
+            )
+        tasks.append(Task.from_dict(dict(zip(keys, row, strict=True))))
+    return tasks
@@ -0,0 +1,218 @@
+"""Fractional ordering keys for manually ordered tasks.
+
+Each task has a ``sort_key`` string and tasks are listed by comparing
+keys as plain strings. Moving a task gives it a new key between the keys
+of its new neighbours, so a move writes one row however long the list
+is; renumbering positions would rewrite every row after the drop point.
+
+Keys are base-62 numbers made of an integer part and a fraction. The
+first character of the integer part encodes its length ('a' one digit,
+'b' two digits, ... and 'Z', 'Y', ... for the negative integers that
+precede 'a0'), so appending or prepending a task increments or
+decrements the integer part and stays short. Inserting between two keys
+extends the fraction, which grows by about one character per six
+inserts into the same gap; :func:`keys_between` hands out evenly spaced
+short keys again when a run of long keys is rebalanced.
+
+Digits are in ASCII order, so SQLite's default BINARY collation sorts
+keys the same way Python does.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+# Key of the first task on an empty board
+FIRST_KEY = "a" + DIGITS[0]
+
+# Smallest integer part; nothing can be placed before it without a fraction
+SMALLEST_INTEGER = "A" + DIGITS[0] * 26
+
+# Boards with a key longer than this are rebalanced by maintenance
+MAX_KEY_LENGTH = 24
+
+# Keys up to this length are kept when a board is rebalanced; only the
+# runs of longer keys between them are rewritten
+ANCHOR_KEY_LENGTH = 8
+
+
+def _integer_length(head: str) -> int:
+    """Length of an integer part, from its first character.
+
+    Raises:
+        ValueError: If the character does not start an integer part
+    """
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid sort key head: {head!r}")
+
+
+def _split(key: str) -> tuple[str, str]:
+    """Split a key into its integer part and its fraction.
+
+    Raises:
+        ValueError: If the key is malformed
+    """
+    if not key or key == SMALLEST_INTEGER:
+        raise ValueError(f"Invalid sort key: {key!r}")
+    length = _integer_length(key[0])
+    if length > len(key) or any(digit not in DIGITS for digit in key[1:]):
+        raise ValueError(f"Invalid sort key: {key!r}")
+    fraction = key[length:]
+    # A trailing zero would leave no key between "x" and "x0"
+    if fraction.endswith(DIGITS[0]):
+        raise ValueError(f"Invalid sort key: {key!r}")
+    return key[:length], fraction
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    """Fraction between two fractions; "" is zero and None is one.
+
+    Args:
+        a: Lower fraction
+        b: Upper fraction, greater than a, or None
+    """
+    if b is not None:
+        # Keep the common prefix, padding a with zeros
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else DIGITS[0]) == b[n]:
+            n += 1
+        if n:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else len(DIGITS)
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    # Consecutive digits: b's first digit alone is between them if b goes
+    # on, otherwise keep a's digit and halve what follows it
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _increment(integer: str) -> Optional[str]:
+    """Next integer part, or None after the largest one."""
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        position = DIGITS.index(digits[i]) + 1
+        if position < len(DIGITS):
+            digits[i] = DIGITS[position]
+            return head + "".join(digits)
+        digits[i] = DIGITS[0]
+    if head == "Z":
+        return "a" + DIGITS[0]
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(DIGITS[0])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement(integer: str) -> Optional[str]:
+    """Previous integer part, or None before the smallest one."""
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        position = DIGITS.index(digits[i]) - 1
+        if position >= 0:
+            digits[i] = DIGITS[position]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def key_between(a: Optional[str], b: Optional[str]) -> str:
+    """Generate a key that sorts between two keys.
+
+    Args:
+        a: Key to sort after, or None for the start
+        b: Key to sort before, or None for the end
+
+    Returns:
+        New key, as short as the neighbours allow
+
+    Raises:
+        ValueError: If a key is malformed or a is not less than b
+    """
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"Sort key {a!r} is not before {b!r}")
+    if a is None:
+        if b is None:
+            return FIRST_KEY
+        integer_b, fraction_b = _split(b)
+        if integer_b == SMALLEST_INTEGER:
+            return integer_b + _midpoint("", fraction_b)
+        if integer_b < b:
+            return integer_b
+        previous = _decrement(integer_b)
+        if previous is None:
+            raise ValueError("No sort key before the smallest key")
+        return previous
+
+    integer_a, fraction_a = _split(a)
+    if b is None:
+        following = _increment(integer_a)
+        return following if following is not None else integer_a + _midpoint(fraction_a, None)
+
+    integer_b, fraction_b = _split(b)
+    if integer_a == integer_b:
+        return integer_a + _midpoint(fraction_a, fraction_b)
+    following = _increment(integer_a)
+    if following is not None and following < b:
+        return following
+    return integer_a + _midpoint(fraction_a, None)
+
+
+def keys_between(a: Optional[str], b: Optional[str], count: int) -> list[str]:
+    """Generate evenly spread, increasing keys between two keys.
+
+    Between two keys the range is bisected, so the keys stay about as
+    short as a single key_between() result; after a key (or on an empty
+    board) the keys are consecutive integers.
+
+    Args:
+        a: Key to sort after, or None for the start
+        b: Key to sort before, or None for the end
+        count: Number of keys
+
+    Returns:
+        Keys in increasing order
+
+    Raises:
+        ValueError: If a key is malformed or a is not less than b
+    """
+    if count <= 0:
+        return []
+    if count == 1:
+        return [key_between(a, b)]
+    if b is None:
+        keys = [key_between(a, None)]
+        while len(keys) < count:
+            keys.append(key_between(keys[-1], None))
+        return keys
+    if a is None:
+        keys = [key_between(None, b)]
+        while len(keys) < count:
+            keys.append(key_between(None, keys[-1]))
+        return keys[::-1]
+    middle = count // 2
+    key = key_between(a, b)
+    return [
+        *keys_between(a, key, middle),
+        key,
+        *keys_between(key, b, count - middle - 1),
+    ]
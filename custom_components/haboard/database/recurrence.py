@@ -0,0 +1,448 @@
+"""Recurring task rules for HABoard.
+
+A recurring task is a single row: its ``due_date`` is the next open
+occurrence and its ``recurrence`` column holds an RRULE (RFC 5545)
+string. Completing it moves the row on to the following occurrence
+instead of copying it, and later occurrences are only expanded on demand
+for the date window a caller asks about.
+
+Supported RRULE parts: FREQ (DAILY, WEEKLY, MONTHLY, YEARLY), INTERVAL,
+BYDAY (plain weekdays, with DAILY or WEEKLY), BYMONTHDAY (with MONTHLY,
+negative values count from the month end), COUNT and UNTIL. The task's
+due date acts as DTSTART.
+"""
+from __future__ import annotations
+
+import calendar
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+from functools import lru_cache
+import heapq
+from typing import Iterable, Iterator, Optional
+
+from .models import Task
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+# Date windows whose expansions are kept, least recently used dropped first
+EXPANSION_CACHE_WINDOWS = 16
+
+# Fields copied into each expanded occurrence
+TASK_SLOTS = Task.__slots__
+
+# (window start, window end) -> (rule, first occurrence) -> occurrences
+_expansions: OrderedDict[tuple[str, str], dict[tuple[str, str], tuple[str, ...]]] = (
+    OrderedDict()
+)
+
+
+@dataclass(frozen=True, slots=True)
+class RecurrenceRule:
+    """Parsed RRULE."""
+
+    freq: str
+    interval: int = 1
+    by_day: tuple[int, ...] = ()  # Weekdays, 0=Monday
+    by_month_day: tuple[int, ...] = ()  # 1-31, or -1 for the last day
+    count: Optional[int] = None
+    until: Optional[date] = None
+
+    def __str__(self) -> str:
+        """Render the rule in canonical RRULE form."""
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.by_day:
+            parts.append("BYDAY=" + ",".join(WEEKDAYS[day] for day in self.by_day))
+        if self.by_month_day:
+            parts.append("BYMONTHDAY=" + ",".join(str(day) for day in self.by_month_day))
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        if self.until is not None:
+            parts.append(f"UNTIL={self.until.strftime('%Y%m%d')}")
+        return ";".join(parts)
+
+
+@lru_cache(maxsize=1024)
+def parse_rule(text: str) -> RecurrenceRule:
+    """Parse an RRULE string.
+
+    Args:
+        text: Rule such as ``FREQ=WEEKLY;BYDAY=MO,TH`` (an ``RRULE:``
+            prefix is accepted)
+
+    Returns:
+        Parsed rule
+
+    Raises:
+        ValueError: If the rule is malformed or uses unsupported parts
+    """
+    if text.upper().startswith("RRULE:"):
+        text = text[6:]
+    values: dict[str, str] = {}
+    for part in text.strip().upper().split(";"):
+        name, sep, value = part.partition("=")
+        if not sep or not value:
+            raise ValueError(f"Malformed recurrence rule part: {part!r}")
+        values[name] = value
+
+    freq = values.pop("FREQ", None)
+    if freq not in FREQUENCIES:
+        raise ValueError(f"Recurrence FREQ must be one of {', '.join(FREQUENCIES)}")
+    try:
+        rule = RecurrenceRule(
+            freq,
+            interval=int(values.pop("INTERVAL", "1")),
+            by_day=tuple(
+                sorted(WEEKDAYS.index(day) for day in values.pop("BYDAY", "").split(",") if day)
+            ),
+            by_month_day=tuple(
+                sorted(int(day) for day in values.pop("BYMONTHDAY", "").split(",") if day)
+            ),
+            count=int(values.pop("COUNT")) if "COUNT" in values else None,
+            until=_parse_until(values.pop("UNTIL")) if "UNTIL" in values else None,
+        )
+    except ValueError as err:
+        raise ValueError(f"Invalid recurrence rule {text!r}: {err}") from err
+
+    if values:
+        raise ValueError(f"Unsupported recurrence rule parts: {', '.join(values)}")
+    _check_rule(rule)
+    return rule
+
+
+def _parse_until(value: str) -> date:
+    """Parse the date of an UNTIL part; a time after it is ignored."""
+    return date(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+
+
+def _check_rule(rule: RecurrenceRule) -> None:
+    """Check that the parts of a parsed rule fit together.
+
+    Args:
+        rule: Parsed rule
+
+    Raises:
+        ValueError: If a part is out of range or not supported with FREQ
+    """
+    if rule.interval < 1 or (rule.count is not None and rule.count < 1):
+        raise ValueError("Recurrence INTERVAL and COUNT must be positive")
+    if rule.count is not None and rule.until is not None:
+        raise ValueError("Recurrence rules take COUNT or UNTIL, not both")
+    if rule.by_day and rule.freq not in ("DAILY", "WEEKLY"):
+        raise ValueError("Recurrence BYDAY is only supported with DAILY or WEEKLY")
+    if rule.by_month_day and rule.freq != "MONTHLY":
+        raise ValueError("Recurrence BYMONTHDAY is only supported with MONTHLY")
+    if any(day == 0 or not -31 <= day <= 31 for day in rule.by_month_day):
+        raise ValueError("Recurrence BYMONTHDAY values must be 1..31 or -31..-1")
+
+
+def _candidates(
+    rule: RecurrenceRule, dtstart: date, from_date: date, stop: date
+) -> Iterator[date]:
+    """Generate candidate dates in order, period by period.
+
+    Rules with COUNT start at the first period so the count stays right;
+    others skip straight to the period containing ``from_date``.
+
+    Args:
+        rule: Parsed rule
+        dtstart: First occurrence
+        from_date: Earliest date the caller needs
+        stop: Stop once a period starts after this date
+
+    Returns:
+        Candidate dates, not yet checked against dtstart, COUNT or UNTIL
+    """
+    skip_ahead = rule.count is None and from_date > dtstart
+    return _FREQUENCY_CANDIDATES[rule.freq](rule, dtstart, from_date, stop, skip_ahead)
+
+
+def _daily_candidates(
+    rule: RecurrenceRule, dtstart: date, from_date: date, stop: date, skip_ahead: bool
+) -> Iterator[date]:
+    """Generate the days of a DAILY rule, limited to BYDAY if given."""
+    step = 0
+    if skip_ahead:
+        step = -(-(from_date - dtstart).days // rule.interval)
+    day = dtstart + timedelta(days=step * rule.interval)
+    while day <= stop:
+        if not rule.by_day or day.weekday() in rule.by_day:
+            yield day
+        day += timedelta(days=rule.interval)
+
+
+def _weekly_candidates(
+    rule: RecurrenceRule, dtstart: date, from_date: date, stop: date, skip_ahead: bool
+) -> Iterator[date]:
+    """Generate the BYDAY weekdays (default: dtstart's) of each WEEKLY period."""
+    weekdays = rule.by_day or (dtstart.weekday(),)
+    week = dtstart - timedelta(days=dtstart.weekday())
+    if skip_ahead:
+        from_week = from_date - timedelta(days=from_date.weekday())
+        week += timedelta(weeks=(from_week - week).days // 7 // rule.interval * rule.interval)
+    while week <= stop:
+        for weekday in weekdays:
+            yield week + timedelta(days=weekday)
+        week += timedelta(weeks=rule.interval)
+
+
+def _monthly_candidates(
+    rule: RecurrenceRule, dtstart: date, from_date: date, stop: date, skip_ahead: bool
+) -> Iterator[date]:
+    """Generate the BYMONTHDAY days (default: dtstart's) of each MONTHLY period.
+
+    Days the month does not have are skipped; negative days count from
+    the month end.
+    """
+    month_days = rule.by_month_day or (dtstart.day,)
+    month = dtstart.year * 12 + dtstart.month - 1
+    if skip_ahead:
+        months_ahead = from_date.year * 12 + from_date.month - 1 - month
+        month += months_ahead // rule.interval * rule.interval
+    while (first := date(month // 12, month % 12 + 1, 1)) <= stop:
+        last_day = calendar.monthrange(first.year, first.month)[1]
+        days = sorted(
+            day if day > 0 else last_day + 1 + day
+            for day in month_days
+            if abs(day) <= last_day
+        )
+        for day in days:
+            yield first.replace(day=day)
+        month += rule.interval
+
+
+def _yearly_candidates(
+    rule: RecurrenceRule, dtstart: date, from_date: date, stop: date, skip_ahead: bool
+) -> Iterator[date]:
+    """Generate dtstart's date in each YEARLY period; 29 February only in leap years."""
+    year = dtstart.year
+    if skip_ahead:
+        year += (from_date.year - year) // rule.interval * rule.interval
+    while year <= stop.year:
+        if dtstart.month != 2 or dtstart.day != 29 or calendar.isleap(year):
+            yield dtstart.replace(year=year)
+        year += rule.interval
+
+
+# FREQ -> candidate generator
+_FREQUENCY_CANDIDATES = {
+    "DAILY": _daily_candidates,
+    "WEEKLY": _weekly_candidates,
+    "MONTHLY": _monthly_candidates,
+    "YEARLY": _yearly_candidates,
+}
+
+
+def _occurrences(
+    rule: RecurrenceRule, dtstart: date, from_date: date, stop: date
+) -> Iterator[date]:
+    """Generate occurrences on or after ``from_date`` up to ``stop``.
+
+    Args:
+        rule: Parsed rule
+        dtstart: First occurrence
+        from_date: Earliest occurrence wanted
+        stop: Latest occurrence wanted
+
+    Yields:
+        Occurrence dates in order
+    """
+    if rule.until is not None:
+        stop = min(stop, rule.until)
+    remaining = rule.count
+    for day in _candidates(rule, dtstart, from_date, stop):
+        if day < dtstart:
+            continue
+        if day > stop:
+            return
+        if remaining is not None:
+            if remaining == 0:
+                return
+            remaining -= 1
+        if day >= from_date:
+            yield day
+
+
+def occurrences_between(
+    rule_text: str, dtstart: str, start: str, end: str
+) -> tuple[str, ...]:
+    """List the occurrences of a rule within a date window.
+
+    Results are cached per window, keyed by (rule, first occurrence), so
+    repeated agenda requests for a window do not expand again. A series
+    that was completed has a new first occurrence and so a new key. The
+    cache holds whole windows rather than single expansions so that a
+    large number of series cannot evict each other.
+
+    Args:
+        rule_text: RRULE string
+        dtstart: First occurrence (YYYY-MM-DD)
+        start: First date of the window (YYYY-MM-DD)
+        end: Last date of the window, inclusive (YYYY-MM-DD)
+
+    Returns:
+        Occurrence dates (YYYY-MM-DD) in order
+
+    Raises:
+        ValueError: If the rule or a date is invalid
+    """
+    window = (start, end)
+    if (cache := _expansions.get(window)) is None:
+        cache = _expansions[window] = {}
+        if len(_expansions) > EXPANSION_CACHE_WINDOWS:
+            _expansions.popitem(last=False)
+    else:
+        _expansions.move_to_end(window)
+
+    key = (rule_text, dtstart)
+    if (days := cache.get(key)) is None:
+        days = cache[key] = tuple(
+            day.isoformat()
+            for day in _occurrences(
+                parse_rule(rule_text),
+                date.fromisoformat(dtstart),
+                date.fromisoformat(start),
+                date.fromisoformat(end),
+            )
+        )
+    return days
+
+
+def clear_expansion_cache() -> None:
+    """Forget all cached window expansions."""
+    _expansions.clear()
+
+
+def next_occurrence(rule_text: str, dtstart: str) -> Optional[str]:
+    """Find the occurrence following the first one.
+
+    Args:
+        rule_text: RRULE string
+        dtstart: First occurrence (YYYY-MM-DD)
+
+    Returns:
+        Next occurrence (YYYY-MM-DD), or None if the series ends
+
+    Raises:
+        ValueError: If the rule or date is invalid
+    """
+    rule = parse_rule(rule_text)
+    first = date.fromisoformat(dtstart)
+    for day in _occurrences(rule, first, first + timedelta(days=1), date.max):
+        return day.isoformat()
+    return None
+
+
+def validate_recurrence(task: Task) -> None:
+    """Check a task's recurrence rule and store it in canonical form.
+
+    Args:
+        task: Task to check (updated in place)
+
+    Raises:
+        ValueError: If the rule is invalid or the task has no due date
+    """
+    if not task.recurrence:
+        task.recurrence = None
+        return
+    if not task.due_date:
+        raise ValueError("Recurring tasks need a due date")
+    task.recurrence = str(parse_rule(task.recurrence))
+
+
+def advance(task: Task) -> bool:
+    """Move a recurring task on to its next occurrence.
+
+    The due date becomes the next occurrence and a COUNT is reduced by
+    the occurrence that was just used up, so the row alone describes the
+    rest of the series.
+
+    Args:
+        task: Recurring task (updated in place)
+
+    Returns:
+        False if the series has no further occurrence
+    """
+    if not task.recurrence or not task.due_date:
+        return False
+    following = next_occurrence(task.recurrence, task.due_date)
+    if following is None:
+        return False
+    rule = parse_rule(task.recurrence)
+    if rule.count is not None:
+        task.recurrence = str(replace(rule, count=rule.count - 1))
+    task.due_date = following
+    return True
+
+
+def expand_occurrences(
+    tasks: Iterable[Task], start: str, end: str, limit: Optional[int] = None
+) -> list[Task]:
+    """Expand recurring tasks into their occurrences within a window.
+
+    Each task's own due date is the occurrence stored in the database and
+    is left out; only the later, not yet persisted occurrences are
+    returned, as copies of the task with the occurrence as due date.
+    Occurrences are ordered before any copy is made, so a limit keeps
+    large windows cheap.
+
+    Args:
+        tasks: Recurring tasks
+        start: First date of the window (YYYY-MM-DD)
+        end: Last date of the window, inclusive (YYYY-MM-DD)
+        limit: Maximum number of occurrences, earliest first
+
+    Returns:
+        Occurrence tasks in (due date, due time, priority) agenda order
+    """
+    keyed = []
+    for index, task in enumerate(tasks):
+        if not task.recurrence or not task.due_date:
+            continue
+        due_time = task.due_time or ""
+        for day in occurrences_between(task.recurrence, task.due_date, start, end):
+            if day != task.due_date:
+                keyed.append((day, due_time, -task.priority, index, task))
+    # The unique index settles ties, so tasks themselves are never compared
+    if limit is not None and limit < len(keyed):
+        keyed = heapq.nsmallest(limit, keyed)
+    else:
+        keyed.sort()
+    return [_occurrence(task, day) for day, _, _, _, task in keyed]
+
+
+def _occurrence(task: Task, due_date: str) -> Task:
+    """Copy a task with another due date.
+
+    The slots are copied one by one, which is several times faster than
+    dataclasses.replace() and matters when a window holds many occurrences,
+    and picks up new fields without listing them here. The tag list is
+    shared with the series task.
+
+    Args:
+        task: Recurring task
+        due_date: Occurrence date
+
+    Returns:
+        Task copy
+    """
+    copy = object.__new__(Task)
+    for name in TASK_SLOTS:
+        setattr(copy, name, getattr(task, name))
+    copy.due_date = due_date
+    return copy
+
+
+def agenda_key(task: Task) -> tuple[str, str, int]:
+    """Sort key matching the SQL agenda order.
+
+    Args:
+        task: Task with a due date
+
+    Returns:
+        (due date, due time with untimed first, negated priority)
+    """
+    return (task.due_date or "", task.due_time or "", -task.priority)
@@ -1,46 +1,340 @@
 """Repository layer for database operations."""
 from __future__ import annotations
 
+from collections import Counter
+from datetime import datetime, timezone, tzinfo
+import json
 import logging
-from datetime import datetime
-from typing import Optional
+import time
+from typing import Any, AsyncIterator, Callable, Iterable, Optional
 
 import aiosqlite
 
-from .models import Task, Tag
+from .models import DEFAULT_BOARD_ID, Board, BoardList, Tag, Task, now_ms
+from .ordering import ANCHOR_KEY_LENGTH, MAX_KEY_LENGTH, key_between, keys_between
+from .recurrence import advance, validate_recurrence
 
 _LOGGER = logging.getLogger(__name__)
 
+# Task columns in Task field order, so rows can be decoded positionally.
+# Board, list and parent keys are resolved to their public IDs by primary
+# key. Queries append the aggregated tag names as the last column.
+TASK_COLUMNS = (
+    "t.id, t.title, t.notes, t.due_date, t.due_time, t.priority, t.completed, "
+    "t.completed_at, t.created_at, t.modified_at, t.device_id, t.version, t.recurrence, "
+    "(SELECT id FROM boards WHERE pk = t.board_pk), (SELECT id FROM lists WHERE pk = t.list_pk), "
+    "t.sort_key, (SELECT id FROM tasks WHERE pk = t.parent_pk), t.subtask_count, t.subtasks_done"
+)
+
+# Tag names of task t as a JSON array, read from the denormalized
+# tags_json column. task_tags is only consulted for rows the migration
+# backfill has not filled yet (COALESCE skips it once tags_json is set).
+TASK_TAGS = (
+    "COALESCE(t.tags_json, (SELECT json_group_array(tag.name) FROM task_tags tt "
+    "JOIN tags tag ON tag.pk = tt.tag_pk WHERE tt.task_pk = t.pk)) AS tags"
+)
+
+# The same columns from tasks_archive, which stores the tag names itself
+ARCHIVE_COLUMNS = (
+    "a.id, a.title, a.notes, a.due_date, a.due_time, a.priority, a.completed, "
+    "a.completed_at, a.created_at, a.modified_at, a.device_id, a.version, a.recurrence, "
+    "(SELECT id FROM boards WHERE pk = a.board_pk), (SELECT id FROM lists WHERE pk = a.list_pk), "
+    "a.sort_key, a.parent_id, a.subtask_count, a.subtasks_done"
+)
+
+# Key of the default board, created by migration 10
+DEFAULT_BOARD_PK = 1
+
+# Key of a board by public ID, as a scalar subquery
+BOARD_PK = "(SELECT pk FROM boards WHERE id = ?)"
+
+# Key of a list by public ID, as a scalar subquery
+LIST_PK = "(SELECT pk FROM lists WHERE id = ?)"
+
+# Keys of the tasks matching a condition on tasks, with all their
+# subtasks, as a subquery; format with condition=...
+SUBTREE_PKS = """
+    WITH RECURSIVE subtree(pk) AS (
+        SELECT pk FROM tasks WHERE {condition}
+        UNION
+        SELECT t.pk FROM tasks t JOIN subtree s ON t.parent_pk = s.pk
+    )
+    SELECT pk FROM subtree
+"""
+
+TAG_COLUMNS = "id, name, color, created_at"
+
+# Columns of a Board in model order
+BOARD_COLUMNS = "id, name, created_at, modified_at"
+
+# Columns of a BoardList in model order, for lists aliased l
+LIST_COLUMNS = "l.id, (SELECT id FROM boards WHERE pk = l.board_pk), l.name, l.created_at"
+
+# Link a tag (by key) to a task (by public ID); task_tags holds integer keys
+LINK_TAG_SQL = (
+    "INSERT OR IGNORE INTO task_tags (task_pk, tag_pk) SELECT pk, ? FROM tasks WHERE id = ?"
+)
+
+# Called after a task write commits with the task ID and the task as
+# stored, or None if the task was deleted or archived
+TaskListener = Callable[[str, Optional[Task]], None]
+
+# Called after a tag write commits with the tag name and the tag, or None
+# if the tag was deleted
+TagListener = Callable[[str, Optional[Tag]], None]
+
+# Called after a board write commits with the board ID and the board, or
+# None if the board was deleted
+BoardListener = Callable[[str, Optional[Board]], None]
+
+# Rows fetched per round trip when streaming large result sets
+DEFAULT_BATCH_SIZE = 500
+
+# Host parameters per statement when expanding IN (...) lists
+MAX_SQL_PARAMS = 500
+
+# Fields update_many() may set
+BATCH_UPDATE_FIELDS = ("title", "notes", "due_date", "due_time", "priority")
+
+# Tag names of the task being updated, as in TASK_TAGS but for UPDATE
+# statements, which cannot alias their target table
+CURRENT_TAGS = (
+    "COALESCE(tasks.tags_json, (SELECT json_group_array(tag.name) FROM task_tags tt "
+    "JOIN tags tag ON tag.pk = tt.tag_pk WHERE tt.task_pk = tasks.pk))"
+)
+
+# completion_daily.tag of the rows counting every task
+ALL_TAGS = ""
+
+# Add to (or, with a negative count, take from) a day of the completion rollup
+ROLL_UP_SQL = """
+    INSERT INTO completion_daily (tag, day, completed) VALUES (?, ?, ?)
+    ON CONFLICT (tag, day) DO UPDATE SET completed = MAX(0, completed + excluded.completed)
+"""
+
+
+def _fts_query(query: str, board_pk: Optional[int] = None) -> str:
+    """Build a tasks_fts MATCH expression for a search query.
+
+    The query is limited to the title and notes columns, so it cannot match
+    the board keys indexed alongside them. With a board, the board key is
+    matched in the same full-text expression, so only that board's posting
+    lists are intersected.
+
+    Args:
+        query: Search query in FTS5 syntax
+        board_pk: Key of the board to search
+
+    Returns:
+        MATCH expression
+    """
+    expression = f"{{title notes}} : ({query})"
+    if board_pk is not None:
+        expression = f'board_pk : "{board_pk}" AND {expression}'
+    return expression
+
+
+def _tags_json(tags: list[str]) -> str:
+    """Encode tag names for the tags_json column, dropping duplicates.
+
+    Args:
+        tags: Tag names in display order
+
+    Returns:
+        Compact JSON array in the same form SQLite's json_group_array builds
+    """
+    return json.dumps(list(dict.fromkeys(tags)), ensure_ascii=False, separators=(",", ":"))
+
+
+def _list_filters(
+    alias: str,
+    tag: Optional[str],
+    board_id: Optional[str],
+    list_id: Optional[str],
+    top_level: bool,
+    after: Optional[str],
+) -> tuple[list[str], list]:
+    """WHERE conditions of a task list on the live or the archive table.
+
+    Archived rows keep their tags as JSON and their parent as an ID, so
+    those two conditions differ between the tables.
+
+    Args:
+        alias: "t" for tasks, "a" for tasks_archive
+        tag: Filter by tag name
+        board_id: Filter by board ID
+        list_id: Filter by list ID
+        top_level: Leave out subtasks
+        after: List tasks with IDs after this one
+
+    Returns:
+        Conditions and their parameters
+    """
+    archived = alias == "a"
+    clauses: list[str] = []
+    params: list = []
+    if tag:
+        clauses.append(
+            "EXISTS (SELECT 1 FROM json_each(a.tags) WHERE value = ?)"
+            if archived
+            else "t.pk IN (SELECT task_pk FROM task_tags tt2 "
+            "JOIN tags tag2 ON tt2.tag_pk = tag2.pk WHERE tag2.name = ?)"
+        )
+        params.append(tag)
+    if board_id is not None:
+        clauses.append(f"{alias}.board_pk = {BOARD_PK}")
+        params.append(board_id)
+    if list_id is not None:
+        clauses.append(f"{alias}.list_pk = {LIST_PK}")
+        params.append(list_id)
+    if top_level:
+        clauses.append("a.parent_id IS NULL" if archived else "t.parent_pk IS NULL")
+    if after is not None:
+        clauses.append(f"{alias}.id > ?")
+        params.append(after)
+    return clauses, params
+
+
+def _list_order(
+    archive: bool, after: Optional[str], manual_order: bool, limit: int, offset: int
+) -> tuple[str, list]:
+    """ORDER BY and LIMIT of a task list.
+
+    Args:
+        archive: The query is a compound SELECT with the archive
+        after: Keyset pagination in ID order after this ID
+        manual_order: Order by sort key
+        limit: Maximum number of tasks
+        offset: Number of tasks to skip (unless paging by ID)
+
+    Returns:
+        SQL to append and its parameters
+    """
+    # A compound SELECT orders by result column names
+    prefix = "" if archive else "t."
+    if after is not None:
+        # Time-ordered IDs make this creation order for new tasks
+        return f" ORDER BY {prefix}id LIMIT ?", [limit]
+    if manual_order:
+        order = f"{prefix}sort_key"
+    else:
+        order = f"{prefix}due_date ASC, {prefix}created_at DESC"
+    return f" ORDER BY {order} LIMIT ? OFFSET ?", [limit, offset]
+
+
+def _board_filter(board_id: Optional[str], alias: str = "") -> tuple[str, tuple]:
+    """SQL condition limiting a query to one board, to append to its WHERE.
+
+    Args:
+        board_id: Board ID, or None for every board
+        alias: Table alias of the tasks table
+
+    Returns:
+        Condition (empty for every board) and its parameters
+    """
+    if board_id is None:
+        return "", ()
+    column = f"{alias}.board_pk" if alias else "board_pk"
+    return f" AND {column} = {BOARD_PK}", (board_id,)
+
+
+def _adopt_parent_boards(tasks: list[Task], parent_boards: dict[str, str]) -> None:
+    """Put new subtasks on the board of their parent.
+
+    A subtask leaves its list when this moves it to another board.
+
+    Args:
+        tasks: Tasks about to be inserted, with valid parent links
+        parent_boards: Board ID of each existing parent task
+    """
+    parents = {task.id: task for task in tasks}
+    for task in tasks:
+        parent_id = task.parent_id
+        while parent_id in parents and parents[parent_id].parent_id is not None:
+            parent_id = parents[parent_id].parent_id
+        board_id = parents[parent_id].board_id if parent_id in parents else None
+        board_id = parent_boards.get(parent_id, board_id)
+        if board_id is not None and board_id != task.board_id:
+            task.board_id, task.list_id = board_id, None
+
 
 class TaskRepository:
     """Repository for task operations."""
 
-    def __init__(self, conn: aiosqlite.Connection):
+    def __init__(self, conn: aiosqlite.Connection, time_zone: tzinfo = timezone.utc):
         """Initialize repository.
 
         Args:
             conn: Database connection
+            time_zone: Time zone that assigns completions to dates in the
+                completion rollup
         """
         self.conn = conn
+        self.time_zone = time_zone
+        self._listeners: list[TaskListener] = []
+
+    def add_listener(self, listener: TaskListener) -> Callable[[], None]:
+        """Register a listener for committed task writes.
+
+        Listeners run synchronously after every create, update, delete,
+        bulk insert and archival, so they must not block.
+
+        Args:
+            listener: Called with the task ID and the stored task (None
+                once the task is deleted or archived)
+
+        Returns:
+            Function that removes the listener
+        """
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _notify(self, task_id: str, task: Optional[Task]) -> None:
+        """Pass a committed task write to the listeners.
+
+        Args:
+            task_id: Task ID
+            task: Stored task, or None if it no longer exists
+        """
+        for listener in self._listeners:
+            try:
+                listener(task_id, task)
+            except Exception:
+                _LOGGER.exception("Task listener failed for %s", task_id)
 
     async def create(self, task: Task) -> Task:
         """Create a new task.
 
+        A subtask (parent_id set) goes on its parent's board.
+
         Args:
             task: Task to create
 
         Returns:
             Created task
+
+        Raises:
+            ValueError: If the task's recurrence rule is invalid, or its
+                board, list or parent does not exist
         """
-        task.modified_at = datetime.utcnow().isoformat()
+        validate_recurrence(task)
+        parent_pk = None
+        if task.parent_id is not None:
+            parent_pk, task.board_id = await self._resolve_parent(task.parent_id)
+        board_pk, list_pk = await self._resolve_placement(task.board_id, task.list_id)
+        task.modified_at = now_ms()
+        task.subtask_count = task.subtasks_done = 0
+        # New tasks go to the end of the board's manual order
+        task.sort_key = key_between(await self._last_sort_key(board_pk), None)
 
         await self.conn.execute(
             """
             INSERT INTO tasks (
                 id, title, notes, due_date, due_time, priority,
                 completed, completed_at, created_at, modified_at,
-                device_id, version
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                device_id, version, recurrence, tags_json, board_pk, list_pk, sort_key,
+                parent_pk
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 task.id,
@@ -55,17 +349,139 @@ class TaskRepository:
                 task.modified_at,
                 task.device_id,
                 task.version,
+                task.recurrence,
+                _tags_json(task.tags),
+                board_pk,
+                list_pk,
+                task.sort_key,
+                parent_pk,
             ),
         )
 
         # Add tags if any
         if task.tags:
             await self._add_tags_to_task(task.id, task.tags)
+        if task.completed:
+            await self._roll_up([(task.completed_at, task.tags)])
 
         await self.conn.commit()
         _LOGGER.debug("Created task: %s", task.id)
+        self._notify(task.id, task)
         return task
 
+    async def bulk_create(self, tasks: list[Task]) -> int:
+        """Insert many tasks in a single transaction.
+
+        Unlike create(), timestamps are kept as given so imported tasks
+        retain their history. Tasks whose ID already exists are skipped.
+        Tasks of a board or list that does not exist (as when importing an
+        export of another database) are put on the default board. New tasks
+        are appended to their board's manual order, keeping the order of
+        their own sort keys (tasks without one last). Subtasks may come
+        before their parent and are moved to its board (out of their list,
+        if that is another board); links to a parent that does not exist,
+        or that would make a task its own ancestor, are dropped.
+
+        Args:
+            tasks: Tasks to insert
+
+        Returns:
+            Number of tasks inserted
+
+        Raises:
+            ValueError: If a task's recurrence rule is invalid
+        """
+        if not tasks:
+            return 0
+        for task in tasks:
+            validate_recurrence(task)
+
+        try:
+            existing = await self._existing_task_ids([task.id for task in tasks])
+            new_tasks = []
+            for task in tasks:
+                if task.id not in existing:
+                    # Also drops duplicates within the batch itself
+                    existing.add(task.id)
+                    new_tasks.append(task)
+
+            # Subtasks first take their parent's board, so that an unknown
+            # board puts parent and subtasks on the default board together
+            parent_boards = await self._drop_invalid_parents(new_tasks)
+            _adopt_parent_boards(new_tasks, parent_boards)
+            task_placements = await self._resolve_placements(new_tasks)
+            await self._append_sort_keys(
+                [
+                    (task, board_pk)
+                    for task, (board_pk, _) in zip(new_tasks, task_placements, strict=True)
+                ]
+            )
+
+            await self.conn.executemany(
+                """
+                INSERT INTO tasks (
+                    id, title, notes, due_date, due_time, priority,
+                    completed, completed_at, created_at, modified_at,
+                    device_id, version, recurrence, tags_json, board_pk, list_pk, sort_key
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        task.id,
+                        task.title,
+                        task.notes,
+                        task.due_date,
+                        task.due_time,
+                        task.priority,
+                        task.completed,
+                        task.completed_at,
+                        task.created_at,
+                        task.modified_at,
+                        task.device_id,
+                        task.version,
+                        task.recurrence,
+                        _tags_json(task.tags),
+                        board_pk,
+                        list_pk,
+                        task.sort_key,
+                    )
+                    for task, (board_pk, list_pk) in zip(new_tasks, task_placements, strict=True)
+                ],
+            )
+
+            # Linked after every row exists, as parents may come later
+            await self.conn.executemany(
+                "UPDATE tasks SET parent_pk = (SELECT pk FROM tasks WHERE id = ?) WHERE id = ?",
+                [(task.parent_id, task.id) for task in new_tasks if task.parent_id is not None],
+            )
+
+            tag_names = {name for task in new_tasks for name in task.tags}
+            if tag_names:
+                tag_pks = await self._get_or_create_tag_pks(tag_names)
+                await self.conn.executemany(
+                    LINK_TAG_SQL,
+                    [
+                        (tag_pks[name], task.id)
+                        for task in new_tasks
+                        for name in task.tags
+                    ],
+                )
+            await self._roll_up(
+                (task.completed_at, task.tags) for task in new_tasks if task.completed
+            )
+
+            await self.conn.commit()
+        except Exception:
+            await self.conn.rollback()
+            raise
+
+        _LOGGER.debug(
+            "Bulk created %d tasks (%d skipped)", len(new_tasks), len(tasks) - len(new_tasks)
+        )
+        for task in new_tasks:
+            self._notify(task.id, task)
+        return len(new_tasks)
+
     async def get(self, task_id: str) -> Optional[Task]:
         """Get task by ID.
 
@@ -76,13 +492,10 @@ class TaskRepository:
             Task if found, None otherwise
         """
         cursor = await self.conn.execute(
-            """
-            SELECT t.*, GROUP_CONCAT(tag.name) as tags
+            f"""
+            SELECT {TASK_COLUMNS}, {TASK_TAGS}
             FROM tasks t
-            LEFT JOIN task_tags tt ON t.id = tt.task_id
-            LEFT JOIN tags tag ON tt.tag_id = tag.id
             WHERE t.id = ?
-            GROUP BY t.id
             """,
             (task_id,),
         )
@@ -93,12 +506,49 @@ class TaskRepository:
 
         return self._row_to_task(row)
 
+    async def get_subtree(self, task_id: str) -> list[Task]:
+        """Get a task with all its subtasks, in one recursive query.
+
+        Tasks come depth first: each task is followed by its subtasks, and
+        siblings are in manual order. The path of sort keys from the root
+        orders the rows; a space sorts before every key character, so a
+        task's path sorts before those of its subtasks.
+
+        Args:
+            task_id: Task ID
+
+        Returns:
+            The task followed by its subtasks (parent_id links them), or an
+            empty list if the task does not exist
+        """
+        cursor = await self.conn.execute(
+            f"""
+            WITH RECURSIVE subtree(pk, path) AS (
+                SELECT pk, COALESCE(sort_key, '') FROM tasks WHERE id = ?
+                UNION ALL
+                SELECT t.pk, s.path || ' ' || COALESCE(t.sort_key, '')
+                FROM tasks t JOIN subtree s ON t.parent_pk = s.pk
+            )
+            SELECT {TASK_COLUMNS}, {TASK_TAGS}
+            FROM subtree s JOIN tasks t ON t.pk = s.pk
+            ORDER BY s.path
+            """,
+            (task_id,),
+        )
+        return [self._row_to_task(row) for row in await cursor.fetchall()]
+
     async def list(
         self,
         completed: Optional[bool] = None,
         tag: Optional[str] = None,
         limit: int = 100,
         offset: int = 0,
+        include_archived: bool = False,
+        after: Optional[str] = None,
+        board_id: Optional[str] = None,
+        list_id: Optional[str] = None,
+        manual_order: bool = False,
+        top_level: bool = False,
     ) -> list[Task]:
         """List tasks with optional filters.
 
@@ -107,299 +557,2200 @@ class TaskRepository:
             tag: Filter by tag name
             limit: Maximum number of tasks
             offset: Number of tasks to skip
+            include_archived: Also list archived tasks
+            after: List in ID order after this task ID instead of using
+                offset ("" for the first page)
+            board_id: Only list tasks on this board
+            list_id: Only list tasks in this list
+            manual_order: List in the board's manual order instead of by due
+                date; needs board_id or list_id
+            top_level: Leave out subtasks
 
         Returns:
             List of tasks
-        """
-        query = """
-            SELECT t.*, GROUP_CONCAT(tag.name) as tags
-            FROM tasks t
-            LEFT JOIN task_tags tt ON t.id = tt.task_id
-            LEFT JOIN tags tag ON tt.tag_id = tag.id
-        """
-
-        where_clauses = []
-        params = []
-
-        if completed is not None:
-            where_clauses.append("t.completed = ?")
-            params.append(completed)
 
-        if tag:
-            where_clauses.append(
-                "t.id IN (SELECT task_id FROM task_tags tt2 "
-                "JOIN tags tag2 ON tt2.tag_id = tag2.id WHERE tag2.name = ?)"
-            )
-            params.append(tag)
-
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
-
-        query += " GROUP BY t.id ORDER BY t.due_date ASC, t.created_at DESC"
-        query += " LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
+        Raises:
+            ValueError: If manual_order is set without a board or list, or
+                together with after
+        """
+        query, params = self._build_list_query(
+            completed,
+            tag,
+            limit,
+            offset,
+            include_archived,
+            after,
+            board_id,
+            list_id,
+            manual_order,
+            top_level,
+        )
 
         cursor = await self.conn.execute(query, params)
         rows = await cursor.fetchall()
 
         return [self._row_to_task(row) for row in rows]
 
-    async def update(self, task: Task) -> Task:
-        """Update an existing task.
+    async def iter_list(
+        self,
+        completed: Optional[bool] = None,
+        tag: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        include_archived: bool = False,
+        after: Optional[str] = None,
+        board_id: Optional[str] = None,
+        list_id: Optional[str] = None,
+        manual_order: bool = False,
+        top_level: bool = False,
+    ) -> AsyncIterator[list[Task]]:
+        """Stream tasks in batches with the same filters and order as list().
+
+        Rows are fetched from the cursor with ``fetchmany`` so only one
+        batch is held in memory at a time.
 
         Args:
-            task: Task to update
-
-        Returns:
-            Updated task
+            completed: Filter by completion status
+            tag: Filter by tag name
+            limit: Maximum number of tasks
+            offset: Number of tasks to skip
+            batch_size: Number of rows fetched per batch
+            include_archived: Also list archived tasks
+            after: List in ID order after this task ID instead of using
+                offset ("" for the first page)
+            board_id: Only list tasks on this board
+            list_id: Only list tasks in this list
+            manual_order: List in the board's manual order instead of by due
+                date; needs board_id or list_id
+            top_level: Leave out subtasks
+
+        Yields:
+            Lists of at most ``batch_size`` tasks
+
+        Raises:
+            ValueError: If manual_order is set without a board or list, or
+                together with after
         """
-        task.modified_at = datetime.utcnow().isoformat()
-        task.version += 1
-
-        await self.conn.execute(
-            """
-            UPDATE tasks SET
-                title = ?, notes = ?, due_date = ?, due_time = ?,
-                priority = ?, completed = ?, completed_at = ?,
-                modified_at = ?, device_id = ?, version = ?
-            WHERE id = ?
-            """,
-            (
-                task.title,
-                task.notes,
-                task.due_date,
-                task.due_time,
-                task.priority,
-                task.completed,
-                task.completed_at,
-                task.modified_at,
-                task.device_id,
-                task.version,
-                task.id,
-            ),
+        query, params = self._build_list_query(
+            completed,
+            tag,
+            limit,
+            offset,
+            include_archived,
+            after,
+            board_id,
+            list_id,
+            manual_order,
+            top_level,
         )
 
-        # Update tags (remove all and re-add)
-        await self.conn.execute("DELETE FROM task_tags WHERE task_id = ?", (task.id,))
-        if task.tags:
-            await self._add_tags_to_task(task.id, task.tags)
-
-        await self.conn.commit()
-        _LOGGER.debug("Updated task: %s", task.id)
-        return task
+        async for tasks in self._iter_batches(query, params, batch_size):
+            yield tasks
 
-    async def delete(self, task_id: str) -> bool:
-        """Delete a task.
+    async def iter_all(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        include_archived: bool = False,
+        board_id: Optional[str] = None,
+    ) -> AsyncIterator[list[Task]]:
+        """Stream every task with its tags in batches, in ID order.
+
+        The order follows the ID index, so no sort is needed and the first
+        batch is available immediately even for large tables (on one board,
+        only that board's tasks are sorted). Archived tasks follow the live
+        ones, in ID order too; the two tables are read one after the other,
+        so a batch never mixes them.
 
         Args:
-            task_id: Task ID
+            batch_size: Number of rows fetched per batch
+            include_archived: Also stream archived tasks
+            board_id: Only stream the tasks of this board
 
-        Returns:
-            True if deleted, False if not found
+        Yields:
+            Lists of at most ``batch_size`` tasks
         """
-        cursor = await self.conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-        await self.conn.commit()
+        params: list = []
+        live_where = archive_where = ""
+        if board_id is not None:
+            live_where = f" WHERE t.board_pk = {BOARD_PK}"
+            archive_where = f" WHERE a.board_pk = {BOARD_PK}"
+            params.append(board_id)
+        queries = [f"SELECT {TASK_COLUMNS}, {TASK_TAGS} FROM tasks t{live_where} ORDER BY t.id"]
+        if include_archived:
+            queries.append(
+                f"SELECT {ARCHIVE_COLUMNS}, a.tags FROM tasks_archive a{archive_where} "
+                "ORDER BY a.id"
+            )
 
-        deleted = cursor.rowcount > 0
-        if deleted:
-            _LOGGER.debug("Deleted task: %s", task_id)
-        return deleted
+        for query in queries:
+            async for tasks in self._iter_batches(query, params, batch_size):
+                yield tasks
 
-    async def search(self, query: str, limit: int = 50) -> list[Task]:
-        """Search tasks using full-text search.
+    async def _iter_batches(
+        self, query: str, params: list, batch_size: int
+    ) -> AsyncIterator[list[Task]]:
+        """Run a task query and yield the results in batches.
 
         Args:
-            query: Search query
-            limit: Maximum number of results
+            query: SQL query selecting TASK_COLUMNS followed by tag names
+            params: Query parameters
+            batch_size: Number of rows fetched per batch
+
+        Yields:
+            Lists of at most ``batch_size`` tasks
+        """
+        cursor = await self.conn.execute(query, params)
+        try:
+            while rows := await cursor.fetchmany(batch_size):
+                yield [self._row_to_task(row) for row in rows]
+        finally:
+            await cursor.close()
+
+    def _build_list_query(
+        self,
+        completed: Optional[bool],
+        tag: Optional[str],
+        limit: int,
+        offset: int,
+        include_archived: bool = False,
+        after: Optional[str] = None,
+        board_id: Optional[str] = None,
+        list_id: Optional[str] = None,
+        manual_order: bool = False,
+        top_level: bool = False,
+    ) -> tuple[str, list]:
+        """Build the SQL query for listing tasks.
+
+        Board and list filters come first in idx_tasks_board_due and
+        idx_tasks_list, so a filtered list reads only that board's or list's
+        tasks. In manual order idx_tasks_board_order and idx_tasks_list_order
+        return them already sorted.
+
+        Args:
+            completed: Filter by completion status
+            tag: Filter by tag name
+            limit: Maximum number of tasks
+            offset: Number of tasks to skip
+            include_archived: Also list archived tasks (all completed)
+            after: Keyset pagination: list tasks in ID order, starting after
+                this ID ("" for the first page); offset is ignored
+            board_id: Filter by board ID
+            list_id: Filter by list ID
+            manual_order: Order by sort key (needs board_id or list_id)
+            top_level: Leave out subtasks
 
         Returns:
-            List of matching tasks
+            Tuple of (SQL query, parameters)
+
+        Raises:
+            ValueError: If manual_order is set without a board or list, or
+                together with after
         """
-        cursor = await self.conn.execute(
-            """
-            SELECT t.*, GROUP_CONCAT(tag.name) as tags
+        if manual_order:
+            # Sort keys are only ordered within a board
+            if board_id is None and list_id is None:
+                raise ValueError("Manual order needs a board or list")
+            if after is not None:
+                raise ValueError("Manual order cannot be paged by task ID")
+
+        query = f"""
+            SELECT {TASK_COLUMNS}, {TASK_TAGS}
             FROM tasks t
-            LEFT JOIN task_tags tt ON t.id = tt.task_id
-            LEFT JOIN tags tag ON tt.tag_id = tag.id
-            WHERE t.rowid IN (
-                SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?
+        """
+
+        where_clauses, params = _list_filters("t", tag, board_id, list_id, top_level, after)
+        if completed is not None:
+            # Inlined rather than bound so the partial indexes on open
+            # tasks can be chosen when the statement is prepared
+            where_clauses.insert(0, f"t.completed = {int(completed)}")
+        if where_clauses:
+            query += " WHERE " + " AND ".join(where_clauses)
+
+        archive = include_archived and completed is not False
+        if archive:
+            query += f" UNION ALL SELECT {ARCHIVE_COLUMNS}, a.tags FROM tasks_archive a"
+            archive_clauses, archive_params = _list_filters(
+                "a", tag, board_id, list_id, top_level, after
             )
-            GROUP BY t.id
-            LIMIT ?
-            """,
-            (query, limit),
-        )
-        rows = await cursor.fetchall()
+            if archive_clauses:
+                query += " WHERE " + " AND ".join(archive_clauses)
+            params.extend(archive_params)
 
-        return [self._row_to_task(row) for row in rows]
+        order, order_params = _list_order(archive, after, manual_order, limit, offset)
+        query += order
+        params.extend(order_params)
+        return query, params
 
-    async def _add_tags_to_task(self, task_id: str, tag_names: list[str]) -> None:
-        """Add tags to a task, creating tags if they don't exist.
+    async def list_overdue(
+        self, today: str, now_time: str, limit: int = 500, board_id: Optional[str] = None
+    ) -> list[Task]:
+        """List open tasks whose due date and time have passed.
+
+        Dates and times are compared as local wall-clock values, the way
+        tasks store them. A task due today without a time is not overdue
+        until tomorrow.
 
         Args:
-            task_id: Task ID
-            tag_names: List of tag names
+            today: Current local date (YYYY-MM-DD)
+            now_time: Current local time (HH:MM:SS)
+            limit: Maximum number of tasks
+            board_id: Only list tasks on this board
+
+        Returns:
+            Tasks in agenda order (due date, due time, highest priority first)
         """
-        for tag_name in tag_names:
-            # Get or create tag
-            cursor = await self.conn.execute(
-                "SELECT id FROM tags WHERE name = ?", (tag_name,)
-            )
-            row = await cursor.fetchone()
+        query, params = self._build_overdue_query(today, now_time, limit, board_id)
+        cursor = await self.conn.execute(query, params)
+        return [self._row_to_task(row) for row in await cursor.fetchall()]
 
-            if row:
-                tag_id = row["id"]
-            else:
-                # Create new tag
-                from .models import Tag
+    async def list_due(
+        self,
+        due_from: str,
+        due_to: str,
+        from_time: Optional[str] = None,
+        limit: int = 500,
+        board_id: Optional[str] = None,
+    ) -> list[Task]:
+        """List open tasks due within a date range.
 
-                tag = Tag(name=tag_name)
-                await self.conn.execute(
-                    "INSERT INTO tags (id, name) VALUES (?, ?)", (tag.id, tag.name)
-                )
-                tag_id = tag.id
+        Args:
+            due_from: First due date (YYYY-MM-DD)
+            due_to: Last due date, inclusive (YYYY-MM-DD)
+            from_time: Skip tasks due before this time (HH:MM:SS) on
+                ``due_from``; tasks without a due time are kept
+            limit: Maximum number of tasks
+            board_id: Only list tasks on this board
 
-            # Link tag to task
-            await self.conn.execute(
-                "INSERT OR IGNORE INTO task_tags (task_id, tag_id) VALUES (?, ?)",
-                (task_id, tag_id),
-            )
+        Returns:
+            Tasks in agenda order (due date, due time, highest priority first)
+        """
+        query, params = self._build_due_query(due_from, due_to, from_time, limit, board_id)
+        cursor = await self.conn.execute(query, params)
+        return [self._row_to_task(row) for row in await cursor.fetchall()]
 
-    def _row_to_task(self, row: aiosqlite.Row) -> Task:
-        """Convert database row to Task model.
+    async def iter_open_due(
+        self, due_from: str, batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> AsyncIterator[list[tuple[str, str, Optional[str]]]]:
+        """Stream the due dates of open tasks, without the rest of the task.
+
+        Reads idx_tasks_open_agenda in order, for loading schedules.
 
         Args:
-            row: Database row
+            due_from: First due date (YYYY-MM-DD)
+            batch_size: Number of rows fetched per batch
 
-        Returns:
-            Task instance
+        Yields:
+            Lists of (task ID, due date, due time) tuples
         """
-        tags = row["tags"].split(",") if row["tags"] else []
-        return Task(
-            id=row["id"],
-            title=row["title"],
-            notes=row["notes"],
-            due_date=row["due_date"],
-            due_time=row["due_time"],
-            priority=row["priority"],
-            completed=bool(row["completed"]),
-            completed_at=row["completed_at"],
-            created_at=row["created_at"],
-            modified_at=row["modified_at"],
-            device_id=row["device_id"],
-            version=row["version"],
-            tags=tags,
+        cursor = await self.conn.execute(
+            "SELECT id, due_date, due_time FROM tasks "
+            "WHERE completed = 0 AND due_date >= ? ORDER BY due_date, due_time",
+            (due_from,),
         )
+        try:
+            while rows := await cursor.fetchmany(batch_size):
+                yield [tuple(row) for row in rows]
+        finally:
+            await cursor.close()
+
+    async def list_recurring(
+        self, due_to: str, board_id: Optional[str] = None
+    ) -> list[Task]:
+        """List open recurring tasks whose next occurrence is not after a date.
 
-
-class TagRepository:
-    """Repository for tag operations."""
-
-    def __init__(self, conn: aiosqlite.Connection):
-        """Initialize repository.
+        These are the series that can have occurrences up to ``due_to``;
+        reads idx_tasks_open_recurring.
 
         Args:
-            conn: Database connection
+            due_to: Last date of interest (YYYY-MM-DD)
+            board_id: Only list tasks on this board
+
+        Returns:
+            Recurring tasks in due date order
         """
-        self.conn = conn
+        query = f"""
+            SELECT {TASK_COLUMNS}, {TASK_TAGS}
+            FROM tasks t
+            WHERE t.completed = 0 AND t.recurrence IS NOT NULL AND t.due_date <= ?
+        """
+        params: list = [due_to]
+        if board_id is not None:
+            query += f" AND t.board_pk = {BOARD_PK}"
+            params.append(board_id)
+        cursor = await self.conn.execute(query + " ORDER BY t.due_date", params)
+        return [self._row_to_task(row) for row in await cursor.fetchall()]
 
-    async def create(self, tag: Tag) -> Tag:
-        """Create a new tag.
+    async def count_open(
+        self, today: str, now_time: str, board_id: Optional[str] = None
+    ) -> list[tuple[int, int, int, int]]:
+        """Count open tasks per priority, with how many are overdue or due today.
+
+        One pass over the open-task index; overdue follows list_overdue().
 
         Args:
-            tag: Tag to create
+            today: Current local date (YYYY-MM-DD)
+            now_time: Current local time (HH:MM:SS)
+            board_id: Only count the tasks of this board
 
         Returns:
-            Created tag
+            (priority, open, overdue, due today) tuples
         """
-        await self.conn.execute(
-            "INSERT INTO tags (id, name, color) VALUES (?, ?, ?)",
-            (tag.id, tag.name, tag.color),
+        board_filter, params = _board_filter(board_id)
+        cursor = await self.conn.execute(
+            f"""
+            SELECT priority, COUNT(*),
+                COUNT(*) FILTER (WHERE due_date < ? OR (due_date = ? AND due_time < ?)),
+                COUNT(*) FILTER (WHERE due_date = ?)
+            FROM tasks
+            WHERE completed = 0{board_filter}
+            GROUP BY priority
+            """,
+            (today, today, now_time, today, *params),
         )
-        await self.conn.commit()
-        _LOGGER.debug("Created tag: %s", tag.name)
-        return tag
+        return [tuple(row) for row in await cursor.fetchall()]
 
-    async def get(self, tag_id: str) -> Optional[Tag]:
-        """Get tag by ID.
+    async def count_completed(
+        self, since: int, board_id: Optional[str] = None
+    ) -> tuple[int, int]:
+        """Count completed tasks, in total and since a point in time.
 
         Args:
-            tag_id: Tag ID
+            since: Epoch milliseconds
+            board_id: Only count the tasks of this board
 
         Returns:
-            Tag if found, None otherwise
+            Tuple of (completed, completed since)
         """
+        board_filter, params = _board_filter(board_id)
         cursor = await self.conn.execute(
-            "SELECT * FROM tags WHERE id = ?", (tag_id,)
+            f"SELECT COUNT(*) FROM tasks WHERE completed = 1{board_filter}", params
         )
-        row = await cursor.fetchone()
-
-        if not row:
-            return None
+        (completed,) = await cursor.fetchone()
+        cursor = await self.conn.execute(
+            f"SELECT COUNT(*) FROM tasks WHERE completed = 1 AND completed_at >= ?{board_filter}",
+            (since, *params),
+        )
+        (recent,) = await cursor.fetchone()
+        return completed, recent
 
-        return self._row_to_tag(row)
+    async def count_by_tag(self, board_id: Optional[str] = None) -> list[tuple[str, int, int]]:
+        """Count open and completed tasks per tag.
 
-    async def get_by_name(self, name: str) -> Optional[Tag]:
-        """Get tag by name.
+        Walks task_tags once per tag through idx_task_tags_tag; tags
+        without tasks are included with zero counts.
 
         Args:
-            name: Tag name
+            board_id: Only count the tasks of this board
 
         Returns:
-            Tag if found, None otherwise
+            (tag name, open, completed) tuples in tag name order
         """
+        board_filter, params = _board_filter(board_id, "t")
         cursor = await self.conn.execute(
-            "SELECT * FROM tags WHERE name = ?", (name,)
+            f"""
+            SELECT tag.name,
+                COUNT(t.pk) FILTER (WHERE t.completed = 0),
+                COUNT(t.pk) FILTER (WHERE t.completed = 1)
+            FROM tags tag
+            LEFT JOIN task_tags tt ON tt.tag_pk = tag.pk
+            LEFT JOIN tasks t ON t.pk = tt.task_pk{board_filter}
+            GROUP BY tag.pk
+            ORDER BY tag.name
+            """,
+            params,
         )
-        row = await cursor.fetchone()
+        return [tuple(row) for row in await cursor.fetchall()]
 
-        if not row:
-            return None
+    async def list_completed_at(self, since: int, board_id: Optional[str] = None) -> list[int]:
+        """List completion times since a point in time.
 
-        return self._row_to_tag(row)
+        A range scan of idx_tasks_done_completed_at; archived tasks are not
+        included.
 
-    async def list(self) -> list[Tag]:
-        """List all tags.
+        Args:
+            since: Epoch milliseconds
+            board_id: Only list the tasks of this board
 
         Returns:
-            List of tags
+            Completion times (epoch milliseconds) in ascending order
         """
+        board_filter, params = _board_filter(board_id)
         cursor = await self.conn.execute(
-            "SELECT * FROM tags ORDER BY name ASC"
+            "SELECT completed_at FROM tasks "
+            f"WHERE completed = 1 AND completed_at >= ?{board_filter} ORDER BY completed_at",
+            (since, *params),
         )
-        rows = await cursor.fetchall()
+        return [row[0] for row in await cursor.fetchall()]
 
-        return [self._row_to_tag(row) for row in rows]
+    def _build_overdue_query(
+        self, today: str, now_time: str, limit: int, board_id: Optional[str] = None
+    ) -> tuple[str, list]:
+        """Build the SQL query for overdue tasks.
 
-    async def delete(self, tag_id: str) -> bool:
-        """Delete a tag.
+        The due_date bound is a range on idx_tasks_open_agenda (or, for one
+        board, idx_tasks_board_open_agenda); the time check only filters the
+        rows of today.
 
         Args:
-            tag_id: Tag ID
+            today: Current local date
+            now_time: Current local time
+            limit: Maximum number of tasks
+            board_id: Filter by board ID
 
         Returns:
-            True if deleted, False if not found
+            Tuple of (SQL query, parameters)
         """
-        cursor = await self.conn.execute("DELETE FROM tags WHERE id = ?", (tag_id,))
-        await self.conn.commit()
+        query = f"""
+            SELECT {TASK_COLUMNS}, {TASK_TAGS}
+            FROM tasks t
+            WHERE t.completed = 0 AND t.due_date <= ?
+                AND (t.due_date < ? OR t.due_time < ?)
+        """
+        params: list = [today, today, now_time]
+        if board_id is not None:
+            query += f" AND t.board_pk = {BOARD_PK}"
+            params.append(board_id)
+        query += " ORDER BY t.due_date, t.due_time, t.priority DESC LIMIT ?"
+        params.append(limit)
+        return query, params
+
+    def _build_due_query(
+        self,
+        due_from: str,
+        due_to: str,
+        from_time: Optional[str],
+        limit: int,
+        board_id: Optional[str] = None,
+    ) -> tuple[str, list]:
+        """Build the SQL query for tasks due within a date range.
 
-        deleted = cursor.rowcount > 0
-        if deleted:
-            _LOGGER.debug("Deleted tag: %s", tag_id)
-        return deleted
+        Args:
+            due_from: First due date
+            due_to: Last due date, inclusive
+            from_time: Earliest due time on the first date
+            limit: Maximum number of tasks
+            board_id: Filter by board ID
 
-    def _row_to_tag(self, row: aiosqlite.Row) -> Tag:
-        """Convert database row to Tag model.
+        Returns:
+            Tuple of (SQL query, parameters)
+        """
+        query = f"""
+            SELECT {TASK_COLUMNS}, {TASK_TAGS}
+            FROM tasks t
+            WHERE t.completed = 0 AND t.due_date BETWEEN ? AND ?
+        """
+        params: list = [due_from, due_to]
+        if from_time is not None:
+            query += " AND (t.due_date > ? OR t.due_time IS NULL OR t.due_time >= ?)"
+            params.extend([due_from, from_time])
+        if board_id is not None:
+            query += f" AND t.board_pk = {BOARD_PK}"
+            params.append(board_id)
+        query += " ORDER BY t.due_date, t.due_time, t.priority DESC LIMIT ?"
+        params.append(limit)
+        return query, params
+
+    async def update(self, task: Task) -> Task:
+        """Update an existing task.
+
+        Completing a recurring task moves it on to its next occurrence and
+        leaves it open; completed_at then records the last completion. Only
+        the final occurrence of a series is stored as completed. Changing
+        board_id or list_id moves the task; on another board it goes to the
+        end of the manual order, and its subtasks go with it. The stored
+        sort_key is kept otherwise, as positions change through move() only.
+        A subtask stays on its parent's board; setting parent_id to None
+        makes it a top-level task. completed_at is set to now when the task
+        is completed and cleared when it is reopened, so the completion
+        rollup counts the day it actually happened.
 
         Args:
-            row: Database row
+            task: Task to update
 
         Returns:
-            Tag instance
-        """
-        return Tag(
-            id=row["id"],
-            name=row["name"],
-            color=row["color"],
-            created_at=row["created_at"],
+            Updated task
+
+        Raises:
+            ValueError: If the task does not exist, its recurrence rule is
+                invalid, its board, list or parent does not exist, or the
+                parent is one of its subtasks
+        """
+        validate_recurrence(task)
+        try:
+            parent_pk = None
+            if task.parent_id is not None:
+                parent_pk, task.board_id = await self._resolve_parent(task.parent_id, task.id)
+            board_pk, list_pk = await self._resolve_placement(task.board_id, task.list_id)
+            cursor = await self.conn.execute(
+                f"SELECT t.completed, t.completed_at, t.board_pk, t.sort_key, {TASK_TAGS} "
+                "FROM tasks t WHERE t.id = ?",
+                (task.id,),
+            )
+            stored = await cursor.fetchone()
+            if stored is None:
+                raise ValueError(f"Task not found: {task.id}")
+            task.sort_key = (
+                stored[3]
+                if stored[2] == board_pk
+                else key_between(await self._last_sort_key(board_pk), None)
+            )
+            task.modified_at = now_ms()
+            task.version += 1
+            await self._record_completion(task, bool(stored[0]), stored[1], stored[4])
+
+            await self.conn.execute(
+                """
+                UPDATE tasks SET
+                    title = ?, notes = ?, due_date = ?, due_time = ?,
+                    priority = ?, completed = ?, completed_at = ?,
+                    modified_at = ?, device_id = ?, version = ?, recurrence = ?,
+                    tags_json = ?, board_pk = ?, list_pk = ?, sort_key = ?, parent_pk = ?
+                WHERE id = ?
+                """,
+                (
+                    task.title,
+                    task.notes,
+                    task.due_date,
+                    task.due_time,
+                    task.priority,
+                    task.completed,
+                    task.completed_at,
+                    task.modified_at,
+                    task.device_id,
+                    task.version,
+                    task.recurrence,
+                    _tags_json(task.tags),
+                    board_pk,
+                    list_pk,
+                    task.sort_key,
+                    parent_pk,
+                    task.id,
+                ),
+            )
+
+            # Update tags (remove all and re-add)
+            await self.conn.execute(
+                "DELETE FROM task_tags WHERE task_pk = (SELECT pk FROM tasks WHERE id = ?)",
+                (task.id,),
+            )
+            if task.tags:
+                await self._add_tags_to_task(task.id, task.tags)
+            carried = []
+            if stored[2] != board_pk:
+                carried = await self._carry_subtasks(task, board_pk)
+
+            await self.conn.commit()
+        except Exception:
+            await self.conn.rollback()
+            raise
+        _LOGGER.debug("Updated task: %s", task.id)
+        self._notify(task.id, task)
+        await self.notify_many(carried)
+        return task
+
+    async def _record_completion(
+        self, task: Task, was_completed: bool, completed_at: Optional[int], tags_json: str
+    ) -> None:
+        """Set completed_at for an update and roll up the completion it makes.
+
+        Completing a recurring task advances it and counts the occurrence;
+        completing any other task counts it, and reopening a task takes its
+        stored completion back. Runs inside update()'s transaction.
+
+        Args:
+            task: Task being updated, with modified_at already set
+            was_completed: Whether the stored task is completed
+            completed_at: Stored completion time
+            tags_json: Stored tags (JSON array)
+        """
+        advanced = task.completed and advance(task)
+        if advanced:
+            task.completed = False
+            task.completed_at = task.modified_at
+        elif task.completed and not was_completed:
+            task.completed_at = task.modified_at
+        elif not task.completed and was_completed:
+            task.completed_at = None
+
+        if was_completed and not task.completed:
+            await self._roll_up([(completed_at, json.loads(tags_json))], -1)
+        if advanced or (task.completed and not was_completed):
+            await self._roll_up([(task.completed_at, task.tags)])
+
+    async def move(
+        self,
+        task_id: str,
+        after_id: Optional[str] = None,
+        before_id: Optional[str] = None,
+        device_id: str = "",
+    ) -> Optional[Task]:
+        """Move a task to a new place in its board's manual order.
+
+        The task gets a sort key between its new neighbours, found with
+        one index seek each, so only the moved task is written however
+        long the board is.
+
+        Args:
+            task_id: Task to move
+            after_id: Place the task right after this task
+            before_id: Place the task right before this task; ignored when
+                after_id is given. With neither, the task goes to the top
+            device_id: Device making the change
+
+        Returns:
+            Moved task, or None if not found
+
+        Raises:
+            ValueError: If the other task is the task itself, does not
+                exist, is on another board or has no sort key yet
+        """
+        anchor_id = after_id if after_id is not None else before_id
+        if anchor_id == task_id:
+            raise ValueError("A task cannot be moved next to itself")
+        cursor = await self.conn.execute(
+            "SELECT t.rowid, t.board_pk, a.board_pk, a.sort_key FROM tasks t "
+            "LEFT JOIN tasks a ON a.id = ? WHERE t.id = ?",
+            (anchor_id, task_id),
+        )
+        row = await cursor.fetchone()
+        if row is None:
+            return None
+        rowid, board_pk, anchor_board_pk, anchor_key = row
+        if anchor_id is not None:
+            if anchor_board_pk != board_pk:
+                raise ValueError(f"Task {anchor_id} is not on the same board")
+            if anchor_key is None:
+                raise ValueError(f"Task {anchor_id} has no position yet")
+
+        if after_id is not None:
+            lower = anchor_key
+            upper = await self._adjacent_sort_key(board_pk, anchor_key, rowid)
+        elif before_id is not None:
+            lower = await self._adjacent_sort_key(board_pk, anchor_key, rowid, following=False)
+            upper = anchor_key
+        else:
+            # Every key sorts after ""
+            lower = None
+            upper = await self._adjacent_sort_key(board_pk, "", rowid)
+
+        await self.conn.execute(
+            "UPDATE tasks SET sort_key = ?, modified_at = ?, device_id = ?, "
+            "version = version + 1 WHERE rowid = ?",
+            (key_between(lower, upper), now_ms(), device_id, rowid),
+        )
+        await self.conn.commit()
+        _LOGGER.debug("Moved task: %s", task_id)
+        moved = await self.notify_many([task_id])
+        return moved[0] if moved else None
+
+    async def rebalance_sort_keys(self, deadline: float) -> list[Task]:
+        """Give runs of long sort keys short, evenly spaced keys.
+
+        Repeated moves into the same gap lengthen keys. On a board with a
+        key longer than MAX_KEY_LENGTH, each run of keys longer than
+        ANCHOR_KEY_LENGTH is rewritten with keys between the short keys
+        around it, so the rest of the board keeps its keys and the order
+        never changes. Each run is one transaction and the deadline is
+        checked between runs. Keys close to a long neighbour are long
+        themselves, so a run cannot be split without reordering it.
+        Rewritten tasks get a new version, as clients must replace the keys
+        they hold.
+
+        Args:
+            deadline: time.monotonic() value to stop at
+
+        Returns:
+            Rewritten tasks, as stored
+        """
+        rekeyed: list[str] = []
+        while time.monotonic() < deadline:
+            cursor = await self.conn.execute(
+                "SELECT board_pk, MIN(sort_key) FROM tasks WHERE length(sort_key) > ? "
+                "GROUP BY board_pk LIMIT 1",
+                (MAX_KEY_LENGTH,),
+            )
+            row = await cursor.fetchone()
+            if row is None:
+                break
+            rekeyed.extend(await self._rekey_run(row[0], row[1]))
+        return await self.notify_many(rekeyed)
+
+    async def _rekey_run(self, board_pk: int, long_key: str) -> list[str]:
+        """Rewrite the run of long keys around a key.
+
+        Args:
+            board_pk: Board key
+            long_key: A key longer than MAX_KEY_LENGTH on the board
+
+        Returns:
+            IDs of the rewritten tasks
+        """
+        cursor = await self.conn.execute(
+            "SELECT sort_key FROM tasks WHERE board_pk = ? AND sort_key < ? "
+            "AND length(sort_key) <= ? ORDER BY sort_key DESC LIMIT 1",
+            (board_pk, long_key, ANCHOR_KEY_LENGTH),
+        )
+        row = await cursor.fetchone()
+        low = row[0] if row else None
+        cursor = await self.conn.execute(
+            "SELECT id, sort_key FROM tasks WHERE board_pk = ? AND sort_key > ? "
+            "ORDER BY sort_key, rowid",
+            (board_pk, low or ""),
+        )
+        run = []
+        high = None
+        async for task_id, key in cursor:
+            if len(key) <= ANCHOR_KEY_LENGTH:
+                high = key
+                break
+            run.append(task_id)
+        await cursor.close()
+
+        modified_at = now_ms()
+        await self.conn.executemany(
+            """
+            UPDATE tasks SET sort_key = ?, modified_at = ?, version = version + 1
+            WHERE id = ?
+            """,
+            [
+                (key, modified_at, task_id)
+                for task_id, key in zip(run, keys_between(low, high, len(run)), strict=True)
+            ],
+        )
+        await self.conn.commit()
+        _LOGGER.debug("Rebalanced sort keys of %d tasks on board %d", len(run), board_pk)
+        return run
+
+    async def _adjacent_sort_key(
+        self, board_pk: int, key: str, rowid: int, following: bool = True
+    ) -> Optional[str]:
+        """Closest sort key after (or before) a key on a board.
+
+        ORDER BY ... LIMIT 1 stops at the first idx_tasks_board_order entry
+        past the key, so this is one index seek.
+
+        Args:
+            board_pk: Board key
+            key: Sort key to start from
+            rowid: Task to skip (the one being moved)
+            following: Look after the key rather than before it
+
+        Returns:
+            Neighbouring sort key, or None at the end of the board
+        """
+        operator, direction = (">", "ASC") if following else ("<", "DESC")
+        cursor = await self.conn.execute(
+            f"SELECT sort_key FROM tasks WHERE board_pk = ? AND sort_key {operator} ? "
+            f"AND rowid != ? ORDER BY sort_key {direction} LIMIT 1",
+            (board_pk, key, rowid),
+        )
+        row = await cursor.fetchone()
+        return row[0] if row else None
+
+    async def delete(self, task_id: str) -> bool:
+        """Delete a task with its subtasks.
+
+        Args:
+            task_id: Task ID
+
+        Returns:
+            True if deleted, False if not found
+        """
+        cursor = await self.conn.execute(
+            f"DELETE FROM tasks WHERE pk IN ({SUBTREE_PKS.format(condition='id = ?')}) "
+            "RETURNING id",
+            (task_id,),
+        )
+        deleted = [row[0] for row in await cursor.fetchall()]
+        await self.conn.commit()
+
+        if not deleted:
+            return False
+        _LOGGER.debug("Deleted task %s with %d subtasks", task_id, len(deleted) - 1)
+        for deleted_id in deleted:
+            self._notify(deleted_id, None)
+        return True
+
+    async def complete_many(
+        self,
+        completed: bool = True,
+        device_id: str = "",
+        *,
+        task_ids: Optional[list[str]] = None,
+        tag: Optional[str] = None,
+        query: Optional[str] = None,
+        board_id: Optional[str] = None,
+    ) -> list[Task]:
+        """Complete or reopen every selected task in one transaction.
+
+        One UPDATE covers the plain tasks. Recurring tasks move on to their
+        next occurrence as update() does, which needs a date computed per
+        task, so they are written with a single executemany instead. The
+        completion rollup changes in the same transaction.
+
+        Args:
+            completed: Complete (True) or reopen (False) the tasks
+            device_id: Device making the change
+            task_ids: Select these tasks
+            tag: Select tasks with this tag
+            query: Select tasks matching this full-text query
+            board_id: Select tasks on this board
+
+        Returns:
+            Tasks that changed, as stored
+
+        Raises:
+            ValueError: If no selector is given
+        """
+        selector, params = self._build_selector(task_ids, tag, query, board_id)
+        now = now_ms()
+        try:
+            changed: list[str] = []
+            if completed:
+                cursor = await self.conn.execute(
+                    f"""
+                    SELECT {TASK_COLUMNS}, {TASK_TAGS} FROM tasks t
+                    WHERE t.completed = 0 AND t.recurrence IS NOT NULL AND {selector}
+                    """,
+                    params,
+                )
+                recurring = [self._row_to_task(row) for row in await cursor.fetchall()]
+                for task in recurring:
+                    task.completed = not advance(task)
+                await self.conn.executemany(
+                    """
+                    UPDATE tasks SET due_date = ?, recurrence = ?, completed = ?,
+                        completed_at = ?, modified_at = ?, device_id = ?,
+                        version = version + 1
+                    WHERE id = ?
+                    """,
+                    [
+                        (
+                            task.due_date,
+                            task.recurrence,
+                            task.completed,
+                            now,
+                            now,
+                            device_id,
+                            task.id,
+                        )
+                        for task in recurring
+                    ],
+                )
+                changed.extend(task.id for task in recurring)
+                cursor = await self.conn.execute(
+                    f"""
+                    UPDATE tasks SET completed = 1, completed_at = ?, modified_at = ?,
+                        device_id = ?, version = version + 1
+                    WHERE completed = 0 AND recurrence IS NULL AND {selector}
+                    RETURNING id, {CURRENT_TAGS}
+                    """,
+                    [now, now, device_id, *params],
+                )
+                rows = await cursor.fetchall()
+                await self._roll_up(
+                    [(now, task.tags) for task in recurring]
+                    + [(now, json.loads(row[1])) for row in rows]
+                )
+            else:
+                # RETURNING only sees the new row, so read the completions
+                # to take back first
+                cursor = await self.conn.execute(
+                    f"SELECT t.completed_at, {TASK_TAGS} FROM tasks t "
+                    f"WHERE t.completed = 1 AND {selector}",
+                    params,
+                )
+                await self._roll_up(
+                    [(row[0], json.loads(row[1])) for row in await cursor.fetchall()], -1
+                )
+                cursor = await self.conn.execute(
+                    f"""
+                    UPDATE tasks SET completed = 0, completed_at = NULL, modified_at = ?,
+                        device_id = ?, version = version + 1
+                    WHERE completed = 1 AND {selector}
+                    RETURNING id
+                    """,
+                    [now, device_id, *params],
+                )
+                rows = await cursor.fetchall()
+            changed.extend(row[0] for row in rows)
+            await self.conn.commit()
+        except Exception:
+            await self.conn.rollback()
+            raise
+
+        _LOGGER.debug("%s %d tasks", "Completed" if completed else "Reopened", len(changed))
+        return await self.notify_many(changed)
+
+    async def update_many(
+        self,
+        changes: dict[str, Any],
+        device_id: str = "",
+        *,
+        task_ids: Optional[list[str]] = None,
+        tag: Optional[str] = None,
+        query: Optional[str] = None,
+        board_id: Optional[str] = None,
+    ) -> list[Task]:
+        """Set the same fields on every selected task with one UPDATE.
+
+        Clearing the due date also clears the recurrence rule, as a
+        recurring task needs a due date.
+
+        Args:
+            changes: Field name -> new value, for BATCH_UPDATE_FIELDS
+            device_id: Device making the change
+            task_ids: Select these tasks
+            tag: Select tasks with this tag
+            query: Select tasks matching this full-text query
+            board_id: Select tasks on this board
+
+        Returns:
+            Tasks that changed, as stored
+
+        Raises:
+            ValueError: If no selector is given or a field cannot be set
+        """
+        unknown = set(changes) - set(BATCH_UPDATE_FIELDS)
+        if unknown or not changes:
+            raise ValueError(f"Cannot update fields: {', '.join(sorted(unknown)) or 'none'}")
+        selector, params = self._build_selector(task_ids, tag, query, board_id)
+
+        assignments = [f"{field} = ?" for field in changes]
+        if "due_date" in changes and changes["due_date"] is None:
+            assignments.append("recurrence = NULL")
+        try:
+            cursor = await self.conn.execute(
+                f"""
+                UPDATE tasks SET {', '.join(assignments)}, modified_at = ?,
+                    device_id = ?, version = version + 1
+                WHERE {selector}
+                RETURNING id
+                """,
+                [*changes.values(), now_ms(), device_id, *params],
+            )
+            changed = [row[0] for row in await cursor.fetchall()]
+            await self.conn.commit()
+        except Exception:
+            await self.conn.rollback()
+            raise
+
+        _LOGGER.debug("Updated %d tasks", len(changed))
+        return await self.notify_many(changed)
+
+    async def delete_many(
+        self,
+        *,
+        task_ids: Optional[list[str]] = None,
+        tag: Optional[str] = None,
+        query: Optional[str] = None,
+        board_id: Optional[str] = None,
+    ) -> list[str]:
+        """Delete every selected task, and its subtasks, with one DELETE.
+
+        Args:
+            task_ids: Select these tasks
+            tag: Select tasks with this tag
+            query: Select tasks matching this full-text query
+            board_id: Select tasks on this board
+
+        Returns:
+            IDs of the deleted tasks
+
+        Raises:
+            ValueError: If no selector is given
+        """
+        selector, params = self._build_selector(task_ids, tag, query, board_id)
+        try:
+            cursor = await self.conn.execute(
+                f"DELETE FROM tasks WHERE pk IN ({SUBTREE_PKS.format(condition=selector)}) "
+                "RETURNING id",
+                params,
+            )
+            deleted = [row[0] for row in await cursor.fetchall()]
+            await self.conn.commit()
+        except Exception:
+            await self.conn.rollback()
+            raise
+
+        _LOGGER.debug("Deleted %d tasks", len(deleted))
+        for task_id in deleted:
+            self._notify(task_id, None)
+        return deleted
+
+    async def tag_many(
+        self,
+        add: list[str],
+        remove: list[str],
+        device_id: str = "",
+        *,
+        task_ids: Optional[list[str]] = None,
+        tag: Optional[str] = None,
+        query: Optional[str] = None,
+        board_id: Optional[str] = None,
+    ) -> list[Task]:
+        """Add and remove tags on every selected task in one transaction.
+
+        One UPDATE rewrites tags_json of the tasks whose tags change (added
+        tags go last, in the given order); task_tags is then adjusted for
+        those tasks with one INSERT and one DELETE.
+
+        Args:
+            add: Tag names to add
+            remove: Tag names to remove
+            device_id: Device making the change
+            task_ids: Select these tasks
+            tag: Select tasks with this tag
+            query: Select tasks matching this full-text query
+            board_id: Select tasks on this board
+
+        Returns:
+            Tasks that changed, as stored
+
+        Raises:
+            ValueError: If no selector is given, or a tag is both added and
+                removed
+        """
+        add = list(dict.fromkeys(add))
+        remove = list(dict.fromkeys(remove))
+        if set(add) & set(remove):
+            raise ValueError("A tag cannot be added and removed at once")
+        selector, params = self._build_selector(task_ids, tag, query, board_id)
+        add_json = json.dumps(add, ensure_ascii=False)
+        remove_json = json.dumps(remove, ensure_ascii=False)
+
+        try:
+            tag_pks = await self._get_or_create_tag_pks(set(add)) if add else {}
+            cursor = await self.conn.execute(
+                f"""
+                UPDATE tasks SET tags_json = (
+                    SELECT json_group_array(value) FROM (
+                        SELECT 0 AS part, key, value FROM json_each({CURRENT_TAGS})
+                        WHERE value NOT IN (SELECT value FROM json_each(?))
+                        UNION ALL
+                        SELECT 1, key, value FROM json_each(?)
+                        WHERE value NOT IN (SELECT value FROM json_each({CURRENT_TAGS}))
+                        ORDER BY part, key
+                    )
+                ), modified_at = ?, device_id = ?, version = version + 1
+                WHERE {selector}
+                    AND (
+                        EXISTS (SELECT 1 FROM json_each(?) WHERE value NOT IN
+                            (SELECT value FROM json_each({CURRENT_TAGS})))
+                        OR EXISTS (SELECT 1 FROM json_each({CURRENT_TAGS}) WHERE value IN
+                            (SELECT value FROM json_each(?)))
+                    )
+                RETURNING pk, id
+                """,
+                [
+                    remove_json,
+                    add_json,
+                    now_ms(),
+                    device_id,
+                    *params,
+                    add_json,
+                    remove_json,
+                ],
+            )
+            rows = await cursor.fetchall()
+            task_pks = json.dumps([row[0] for row in rows])
+            if add:
+                await self.conn.execute(
+                    "INSERT OR IGNORE INTO task_tags (task_pk, tag_pk) "
+                    "SELECT t.value, g.value FROM json_each(?) t, json_each(?) g",
+                    (task_pks, json.dumps(list(tag_pks.values()))),
+                )
+            if remove:
+                await self.conn.execute(
+                    """
+                    DELETE FROM task_tags
+                    WHERE task_pk IN (SELECT value FROM json_each(?))
+                        AND tag_pk IN (
+                            SELECT pk FROM tags WHERE name IN (SELECT value FROM json_each(?))
+                        )
+                    """,
+                    (task_pks, remove_json),
+                )
+            await self.conn.commit()
+        except Exception:
+            await self.conn.rollback()
+            raise
+
+        _LOGGER.debug("Retagged %d tasks", len(rows))
+        return await self.notify_many([row[1] for row in rows])
+
+    def _build_selector(
+        self,
+        task_ids: Optional[list[str]],
+        tag: Optional[str],
+        query: Optional[str],
+        board_id: Optional[str] = None,
+    ) -> tuple[str, list]:
+        """Build the WHERE condition selecting tasks for a batch operation.
+
+        Columns are unqualified so the condition works in UPDATE and DELETE
+        statements on tasks. All selectors given must match. The ID list is
+        passed as one JSON parameter, so its length is not limited by
+        MAX_SQL_PARAMS.
+
+        Args:
+            task_ids: Task IDs
+            tag: Tag name
+            query: Full-text search query
+            board_id: Board ID
+
+        Returns:
+            Tuple of (SQL condition, parameters)
+
+        Raises:
+            ValueError: If no selector is given
+        """
+        clauses = []
+        params: list = []
+        if task_ids is not None:
+            clauses.append("id IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(task_ids))
+        if tag is not None:
+            clauses.append(
+                "pk IN (SELECT tt.task_pk FROM task_tags tt "
+                "JOIN tags tag ON tag.pk = tt.tag_pk WHERE tag.name = ?)"
+            )
+            params.append(tag)
+        if query is not None:
+            clauses.append("pk IN (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?)")
+            params.append(_fts_query(query))
+        if board_id is not None:
+            clauses.append(f"board_pk = {BOARD_PK}")
+            params.append(board_id)
+        if not clauses:
+            raise ValueError("Select tasks by ID, tag, search query or board")
+        return " AND ".join(clauses), params
+
+    async def notify_many(self, task_ids: list[str]) -> list[Task]:
+        """Read back tasks changed by a batch operation and notify listeners.
+
+        Also used by BoardRepository for tasks its writes change.
+
+        Args:
+            task_ids: IDs of the changed tasks
+
+        Returns:
+            Changed tasks, as stored
+        """
+        if not task_ids:
+            return []
+        cursor = await self.conn.execute(
+            f"""
+            SELECT {TASK_COLUMNS}, {TASK_TAGS} FROM tasks t
+            WHERE t.id IN (SELECT value FROM json_each(?))
+            """,
+            (json.dumps(task_ids),),
+        )
+        tasks = [self._row_to_task(row) for row in await cursor.fetchall()]
+        for task in tasks:
+            self._notify(task.id, task)
+        return tasks
+
+    async def completion_history(
+        self, start: str, end: str, tag: Optional[str] = None
+    ) -> list[tuple[str, int]]:
+        """Read completions per day from the rollup.
+
+        A range scan of the completion_daily primary key, so a year costs
+        at most 365 rows however many tasks there are. Days without
+        completions are left out.
+
+        Args:
+            start: First local date (YYYY-MM-DD)
+            end: Last local date, inclusive
+            tag: Only count tasks with this tag (None: every task)
+
+        Returns:
+            (date, completions) tuples in date order
+        """
+        cursor = await self.conn.execute(
+            "SELECT day, completed FROM completion_daily "
+            "WHERE tag = ? AND day BETWEEN ? AND ? AND completed > 0 ORDER BY day",
+            (ALL_TAGS if tag is None else tag, start, end),
+        )
+        return [tuple(row) for row in await cursor.fetchall()]
+
+    async def backfill_completion_history(self, batch_size: int = DEFAULT_BATCH_SIZE) -> bool:
+        """Roll up one batch of completions from before the rollup existed.
+
+        Walks live tasks and then the archive in key order, resuming from
+        the checkpoint in completion_backfill, and removes that row when
+        done. Completions from after the migration are skipped, as writes
+        have counted them already. Call again until it returns False.
+
+        Args:
+            batch_size: Maximum number of rows to read
+
+        Returns:
+            True if there is more to roll up
+        """
+        cursor = await self.conn.execute("SELECT cutoff, source, after FROM completion_backfill")
+        state = await cursor.fetchone()
+        if state is None:
+            return False
+        cutoff, source, after = state
+
+        if source == "tasks":
+            sql = f"""
+                SELECT t.pk, t.completed, t.completed_at, {TASK_TAGS} FROM tasks t
+                WHERE t.pk > ? ORDER BY t.pk LIMIT ?
+            """
+        else:
+            sql = """
+                SELECT rowid, completed, completed_at, tags FROM tasks_archive
+                WHERE rowid > ? ORDER BY rowid LIMIT ?
+            """
+        cursor = await self.conn.execute(sql, (after, batch_size))
+        rows = await cursor.fetchall()
+
+        try:
+            await self._roll_up(
+                (completed_at, json.loads(tags or "[]"))
+                for _, completed, completed_at, tags in rows
+                if completed and completed_at is not None and completed_at < cutoff
+            )
+            more = True
+            if len(rows) == batch_size:
+                await self.conn.execute(
+                    "UPDATE completion_backfill SET after = ?", (rows[-1][0],)
+                )
+            elif source == "tasks":
+                await self.conn.execute(
+                    "UPDATE completion_backfill SET source = 'archive', after = 0"
+                )
+            else:
+                await self.conn.execute("DELETE FROM completion_backfill")
+                more = False
+            await self.conn.commit()
+        except Exception:
+            await self.conn.rollback()
+            raise
+
+        _LOGGER.debug("Rolled up completions of %d %s rows", len(rows), source)
+        return more
+
+    async def _roll_up(
+        self, completions: Iterable[tuple[Optional[int], list[str]]], delta: int = 1
+    ) -> None:
+        """Count completions in the daily rollup, without committing.
+
+        Args:
+            completions: (completed_at, tag names) of each completion
+            delta: 1 to add the completions, -1 to take them back
+        """
+        counts: Counter[tuple[str, str]] = Counter()
+        for completed_at, tags in completions:
+            if completed_at is None:
+                continue
+            day = datetime.fromtimestamp(completed_at / 1000, self.time_zone).date().isoformat()
+            counts[ALL_TAGS, day] += delta
+            for tag in set(tags):
+                counts[tag, day] += delta
+        if counts:
+            await self.conn.executemany(
+                ROLL_UP_SQL, [(tag, day, count) for (tag, day), count in counts.items()]
+            )
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 50,
+        include_archived: bool = False,
+        board_id: Optional[str] = None,
+    ) -> list[Task]:
+        """Search tasks using full-text search.
+
+        Args:
+            query: Search query
+            limit: Maximum number of results
+            include_archived: Also search archived tasks (after live matches)
+            board_id: Only search tasks on this board
+
+        Returns:
+            List of matching tasks
+        """
+        board_pk = None
+        if board_id is not None:
+            board_pk = await self._board_pk(board_id)
+            if board_pk is None:
+                return []
+
+        sql = f"""
+            SELECT {TASK_COLUMNS}, {TASK_TAGS}
+            FROM tasks t
+            WHERE t.rowid IN (
+                SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?
+            )
+        """
+        params: list = [_fts_query(query, board_pk)]
+        if include_archived:
+            sql += f"""
+            UNION ALL
+            SELECT {ARCHIVE_COLUMNS}, a.tags
+            FROM tasks_archive a
+            WHERE a.rowid IN (
+                SELECT rowid FROM tasks_archive_fts WHERE tasks_archive_fts MATCH ?
+            )
+            """
+            params.append(query)
+            if board_pk is not None:
+                sql += " AND a.board_pk = ?"
+                params.append(board_pk)
+        sql += " LIMIT ?"
+        params.append(limit)
+
+        cursor = await self.conn.execute(sql, params)
+        rows = await cursor.fetchall()
+
+        return [self._row_to_task(row) for row in rows]
+
+    async def archive_completed(
+        self, completed_before: int, batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> int:
+        """Move one batch of tasks completed before a cutoff into the archive.
+
+        The batch is copied and deleted in a single transaction; call again
+        until it returns 0 to archive everything. Only top-level tasks whose
+        subtasks are all completed are archived, and they take their
+        subtasks along, so no progress counter changes under a live parent.
+        The counters rule out most unfinished trees before the subtree is
+        walked.
+
+        Args:
+            completed_before: Epoch milliseconds; older completions are archived
+            batch_size: Maximum number of tasks to move
+
+        Returns:
+            Number of tasks archived, subtasks included
+        """
+        subtasks = SUBTREE_PKS.format(condition="parent_pk = r.pk")
+        roots = f"""
+            pk IN (
+                SELECT pk FROM tasks r
+                WHERE completed = 1 AND completed_at < ? AND parent_pk IS NULL
+                    AND subtasks_done = subtask_count
+                    AND NOT EXISTS (
+                        SELECT 1 FROM tasks WHERE completed = 0 AND pk IN ({subtasks})
+                    )
+                ORDER BY completed_at
+                LIMIT ?
+            )
+        """
+        cursor = await self.conn.execute(
+            f"SELECT id FROM tasks WHERE pk IN ({SUBTREE_PKS.format(condition=roots)})",
+            (completed_before, batch_size),
+        )
+        task_ids = [row[0] for row in await cursor.fetchall()]
+        if not task_ids:
+            return 0
+
+        selected = "(SELECT value FROM json_each(?))"
+        try:
+            await self.conn.execute(
+                f"""
+                INSERT INTO tasks_archive (
+                    id, title, notes, due_date, due_time, priority,
+                    completed, completed_at, created_at, modified_at,
+                    device_id, version, recurrence, board_pk, list_pk, sort_key,
+                    parent_id, subtask_count, subtasks_done, tags, archived_at
+                )
+                SELECT t.id, t.title, t.notes, t.due_date, t.due_time, t.priority,
+                    t.completed, t.completed_at, t.created_at, t.modified_at,
+                    t.device_id, t.version, t.recurrence, t.board_pk, t.list_pk,
+                    t.sort_key, (SELECT id FROM tasks WHERE pk = t.parent_pk),
+                    t.subtask_count, t.subtasks_done, {TASK_TAGS}, ?
+                FROM tasks t
+                WHERE t.id IN {selected}
+                """,
+                [now_ms(), json.dumps(task_ids)],
+            )
+            await self.conn.execute(
+                f"DELETE FROM tasks WHERE id IN {selected}", (json.dumps(task_ids),)
+            )
+            await self.conn.commit()
+        except Exception:
+            await self.conn.rollback()
+            raise
+
+        _LOGGER.debug("Archived %d completed tasks", len(task_ids))
+        for task_id in task_ids:
+            self._notify(task_id, None)
+        return len(task_ids)
+
+    async def _add_tags_to_task(self, task_id: str, tag_names: list[str]) -> None:
+        """Add tags to a task, creating tags if they don't exist.
+
+        Args:
+            task_id: Task ID
+            tag_names: List of tag names
+        """
+        tag_pks = await self._get_or_create_tag_pks(set(tag_names))
+        await self.conn.executemany(
+            LINK_TAG_SQL, [(tag_pks[name], task_id) for name in tag_names]
+        )
+
+    async def _resolve_placement(
+        self, board_id: str, list_id: Optional[str]
+    ) -> tuple[int, Optional[int]]:
+        """Look up the keys of a task's board and list.
+
+        Args:
+            board_id: Board ID
+            list_id: List ID, or None for no list
+
+        Returns:
+            Tuple of (board key, list key or None)
+
+        Raises:
+            ValueError: If the board does not exist, or the list is not on it
+        """
+        cursor = await self.conn.execute(
+            "SELECT b.pk, l.pk FROM boards b "
+            "LEFT JOIN lists l ON l.id = ? AND l.board_pk = b.pk WHERE b.id = ?",
+            (list_id, board_id),
+        )
+        row = await cursor.fetchone()
+        if row is None:
+            raise ValueError(f"Board not found: {board_id}")
+        if list_id is not None and row[1] is None:
+            raise ValueError(f"List {list_id} is not on board {board_id}")
+        return row[0], row[1]
+
+    async def _resolve_parent(
+        self, parent_id: str, task_id: Optional[str] = None
+    ) -> tuple[int, str]:
+        """Look up the key and board of a subtask's parent.
+
+        Args:
+            parent_id: Parent task ID
+            task_id: ID of the (existing) subtask, to reject cycles
+
+        Returns:
+            Tuple of (parent key, parent's board ID)
+
+        Raises:
+            ValueError: If the parent does not exist, or is the task itself
+                or one of its subtasks
+        """
+        cursor = await self.conn.execute(
+            "SELECT t.pk, b.id FROM tasks t JOIN boards b ON b.pk = t.board_pk WHERE t.id = ?",
+            (parent_id,),
+        )
+        row = await cursor.fetchone()
+        if row is None:
+            raise ValueError(f"Parent task not found: {parent_id}")
+        if task_id is not None:
+            # Walk up from the parent; meeting the task would close a cycle
+            cursor = await self.conn.execute(
+                """
+                WITH RECURSIVE ancestors(pk, id, parent_pk) AS (
+                    SELECT pk, id, parent_pk FROM tasks WHERE pk = ?
+                    UNION
+                    SELECT t.pk, t.id, t.parent_pk FROM tasks t
+                    JOIN ancestors a ON t.pk = a.parent_pk
+                )
+                SELECT 1 FROM ancestors WHERE id = ?
+                """,
+                (row[0], task_id),
+            )
+            if await cursor.fetchone() is not None:
+                raise ValueError("A task cannot be a subtask of itself or of its subtasks")
+        return row[0], row[1]
+
+    async def link_parents(self, links: dict[str, str]) -> list[Task]:
+        """Link existing tasks to parents that were stored after them.
+
+        An import inserts in batches, and bulk_create() drops links to a
+        parent in a later batch; the importer passes those links here once
+        every batch is in. A subtask moves to its parent's board (out of its
+        list if that is another board) and takes its own subtasks along.
+        Links to tasks that still do not exist, or that would make a task
+        its own ancestor, are skipped.
+
+        Args:
+            links: Subtask ID -> parent ID
+
+        Returns:
+            Changed tasks, as stored
+        """
+        changed: list[str] = []
+        try:
+            for task_id, parent_id in links.items():
+                task = await self.get(task_id)
+                if task is None:
+                    continue
+                try:
+                    parent_pk, board_id = await self._resolve_parent(parent_id, task_id)
+                except ValueError:
+                    continue
+                board_pk = await self._board_pk(board_id)
+                moved = board_id != task.board_id
+                task.modified_at = now_ms()
+                await self.conn.execute(
+                    """
+                    UPDATE tasks SET parent_pk = ?, board_pk = ?,
+                        list_pk = CASE WHEN ? THEN NULL ELSE list_pk END,
+                        sort_key = COALESCE(?, sort_key), modified_at = ?,
+                        version = version + 1
+                    WHERE id = ?
+                    """,
+                    (
+                        parent_pk,
+                        board_pk,
+                        moved,
+                        key_between(await self._last_sort_key(board_pk), None) if moved else None,
+                        task.modified_at,
+                        task_id,
+                    ),
+                )
+                changed.append(task_id)
+                if moved:
+                    changed.extend(await self._carry_subtasks(task, board_pk))
+            await self.conn.commit()
+        except Exception:
+            await self.conn.rollback()
+            raise
+        return await self.notify_many(list(dict.fromkeys(changed)))
+
+    async def _drop_invalid_parents(self, tasks: list[Task]) -> dict[str, str]:
+        """Clear parent links of new tasks that cannot be stored.
+
+        A parent must be one of the tasks or an existing task. Existing
+        tasks never point at new ones, so a cycle can only run through the
+        new tasks themselves.
+
+        Args:
+            tasks: Tasks about to be inserted
+
+        Returns:
+            Board ID of each existing task that is a parent of a new one
+        """
+        parents = {task.id: task.parent_id for task in tasks if task.parent_id is not None}
+        if not parents:
+            return {}
+        cursor = await self.conn.execute(
+            """
+            SELECT t.id, b.id FROM tasks t JOIN boards b ON b.pk = t.board_pk
+            WHERE t.id IN (SELECT value FROM json_each(?))
+            """,
+            (json.dumps(list(set(parents.values()))),),
+        )
+        existing_parents = {row[0]: row[1] for row in await cursor.fetchall()}
+        known = existing_parents.keys() | {task.id for task in tasks}
+        for task in tasks:
+            if task.parent_id is None:
+                continue
+            seen = {task.id}
+            ancestor = task.parent_id
+            while ancestor in parents and ancestor not in seen:
+                seen.add(ancestor)
+                ancestor = parents[ancestor]
+            if task.parent_id not in known or ancestor == task.id:
+                task.parent_id = None
+                del parents[task.id]
+        return existing_parents
+
+    async def _resolve_placements(self, tasks: list[Task]) -> list[tuple[int, Optional[int]]]:
+        """Resolve the board and list keys of new tasks.
+
+        Tasks of a board or list that does not exist are put on the default
+        board, out of any list. An import holds few distinct (board, list)
+        pairs, so each is resolved once.
+
+        Args:
+            tasks: Tasks about to be inserted, updated in place
+
+        Returns:
+            (board key, list key) of each task, in order
+        """
+        placements: dict[tuple[str, Optional[str]], tuple[int, Optional[int]]] = {}
+        unknown: set[tuple[str, Optional[str]]] = set()
+        for key in {(task.board_id, task.list_id) for task in tasks}:
+            try:
+                placements[key] = await self._resolve_placement(*key)
+            except ValueError:
+                placements[key] = (DEFAULT_BOARD_PK, None)
+                unknown.add(key)
+        task_placements = [placements[(task.board_id, task.list_id)] for task in tasks]
+        for task in tasks:
+            if (task.board_id, task.list_id) in unknown:
+                task.board_id, task.list_id = DEFAULT_BOARD_ID, None
+        return task_placements
+
+    async def _carry_subtasks(self, task: Task, board_pk: int) -> list[str]:
+        """Move a task's subtasks to the board it was moved to.
+
+        They leave their lists and are appended to the board's manual order
+        in their current order.
+
+        Args:
+            task: Task that moved, already written with its new board
+            board_pk: Key of the new board
+
+        Returns:
+            IDs of the moved subtasks
+        """
+        cursor = await self.conn.execute(
+            f"SELECT id FROM tasks WHERE pk IN ({SUBTREE_PKS.format(condition='id = ?')}) "
+            "AND id != ? ORDER BY sort_key",
+            (task.id, task.id),
+        )
+        subtask_ids = [row[0] for row in await cursor.fetchall()]
+        keys = keys_between(await self._last_sort_key(board_pk), None, len(subtask_ids))
+        await self.conn.executemany(
+            """
+            UPDATE tasks SET board_pk = ?, list_pk = NULL, sort_key = ?, modified_at = ?,
+                device_id = ?, version = version + 1
+            WHERE id = ?
+            """,
+            [
+                (board_pk, key, task.modified_at, task.device_id, subtask_id)
+                for subtask_id, key in zip(subtask_ids, keys, strict=True)
+            ],
+        )
+        return subtask_ids
+
+    async def _board_pk(self, board_id: str) -> Optional[int]:
+        """Look up the key of a board.
+
+        Args:
+            board_id: Board ID
+
+        Returns:
+            Board key, or None if the board does not exist
+        """
+        cursor = await self.conn.execute("SELECT pk FROM boards WHERE id = ?", (board_id,))
+        row = await cursor.fetchone()
+        return row[0] if row else None
+
+    async def _last_sort_key(self, board_pk: int) -> Optional[str]:
+        """Largest sort key on a board.
+
+        Args:
+            board_pk: Board key
+
+        Returns:
+            Sort key of the last task, or None if the board has no keyed tasks
+        """
+        cursor = await self.conn.execute(
+            "SELECT MAX(sort_key) FROM tasks WHERE board_pk = ?", (board_pk,)
+        )
+        return (await cursor.fetchone())[0]
+
+    async def _append_sort_keys(self, placed: list[tuple[Task, int]]) -> None:
+        """Give new tasks sort keys at the end of their boards.
+
+        Each board's tasks get one run of evenly spaced keys, in the order
+        of the sort keys they came with (tasks without one last, in the
+        order given).
+
+        Args:
+            placed: Tuples of (task, board key)
+        """
+        boards: dict[int, list[Task]] = {}
+        for task, board_pk in placed:
+            boards.setdefault(board_pk, []).append(task)
+        for board_pk, tasks in boards.items():
+            tasks.sort(key=lambda task: (task.sort_key is None, task.sort_key or ""))
+            keys = keys_between(await self._last_sort_key(board_pk), None, len(tasks))
+            for task, key in zip(tasks, keys, strict=True):
+                task.sort_key = key
+
+    async def _existing_task_ids(self, task_ids: list[str]) -> set[str]:
+        """Find which of the given task IDs already exist, live or archived.
+
+        Args:
+            task_ids: Task IDs to check
+
+        Returns:
+            Set of existing task IDs
+        """
+        existing: set[str] = set()
+        for start in range(0, len(task_ids), MAX_SQL_PARAMS):
+            chunk = task_ids[start : start + MAX_SQL_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = await self.conn.execute(
+                f"SELECT id FROM tasks WHERE id IN ({placeholders}) "
+                f"UNION ALL SELECT id FROM tasks_archive WHERE id IN ({placeholders})",
+                chunk + chunk,
+            )
+            existing.update(row[0] for row in await cursor.fetchall())
+        return existing
+
+    async def _get_or_create_tag_pks(self, tag_names: set[str]) -> dict[str, int]:
+        """Resolve tag names to internal keys, creating missing tags.
+
+        Args:
+            tag_names: Tag names
+
+        Returns:
+            Mapping of tag name to tag key (tags.pk)
+        """
+        names = list(tag_names)
+        tag_pks = await self._select_tag_pks(names)
+
+        new_tags = [Tag(name=name) for name in names if name not in tag_pks]
+        if new_tags:
+            await self.conn.executemany(
+                "INSERT INTO tags (id, name) VALUES (?, ?)",
+                [(tag.id, tag.name) for tag in new_tags],
+            )
+            tag_pks.update(await self._select_tag_pks([tag.name for tag in new_tags]))
+
+        return tag_pks
+
+    async def _select_tag_pks(self, names: list[str]) -> dict[str, int]:
+        """Look up the internal keys of existing tags.
+
+        Args:
+            names: Tag names
+
+        Returns:
+            Mapping of tag name to tag key for the tags that exist
+        """
+        tag_pks: dict[str, int] = {}
+        for start in range(0, len(names), MAX_SQL_PARAMS):
+            chunk = names[start : start + MAX_SQL_PARAMS]
+            cursor = await self.conn.execute(
+                f"SELECT name, pk FROM tags WHERE name IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            tag_pks.update((row[0], row[1]) for row in await cursor.fetchall())
+        return tag_pks
+
+    def _row_to_task(self, row: aiosqlite.Row) -> Task:
+        """Convert database row to Task model.
+
+        The row must be selected as ``TASK_COLUMNS`` followed by the tag
+        names as a JSON array. Fields are read by position and every field is passed to the
+        constructor, so no default factories (UUID, timestamps) run.
+
+        Args:
+            row: Database row
+
+        Returns:
+            Task instance
+        """
+        tags = row[19]
+        return Task(
+            row[0],
+            row[1],
+            row[2],
+            row[3],
+            row[4],
+            row[5],
+            bool(row[6]),
+            row[7],
+            row[8],
+            row[9],
+            row[10],
+            row[11],
+            row[12],
+            row[13],
+            row[14],
+            row[15],
+            row[16],
+            row[17],
+            row[18],
+            json.loads(tags) if tags and tags != "[]" else [],
+        )
+
+
+class TagRepository:
+    """Repository for tag operations."""
+
+    def __init__(self, conn: aiosqlite.Connection):
+        """Initialize repository.
+
+        Args:
+            conn: Database connection
+        """
+        self.conn = conn
+        self._listeners: list[TagListener] = []
+
+    def add_listener(self, listener: TagListener) -> Callable[[], None]:
+        """Register a listener for committed tag creations and deletions.
+
+        Args:
+            listener: Called with the tag name and the tag (None once the
+                tag is deleted)
+
+        Returns:
+            Function that removes the listener
+        """
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _notify(self, name: str, tag: Optional[Tag]) -> None:
+        """Pass a committed tag write to the listeners.
+
+        Args:
+            name: Tag name
+            tag: Stored tag, or None if it no longer exists
+        """
+        for listener in self._listeners:
+            try:
+                listener(name, tag)
+            except Exception:
+                _LOGGER.exception("Tag listener failed for %s", name)
+
+    async def create(self, tag: Tag) -> Tag:
+        """Create a new tag.
+
+        Args:
+            tag: Tag to create
+
+        Returns:
+            Created tag
+        """
+        await self.conn.execute(
+            "INSERT INTO tags (id, name, color) VALUES (?, ?, ?)",
+            (tag.id, tag.name, tag.color),
+        )
+        await self.conn.commit()
+        _LOGGER.debug("Created tag: %s", tag.name)
+        self._notify(tag.name, tag)
+        return tag
+
+    async def get(self, tag_id: str) -> Optional[Tag]:
+        """Get tag by ID.
+
+        Args:
+            tag_id: Tag ID
+
+        Returns:
+            Tag if found, None otherwise
+        """
+        cursor = await self.conn.execute(
+            f"SELECT {TAG_COLUMNS} FROM tags WHERE id = ?", (tag_id,)
+        )
+        row = await cursor.fetchone()
+
+        if not row:
+            return None
+
+        return self._row_to_tag(row)
+
+    async def get_by_name(self, name: str) -> Optional[Tag]:
+        """Get tag by name.
+
+        Args:
+            name: Tag name
+
+        Returns:
+            Tag if found, None otherwise
+        """
+        cursor = await self.conn.execute(
+            f"SELECT {TAG_COLUMNS} FROM tags WHERE name = ?", (name,)
+        )
+        row = await cursor.fetchone()
+
+        if not row:
+            return None
+
+        return self._row_to_tag(row)
+
+    async def list(self) -> list[Tag]:
+        """List all tags.
+
+        Returns:
+            List of tags
+        """
+        cursor = await self.conn.execute(
+            f"SELECT {TAG_COLUMNS} FROM tags ORDER BY name ASC"
+        )
+        rows = await cursor.fetchall()
+
+        return [self._row_to_tag(row) for row in rows]
+
+    async def delete(self, tag_id: str) -> bool:
+        """Delete a tag.
+
+        Args:
+            tag_id: Tag ID
+
+        Returns:
+            True if deleted, False if not found
+        """
+        # Drop the tag from the denormalized lists of the tasks carrying it
+        await self.conn.execute(
+            """
+            UPDATE tasks SET tags_json = (
+                SELECT json_group_array(value) FROM json_each(tasks.tags_json)
+                WHERE value != (SELECT name FROM tags WHERE id = ?)
+            )
+            WHERE tags_json IS NOT NULL
+                AND pk IN (
+                    SELECT task_pk FROM task_tags
+                    WHERE tag_pk = (SELECT pk FROM tags WHERE id = ?)
+                )
+            """,
+            (tag_id, tag_id),
+        )
+        cursor = await self.conn.execute(
+            "DELETE FROM tags WHERE id = ? RETURNING name", (tag_id,)
+        )
+        row = await cursor.fetchone()
+        await cursor.close()
+        await self.conn.commit()
+
+        if row is None:
+            return False
+        _LOGGER.debug("Deleted tag: %s", tag_id)
+        self._notify(row[0], None)
+        return True
+
+    def _row_to_tag(self, row: aiosqlite.Row) -> Tag:
+        """Convert database row to Tag model.
+
+        The row must be selected as ``TAG_COLUMNS``.
+
+        Args:
+            row: Database row
+
+        Returns:
+            Tag instance
+        """
+        return Tag(row[0], row[1], row[2], row[3])
+
+
+class BoardRepository:
+    """Repository for board and list operations."""
+
+    def __init__(self, conn: aiosqlite.Connection, task_repo: TaskRepository):
+        """Initialize repository.
+
+        Args:
+            conn: Database connection
+            task_repo: Task repository, notified of tasks removed or moved
+                along with their board or list
+        """
+        self.conn = conn
+        self.task_repo = task_repo
+        self._listeners: list[BoardListener] = []
+
+    def add_listener(self, listener: BoardListener) -> Callable[[], None]:
+        """Register a listener for committed board and list writes.
+
+        Args:
+            listener: Called with the board ID and the board (None once the
+                board is deleted) when a board is created, renamed or
+                deleted, or one of its lists is created or deleted
+
+        Returns:
+            Function that removes the listener
+        """
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _notify(self, board_id: str, board: Optional[Board]) -> None:
+        """Pass a committed board write to the listeners.
+
+        Args:
+            board_id: Board ID
+            board: Stored board, or None if it no longer exists
+        """
+        for listener in self._listeners:
+            try:
+                listener(board_id, board)
+            except Exception:
+                _LOGGER.exception("Board listener failed for %s", board_id)
+
+    async def create(self, board: Board) -> Board:
+        """Create a new board.
+
+        Args:
+            board: Board to create
+
+        Returns:
+            Created board
+        """
+        await self.conn.execute(
+            "INSERT INTO boards (id, name, created_at, modified_at) VALUES (?, ?, ?, ?)",
+            (board.id, board.name, board.created_at, board.modified_at),
+        )
+        await self.conn.commit()
+        _LOGGER.debug("Created board: %s", board.name)
+        self._notify(board.id, board)
+        return board
+
+    async def get(self, board_id: str) -> Optional[Board]:
+        """Get board by ID.
+
+        Args:
+            board_id: Board ID
+
+        Returns:
+            Board if found, None otherwise
+        """
+        cursor = await self.conn.execute(
+            f"SELECT {BOARD_COLUMNS} FROM boards WHERE id = ?", (board_id,)
+        )
+        row = await cursor.fetchone()
+
+        if not row:
+            return None
+
+        return Board(row[0], row[1], row[2], row[3])
+
+    async def list(self) -> list[Board]:
+        """List all boards, the default board first.
+
+        Returns:
+            List of boards
+        """
+        cursor = await self.conn.execute(
+            f"SELECT {BOARD_COLUMNS} FROM boards ORDER BY pk != ?, name ASC",
+            (DEFAULT_BOARD_PK,),
+        )
+        return [Board(row[0], row[1], row[2], row[3]) for row in await cursor.fetchall()]
+
+    async def rename(self, board_id: str, name: str) -> Optional[Board]:
+        """Rename a board.
+
+        Args:
+            board_id: Board ID
+            name: New name
+
+        Returns:
+            Renamed board, or None if not found
+        """
+        cursor = await self.conn.execute(
+            f"UPDATE boards SET name = ?, modified_at = ? WHERE id = ? RETURNING {BOARD_COLUMNS}",
+            (name, now_ms(), board_id),
+        )
+        row = await cursor.fetchone()
+        await cursor.close()
+        await self.conn.commit()
+
+        if row is None:
+            return None
+        board = Board(row[0], row[1], row[2], row[3])
+        self._notify(board.id, board)
+        return board
+
+    async def delete(self, board_id: str) -> bool:
+        """Delete a board with its lists, tasks and archived tasks.
+
+        Args:
+            board_id: Board ID
+
+        Returns:
+            True if deleted, False if not found
+
+        Raises:
+            ValueError: If the board is the default board
+        """
+        if board_id == DEFAULT_BOARD_ID:
+            raise ValueError("The default board cannot be deleted")
+        # Deleting the tasks first notifies their listeners; an interruption
+        # before the board goes leaves an empty board behind, nothing worse
+        await self.task_repo.delete_many(board_id=board_id)
+        try:
+            await self.conn.execute(
+                f"DELETE FROM tasks_archive WHERE board_pk = {BOARD_PK}", (board_id,)
+            )
+            # Lists go with the board (ON DELETE CASCADE)
+            cursor = await self.conn.execute("DELETE FROM boards WHERE id = ?", (board_id,))
+            await self.conn.commit()
+        except Exception:
+            await self.conn.rollback()
+            raise
+
+        deleted = cursor.rowcount > 0
+        if deleted:
+            _LOGGER.debug("Deleted board: %s", board_id)
+            self._notify(board_id, None)
+        return deleted
+
+    async def create_list(self, board_list: BoardList) -> BoardList:
+        """Create a new list on a board.
+
+        Args:
+            board_list: List to create
+
+        Returns:
+            Created list
+
+        Raises:
+            ValueError: If the board does not exist
+        """
+        cursor = await self.conn.execute(
+            "INSERT INTO lists (id, board_pk, name, created_at) "
+            "SELECT ?, pk, ?, ? FROM boards WHERE id = ?",
+            (board_list.id, board_list.name, board_list.created_at, board_list.board_id),
+        )
+        if cursor.rowcount == 0:
+            raise ValueError(f"Board not found: {board_list.board_id}")
+        await self.conn.commit()
+        _LOGGER.debug("Created list: %s", board_list.name)
+        self._notify(board_list.board_id, await self.get(board_list.board_id))
+        return board_list
+
+    async def list_lists(self, board_id: str) -> list[BoardList]:
+        """List the lists of a board.
+
+        Args:
+            board_id: Board ID
+
+        Returns:
+            Lists ordered by name
+        """
+        cursor = await self.conn.execute(
+            f"SELECT {LIST_COLUMNS} FROM lists l "
+            f"WHERE l.board_pk = {BOARD_PK} ORDER BY l.name ASC",
+            (board_id,),
         )
+        return [
+            BoardList(row[0], row[1], row[2], row[3]) for row in await cursor.fetchall()
+        ]
+
+    async def delete_list(self, list_id: str, device_id: str = "") -> bool:
+        """Delete a list; its tasks stay on the board without a list.
+
+        Args:
+            list_id: List ID
+            device_id: Device making the change
+
+        Returns:
+            True if deleted, False if not found
+        """
+        try:
+            cursor = await self.conn.execute(
+                f"""
+                UPDATE tasks SET list_pk = NULL, modified_at = ?, device_id = ?,
+                    version = version + 1
+                WHERE list_pk = {LIST_PK}
+                RETURNING id
+                """,
+                (now_ms(), device_id, list_id),
+            )
+            moved = [row[0] for row in await cursor.fetchall()]
+            await self.conn.execute(
+                f"UPDATE tasks_archive SET list_pk = NULL WHERE list_pk = {LIST_PK}",
+                (list_id,),
+            )
+            cursor = await self.conn.execute(
+                "DELETE FROM lists WHERE id = ? "
+                "RETURNING (SELECT id FROM boards WHERE pk = board_pk)",
+                (list_id,),
+            )
+            row = await cursor.fetchone()
+            await cursor.close()
+            await self.conn.commit()
+        except Exception:
+            await self.conn.rollback()
+            raise
+
+        if row is None:
+            return False
+        _LOGGER.debug("Deleted list %s, moving %d tasks off it", list_id, len(moved))
+        await self.task_repo.notify_many(moved)
+        self._notify(row[0], await self.get(row[0]))
+        return True
@@ -2,6 +2,9 @@
 -- SQLite with WAL mode + FTS5 for full-text search
 -- Version: 1 (MVP Schema)
 
+-- Free pages are released by idle-time maintenance (must precede CREATE TABLE)
+PRAGMA auto_vacuum = INCREMENTAL;
+
 -- Enable WAL mode for better concurrent access
 PRAGMA journal_mode = WAL;
 PRAGMA synchronous = NORMAL;
@@ -136,7 +139,10 @@ GROUP BY t.id;
 CREATE TABLE IF NOT EXISTS schema_version (
     version INTEGER PRIMARY KEY,
     applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-    description TEXT
+    description TEXT,
+    status TEXT NOT NULL DEFAULT 'complete',  -- 'backfilling' until data backfills finish
+    backfill TEXT,  -- Name of the backfill in progress
+    checkpoint TEXT  -- Last position processed by that backfill
 );
 
 -- Insert initial schema version
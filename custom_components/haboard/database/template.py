@@ -0,0 +1,128 @@
+"""Schema template for new HABoard databases.
+
+Creating the schema statement by statement (tables, indexes, FTS5 and
+triggers, then every migration) costs one journal sync per statement. New
+databases are instead copied from a template built once per process in
+memory and written out with SQLite's backup API in a single pass.
+
+The template is built from schema.sql plus the registered migration chain,
+so it cannot drift from them; it is keyed by a fingerprint of both and
+checked against the latest migration version before use.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+from pathlib import Path
+import sqlite3
+from typing import Optional
+
+import aiosqlite
+
+from .migrations import MIGRATIONS, Migration, MigrationManager
+
+_LOGGER = logging.getLogger(__name__)
+
+# fingerprint -> serialized template database
+_TEMPLATES: dict[str, bytes] = {}
+
+
+def schema_fingerprint(
+    schema_sql: str, migrations: Optional[list[Migration]] = None
+) -> str:
+    """Fingerprint the base schema and migration chain.
+
+    Args:
+        schema_sql: Contents of schema.sql
+        migrations: Migration chain (defaults to the registered migrations)
+
+    Returns:
+        Hex digest identifying the schema a template was built from
+    """
+    if migrations is None:
+        migrations = MIGRATIONS
+    digest = hashlib.sha256(schema_sql.encode())
+    for migration in sorted(migrations, key=lambda m: m.version):
+        digest.update(f"\n{migration.version}:{migration.description}".encode())
+    return digest.hexdigest()[:16]
+
+
+async def async_build_template(
+    schema_sql: str, migrations: Optional[list[Migration]] = None
+) -> bytes:
+    """Build a fully migrated, empty database in memory.
+
+    Args:
+        schema_sql: Contents of schema.sql
+        migrations: Migration chain (defaults to the registered migrations)
+
+    Returns:
+        Serialized template database
+
+    Raises:
+        RuntimeError: If the template does not match the migration chain
+    """
+    if migrations is None:
+        migrations = MIGRATIONS
+
+    snapshot = sqlite3.connect(":memory:", check_same_thread=False)
+    try:
+        async with aiosqlite.connect(":memory:") as conn:
+            conn.row_factory = aiosqlite.Row
+            await conn.executescript(schema_sql)
+            await conn.commit()
+
+            manager = MigrationManager(conn)
+            for migration in migrations:
+                manager.register(migration)
+            await manager.migrate_to_latest()
+            # Backfills over an empty database finish in one batch each
+            await manager.run_backfills()
+
+            expected = max((m.version for m in migrations), default=1)
+            version = await manager.get_current_version()
+            if version != expected or await manager.has_pending_backfills():
+                raise RuntimeError(
+                    f"Schema template is at version {version}, "
+                    f"migration chain expects {expected}"
+                )
+
+            await conn.backup(snapshot)
+        return snapshot.serialize()
+    finally:
+        snapshot.close()
+
+
+async def async_get_template(schema_sql: str) -> bytes:
+    """Get the template for the current schema, building it on first use.
+
+    Args:
+        schema_sql: Contents of schema.sql
+
+    Returns:
+        Serialized template database
+    """
+    fingerprint = schema_fingerprint(schema_sql)
+    if (template := _TEMPLATES.get(fingerprint)) is None:
+        _LOGGER.debug("Building schema template %s", fingerprint)
+        template = _TEMPLATES[fingerprint] = await async_build_template(schema_sql)
+    return template
+
+
+def write_template(template: bytes, db_path: Path) -> None:
+    """Copy a template into a new database file.
+
+    Blocking; run it in an executor.
+
+    Args:
+        template: Serialized template database
+        db_path: Database file to write (must be empty or missing)
+    """
+    source = sqlite3.connect(":memory:")
+    target = sqlite3.connect(db_path)
+    try:
+        source.deserialize(template)
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
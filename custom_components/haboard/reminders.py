@@ -0,0 +1,228 @@
+"""Due-task reminders for HABoard.
+
+Open tasks with a due date are kept in a min-heap keyed by the instant
+they fall due. Only the earliest deadline has a timer; when it fires,
+every task due by then gets a ``haboard_task_due`` event and the timer is
+re-armed for the next deadline. Idle cost is one pending timer however
+many tasks there are.
+
+The heap is loaded once from the open-task due-date index and then kept
+current by the repository's write listener, so nothing polls the tasks
+table.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, time as dt_time, tzinfo
+import heapq
+import logging
+import time
+from typing import Optional
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, EVENT_TASK_DUE
+from .database.models import Task
+from .database.repository import TaskRepository
+
+_LOGGER = logging.getLogger(__name__)
+
+# Local time at which tasks with a due date but no due time fall due
+ALL_DAY_DUE_TIME = dt_time(9, 0)
+
+# Rebuild the heap once stale entries outnumber live ones by this factor
+HEAP_COMPACT_FACTOR = 2
+
+
+class ReminderScheduler:
+    """Fire an event when open tasks become due."""
+
+    def __init__(
+        self, hass: HomeAssistant, task_repo: TaskRepository, entry_id: str
+    ) -> None:
+        """Initialize scheduler.
+
+        Args:
+            hass: Home Assistant instance
+            task_repo: Task repository to load from and listen to
+            entry_id: Config entry the tasks belong to
+        """
+        self.hass = hass
+        self.task_repo = task_repo
+        self.entry_id = entry_id
+        # (due timestamp, task ID); updated entries are left in place and
+        # skipped when popped unless they match _deadlines
+        self._heap: list[tuple[float, str]] = []
+        self._deadlines: dict[str, float] = {}
+        self._timer_at: Optional[float] = None
+        self._cancel_timer: Optional[CALLBACK_TYPE] = None
+        self._remove_listener: Optional[CALLBACK_TYPE] = None
+
+    @property
+    def time_zone(self) -> tzinfo:
+        """Time zone the due dates and times are local to."""
+        return dt_util.get_time_zone(self.hass.config.time_zone) or dt_util.UTC
+
+    @property
+    def next_deadline(self) -> Optional[float]:
+        """Timestamp the timer is armed for, if any."""
+        return self._timer_at
+
+    def __len__(self) -> int:
+        """Number of tasks waiting to fall due."""
+        return len(self._deadlines)
+
+    async def async_start(self) -> None:
+        """Start listening to task writes and load upcoming deadlines."""
+        self._remove_listener = self.task_repo.add_listener(self.async_task_changed)
+
+        start = time.monotonic()
+        now = time.time()
+        time_zone = self.time_zone
+        today = dt_util.now(time_zone).date().isoformat()
+        async for rows in self.task_repo.iter_open_due(today):
+            for task_id, due_date, due_time in rows:
+                # Writes during the load are newer than what the cursor read
+                if task_id in self._deadlines:
+                    continue
+                deadline = self._deadline(due_date, due_time, time_zone)
+                if deadline is not None and deadline > now:
+                    self._deadlines[task_id] = deadline
+        self._heap = [(deadline, task_id) for task_id, deadline in self._deadlines.items()]
+        heapq.heapify(self._heap)
+        self._arm()
+
+        _LOGGER.debug(
+            "Loaded %d task reminders in %.1fms",
+            len(self._deadlines),
+            (time.monotonic() - start) * 1000,
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening and cancel the timer."""
+        if self._remove_listener is not None:
+            self._remove_listener()
+            self._remove_listener = None
+        if self._cancel_timer is not None:
+            self._cancel_timer()
+            self._cancel_timer = None
+        self._timer_at = None
+
+    @callback
+    def async_task_changed(self, task_id: str, task: Optional[Task]) -> None:
+        """Update the deadline of a task after a repository write.
+
+        Args:
+            task_id: Task ID
+            task: Stored task, or None if it was deleted or archived
+        """
+        deadline = None
+        if task is not None and not task.completed and task.due_date:
+            deadline = self._deadline(task.due_date, task.due_time, self.time_zone)
+            if deadline is not None and deadline <= time.time():
+                deadline = None
+
+        if deadline is None:
+            if self._deadlines.pop(task_id, None) is not None:
+                self._compact()
+                self._arm()
+            return
+        if self._deadlines.get(task_id) == deadline:
+            return
+
+        self._deadlines[task_id] = deadline
+        heapq.heappush(self._heap, (deadline, task_id))
+        self._compact()
+        self._arm()
+
+    def _deadline(
+        self, due_date: str, due_time: Optional[str], time_zone: tzinfo
+    ) -> Optional[float]:
+        """Convert a local due date and time to a timestamp.
+
+        Args:
+            due_date: Due date (YYYY-MM-DD)
+            due_time: Due time (HH:MM[:SS]), or None for ALL_DAY_DUE_TIME
+            time_zone: Time zone the values are local to
+
+        Returns:
+            Unix timestamp, or None if the values cannot be parsed
+        """
+        try:
+            local_time = dt_time.fromisoformat(due_time) if due_time else ALL_DAY_DUE_TIME
+            due = datetime.combine(date.fromisoformat(due_date), local_time, time_zone)
+        except ValueError:
+            _LOGGER.debug("Ignoring unparseable due date %s %s", due_date, due_time)
+            return None
+        return due.timestamp()
+
+    def _compact(self) -> None:
+        """Drop stale heap entries once they outnumber the live ones."""
+        if len(self._heap) > HEAP_COMPACT_FACTOR * len(self._deadlines) + 64:
+            self._heap = [(deadline, task_id) for task_id, deadline in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def _arm(self) -> None:
+        """Point the timer at the earliest live deadline."""
+        heap = self._heap
+        while heap and self._deadlines.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+
+        deadline = heap[0][0] if heap else None
+        if deadline == self._timer_at:
+            return
+        if self._cancel_timer is not None:
+            self._cancel_timer()
+            self._cancel_timer = None
+        self._timer_at = deadline
+        if deadline is not None:
+            self._cancel_timer = async_track_point_in_utc_time(
+                self.hass, self._async_fire, dt_util.utc_from_timestamp(deadline)
+            )
+
+    @callback
+    def _async_fire(self, _: datetime) -> None:
+        """Pop every task due by now, fire their events and re-arm."""
+        self._cancel_timer = None
+        self._timer_at = None
+
+        now = time.time()
+        due_ids = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            deadline, task_id = heapq.heappop(heap)
+            if self._deadlines.get(task_id) == deadline:
+                del self._deadlines[task_id]
+                due_ids.append(task_id)
+        self._arm()
+
+        if due_ids:
+            self.hass.async_create_task(
+                self._async_notify(due_ids), f"{DOMAIN}_reminders_{self.entry_id}"
+            )
+
+    async def _async_notify(self, task_ids: list[str]) -> None:
+        """Fire the due event for tasks that are still open.
+
+        Args:
+            task_ids: IDs of the tasks that fell due
+        """
+        for task_id in task_ids:
+            task = await self.task_repo.get(task_id)
+            if task is None or task.completed:
+                continue
+            self.hass.bus.async_fire(
+                EVENT_TASK_DUE,
+                {
+                    "entry_id": self.entry_id,
+                    "task_id": task.id,
+                    "title": task.title,
+                    "due_date": task.due_date,
+                    "due_time": task.due_time,
+                    "priority": task.priority,
+                    "tags": task.tags,
+                },
+            )
+        _LOGGER.debug("Fired %d task due events", len(task_ids))
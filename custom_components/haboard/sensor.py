@@ -0,0 +1,189 @@
+"""Task count sensors for HABoard.
+
+The sensors share one coordinator that reads the cached counts of
+:class:`~.stats.TaskStats`. Task and tag writes request a refresh, with
+further writes within the cooldown collected into one; a refresh once a
+minute keeps the clock-dependent counts (overdue, due today) current.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+import logging
+from typing import Any, Optional
+
+from homeassistant.components.sensor import (
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import (
+    CoordinatorEntity,
+    DataUpdateCoordinator,
+)
+from homeassistant.util import dt as dt_util
+
+from .const import DEFAULT_NAME, DOMAIN
+from .stats import TaskStats
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds during which further writes are collected into one refresh
+STATS_REFRESH_COOLDOWN = 1.0
+
+# Refresh interval for the counts that change with the clock alone
+STATS_UPDATE_INTERVAL = timedelta(minutes=1)
+
+
+@dataclass(frozen=True, kw_only=True)
+class HABoardSensorEntityDescription(SensorEntityDescription):
+    """Describes a HABoard task count sensor."""
+
+    value_fn: Callable[[dict[str, Any]], int]
+    attributes_fn: Optional[Callable[[dict[str, Any]], dict[str, Any]]] = None
+
+
+SENSORS: tuple[HABoardSensorEntityDescription, ...] = (
+    HABoardSensorEntityDescription(
+        key="open",
+        name="open tasks",
+        icon="mdi:clipboard-list",
+        value_fn=lambda counts: counts["open"],
+        attributes_fn=lambda counts: {
+            "by_priority": {
+                priority: values["open"] for priority, values in counts["by_priority"].items()
+            },
+            "by_tag": {name: values["open"] for name, values in counts["by_tag"].items()},
+        },
+    ),
+    HABoardSensorEntityDescription(
+        key="overdue",
+        name="overdue tasks",
+        icon="mdi:clipboard-alert",
+        value_fn=lambda counts: counts["overdue"],
+        attributes_fn=lambda counts: {
+            "by_priority": {
+                priority: values["overdue"]
+                for priority, values in counts["by_priority"].items()
+            },
+        },
+    ),
+    HABoardSensorEntityDescription(
+        key="due_today",
+        name="tasks due today",
+        icon="mdi:calendar-today",
+        value_fn=lambda counts: counts["due_today"],
+    ),
+    HABoardSensorEntityDescription(
+        key="completed_today",
+        name="tasks completed today",
+        icon="mdi:clipboard-check",
+        value_fn=lambda counts: counts["completed_today"],
+    ),
+)
+
+
+class HABoardStatsCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Task counts shared by the sensors."""
+
+    def __init__(self, hass: HomeAssistant, stats: TaskStats) -> None:
+        """Initialize coordinator.
+
+        Args:
+            hass: Home Assistant instance
+            stats: Cached task statistics
+        """
+        super().__init__(
+            hass, _LOGGER, name=f"{DOMAIN}_stats", update_interval=STATS_UPDATE_INTERVAL
+        )
+        self.stats = stats
+        self._write_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=STATS_REFRESH_COOLDOWN,
+            immediate=True,
+            function=self.async_refresh,
+        )
+
+    @callback
+    def async_data_changed(self, *_: Any) -> None:
+        """Schedule a refresh after a task or tag write."""
+        self._write_debouncer.async_schedule_call()
+
+    @callback
+    def async_stop(self) -> None:
+        """Drop a pending refresh."""
+        self._write_debouncer.async_shutdown()
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Read the counts, from the cache unless something was written."""
+        time_zone = dt_util.get_time_zone(self.hass.config.time_zone) or dt_util.UTC
+        return await self.stats.async_counts(dt_util.now(time_zone))
+
+
+class HABoardSensorEntity(CoordinatorEntity[HABoardStatsCoordinator], SensorEntity):
+    """A task count."""
+
+    entity_description: HABoardSensorEntityDescription
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = "tasks"
+
+    def __init__(
+        self,
+        coordinator: HABoardStatsCoordinator,
+        description: HABoardSensorEntityDescription,
+        entry_id: str,
+        title: str = DEFAULT_NAME,
+    ) -> None:
+        """Initialize entity.
+
+        Args:
+            coordinator: Coordinator holding the counts
+            description: Which count to show
+            entry_id: Config entry the tasks belong to
+            title: Config entry title, prefixed to the sensor name
+        """
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{entry_id}_{description.key}"
+        self._attr_name = f"{title} {description.name}"
+
+    @property
+    def native_value(self) -> int:
+        """Current count."""
+        return self.entity_description.value_fn(self.coordinator.data)
+
+    @property
+    def extra_state_attributes(self) -> Optional[dict[str, Any]]:
+        """Breakdowns of the count, if the sensor has any."""
+        if self.entity_description.attributes_fn is None:
+            return None
+        return self.entity_description.attributes_fn(self.coordinator.data)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the HABoard task count sensors.
+
+    Args:
+        hass: Home Assistant instance
+        entry: Config entry
+        async_add_entities: Adds entities to the platform
+    """
+    data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = HABoardStatsCoordinator(hass, data["stats"])
+    await coordinator.async_config_entry_first_refresh()
+
+    entry.async_on_unload(data["task_repo"].add_listener(coordinator.async_data_changed))
+    entry.async_on_unload(data["tag_repo"].add_listener(coordinator.async_data_changed))
+    entry.async_on_unload(coordinator.async_stop)
+    async_add_entities(
+        HABoardSensorEntity(coordinator, description, entry.entry_id, entry.title)
+        for description in SENSORS
+    )
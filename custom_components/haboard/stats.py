@@ -0,0 +1,208 @@
+"""Aggregate task statistics for HABoard.
+
+Counts come from a handful of indexed COUNT queries instead of reading
+every task. Results are cached against the connection's write generation
+(``total_changes``), so dashboards that refresh without anything having
+been written are served from memory. Counts that depend on the clock
+(overdue, due and completed today) are also keyed by the local minute.
+Both counts and series can be limited to one board.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import date, datetime, time as dt_time, timedelta, tzinfo
+import logging
+import time
+from typing import Any, Optional
+
+from .database.repository import TaskRepository
+
+_LOGGER = logging.getLogger(__name__)
+
+# Priorities reported in the breakdown, even without tasks
+PRIORITIES = range(4)
+
+# Bucket sizes of the completion series
+BUCKET_DAY = "day"
+BUCKET_WEEK = "week"
+BUCKET_MONTH = "month"
+BUCKETS = (BUCKET_DAY, BUCKET_WEEK, BUCKET_MONTH)
+
+# Longest completion series, in days
+MAX_SERIES_DAYS = 366
+
+# Completion series kept per generation (time zone, window and bucket), and
+# board counts kept
+SERIES_CACHE_SIZE = 8
+
+
+def bucket_start(day: date, bucket: str) -> date:
+    """First date of the bucket a date falls in.
+
+    Args:
+        day: Local date
+        bucket: BUCKET_DAY, BUCKET_WEEK (starting Monday) or BUCKET_MONTH
+
+    Returns:
+        Start date of the bucket
+    """
+    if bucket == BUCKET_WEEK:
+        return day - timedelta(days=day.weekday())
+    if bucket == BUCKET_MONTH:
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(start: date, bucket: str) -> date:
+    """Start date of the bucket after the one starting on a date.
+
+    Args:
+        start: Start date of a bucket
+        bucket: Bucket size
+
+    Returns:
+        Start date of the next bucket
+    """
+    if bucket == BUCKET_WEEK:
+        return start + timedelta(days=7)
+    if bucket == BUCKET_MONTH:
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def local_midnight_ms(day: date, time_zone: tzinfo) -> int:
+    """Epoch milliseconds of local midnight at the start of a date."""
+    return int(datetime.combine(day, dt_time(), time_zone).timestamp() * 1000)
+
+
+class TaskStats:
+    """Cached task counts and completion series."""
+
+    def __init__(self, task_repo: TaskRepository) -> None:
+        """Initialize statistics.
+
+        Args:
+            task_repo: Task repository to count in
+        """
+        self.task_repo = task_repo
+        self._counts: OrderedDict[Optional[str], tuple[tuple, dict[str, Any]]] = OrderedDict()
+        self._series: OrderedDict[tuple, list[dict[str, Any]]] = OrderedDict()
+        self._series_generation: Optional[int] = None
+
+    @property
+    def generation(self) -> int:
+        """Rows changed on the connection so far; moves on every write."""
+        return self.task_repo.conn.total_changes
+
+    async def async_counts(
+        self, now: datetime, board_id: Optional[str] = None
+    ) -> dict[str, Any]:
+        """Count open, overdue and completed tasks with their breakdowns.
+
+        Args:
+            now: Current local time; its time zone decides "today"
+            board_id: Only count the tasks of this board
+
+        Returns:
+            {"open", "overdue", "due_today", "completed", "completed_today"
+             counts, "by_priority": {priority: {"open", "overdue"}},
+             "by_tag": {name: {"open", "completed"}}}
+        """
+        today = now.date()
+        now_time = now.strftime("%H:%M:%S")
+        key = (self.generation, now.tzinfo, today, now_time[:5])
+        cached = self._counts.get(board_id)
+        if cached is not None and cached[0] == key:
+            self._counts.move_to_end(board_id)
+            return cached[1]
+
+        start = time.monotonic()
+        by_priority = {str(priority): {"open": 0, "overdue": 0} for priority in PRIORITIES}
+        open_count = overdue = due_today = 0
+        for priority, open_, overdue_, due_today_ in await self.task_repo.count_open(
+            today.isoformat(), now_time, board_id
+        ):
+            by_priority[str(priority)] = {"open": open_, "overdue": overdue_}
+            open_count += open_
+            overdue += overdue_
+            due_today += due_today_
+        completed, completed_today = await self.task_repo.count_completed(
+            local_midnight_ms(today, now.tzinfo), board_id
+        )
+
+        counts = {
+            "open": open_count,
+            "overdue": overdue,
+            "due_today": due_today,
+            "completed": completed,
+            "completed_today": completed_today,
+            "by_priority": by_priority,
+            "by_tag": {
+                name: {"open": open_, "completed": done}
+                for name, open_, done in await self.task_repo.count_by_tag(board_id)
+            },
+        }
+        self._counts[board_id] = (key, counts)
+        self._counts.move_to_end(board_id)
+        if len(self._counts) > SERIES_CACHE_SIZE:
+            self._counts.popitem(last=False)
+        _LOGGER.debug("Counted task statistics in %.1fms", (time.monotonic() - start) * 1000)
+        return counts
+
+    async def async_series(
+        self,
+        now: datetime,
+        days: int,
+        bucket: str = BUCKET_DAY,
+        board_id: Optional[str] = None,
+    ) -> list[dict[str, Any]]:
+        """Count completions per bucket, oldest first.
+
+        The window covers the last ``days`` local dates up to today, widened
+        to whole buckets. Buckets without completions are included.
+
+        Args:
+            now: Current local time; its time zone decides the buckets
+            days: Days to cover (1 to MAX_SERIES_DAYS)
+            bucket: Bucket size
+            board_id: Only count the tasks of this board
+
+        Returns:
+            [{"start": "YYYY-MM-DD", "completed": count}] per bucket
+
+        Raises:
+            ValueError: If days or bucket is out of range
+        """
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket: {bucket}")
+        if not 1 <= days <= MAX_SERIES_DAYS:
+            raise ValueError(f"days must be between 1 and {MAX_SERIES_DAYS}")
+
+        generation = self.generation
+        if generation != self._series_generation:
+            self._series.clear()
+            self._series_generation = generation
+        today = now.date()
+        key = (board_id, now.tzinfo, today, days, bucket)
+        if (series := self._series.get(key)) is not None:
+            self._series.move_to_end(key)
+            return series
+
+        starts = [bucket_start(today - timedelta(days=days - 1), bucket)]
+        while (following := next_bucket(starts[-1], bucket)) <= today:
+            starts.append(following)
+        bounds = [local_midnight_ms(start, now.tzinfo) for start in starts]
+        completed_at = await self.task_repo.list_completed_at(bounds[0], board_id)
+        # Completions after the end of today (clock skew) go into the last bucket
+        positions = [bisect_left(completed_at, bound) for bound in bounds]
+        positions.append(len(completed_at))
+
+        series = [
+            {"start": start.isoformat(), "completed": positions[i + 1] - positions[i]}
+            for i, start in enumerate(starts)
+        ]
+        self._series[key] = series
+        if len(self._series) > SERIES_CACHE_SIZE:
+            self._series.popitem(last=False)
+        return series
@@ -0,0 +1,512 @@
+"""To-do list entities for HABoard.
+
+One entity lists every task and one more is added per tag and per board.
+Their items come from an in-memory copy of the tasks that is loaded once
+and then kept current by the repository write listeners, so reading a
+list never touches the database. State writes are coalesced: the first
+change is written right away and any further changes within the cooldown
+are written together once it ends, so a bulk import costs a couple of
+state writes instead of one per task.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, time as dt_time, tzinfo
+import logging
+import time
+from typing import Optional
+
+from homeassistant.components.todo import (
+    TodoItem,
+    TodoItemStatus,
+    TodoListEntity,
+    TodoListEntityFeature,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util import dt as dt_util
+
+from .const import DEFAULT_NAME, DOMAIN
+from .database.models import DEFAULT_BOARD_ID, Board, Tag, Task, now_ms
+from .database.repository import BoardRepository, TagRepository, TaskRepository
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds during which further changes are collected into one state write
+STATE_WRITE_COOLDOWN = 1.0
+
+# Key of the list holding every task (tag lists are keyed by tag name)
+ALL_TASKS = None
+
+# First element of the keys of board lists, (BOARD_LIST, board ID), which
+# keeps them apart from tag names
+BOARD_LIST = "board"
+
+# Key of a list: ALL_TASKS, a tag name or a board key
+ListKey = str | tuple[str, str] | None
+
+
+def board_key(board_id: str) -> tuple[str, str]:
+    """Key of the list of a board's tasks."""
+    return (BOARD_LIST, board_id)
+
+
+class TodoTaskCache:
+    """In-memory tasks backing the to-do list entities."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        task_repo: TaskRepository,
+        tag_repo: TagRepository,
+        board_repo: BoardRepository,
+        entry_id: str,
+        async_add_entities: AddEntitiesCallback,
+        title: str = DEFAULT_NAME,
+    ) -> None:
+        """Initialize cache.
+
+        Args:
+            hass: Home Assistant instance
+            task_repo: Task repository to load from and listen to
+            tag_repo: Tag repository to listen to
+            board_repo: Board repository to listen to
+            entry_id: Config entry the tasks belong to
+            async_add_entities: Adds the entities of new tags and boards
+            title: Config entry title, used in the entity names
+        """
+        self.hass = hass
+        self.task_repo = task_repo
+        self.tag_repo = tag_repo
+        self.board_repo = board_repo
+        self.entry_id = entry_id
+        self.title = title
+        self._async_add_entities = async_add_entities
+        self.loaded = False
+        # Task ID -> (sort key, item, keys of the lists it is in); tasks
+        # themselves are not kept, as callers may go on changing them
+        self._entries: dict[str, tuple[tuple, TodoItem, tuple[ListKey, ...]]] = {}
+        # List key -> IDs of its tasks
+        self._members: dict[ListKey, set[str]] = {ALL_TASKS: set()}
+        self._entities: dict[ListKey, HABoardTodoListEntity] = {}
+        # Board ID -> board name
+        self.board_names: dict[str, str] = {}
+        self._dirty: set[ListKey] = set()
+        # Tasks written while the initial load was reading
+        self._written: set[str] = set()
+        self._unsubscribers: list = []
+        self._debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=STATE_WRITE_COOLDOWN,
+            immediate=True,
+            function=self._async_write_states,
+        )
+
+    @property
+    def time_zone(self) -> tzinfo:
+        """Time zone the due dates and times are local to."""
+        return dt_util.get_time_zone(self.hass.config.time_zone) or dt_util.UTC
+
+    @callback
+    def async_start(
+        self, tags: list[Tag], boards: list[Board]
+    ) -> list[HABoardTodoListEntity]:
+        """Start listening to writes and create the initial entities.
+
+        Args:
+            tags: Existing tags
+            boards: Existing boards
+
+        Returns:
+            Entities for every task, for each tag and for each board
+        """
+        self._unsubscribers = [
+            self.task_repo.add_listener(self.async_task_changed),
+            self.tag_repo.add_listener(self.async_tag_changed),
+            self.board_repo.add_listener(self.async_board_changed),
+        ]
+        self.board_names = {board.id: board.name for board in boards}
+        entities = [self._new_entity(ALL_TASKS)]
+        entities.extend(self._new_entity(tag.name) for tag in tags)
+        entities.extend(self._new_entity(board_key(board.id)) for board in boards)
+        return entities
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening and drop pending state writes."""
+        for unsubscribe in self._unsubscribers:
+            unsubscribe()
+        self._unsubscribers = []
+        self._debouncer.async_shutdown()
+
+    async def async_load(self) -> None:
+        """Load every live task, then write the states of all lists."""
+        start = time.monotonic()
+        async for tasks in self.task_repo.iter_all():
+            for task in tasks:
+                # Writes during the load are newer than what the cursor read
+                if task.id not in self._written:
+                    self._store(task)
+        self._written.clear()
+        self.loaded = True
+        self._dirty.update(self._members)
+        self._debouncer.async_schedule_call()
+        _LOGGER.debug(
+            "Loaded %d tasks into %d to-do lists in %.1fms",
+            len(self._entries),
+            len(self._members),
+            (time.monotonic() - start) * 1000,
+        )
+
+    def items(self, key: ListKey) -> tuple[list[TodoItem], int]:
+        """Build the items of one list.
+
+        Args:
+            key: Tag name, board key, or ALL_TASKS
+
+        Returns:
+            Items (open ones by due date first, then completed ones), and the
+            number of open items
+        """
+        entries = sorted(
+            (self._entries[task_id] for task_id in self._members.get(key, ())),
+            key=_sort_key,
+        )
+        items = [item for _, item, _ in entries]
+        return items, sum(item.status == TodoItemStatus.NEEDS_ACTION for item in items)
+
+    @callback
+    def async_task_changed(self, task_id: str, task: Optional[Task]) -> None:
+        """Apply a repository write to the cache.
+
+        Args:
+            task_id: Task ID
+            task: Stored task, or None if it was deleted or archived
+        """
+        if not self.loaded:
+            self._written.add(task_id)
+        if (old := self._entries.pop(task_id, None)) is not None:
+            for key in old[2]:
+                self._members[key].discard(task_id)
+                self._dirty.add(key)
+        if task is not None:
+            self._dirty.update(self._store(task))
+        self._debouncer.async_schedule_call()
+
+    @callback
+    def async_tag_changed(self, name: str, tag: Optional[Tag]) -> None:
+        """Add or remove the list of a tag.
+
+        Args:
+            name: Tag name
+            tag: Created tag, or None if it was deleted
+        """
+        if tag is not None:
+            self._members.setdefault(name, set())
+            self._dirty.add(name)
+        else:
+            # The database already dropped the tag from its tasks
+            self._drop_list(name)
+        self._debouncer.async_schedule_call()
+
+    @callback
+    def async_board_changed(self, board_id: str, board: Optional[Board]) -> None:
+        """Add, rename or remove the list of a board.
+
+        Args:
+            board_id: Board ID
+            board: Stored board, or None if it was deleted
+        """
+        key = board_key(board_id)
+        if board is not None:
+            self.board_names[board_id] = board.name
+            if (entity := self._entities.get(key)) is not None:
+                entity.set_board_name(board.name)
+            self._members.setdefault(key, set())
+            self._dirty.add(key)
+        else:
+            # The board's tasks were deleted (and notified) before the board
+            self.board_names.pop(board_id, None)
+            self._drop_list(key)
+        self._debouncer.async_schedule_call()
+
+    def _drop_list(self, key: ListKey) -> None:
+        """Forget a list and remove its entity.
+
+        Args:
+            key: Tag name or board key
+        """
+        for task_id in self._members.pop(key, set()):
+            order, item, keys = self._entries[task_id]
+            self._entries[task_id] = (order, item, tuple(k for k in keys if k != key))
+        self._dirty.discard(key)
+        if (entity := self._entities.pop(key, None)) is not None:
+            self.hass.async_create_task(self._async_remove_entity(entity))
+
+    def _store(self, task: Task) -> tuple[ListKey, ...]:
+        """Add a task to the cache and the lists it belongs to.
+
+        Args:
+            task: Stored task
+
+        Returns:
+            Keys of the lists the task belongs to
+        """
+        keys = (ALL_TASKS, board_key(task.board_id), *dict.fromkeys(task.tags))
+        self._entries[task.id] = (_item_order(task), self._to_item(task), keys)
+        for key in keys:
+            self._members.setdefault(key, set()).add(task.id)
+        return keys
+
+    def _to_item(self, task: Task) -> TodoItem:
+        """Convert a task to a to-do item.
+
+        Args:
+            task: Task
+
+        Returns:
+            To-do item; the due value is a datetime in the Home Assistant
+            time zone if the task has a due time
+        """
+        due: date | datetime | None = None
+        if task.due_date:
+            try:
+                due = date.fromisoformat(task.due_date)
+                if task.due_time:
+                    due = datetime.combine(
+                        due, dt_time.fromisoformat(task.due_time), self.time_zone
+                    )
+            except ValueError:
+                _LOGGER.debug("Ignoring unparseable due date of task %s", task.id)
+        return TodoItem(
+            summary=task.title,
+            uid=task.id,
+            status=TodoItemStatus.COMPLETED if task.completed else TodoItemStatus.NEEDS_ACTION,
+            due=due,
+            description=task.notes,
+        )
+
+    def _new_entity(self, key: ListKey) -> HABoardTodoListEntity:
+        """Create the entity of a list.
+
+        Args:
+            key: Tag name, board key, or ALL_TASKS
+
+        Returns:
+            Entity
+        """
+        self._members.setdefault(key, set())
+        entity = self._entities[key] = HABoardTodoListEntity(self, key)
+        return entity
+
+    @callback
+    def _async_write_states(self) -> None:
+        """Refresh the lists that changed and add entities for new tags and boards."""
+        if not self.loaded:
+            return
+        new_entities = [
+            self._new_entity(key)
+            for key in self._members
+            if key not in self._entities
+        ]
+        if new_entities:
+            self._async_add_entities(new_entities)
+
+        dirty, self._dirty = self._dirty, set()
+        for key in dirty:
+            if (entity := self._entities.get(key)) is not None:
+                entity.async_refresh()
+
+    async def _async_remove_entity(self, entity: HABoardTodoListEntity) -> None:
+        """Remove the entity of a deleted tag or board, and its registry entry.
+
+        Args:
+            entity: Entity to remove
+        """
+        registry = er.async_get(self.hass)
+        if entity.entity_id and registry.async_get(entity.entity_id):
+            registry.async_remove(entity.entity_id)
+        else:
+            await entity.async_remove()
+
+
+def _sort_key(entry: tuple) -> tuple:
+    """Sort key of a cache entry."""
+    return entry[0]
+
+
+def _item_order(task: Task) -> tuple:
+    """Order within a list: open tasks by due date (undated last), then completed."""
+    return (
+        task.completed,
+        task.due_date is None,
+        task.due_date or "",
+        task.due_time or "",
+        -task.priority,
+        -task.created_at,
+    )
+
+
+class HABoardTodoListEntity(TodoListEntity):
+    """A to-do list of every HABoard task, or of the tasks with one tag or on one board."""
+
+    _attr_should_poll = False
+    _attr_icon = "mdi:clipboard-check"
+    _attr_supported_features = (
+        TodoListEntityFeature.CREATE_TODO_ITEM
+        | TodoListEntityFeature.UPDATE_TODO_ITEM
+        | TodoListEntityFeature.DELETE_TODO_ITEM
+        | TodoListEntityFeature.SET_DUE_DATE_ON_ITEM
+        | TodoListEntityFeature.SET_DUE_DATETIME_ON_ITEM
+        | TodoListEntityFeature.SET_DESCRIPTION_ON_ITEM
+    )
+
+    def __init__(self, cache: TodoTaskCache, key: ListKey) -> None:
+        """Initialize entity.
+
+        The default board's list is disabled by default, as until more
+        boards are added it holds the same tasks as the list of every task.
+
+        Args:
+            cache: Task cache the items come from
+            key: Tag name or board key of the listed tasks, or ALL_TASKS
+        """
+        self._cache = cache
+        self.key = key
+        self.tag = key if isinstance(key, str) else None
+        self.board_id = key[1] if isinstance(key, tuple) else None
+        self._open_count: Optional[int] = None
+        if self.board_id is not None:
+            self._attr_unique_id = f"{cache.entry_id}_board_{self.board_id}"
+            self._attr_entity_registry_enabled_default = self.board_id != DEFAULT_BOARD_ID
+            self.set_board_name(cache.board_names.get(self.board_id, self.board_id))
+        elif self.tag is None:
+            self._attr_unique_id = f"{cache.entry_id}_tasks"
+            self._attr_name = cache.title
+        else:
+            self._attr_unique_id = f"{cache.entry_id}_tag_{self.tag}"
+            self._attr_name = f"{cache.title} {self.tag}"
+
+    @property
+    def state(self) -> int | None:
+        """Number of open tasks, counted when the items were built."""
+        return self._open_count
+
+    async def async_added_to_hass(self) -> None:
+        """Show the items if the cache has loaded already."""
+        if self._cache.loaded:
+            self._set_items()
+
+    def set_board_name(self, name: str) -> None:
+        """Name a board list after its board; shown from the next state write.
+
+        Args:
+            name: Board name
+        """
+        self._attr_name = f"{self._cache.title} {name}"
+
+    @callback
+    def async_refresh(self) -> None:
+        """Rebuild the items from the cache and write the state."""
+        if self.hass is None or self.entity_id is None:
+            return
+        self._set_items()
+        self.async_write_ha_state()
+
+    def _set_items(self) -> None:
+        """Rebuild the items from the cache."""
+        self._attr_todo_items, self._open_count = self._cache.items(self.key)
+
+    async def async_create_todo_item(self, item: TodoItem) -> None:
+        """Create a task, tagged with this list's tag or on this list's board."""
+        task = Task(
+            title=item.summary or "",
+            notes=item.description,
+            tags=[self.tag] if self.tag else [],
+            board_id=self.board_id or DEFAULT_BOARD_ID,
+            device_id="homeassistant",
+        )
+        self._apply_item(task, item)
+        await self._cache.task_repo.create(task)
+
+    async def async_update_todo_item(self, item: TodoItem) -> None:
+        """Update a task; completing a recurring task advances it."""
+        task = await self._cache.task_repo.get(item.uid or "")
+        if task is None:
+            raise HomeAssistantError(f"Task {item.uid} not found")
+        if item.summary:
+            task.title = item.summary
+        task.notes = item.description
+        task.device_id = "homeassistant"
+        self._apply_item(task, item)
+        try:
+            await self._cache.task_repo.update(task)
+        except ValueError as err:
+            raise HomeAssistantError(str(err)) from err
+
+    async def async_delete_todo_items(self, uids: list[str]) -> None:
+        """Delete tasks."""
+        for uid in uids:
+            await self._cache.task_repo.delete(uid)
+
+    def _apply_item(self, task: Task, item: TodoItem) -> None:
+        """Copy the due value and status of an item onto a task.
+
+        Args:
+            task: Task to update in place
+            item: To-do item from the service call
+        """
+        due = item.due
+        if isinstance(due, datetime):
+            local = due.astimezone(self._cache.time_zone) if due.tzinfo else due
+            task.due_date = local.date().isoformat()
+            task.due_time = local.strftime("%H:%M:%S")
+        elif isinstance(due, date):
+            task.due_date = due.isoformat()
+            task.due_time = None
+        else:
+            task.due_date = task.due_time = None
+
+        completed = item.status == TodoItemStatus.COMPLETED
+        if completed and not task.completed:
+            task.completed_at = now_ms()
+        elif not completed:
+            task.completed_at = None
+        task.completed = completed
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the HABoard to-do lists.
+
+    The entities are added straight away and show their items once the
+    cache has loaded in the background.
+
+    Args:
+        hass: Home Assistant instance
+        entry: Config entry
+        async_add_entities: Adds entities to the platform
+    """
+    data = hass.data[DOMAIN][entry.entry_id]
+    cache = TodoTaskCache(
+        hass,
+        data["task_repo"],
+        data["tag_repo"],
+        data["board_repo"],
+        entry.entry_id,
+        async_add_entities,
+        entry.title,
+    )
+    data["todo"] = cache
+    async_add_entities(
+        cache.async_start(await data["tag_repo"].list(), await data["board_repo"].list())
+    )
+    entry.async_on_unload(cache.async_stop)
+    entry.async_create_background_task(
+        hass, cache.async_load(), f"{DOMAIN}_todo_load_{entry.entry_id}"
+    )
@@ -36,6 +36,25 @@ describe("HABoard API Client", () => {
     });
   });
 
+  describe("setEntryId", () => {
+    it("should scope requests to the config entry", async () => {
+      client.setEntryId("abc123");
+
+      fetchMock.mockResolvedValue({
+        ok: true,
+        status: 200,
+        json: async () => [],
+      });
+
+      await client.listTasks();
+
+      expect(fetchMock).toHaveBeenCalledWith(
+        "http://localhost:8123/api/haboard/entry/abc123/tasks",
+        expect.any(Object)
+      );
+    });
+  });
+
   describe("setAccessToken", () => {
     it("should set access token", async () => {
       client.setAccessToken("new-token");
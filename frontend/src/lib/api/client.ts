@@ -2,10 +2,15 @@
  * HABoard API client
  */
 import type {
+  Agenda,
+  AgendaRequest,
+  Board,
+  BoardList,
   Task,
   Tag,
   CreateTaskRequest,
   UpdateTaskRequest,
+  MoveTaskRequest,
   SearchTasksRequest,
   CreateTagRequest,
 } from "../types/task";
@@ -16,6 +21,8 @@ import type {
 interface ApiConfig {
   baseUrl: string;
   accessToken?: string;
+  /** Config entry to address; the first entry when unset */
+  entryId?: string;
 }
 
 /**
@@ -58,6 +65,24 @@ export class HABoardAPIClient {
     this.config.accessToken = token;
   }
 
+  /**
+   * Select the config entry (task database) requests go to
+   */
+  setEntryId(entryId?: string) {
+    this.config.entryId = entryId;
+  }
+
+  /**
+   * Scope an endpoint to the selected config entry, if any
+   */
+  private entryPath(endpoint: string): string {
+    if (!this.config.entryId) return endpoint;
+    return endpoint.replace(
+      "/api/haboard/",
+      `/api/haboard/entry/${encodeURIComponent(this.config.entryId)}/`
+    );
+  }
+
   /**
    * Check if error is retryable
    */
@@ -78,7 +103,7 @@ export class HABoardAPIClient {
     options: RequestInit = {},
     retryCount = 0
   ): Promise<T> {
-    const url = `${this.config.baseUrl}${endpoint}`;
+    const url = `${this.config.baseUrl}${this.entryPath(endpoint)}`;
 
     const headers: Record<string, string> = {
       "Content-Type": "application/json",
@@ -158,6 +183,10 @@ export class HABoardAPIClient {
     tag?: string;
     limit?: number;
     offset?: number;
+    board_id?: string;
+    list_id?: string;
+    order?: "due" | "manual";
+    top_level?: boolean;
   }): Promise<Task[]> {
     const searchParams = new URLSearchParams();
 
@@ -173,6 +202,18 @@ export class HABoardAPIClient {
     if (params?.offset) {
       searchParams.set("offset", params.offset.toString());
     }
+    if (params?.board_id) {
+      searchParams.set("board_id", params.board_id);
+    }
+    if (params?.list_id) {
+      searchParams.set("list_id", params.list_id);
+    }
+    if (params?.order) {
+      searchParams.set("order", params.order);
+    }
+    if (params?.top_level) {
+      searchParams.set("top_level", "true");
+    }
 
     const query = searchParams.toString();
     return this.request<Task[]>(`/api/haboard/tasks${query ? `?${query}` : ""}`);
@@ -209,6 +250,17 @@ export class HABoardAPIClient {
     });
   }
 
+  async getSubtasks(id: string): Promise<Task[]> {
+    return this.request<Task[]>(`/api/haboard/tasks/${id}/subtasks`);
+  }
+
+  async moveTask(id: string, data: MoveTaskRequest): Promise<Task> {
+    return this.request<Task>(`/api/haboard/tasks/${id}/move`, {
+      method: "POST",
+      body: JSON.stringify(data),
+    });
+  }
+
   async searchTasks(params: SearchTasksRequest): Promise<Task[]> {
     return this.request<Task[]>("/api/haboard/tasks/search", {
       method: "POST",
@@ -216,6 +268,32 @@ export class HABoardAPIClient {
     });
   }
 
+  async getAgenda(params?: AgendaRequest): Promise<Agenda> {
+    const searchParams = new URLSearchParams();
+
+    if (params?.from) {
+      searchParams.set("from", params.from);
+    }
+    if (params?.to) {
+      searchParams.set("to", params.to);
+    }
+    if (params?.tz) {
+      searchParams.set("tz", params.tz);
+    }
+    if (params?.overdue !== undefined) {
+      searchParams.set("overdue", params.overdue.toString());
+    }
+    if (params?.limit) {
+      searchParams.set("limit", params.limit.toString());
+    }
+    if (params?.board_id) {
+      searchParams.set("board_id", params.board_id);
+    }
+
+    const query = searchParams.toString();
+    return this.request<Agenda>(`/api/haboard/agenda${query ? `?${query}` : ""}`);
+  }
+
   /**
    * Tag operations
    */
@@ -230,6 +308,51 @@ export class HABoardAPIClient {
       body: JSON.stringify(data),
     });
   }
+
+  /**
+   * Board and list operations
+   */
+
+  async listBoards(): Promise<Board[]> {
+    return this.request<Board[]>("/api/haboard/boards");
+  }
+
+  async createBoard(name: string): Promise<Board> {
+    return this.request<Board>("/api/haboard/boards", {
+      method: "POST",
+      body: JSON.stringify({ name }),
+    });
+  }
+
+  async renameBoard(id: string, name: string): Promise<Board> {
+    return this.request<Board>(`/api/haboard/boards/${id}`, {
+      method: "PUT",
+      body: JSON.stringify({ name }),
+    });
+  }
+
+  async deleteBoard(id: string): Promise<void> {
+    await this.request<void>(`/api/haboard/boards/${id}`, {
+      method: "DELETE",
+    });
+  }
+
+  async listLists(boardId: string): Promise<BoardList[]> {
+    return this.request<BoardList[]>(`/api/haboard/boards/${boardId}/lists`);
+  }
+
+  async createList(boardId: string, name: string): Promise<BoardList> {
+    return this.request<BoardList>(`/api/haboard/boards/${boardId}/lists`, {
+      method: "POST",
+      body: JSON.stringify({ name }),
+    });
+  }
+
+  async deleteList(id: string): Promise<void> {
+    await this.request<void>(`/api/haboard/lists/${id}`, {
+      method: "DELETE",
+    });
+  }
 }
 
 /**
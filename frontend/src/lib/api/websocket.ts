@@ -7,12 +7,14 @@ import type { Task } from "../types/task";
  * WebSocket message types
  */
 export type WSMessage =
-  | { type: "haboard/subscribe"; device_id?: string }
+  | { type: "haboard/subscribe"; device_id?: string; entry_id?: string; board_id?: string }
   | { type: "haboard/unsubscribe" }
   | { type: "haboard/ping" }
   | { type: "haboard/task_created"; task: Task }
   | { type: "haboard/task_updated"; task: Task }
   | { type: "haboard/task_deleted"; task_id: string }
+  | { type: "haboard/tasks_updated"; tasks: Task[] }
+  | { type: "haboard/tasks_deleted"; task_ids: string[] }
   | { type: "haboard/pong" };
 
 /**
@@ -128,9 +130,9 @@ export class HABoardWSClient {
   }
 
   /**
-   * Subscribe to task updates
+   * Subscribe to task updates, of one config entry if entryId is given
    */
-  subscribe(deviceId?: string) {
+  subscribe(deviceId?: string, entryId?: string, boardId?: string) {
     if (!this.authenticated) {
       console.warn("Not authenticated, waiting...");
       return;
@@ -140,6 +142,8 @@ export class HABoardWSClient {
       id: this.messageId++,
       type: "haboard/subscribe",
       device_id: deviceId,
+      entry_id: entryId,
+      board_id: boardId,
     } as any);
   }
 
@@ -187,6 +191,18 @@ export class HABoardWSClient {
         this.handlers.onTaskDeleted?.(message.task_id);
         break;
 
+      case "haboard/tasks_updated":
+        for (const task of message.tasks) {
+          this.handlers.onTaskUpdated?.(task);
+        }
+        break;
+
+      case "haboard/tasks_deleted":
+        for (const taskId of message.task_ids) {
+          this.handlers.onTaskDeleted?.(taskId);
+        }
+        break;
+
       case "haboard/pong":
         // Pong received, connection alive
         break;
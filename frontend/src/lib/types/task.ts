@@ -14,7 +14,15 @@ export interface Task {
   modified_at: string;
   device_id: string;
   version: number;
+  recurrence?: string | null; // RRULE, e.g. "FREQ=WEEKLY;BYDAY=MO"
+  board_id: string; // "default" unless created on another board
+  list_id?: string | null;
+  sort_key?: string | null; // Position in the board's manual order; compare as strings
+  parent_id?: string | null; // Set on subtasks
+  subtask_count?: number; // Direct subtasks
+  subtasks_done?: number; // Completed direct subtasks
   tags: string[];
+  occurrence?: boolean; // Agenda only: a later occurrence of a recurring task
 }
 
 /**
@@ -27,6 +35,26 @@ export interface Tag {
   created_at: string;
 }
 
+/**
+ * Board model: a separate set of tasks
+ */
+export interface Board {
+  id: string;
+  name: string;
+  created_at: string;
+  modified_at: string;
+}
+
+/**
+ * List model: a named group of tasks on a board
+ */
+export interface BoardList {
+  id: string;
+  board_id: string;
+  name: string;
+  created_at: string;
+}
+
 /**
  * API request/response types
  */
@@ -36,7 +64,11 @@ export interface CreateTaskRequest {
   due_date?: string;
   due_time?: string;
   priority?: number;
+  recurrence?: string;
   tags?: string[];
+  board_id?: string;
+  list_id?: string;
+  parent_id?: string;
 }
 
 export interface UpdateTaskRequest {
@@ -46,12 +78,41 @@ export interface UpdateTaskRequest {
   due_time?: string;
   priority?: number;
   completed?: boolean;
+  recurrence?: string | null;
   tags?: string[];
+  board_id?: string;
+  list_id?: string | null;
+  parent_id?: string | null;
+}
+
+/**
+ * Open tasks grouped by when they are due (GET /api/haboard/agenda)
+ */
+export interface Agenda {
+  now: string;
+  overdue: Task[];
+  today: Task[];
+  upcoming: { date: string; tasks: Task[] }[];
+}
+
+export interface AgendaRequest {
+  from?: string; // YYYY-MM-DD, default today
+  to?: string; // YYYY-MM-DD, inclusive, default from + 6 days
+  tz?: string; // IANA time zone, default the Home Assistant time zone
+  overdue?: boolean;
+  limit?: number;
+  board_id?: string;
 }
 
 export interface SearchTasksRequest {
   query: string;
   limit?: number;
+  board_id?: string;
+}
+
+export interface MoveTaskRequest {
+  after_id?: string; // Place right after this task
+  before_id?: string; // Place right before this task (if no after_id)
 }
 
 export interface CreateTagRequest {
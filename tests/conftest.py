@@ -4,8 +4,14 @@ from pathlib import Path
 import tempfile
 import asyncio
 
+from homeassistant.core import HomeAssistant
+
 from custom_components.haboard.database import Database
-from custom_components.haboard.database.repository import TaskRepository, TagRepository
+from custom_components.haboard.database.repository import (
+    BoardRepository,
+    TaskRepository,
+    TagRepository,
+)
 
 
 @pytest.fixture(scope="session")
@@ -41,3 +47,17 @@ async def task_repo(db):
 async def tag_repo(db):
     """Create tag repository fixture."""
     return TagRepository(db.conn)
+
+
+@pytest.fixture
+async def board_repo(db, task_repo):
+    """Create board repository fixture."""
+    return BoardRepository(db.conn, task_repo)
+
+
+@pytest.fixture
+async def hass(tmp_path):
+    """Bare Home Assistant instance (UTC) for timers and the event bus."""
+    hass = HomeAssistant(str(tmp_path))
+    yield hass
+    await hass.async_stop(force=True)
@@ -3,7 +3,15 @@ import pytest
 from pathlib import Path
 import tempfile
 
-from custom_components.haboard.database import Database, get_database
+import aiosqlite
+
+from custom_components.haboard.database import SCHEMA_FILE, Database, get_database
+from custom_components.haboard.database.migrations import MIGRATIONS, Migration
+from custom_components.haboard.database.template import (
+    async_build_template,
+    schema_fingerprint,
+    write_template,
+)
 
 
 @pytest.mark.asyncio
@@ -35,7 +43,7 @@ async def test_database_schema_initialization(db):
     # Check current version
     cursor = await db.execute("SELECT MAX(version) as version FROM schema_version")
     row = await cursor.fetchone()
-    assert row["version"] == 1
+    assert row["version"] == MIGRATIONS[-1].version
 
 
 @pytest.mark.asyncio
@@ -65,3 +73,120 @@ async def test_get_database():
         assert (config_dir / ".storage" / "haboard.db").exists()
 
         await db.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_database_warm_up(db):
+    """Test warm-up checks the FTS index and reports step timings."""
+    timings = await db.async_warm_up()
+
+    assert set(timings) == {"fts_integrity_check", "cache_priming"}
+
+
+@pytest.mark.asyncio
+async def test_database_warm_up_rebuilds_damaged_fts(db, task_repo, caplog):
+    """Test warm-up rebuilds an FTS index that is out of sync."""
+    from custom_components.haboard.database.models import Task
+
+    task = Task(title="Buy milk", device_id="test")
+    await task_repo.create(task)
+
+    # Remove the row from the index with the wrong values to damage it
+    cursor = await db.execute("SELECT rowid FROM tasks WHERE id = ?", (task.id,))
+    rowid = (await cursor.fetchone())[0]
+    await db.execute(
+        "INSERT INTO tasks_fts(tasks_fts, rowid, title, notes) "
+        "VALUES('delete', ?, 'other', NULL)",
+        (rowid,),
+    )
+    await db.commit()
+
+    await db.async_warm_up()
+
+    assert "rebuilding" in caplog.text
+    assert [t.id for t in await task_repo.search("milk")] == [task.id]
+    # The rebuilt index passes the check again
+    caplog.clear()
+    await db.async_warm_up()
+    assert "rebuilding" not in caplog.text
+
+
+async def _schema_objects(conn):
+    cursor = await conn.execute(
+        "SELECT type, name, sql FROM sqlite_master ORDER BY type, name"
+    )
+    return [tuple(row) for row in await cursor.fetchall()]
+
+
+@pytest.mark.asyncio
+async def test_template_matches_schema_script(db, tmp_path):
+    """Test that databases copied from the template match a scripted build."""
+    scripted = Database(tmp_path / "scripted.db")
+    scripted._conn = await aiosqlite.connect(str(scripted.db_path))
+    scripted._conn.row_factory = aiosqlite.Row
+    try:
+        await scripted._initialize_schema()
+        assert await _schema_objects(db.conn) == await _schema_objects(scripted.conn)
+
+        cursor = await db.execute("SELECT version, status FROM schema_version")
+        assert [tuple(row) for row in await cursor.fetchall()] == [(1, "complete")] + [
+            (migration.version, "complete") for migration in MIGRATIONS
+        ]
+    finally:
+        await scripted.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_template_follows_migration_chain(tmp_path):
+    """Test that the template is rebuilt from and stamped with the migration chain."""
+
+    async def add_column(conn):
+        await conn.execute("ALTER TABLE tasks ADD COLUMN archived INTEGER DEFAULT 0")
+
+    chain = [Migration(version=2, description="Add archived", upgrade=add_column)]
+    schema_sql = SCHEMA_FILE.read_text()
+    assert schema_fingerprint(schema_sql, chain) != schema_fingerprint(schema_sql)
+
+    db_path = tmp_path / "new.db"
+    write_template(await async_build_template(schema_sql, chain), db_path)
+
+    async with aiosqlite.connect(db_path) as conn:
+        cursor = await conn.execute("SELECT MAX(version) FROM schema_version")
+        assert (await cursor.fetchone())[0] == 2
+        await conn.execute("SELECT archived FROM tasks")
+
+
+@pytest.mark.asyncio
+async def test_database_maintenance(db, task_repo):
+    """Test that maintenance releases free pages and truncates the WAL."""
+    from custom_components.haboard.database.models import Task
+
+    tasks = [Task(title=f"Task {i}", notes="x" * 500, device_id="test") for i in range(500)]
+    await task_repo.bulk_create(tasks)
+    for task in tasks[:400]:
+        await task_repo.delete(task.id)
+
+    cursor = await db.execute("PRAGMA auto_vacuum")
+    assert (await cursor.fetchone())[0] == 2  # INCREMENTAL
+
+    steps = await db.async_run_maintenance()
+
+    assert [step.name for step in steps] == [
+        "fts_merge",
+        "optimize",
+        "incremental_vacuum",
+        "wal_checkpoint",
+    ]
+    assert all(step.complete for step in steps)
+    assert next(step for step in steps if step.name == "incremental_vacuum").work > 0
+    # Both FTS indexes are merged
+    assert next(step for step in steps if step.name == "fts_merge").work >= 2
+    for table in ("tasks_fts", "tasks_archive_fts"):
+        cursor = await db.execute(f"SELECT v FROM {table}_config WHERE k = 'automerge'")
+        assert (await cursor.fetchone())[0] == 8
+
+    cursor = await db.execute("PRAGMA freelist_count")
+    assert (await cursor.fetchone())[0] == 0
+    wal = db.db_path.with_name(db.db_path.name + "-wal")
+    assert not wal.exists() or wal.stat().st_size == 0
+    assert len(await task_repo.search("Task", limit=500)) == 100
@@ -0,0 +1,106 @@
+"""Tests for running several HABoard config entries side by side."""
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from aiohttp import web
+import pytest
+
+from custom_components.haboard.api.views import TaskListView
+from custom_components.haboard.api.websocket import (
+    WebSocketManager,
+    websocket_subscribe,
+    websocket_unsubscribe,
+)
+from custom_components.haboard.config_flow import database_name
+from custom_components.haboard.const import DEFAULT_DATABASE, DOMAIN
+from custom_components.haboard.database import get_database
+from custom_components.haboard.database.models import Task
+from custom_components.haboard.database.repository import TagRepository, TaskRepository
+
+
+def test_database_name():
+    """Test that the first entry keeps the original database file."""
+    assert database_name("haboard", set()) == DEFAULT_DATABASE
+    assert database_name("work", {DEFAULT_DATABASE}) == "haboard_work.db"
+
+
+@pytest.mark.asyncio
+async def test_entries_route_to_their_own_database(hass, tmp_path):
+    """Test that each entry writes to its own file and views pick it by URL."""
+    hass.data[DOMAIN] = {}
+    for entry_id, name in (("home", DEFAULT_DATABASE), ("work", "haboard_work.db")):
+        db = await get_database(tmp_path, name)
+        hass.data[DOMAIN][entry_id] = {
+            "db": db,
+            "task_repo": TaskRepository(db.conn),
+            "tag_repo": TagRepository(db.conn),
+        }
+    try:
+        work_repo = hass.data[DOMAIN]["work"]["task_repo"]
+        await work_repo.create(Task(title="Report", device_id="test"))
+        assert (tmp_path / ".storage" / "haboard_work.db").exists()
+
+        view = TaskListView()
+        request = SimpleNamespace(app={"hass": hass})
+        home_repo, _ = view._get_repos(request)
+        assert home_repo is hass.data[DOMAIN]["home"]["task_repo"]
+        assert await home_repo.list() == []
+        repo, _ = view._get_repos(request, "work")
+        assert [task.title for task in await repo.list()] == ["Report"]
+        with pytest.raises(web.HTTPNotFound):
+            view._get_repos(request, "missing")
+    finally:
+        for data in hass.data[DOMAIN].values():
+            await data["db"].disconnect()
+
+
+def test_broadcasts_name_their_entry(hass):
+    """Test that WebSocket events carry the entry they belong to."""
+    connection = Mock(id=1, subscriptions={"haboard_subscriptions": {"test"}})
+    manager = WebSocketManager(hass, "work")
+    manager.register_connection(connection)
+
+    manager.broadcast_task_deleted("task-1")
+    manager.broadcast_tasks_updated([{"id": "task-2"}])
+    sent = [call.args[0]["event"] for call in connection.send_message.call_args_list]
+    assert [message["entry_id"] for message in sent] == ["work", "work"]
+
+
+def test_broadcasts_skip_other_boards(hass):
+    """Test that connections subscribed to one board only get its task events."""
+    board = Mock(id=1, subscriptions={"haboard_subscriptions": {"test"}})
+    everything = Mock(id=2, subscriptions={"haboard_subscriptions": {"test"}})
+    manager = WebSocketManager(hass, "home")
+    manager.register_connection(board, board_id="work")
+    manager.register_connection(everything)
+
+    manager.broadcast_task_created({"id": "task-1", "board_id": "default"})
+    manager.broadcast_tasks_updated(
+        [{"id": "task-2", "board_id": "work"}, {"id": "task-3", "board_id": "default"}]
+    )
+    sent = [call.args[0]["event"] for call in board.send_message.call_args_list]
+    assert [[task["id"] for task in message["tasks"]] for message in sent] == [["task-2"]]
+    assert everything.send_message.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_closed_connections_are_unregistered(hass):
+    """Test that unsubscribing per entry and closing the connection unregister it."""
+    managers = {entry_id: WebSocketManager(hass, entry_id) for entry_id in ("home", "work")}
+    hass.data[DOMAIN] = {entry_id: {"ws_manager": m} for entry_id, m in managers.items()}
+    connection = Mock(id=1, subscriptions={})
+
+    websocket_subscribe(hass, connection, {"id": 1, "format": "json"})
+    await hass.async_block_till_done()
+    assert all(connection in m._connections for m in managers.values())
+
+    websocket_unsubscribe(hass, connection, {"id": 2, "entry_id": "work"})
+    await hass.async_block_till_done()
+    assert connection.send_result.call_args.args == (2, {"subscribed": True})
+    assert connection not in managers["work"]._connections
+    assert connection in managers["home"]._connections
+
+    # What Home Assistant does when the connection closes
+    for unsubscribe in connection.subscriptions.values():
+        unsubscribe()
+    assert not any(m._connections for m in managers.values())
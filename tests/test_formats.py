@@ -0,0 +1,109 @@
+"""Tests for export/import formats."""
+import pytest
+
+from custom_components.haboard.api.formats import (
+    EXPORT_FORMATS,
+    FORMAT_CSV,
+    FORMAT_ICS,
+    FORMAT_NDJSON,
+    IMPORT_PARSERS,
+)
+from custom_components.haboard.database.models import Task
+
+
+async def _lines(data: bytes):
+    """Yield raw lines like aiohttp's StreamReader does."""
+    for line in data.splitlines(keepends=True):
+        yield line
+
+
+async def _round_trip(fmt: str, tasks: list[Task]) -> list[Task]:
+    export_format = EXPORT_FORMATS[fmt]
+    data = export_format.header + export_format.encode(tasks) + export_format.footer
+    return [task async for task in IMPORT_PARSERS[fmt](_lines(data))]
+
+
+def _sample_tasks() -> list[Task]:
+    parent = Task(
+        title='Buy milk, "fresh"',
+        notes="Line one\nLine two; with ümlauts " + "x" * 100,
+        due_date="2024-12-25",
+        due_time="14:30:00",
+        priority=3,
+        created_at=1734688800000,  # 2024-12-20T10:00:00Z
+        modified_at=1734692400000,
+        device_id="test",
+        recurrence="FREQ=WEEKLY;BYDAY=WE",
+        subtask_count=1,
+        subtasks_done=1,
+        tags=["grocery", "a,b"],
+    )
+    return [
+        parent,
+        Task(
+            title="Done",
+            due_date="2024-12-26",
+            priority=1,
+            completed=True,
+            completed_at=1734771600000,
+            created_at=1734688800000,
+            modified_at=1734771600000,
+            device_id="test",
+            parent_id=parent.id,
+        ),
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fmt", [FORMAT_NDJSON, FORMAT_CSV])
+async def test_lossless_round_trip(fmt):
+    """Test that NDJSON and CSV preserve every field."""
+    tasks = _sample_tasks()
+
+    decoded = await _round_trip(fmt, tasks)
+
+    assert [task.to_dict() for task in decoded] == [task.to_dict() for task in tasks]
+
+
+@pytest.mark.asyncio
+async def test_ics_round_trip():
+    """Test that iCalendar preserves the fields VTODO can represent."""
+    tasks = _sample_tasks()
+
+    decoded = await _round_trip(FORMAT_ICS, tasks)
+
+    for original, task in zip(tasks, decoded, strict=True):
+        assert task.id == original.id
+        assert task.title == original.title
+        assert task.notes == original.notes
+        assert task.due_date == original.due_date
+        assert task.due_time == original.due_time
+        assert task.priority == original.priority
+        assert task.completed == original.completed
+        assert task.completed_at == original.completed_at
+        assert task.created_at == original.created_at
+        assert task.recurrence == original.recurrence
+        assert task.parent_id == original.parent_id
+        assert task.tags == original.tags
+
+
+@pytest.mark.asyncio
+async def test_ics_lines_are_folded():
+    """Test that long iCalendar lines are folded at 75 octets."""
+    data = EXPORT_FORMATS[FORMAT_ICS].encode(_sample_tasks())
+
+    assert all(len(line) <= 75 for line in data.split(b"\r\n"))
+
+
+@pytest.mark.asyncio
+async def test_csv_requires_title_column():
+    """Test that CSV without a title column is rejected."""
+    with pytest.raises(ValueError):
+        [task async for task in IMPORT_PARSERS[FORMAT_CSV](_lines(b"foo,bar\n1,2\n"))]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_rejects_invalid_line():
+    """Test that a malformed NDJSON line reports its line number."""
+    with pytest.raises(ValueError, match="Line 2"):
+        [task async for task in IMPORT_PARSERS[FORMAT_NDJSON](_lines(b'{"title": "a"}\n{oops\n'))]
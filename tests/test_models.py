@@ -0,0 +1,110 @@
+"""Tests for models module."""
+import json
+import uuid
+
+import pytest
+
+from custom_components.haboard.database.models import (
+    TASK_WIRE_KEYS,
+    Tag,
+    Task,
+    decode_columnar,
+    encode_columnar,
+    encode_columnar_dicts,
+    to_epoch_ms,
+    uuid7,
+)
+
+
+def test_columnar_round_trip():
+    """Test that tasks survive a columnar encode/decode round trip."""
+    tasks = [
+        Task(title="Buy milk", notes="2L", priority=2, tags=["grocery"], device_id="a"),
+        Task(title="Call mom", completed=True, completed_at=1704103200000),
+    ]
+
+    payload = json.loads(json.dumps(encode_columnar(tasks)))
+
+    assert payload["keys"] == list(TASK_WIRE_KEYS)
+    assert len(payload["rows"]) == 2
+    assert [task.to_dict() for task in decode_columnar(payload)] == [
+        task.to_dict() for task in tasks
+    ]
+
+
+def test_columnar_keys_match_to_dict():
+    """Test that the columnar keys and to_dict stay in sync."""
+    task = Task(title="Test", tags=["a", "b"])
+
+    assert tuple(task.to_dict()) == TASK_WIRE_KEYS
+    assert encode_columnar_dicts([task.to_dict()]) == encode_columnar([task])
+
+
+def test_columnar_decode_uses_payload_key_order():
+    """Test that decoding follows the keys sent in the payload."""
+    payload = {"keys": ["title", "id"], "rows": [["Reordered", "task-1"]]}
+
+    (task,) = decode_columnar(payload)
+
+    assert task.id == "task-1"
+    assert task.title == "Reordered"
+
+
+def test_columnar_decode_rejects_malformed_payload():
+    """Test that malformed payloads raise ValueError."""
+    with pytest.raises(ValueError):
+        decode_columnar({"rows": []})
+
+    with pytest.raises(ValueError):
+        decode_columnar({"keys": ["id", "title"], "rows": [["only-id"]]})
+
+
+def test_models_are_slotted():
+    """Test that models do not carry a per-instance __dict__."""
+    assert not hasattr(Task(), "__dict__")
+    assert not hasattr(Tag(), "__dict__")
+
+
+def test_from_dict_keeps_provided_id_and_timestamps():
+    """Test that from_dict only generates values for missing keys."""
+    task = Task.from_dict(
+        {"id": "abc", "created_at": 1734688800000, "modified_at": 1734688800123}
+    )
+
+    assert (task.id, task.created_at, task.modified_at) == (
+        "abc",
+        1734688800000,
+        1734688800123,
+    )
+    assert Task.from_dict({}).id
+
+
+def test_timestamps_stored_as_epoch_ms():
+    """Test that ISO timestamps are parsed to epoch ms and rendered back as UTC."""
+    task = Task.from_dict(
+        {
+            "created_at": "2024-12-20T10:00:00",  # Naive: UTC, as older versions wrote
+            "modified_at": "2024-12-20T12:00:00.123+02:00",
+            "completed_at": None,
+        }
+    )
+
+    assert (task.created_at, task.modified_at) == (1734688800000, 1734688800123)
+    assert task.to_dict()["modified_at"] == "2024-12-20T10:00:00.123Z"
+    assert task.to_dict()["completed_at"] is None
+    assert Task.from_dict(task.to_dict()).modified_at == task.modified_at
+    assert to_epoch_ms("2024-12-20 10:00:00") == task.created_at
+
+    with pytest.raises(ValueError):
+        Task.from_dict({"created_at": "yesterday"})
+
+
+def test_uuid7_time_ordered():
+    """Test that generated IDs are valid version 7 UUIDs in creation order."""
+    ids = [uuid7() for _ in range(5000)]
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert all(uuid.UUID(value).version == 7 for value in ids[:10])
+    assert Task().id > ids[-1]
+    assert Tag(name="x").id > ids[-1]
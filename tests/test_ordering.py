@@ -0,0 +1,79 @@
+"""Tests for fractional ordering keys."""
+import random
+
+import pytest
+
+from custom_components.haboard.database.ordering import (
+    FIRST_KEY,
+    key_between,
+    keys_between,
+)
+
+
+def test_append_and_prepend_stay_short():
+    """Test that adding at either end increments or decrements the integer part."""
+    assert key_between(None, None) == FIRST_KEY == "a0"
+    assert key_between("a0", None) == "a1"
+    assert key_between("az", None) == "b00"
+    assert key_between(None, "a0") == "Zz"
+    assert key_between(None, "Zz") == "Zy"
+
+    keys = [FIRST_KEY]
+    for _ in range(1000):
+        keys.append(key_between(keys[-1], None))
+    assert keys == sorted(keys)
+    assert max(len(key) for key in keys) == 3
+
+
+def test_key_between_neighbours():
+    """Test that inserted keys sort strictly between their neighbours."""
+    assert key_between("a0", "a1") == "a0V"
+    assert key_between("a0", "a0V") == "a0G"
+    assert key_between("a0V", "a1") == "a0l"
+    assert key_between("a0", "b10") == "a1"
+
+    rng = random.Random(1)
+    keys = [FIRST_KEY]
+    for _ in range(2000):
+        i = rng.randrange(len(keys) + 1)
+        key = key_between(keys[i - 1] if i else None, keys[i] if i < len(keys) else None)
+        keys.insert(i, key)
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+
+
+def test_repeated_inserts_into_one_gap():
+    """Test that keys grow by about one character per six inserts into a gap."""
+    low, high = "a0", "a1"
+    for _ in range(60):
+        high = key_between(low, high)
+        assert low < high
+    assert len(high) <= 14
+
+
+@pytest.mark.parametrize(
+    ("a", "b"),
+    [("a1", "a0"), ("a0", "a0"), ("", None), ("a", None), ("a0V0", None), ("a0!", None)],
+)
+def test_invalid_keys(a, b):
+    """Test that malformed or misordered keys are rejected."""
+    with pytest.raises(ValueError):
+        key_between(a, b)
+
+
+def test_keys_between():
+    """Test evenly spread keys for bulk inserts and rebalancing."""
+    assert keys_between(None, None, 0) == []
+    assert keys_between(None, None, 3) == ["a0", "a1", "a2"]
+    assert keys_between("a5", None, 2) == ["a6", "a7"]
+    assert keys_between(None, "a0", 2) == ["Zy", "Zz"]
+
+    keys = keys_between("a0", "a1", 100)
+    assert keys == sorted(keys)
+    assert len(set(keys)) == 100
+    assert all("a0" < key < "a1" for key in keys)
+    assert max(len(key) for key in keys) <= 5
+
+    keys = keys_between(None, None, 10000)
+    assert keys == sorted(keys)
+    assert max(len(key) for key in keys) == 4
@@ -0,0 +1,232 @@
+"""Query plan regression tests for the hot task queries.
+
+Each query must be answered from an index: a table scan without an index
+or a temp B-tree sort means an index was dropped or a query was changed in
+a way the indexes no longer serve.
+"""
+import pytest
+
+
+async def _plan(conn, sql, params=()):
+    cursor = await conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+    return [row[3] for row in await cursor.fetchall()]
+
+
+def _assert_indexed(plan, sorted_rows=True):
+    for step in plan:
+        if step.startswith("SCAN") and "INDEX" not in step:
+            raise AssertionError(f"Full table scan: {step} in {plan}")
+        if sorted_rows and "TEMP B-TREE" in step:
+            raise AssertionError(f"Sort not served by an index: {step} in {plan}")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("completed", "index"),
+    [(None, "idx_tasks_due"), (False, "idx_tasks_open_due"), (True, "idx_tasks_due")],
+)
+async def test_list_plan(task_repo, completed, index):
+    """Test that task lists are read in order from the list indexes."""
+    sql, params = task_repo._build_list_query(completed, None, 100, 0)
+    plan = await _plan(task_repo.conn, sql, params)
+
+    _assert_indexed(plan)
+    assert f"USING INDEX {index}" in plan[0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("filters", "index"),
+    [({"board_id": "default"}, "idx_tasks_board_due"), ({"list_id": "x"}, "idx_tasks_list")],
+)
+async def test_board_list_plan(task_repo, filters, index):
+    """Test that board and list pages read only that board's or list's tasks."""
+    sql, params = task_repo._build_list_query(False, None, 100, 0, **filters)
+    plan = await _plan(task_repo.conn, sql, params)
+
+    _assert_indexed(plan)
+    assert f"USING INDEX {index} (" in plan[0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("filters", "index"),
+    [
+        ({"board_id": "default"}, "idx_tasks_board_order"),
+        ({"list_id": "x"}, "idx_tasks_list_order"),
+    ],
+)
+async def test_manual_order_plan(task_repo, filters, index):
+    """Test that manually ordered pages are read in key order from the order indexes."""
+    sql, params = task_repo._build_list_query(None, None, 100, 0, manual_order=True, **filters)
+    plan = await _plan(task_repo.conn, sql, params)
+
+    _assert_indexed(plan)
+    assert f"USING INDEX {index} (" in plan[0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "SELECT sort_key FROM tasks WHERE board_pk = ? AND sort_key > ? "
+        "AND rowid != ? ORDER BY sort_key LIMIT 1",
+        "SELECT sort_key FROM tasks WHERE board_pk = ? AND sort_key < ? "
+        "AND rowid != ? ORDER BY sort_key DESC LIMIT 1",
+    ],
+)
+async def test_move_neighbour_plans(db, sql):
+    """Test that a move finds its new neighbours with a seek, not a sort."""
+    plan = await _plan(db.conn, sql, (1, "a0", 1))
+
+    _assert_indexed(plan)
+    assert "COVERING INDEX idx_tasks_board_order (board_pk=? AND sort_key" in plan[0]
+
+
+@pytest.mark.asyncio
+async def test_subtree_plan(db):
+    """Test that each level of a subtree is a seek into the parent index."""
+    from custom_components.haboard.database.repository import SUBTREE_PKS
+
+    sql = f"SELECT id FROM tasks WHERE pk IN ({SUBTREE_PKS.format(condition='id = ?')})"
+    plan = await _plan(db.conn, sql, ("abc",))
+
+    # The recursive step reads the queue of the CTE itself, not a table
+    _assert_indexed([step for step in plan if step not in ("SCAN s", "SCAN subtree")])
+    assert "SEARCH t USING COVERING INDEX idx_tasks_parent (parent_pk=?)" in plan
+
+
+@pytest.mark.asyncio
+async def test_keyset_list_plan(task_repo):
+    """Test that keyset pages seek into the ID index instead of sorting."""
+    sql, params = task_repo._build_list_query(None, None, 100, 0, after="abc")
+    plan = await _plan(task_repo.conn, sql, params)
+
+    _assert_indexed(plan)
+    assert "(id>?)" in plan[0]
+
+
+@pytest.mark.asyncio
+async def test_list_by_tag_plan(task_repo):
+    """Test that tag filters look tasks up by ID instead of scanning.
+
+    Only the tasks carrying the tag are sorted, so a temp B-tree is fine.
+    """
+    sql, params = task_repo._build_list_query(False, "home", 100, 0)
+    plan = await _plan(task_repo.conn, sql, params)
+
+    _assert_indexed(plan, sorted_rows=False)
+    assert any("COVERING INDEX idx_task_tags_tag" in step for step in plan)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("sql", "params"),
+    [
+        # get()
+        ("SELECT * FROM tasks t WHERE t.id = ?", ("id",)),
+        # search()
+        (
+            "SELECT * FROM tasks t WHERE t.rowid IN "
+            "(SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?)",
+            ("milk",),
+        ),
+        # search() on one board
+        (
+            "SELECT * FROM tasks t WHERE t.rowid IN "
+            "(SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?)",
+            ('board_pk : "1" AND {title notes} : (milk)',),
+        ),
+        # iter_all()
+        ("SELECT * FROM tasks t ORDER BY t.id", ()),
+        ("SELECT * FROM tasks_archive a ORDER BY a.id", ()),
+        # archive_completed()
+        (
+            "SELECT id FROM tasks WHERE completed = 1 AND completed_at < ? "
+            "ORDER BY completed_at LIMIT ?",
+            (1577836800000, 500),
+        ),
+        # list_recurring()
+        (
+            "SELECT * FROM tasks t WHERE t.completed = 0 AND t.recurrence IS NOT NULL "
+            "AND t.due_date <= ? ORDER BY t.due_date",
+            ("2024-12-31",),
+        ),
+        # Task statistics: completed today, completion series
+        (
+            "SELECT COUNT(*) FROM tasks WHERE completed = 1 AND completed_at >= ?",
+            (1577836800000,),
+        ),
+        (
+            "SELECT completed_at FROM tasks "
+            "WHERE completed = 1 AND completed_at >= ? ORDER BY completed_at",
+            (1577836800000,),
+        ),
+        # completion_history()
+        (
+            "SELECT day, completed FROM completion_daily "
+            "WHERE tag = ? AND day BETWEEN ? AND ? AND completed > 0 ORDER BY day",
+            ("", "2024-01-01", "2024-12-31"),
+        ),
+        # Last sort key of a board, for new tasks
+        ("SELECT MAX(sort_key) FROM tasks WHERE board_pk = ?", (1,)),
+        # Tag names of one task
+        (
+            "SELECT json_group_array(tag.name) FROM task_tags tt "
+            "JOIN tags tag ON tag.pk = tt.tag_pk WHERE tt.task_pk = ?",
+            (1,),
+        ),
+    ],
+)
+async def test_lookup_plans(db, sql, params):
+    """Test that single-task lookups, search, export and archival use indexes."""
+    _assert_indexed(await _plan(db.conn, sql, params))
+
+
+@pytest.mark.asyncio
+async def test_agenda_plans(task_repo):
+    """Test that agenda windows are range scans returned in agenda order."""
+    for sql, params in (
+        task_repo._build_overdue_query("2024-12-20", "10:00:00", 500),
+        task_repo._build_due_query("2024-12-20", "2024-12-27", "10:00:00", 500),
+    ):
+        plan = await _plan(task_repo.conn, sql, params)
+
+        _assert_indexed(plan)
+        assert "USING INDEX idx_tasks_open_agenda (due_date" in plan[0]
+
+
+@pytest.mark.asyncio
+async def test_board_agenda_plans(task_repo):
+    """Test that agenda windows of one board are range scans of that board."""
+    for sql, params in (
+        task_repo._build_overdue_query("2024-12-20", "10:00:00", 500, "default"),
+        task_repo._build_due_query("2024-12-20", "2024-12-27", "10:00:00", 500, "default"),
+    ):
+        plan = await _plan(task_repo.conn, sql, params)
+
+        _assert_indexed(plan)
+        assert "USING INDEX idx_tasks_board_open_agenda (board_pk=? AND due_date" in plan[0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("selectors"),
+    [
+        {"task_ids": ["a", "b"]},
+        {"tag": "home"},
+        {"query": "milk"},
+        {"board_id": "default"},
+    ],
+)
+async def test_batch_selector_plans(task_repo, selectors):
+    """Test that batch services find their tasks by key instead of scanning."""
+    selector, params = task_repo._build_selector(
+        selectors.get("task_ids"),
+        selectors.get("tag"),
+        selectors.get("query"),
+        selectors.get("board_id"),
+    )
+    plan = await _plan(task_repo.conn, f"SELECT id FROM tasks WHERE {selector}", params)
+
+    _assert_indexed(plan)
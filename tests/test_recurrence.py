@@ -0,0 +1,145 @@
+"""Tests for recurring task rules."""
+import pytest
+
+from custom_components.haboard.database.models import Task
+from custom_components.haboard.database.recurrence import (
+    advance,
+    expand_occurrences,
+    next_occurrence,
+    occurrences_between,
+    parse_rule,
+)
+
+
+def test_parse_rule_canonical_form():
+    """Test that rules are parsed and rendered in canonical order."""
+    rule = parse_rule("rrule:byday=th,mo;freq=weekly;interval=2")
+
+    assert rule.freq == "WEEKLY"
+    assert rule.by_day == (0, 3)
+    assert str(rule) == "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH"
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "FREQ=HOURLY",
+        "FREQ=DAILY;INTERVAL=0",
+        "FREQ=DAILY;BYHOUR=9",
+        "FREQ=MONTHLY;BYDAY=2TU",
+        "FREQ=DAILY;COUNT=3;UNTIL=20250101",
+        "FREQ=MONTHLY;BYMONTHDAY=32",
+    ],
+)
+def test_parse_rule_rejects_unsupported(text):
+    """Test that malformed and unsupported rules raise ValueError."""
+    with pytest.raises(ValueError):
+        parse_rule(text)
+
+
+@pytest.mark.parametrize(
+    ("rule", "dtstart", "start", "end", "expected"),
+    [
+        (
+            "FREQ=DAILY;INTERVAL=3",
+            "2024-01-01",
+            "2024-12-30",
+            "2025-01-06",
+            ("2025-01-01", "2025-01-04"),
+        ),
+        (
+            "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH",
+            "2024-12-05",
+            "2024-12-01",
+            "2024-12-31",
+            ("2024-12-05", "2024-12-16", "2024-12-19", "2024-12-30"),
+        ),
+        (
+            "FREQ=MONTHLY",
+            "2024-01-31",
+            "2024-01-01",
+            "2024-06-30",
+            ("2024-01-31", "2024-03-31", "2024-05-31"),
+        ),
+        (
+            "FREQ=MONTHLY;BYMONTHDAY=1,-1",
+            "2024-02-01",
+            "2024-02-01",
+            "2024-03-31",
+            ("2024-02-01", "2024-02-29", "2024-03-01", "2024-03-31"),
+        ),
+        (
+            "FREQ=YEARLY",
+            "2024-02-29",
+            "2024-01-01",
+            "2032-12-31",
+            ("2024-02-29", "2028-02-29", "2032-02-29"),
+        ),
+        (
+            "FREQ=DAILY;COUNT=3",
+            "2024-12-01",
+            "2024-12-02",
+            "2024-12-31",
+            ("2024-12-02", "2024-12-03"),
+        ),
+        (
+            "FREQ=WEEKLY;UNTIL=20241215",
+            "2024-12-01",
+            "2024-12-01",
+            "2024-12-31",
+            ("2024-12-01", "2024-12-08", "2024-12-15"),
+        ),
+    ],
+)
+def test_occurrences_between(rule, dtstart, start, end, expected):
+    """Test window expansion, including windows far from the start."""
+    assert occurrences_between(rule, dtstart, start, end) == expected
+
+
+def test_advance_moves_to_next_occurrence():
+    """Test that completing an occurrence persists only the next one."""
+    task = Task(title="Bins", due_date="2024-12-30", recurrence="FREQ=WEEKLY;COUNT=2")
+
+    assert advance(task)
+    assert task.due_date == "2025-01-06"
+    assert task.recurrence == "FREQ=WEEKLY;COUNT=1"
+    assert next_occurrence(task.recurrence, task.due_date) is None
+    assert not advance(task)
+
+
+def test_expand_occurrences_skips_stored_occurrence():
+    """Test that expansion returns only the occurrences after the stored one."""
+    daily = Task(title="Daily", due_date="2024-12-20", recurrence="FREQ=DAILY", priority=1)
+    weekly = Task(title="Weekly", due_date="2024-12-21", recurrence="FREQ=WEEKLY", priority=3)
+    one_off = Task(title="Once", due_date="2024-12-21")
+
+    occurrences = expand_occurrences([daily, weekly, one_off], "2024-12-20", "2024-12-22")
+
+    assert [(task.title, task.due_date) for task in occurrences] == [
+        ("Daily", "2024-12-21"),
+        ("Daily", "2024-12-22"),
+    ]
+    assert all(task.id == daily.id for task in occurrences)
+    assert daily.due_date == "2024-12-20"
+
+
+def test_occurrences_keep_every_field():
+    """Test that an expanded occurrence differs from its series only in the due date."""
+    series = Task(
+        title="Standup",
+        due_date="2024-12-20",
+        recurrence="FREQ=DAILY",
+        board_id="work",
+        list_id="this-week",
+        sort_key="a3",
+        tags=["meetings", "team"],
+    )
+
+    (occurrence,) = expand_occurrences([series], "2024-12-21", "2024-12-21")
+
+    assert occurrence.due_date == "2024-12-21"
+    assert (occurrence.board_id, occurrence.list_id) == ("work", "this-week")
+    assert occurrence.tags == ["meetings", "team"]
+    occurrence.due_date = series.due_date
+    assert occurrence == series
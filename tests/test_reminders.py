@@ -0,0 +1,109 @@
+"""Tests for the due-task reminder scheduler."""
+import asyncio
+from datetime import timedelta
+import time
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.haboard.const import EVENT_TASK_DUE
+from custom_components.haboard.database.models import Task
+from custom_components.haboard.reminders import ReminderScheduler
+
+
+def _pending_timers(hass) -> int:
+    return sum(not handle.cancelled() for handle in hass.loop._scheduled)
+
+
+def _due_in(seconds: float) -> tuple[str, str]:
+    """Local (UTC) due date and time a number of seconds from now."""
+    due = dt_util.utcnow() + timedelta(seconds=seconds)
+    return due.date().isoformat(), due.strftime("%H:%M:%S")
+
+
+@pytest.mark.asyncio
+async def test_reminder_fires_once_when_due(hass, task_repo):
+    """Test that a task fires one event when due, and not after completion."""
+    events = []
+    hass.bus.async_listen(EVENT_TASK_DUE, events.append)
+    scheduler = ReminderScheduler(hass, task_repo, "entry")
+    await scheduler.async_start()
+
+    due_date, due_time = _due_in(1.5)
+    task = await task_repo.create(
+        Task(title="Take out bins", due_date=due_date, due_time=due_time, device_id="test")
+    )
+    done_date, done_time = _due_in(1.5)
+    done = await task_repo.create(
+        Task(title="Already done", due_date=done_date, due_time=done_time, device_id="test")
+    )
+    done.completed = True
+    await task_repo.update(done)
+    assert len(scheduler) == 1
+
+    await asyncio.sleep(2.5)
+    await hass.async_block_till_done()
+
+    assert [event.data["task_id"] for event in events] == [task.id]
+    assert events[0].data["title"] == "Take out bins"
+    assert len(scheduler) == 0
+    assert scheduler.next_deadline is None
+    scheduler.async_stop()
+
+
+@pytest.mark.asyncio
+async def test_reminders_rearm_on_writes(hass, task_repo):
+    """Test that only the earliest deadline is armed as tasks change."""
+    scheduler = ReminderScheduler(hass, task_repo, "entry")
+    await scheduler.async_start()
+
+    later = Task(title="Later", due_date="2999-01-02", due_time="10:00:00", device_id="test")
+    sooner = Task(title="Sooner", due_date="2999-01-01", device_id="test")
+    await task_repo.bulk_create([later, sooner])
+    assert scheduler.next_deadline == scheduler._deadline(
+        "2999-01-01", None, dt_util.UTC
+    )
+
+    await task_repo.delete(sooner.id)
+    assert scheduler.next_deadline == scheduler._deadline(
+        "2999-01-02", "10:00:00", dt_util.UTC
+    )
+
+    later.due_date = None
+    await task_repo.update(later)
+    assert scheduler.next_deadline is None
+    assert len(scheduler) == 0
+    scheduler.async_stop()
+
+
+@pytest.mark.asyncio
+async def test_idle_cost_is_one_timer_for_100k_tasks(hass, db, task_repo):
+    """Test that 100k upcoming tasks cost a single timer and no work while idle."""
+    await db.execute(
+        """
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100000)
+        INSERT INTO tasks (id, title, due_date, due_time, created_at, modified_at, device_id)
+        SELECT 'task-' || i, 'Task ' || i,
+            date('2999-01-01', '+' || (i % 3650) || ' days'),
+            printf('%02d:%02d:00', i % 24, i % 60), 0, 0, 'bench'
+        FROM n
+        """
+    )
+    await db.commit()
+
+    timers_before = _pending_timers(hass)
+    scheduler = ReminderScheduler(hass, task_repo, "entry")
+    await scheduler.async_start()
+
+    assert len(scheduler) == 100_000
+    assert _pending_timers(hass) - timers_before == 1
+    assert scheduler.next_deadline == scheduler._deadline(
+        "2999-01-01", "00:00:00", dt_util.UTC
+    )
+
+    cpu_start = time.process_time()
+    await asyncio.sleep(1)
+    assert time.process_time() - cpu_start < 0.1
+    scheduler.async_stop()
+    assert _pending_timers(hass) == timers_before
@@ -2,7 +2,15 @@
 import pytest
 from datetime import datetime
 
-from custom_components.haboard.database.models import Task, Tag
+from custom_components.haboard.database.models import (
+    DEFAULT_BOARD_ID,
+    Board,
+    BoardList,
+    Task,
+    Tag,
+    to_epoch_ms,
+)
+from custom_components.haboard.database.repository import BoardRepository
 
 
 @pytest.mark.asyncio
@@ -249,3 +257,627 @@ async def test_pagination(task_repo):
     page1_ids = {t.id for t in page1}
     page2_ids = {t.id for t in page2}
     assert len(page1_ids.intersection(page2_ids)) == 0
+
+
+@pytest.mark.asyncio
+async def test_iter_list_batches(task_repo):
+    """Test streaming tasks in batches matches list()."""
+    for i in range(7):
+        await task_repo.create(Task(title=f"Task {i}", tags=["home"], device_id="test"))
+
+    batches = [batch async for batch in task_repo.iter_list(limit=100, batch_size=3)]
+
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    streamed = [task.id for batch in batches for task in batch]
+    assert streamed == [task.id for task in await task_repo.list(limit=100)]
+    assert batches[0][0].tags == ["home"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_create(task_repo):
+    """Test bulk inserting tasks with tags, skipping existing IDs."""
+    existing = Task(title="Existing", device_id="test")
+    await task_repo.create(existing)
+
+    tasks = [
+        Task(title=f"Imported {i}", tags=["import", f"t{i % 2}"], device_id="test")
+        for i in range(5)
+    ]
+    inserted = await task_repo.bulk_create(tasks + [Task(id=existing.id, title="Dup")])
+
+    assert inserted == 5
+    assert len(await task_repo.list(tag="import")) == 5
+    assert (await task_repo.get(existing.id)).title == "Existing"
+
+    streamed = [task async for batch in task_repo.iter_all(batch_size=2) for task in batch]
+    assert len(streamed) == 6
+
+
+@pytest.mark.asyncio
+async def test_archive_completed(task_repo):
+    """Test moving old completed tasks into the archive in batches."""
+    for i in range(5):
+        await task_repo.create(
+            Task(
+                title=f"Old chore {i}",
+                completed=True,
+                completed_at=to_epoch_ms(f"2020-01-0{i + 1}T10:00:00"),
+                tags=["chores", "weekly"],
+                device_id="test",
+            )
+        )
+    recent = Task(
+        title="Recent chore",
+        completed=True,
+        completed_at=to_epoch_ms("2030-01-01T10:00:00"),
+        device_id="test",
+    )
+    await task_repo.create(recent)
+    await task_repo.create(Task(title="Open chore", device_id="test"))
+
+    cutoff = to_epoch_ms("2021-01-01T00:00:00")
+    assert await task_repo.archive_completed(cutoff, batch_size=3) == 3
+    assert await task_repo.archive_completed(cutoff, batch_size=3) == 2
+    assert await task_repo.archive_completed(cutoff) == 0
+
+    assert {task.title for task in await task_repo.list()} == {"Recent chore", "Open chore"}
+    assert await task_repo.search("chore") != []
+    assert len(await task_repo.search("old")) == 0
+
+    listed = await task_repo.list(include_archived=True)
+    assert len(listed) == 7
+    assert len(await task_repo.list(completed=False, include_archived=True)) == 1
+    archived = await task_repo.list(tag="weekly", include_archived=True)
+    assert len(archived) == 5
+    assert sorted(archived[0].tags) == ["chores", "weekly"]
+
+    assert len(await task_repo.search("old", include_archived=True)) == 5
+
+    streamed = [task async for batch in task_repo.iter_all(include_archived=True) for task in batch]
+    assert len(streamed) == 7
+    # Live tasks first, then archived ones, each in ID order
+    live = sorted(task.id for task in await task_repo.list())
+    assert [task.id for task in streamed] == live + sorted(task.id for task in archived)
+
+    # Archived IDs count as existing on import
+    assert await task_repo.bulk_create([Task(id=archived[0].id, title="Dup")]) == 0
+
+
+@pytest.mark.asyncio
+async def test_tags_json(task_repo, tag_repo):
+    """Test the denormalized tag list keeps order, commas and tag deletes."""
+    task = Task(title="Groceries", tags=["shop, weekly", "home", "home"], device_id="test")
+    await task_repo.create(task)
+
+    assert (await task_repo.get(task.id)).tags == ["shop, weekly", "home"]
+    assert len(await task_repo.list(tag="shop, weekly")) == 1
+
+    task.tags = ["home", "urgent"]
+    await task_repo.update(task)
+    assert (await task_repo.get(task.id)).tags == ["home", "urgent"]
+
+    await tag_repo.delete((await tag_repo.get_by_name("home")).id)
+    assert (await task_repo.get(task.id)).tags == ["urgent"]
+
+
+@pytest.mark.asyncio
+async def test_tags_json_fallback(db, task_repo):
+    """Test that rows without tags_json read their tags from task_tags."""
+    for i in range(3):
+        await task_repo.create(Task(title=f"Task {i}", tags=["a", f"t{i}"], device_id="test"))
+    await db.execute("UPDATE tasks SET tags_json = NULL")
+
+    assert all(sorted(task.tags)[0] == "a" for task in await task_repo.list())
+
+
+@pytest.mark.asyncio
+async def test_keyset_pagination(task_repo):
+    """Test paging by ID visits every task once, legacy UUIDv4 IDs included."""
+    import uuid
+
+    legacy = [Task(id=str(uuid.uuid4()), title=f"Legacy {i}", device_id="test") for i in range(3)]
+    new = [Task(title=f"New {i}", device_id="test") for i in range(4)]
+    await task_repo.bulk_create(legacy + new)
+
+    seen = []
+    after = ""
+    while page := await task_repo.list(limit=3, after=after):
+        seen.extend(task.id for task in page)
+        after = page[-1].id
+
+    assert seen == sorted(task.id for task in legacy + new)
+    # New IDs come out in creation order
+    assert [i for i in seen if i in {task.id for task in new}] == [task.id for task in new]
+
+
+@pytest.mark.asyncio
+async def test_agenda_queries(task_repo):
+    """Test overdue and due-window queries against local dates and times."""
+    for title, due_date, due_time, priority in (
+        ("Last week", "2024-12-13", None, 0),
+        ("This morning", "2024-12-20", "08:00:00", 1),
+        ("Today, no time", "2024-12-20", None, 0),
+        ("Tonight low", "2024-12-20", "18:00:00", 1),
+        ("Tonight high", "2024-12-20", "18:00:00", 3),
+        ("Tomorrow", "2024-12-21", "09:00:00", 0),
+        ("Next month", "2025-01-20", None, 0),
+        ("No due date", None, None, 3),
+    ):
+        await task_repo.create(
+            Task(
+                title=title,
+                due_date=due_date,
+                due_time=due_time,
+                priority=priority,
+                device_id="test",
+            )
+        )
+    done = Task(title="Done", due_date="2024-12-19", device_id="test", completed=True)
+    await task_repo.create(done)
+
+    overdue = await task_repo.list_overdue("2024-12-20", "10:00:00")
+    assert [task.title for task in overdue] == ["Last week", "This morning"]
+
+    due = await task_repo.list_due("2024-12-20", "2024-12-26", from_time="10:00:00")
+    assert [task.title for task in due] == [
+        "Today, no time",
+        "Tonight high",
+        "Tonight low",
+        "Tomorrow",
+    ]
+    assert len(await task_repo.list_due("2024-12-20", "2024-12-20")) == 4
+
+
+@pytest.mark.asyncio
+async def test_complete_recurring_task(task_repo):
+    """Test that completing a recurring task advances it instead."""
+    task = await task_repo.create(
+        Task(
+            title="Water plants",
+            due_date="2024-12-20",
+            recurrence="freq=daily;interval=2;count=2",
+            device_id="test",
+        )
+    )
+    assert task.recurrence == "FREQ=DAILY;INTERVAL=2;COUNT=2"
+    with pytest.raises(ValueError):
+        await task_repo.create(Task(title="No date", recurrence="FREQ=DAILY"))
+
+    task.completed = True
+    await task_repo.update(task)
+    stored = await task_repo.get(task.id)
+    assert not stored.completed
+    assert stored.completed_at is not None
+    assert stored.due_date == "2024-12-22"
+    assert stored.recurrence == "FREQ=DAILY;INTERVAL=2;COUNT=1"
+    assert [t.id for t in await task_repo.list_recurring("2024-12-31")] == [task.id]
+    assert await task_repo.list_recurring("2024-12-21") == []
+
+    # The last occurrence completes the series
+    stored.completed = True
+    await task_repo.update(stored)
+    stored = await task_repo.get(task.id)
+    assert stored.completed
+    assert stored.due_date == "2024-12-22"
+    assert await task_repo.list_recurring("2024-12-31") == []
+
+
+@pytest.mark.asyncio
+async def test_batch_complete_and_update(db, task_repo):
+    """Test completing and updating tasks selected by tag, query and IDs."""
+    milk = await task_repo.create(Task(title="Buy milk", tags=["groceries"], device_id="test"))
+    eggs = await task_repo.create(Task(title="Buy eggs", tags=["groceries"], device_id="test"))
+    bread = await task_repo.create(
+        Task(
+            title="Buy bread",
+            due_date="2024-12-20",
+            recurrence="FREQ=WEEKLY",
+            tags=["groceries"],
+            device_id="test",
+        )
+    )
+    other = await task_repo.create(Task(title="Call plumber", device_id="test"))
+    changed = []
+    task_repo.add_listener(lambda task_id, task: changed.append(task_id))
+
+    with pytest.raises(ValueError):
+        await task_repo.complete_many()
+
+    done = await task_repo.complete_many(device_id="phone", tag="groceries", query="milk OR bread")
+    assert sorted(task.id for task in done) == sorted([milk.id, bread.id])
+    assert sorted(changed) == sorted([milk.id, bread.id])
+    stored = {task.id: task for task in await task_repo.list()}
+    assert stored[milk.id].completed and stored[milk.id].device_id == "phone"
+    assert stored[milk.id].version == milk.version + 1
+    # The recurring task moves to its next occurrence instead
+    assert not stored[bread.id].completed
+    assert stored[bread.id].due_date == "2024-12-27"
+    assert not stored[eggs.id].completed and not stored[other.id].completed
+
+    # Completing again changes nothing
+    assert await task_repo.complete_many(task_ids=[milk.id]) == []
+    reopened = await task_repo.complete_many(False, tag="groceries")
+    assert [task.id for task in reopened] == [milk.id]
+    assert reopened[0].completed_at is None
+
+    updated = await task_repo.update_many(
+        {"priority": 3, "due_date": None}, "phone", task_ids=[bread.id, eggs.id, "missing"]
+    )
+    assert sorted(task.id for task in updated) == sorted([bread.id, eggs.id])
+    assert all(task.priority == 3 and task.recurrence is None for task in updated)
+    with pytest.raises(ValueError):
+        await task_repo.update_many({"tags": []}, task_ids=[eggs.id])
+
+
+@pytest.mark.asyncio
+async def test_batch_tag_and_delete(db, task_repo, tag_repo):
+    """Test that bulk tagging keeps tags_json and task_tags in step."""
+    tasks = [
+        await task_repo.create(Task(title=f"Task {i}", tags=tags, device_id="test"))
+        for i, tags in enumerate((["home"], ["home", "urgent"], ["work"]))
+    ]
+
+    retagged = await task_repo.tag_many(["urgent", "weekend"], ["home"], "phone", tag="home")
+    assert {task.id: task.tags for task in retagged} == {
+        tasks[0].id: ["urgent", "weekend"],
+        tasks[1].id: ["urgent", "weekend"],
+    }
+    assert (await tag_repo.get_by_name("weekend")) is not None
+    # The join table agrees with the denormalized list
+    await db.execute("UPDATE tasks SET tags_json = NULL")
+    assert len(await task_repo.list(tag="home")) == 0
+    assert sorted(task.tags for task in await task_repo.list(tag="weekend")) == [
+        ["urgent", "weekend"],
+        ["urgent", "weekend"],
+    ]
+    assert await task_repo.tag_many(["urgent"], [], tag="urgent") == []
+    with pytest.raises(ValueError):
+        await task_repo.tag_many(["a"], ["a"], task_ids=[tasks[2].id])
+
+    deleted = []
+    task_repo.add_listener(lambda task_id, task: deleted.append((task_id, task)))
+    assert sorted(await task_repo.delete_many(tag="weekend")) == sorted(
+        [tasks[0].id, tasks[1].id]
+    )
+    assert sorted(deleted) == sorted([(tasks[0].id, None), (tasks[1].id, None)])
+    assert [task.id for task in await task_repo.list()] == [tasks[2].id]
+
+
+@pytest.mark.asyncio
+async def test_completion_rollup(db, task_repo):
+    """Test that completing and reopening tasks keeps the daily rollup current."""
+    from datetime import timedelta, timezone
+
+    def at(day, hour=12):
+        return to_epoch_ms(f"{day}T{hour:02d}:00:00+00:00")
+
+    await task_repo.create(
+        Task(title="Done", completed=True, completed_at=at("2024-12-18"), tags=["home"])
+    )
+    await task_repo.bulk_create(
+        [
+            Task(title=f"Imported {i}", completed=True, completed_at=at("2024-12-19"))
+            for i in range(3)
+        ]
+    )
+    assert await task_repo.completion_history("2024-12-01", "2024-12-31") == [
+        ("2024-12-18", 1),
+        ("2024-12-19", 3),
+    ]
+
+    # Completing stamps today, whatever completed_at the caller passes
+    today = datetime.now(timezone.utc).date().isoformat()
+    task = await task_repo.create(Task(title="Open", tags=["home", "work"]))
+    task.completed = True
+    task.completed_at = at("2024-12-20")
+    await task_repo.update(task)
+    assert await task_repo.completion_history(today, today, "work") == [(today, 1)]
+
+    # Reopening takes the completion back and clears completed_at; a stale
+    # completed_at does not move the next completion to another day
+    task.completed = False
+    await task_repo.update(task)
+    assert task.completed_at is None
+    assert await task_repo.completion_history(today, today) == []
+    task.completed_at = at("2024-12-20")
+    task.completed = True
+    await task_repo.update(task)
+    assert await task_repo.completion_history(today, today) == [(today, 1)]
+    assert await task_repo.completion_history("2024-12-20", "2024-12-20") == []
+    task.completed = False
+    await task_repo.update(task)
+    with pytest.raises(ValueError):
+        await task_repo.update(Task(id="missing", title="Missing", completed=True))
+    assert await task_repo.completion_history(today, today) == []
+    await task_repo.complete_many(tag="work")
+    await task_repo.complete_many(False, tag="home")
+    assert await task_repo.completion_history("2024-12-01", "2024-12-31", "home") == []
+
+    # Days follow the repository time zone
+    task_repo.time_zone = timezone(timedelta(hours=-14))
+    await task_repo.create(Task(title="Late", completed=True, completed_at=at("2024-12-19", 2)))
+    assert ("2024-12-18", 1) in await task_repo.completion_history("2024-12-18", "2024-12-18")
+
+
+@pytest.mark.asyncio
+async def test_failed_update_rolls_back(db, task_repo):
+    """Test that an update the database rejects leaves no completion behind."""
+    import sqlite3
+    from datetime import timezone
+
+    today = datetime.now(timezone.utc).date().isoformat()
+    task = await task_repo.create(Task(title="Open", tags=["home"]))
+    task.completed = True
+    task.priority = 9
+    with pytest.raises(sqlite3.IntegrityError):
+        await task_repo.update(task)
+
+    # The next commit must not carry the failed update's rollup along
+    await task_repo.create(Task(title="Another"))
+    assert await task_repo.completion_history(today, today) == []
+    assert not (await task_repo.get(task.id)).completed
+
+
+@pytest.mark.asyncio
+async def test_backfill_completion_history(db, task_repo):
+    """Test that the backfill rolls up live and archived completions once."""
+    await task_repo.bulk_create(
+        [
+            Task(
+                title=f"Task {i}",
+                completed=i % 2 == 0,
+                completed_at=to_epoch_ms(f"2024-12-{10 + i % 3}T12:00:00+00:00"),
+                tags=["home"] if i < 4 else [],
+            )
+            for i in range(9)
+        ]
+    )
+    await task_repo.archive_completed(to_epoch_ms("2024-12-11T00:00:00+00:00"))
+    expected = await task_repo.completion_history("2024-12-01", "2024-12-31")
+    expected_home = await task_repo.completion_history("2024-12-01", "2024-12-31", "home")
+
+    # Start over as if the tasks predated the rollup
+    await db.execute("DELETE FROM completion_daily")
+    cursor = await db.execute("SELECT COUNT(*) FROM completion_backfill")
+    assert (await cursor.fetchone())[0] == 1
+    batches = 0
+    while await task_repo.backfill_completion_history(batch_size=2):
+        batches += 1
+    assert batches > 3
+    assert await task_repo.completion_history("2024-12-01", "2024-12-31") == expected
+    assert await task_repo.completion_history("2024-12-01", "2024-12-31", "home") == expected_home
+    assert not await task_repo.backfill_completion_history()
+
+
+@pytest.mark.asyncio
+async def test_boards_scope_queries(db, task_repo):
+    """Test that lists, search, agenda and batch services stay on one board."""
+    board_repo = BoardRepository(db.conn, task_repo)
+    board_writes = []
+    board_repo.add_listener(lambda board_id, board: board_writes.append(board and board.name))
+    work = await board_repo.create(Board(name="Work"))
+    week = await board_repo.create_list(BoardList(board_id=work.id, name="This week"))
+    assert [board.name for board in await board_repo.list()] == ["Tasks", "Work"]
+    with pytest.raises(ValueError):
+        await board_repo.create_list(BoardList(board_id="missing", name="Nope"))
+
+    home = await task_repo.create(Task(title="Buy milk", due_date="2024-12-19", device_id="test"))
+    report = await task_repo.create(
+        Task(
+            title="Milk report",
+            due_date="2024-12-19",
+            board_id=work.id,
+            list_id=week.id,
+            device_id="test",
+        )
+    )
+    assert home.board_id == DEFAULT_BOARD_ID
+    assert (await task_repo.get(report.id)).list_id == week.id
+    with pytest.raises(ValueError):
+        await task_repo.create(Task(title="Lost", list_id=week.id, device_id="test"))
+
+    assert [task.id for task in await task_repo.list(board_id=work.id)] == [report.id]
+    assert [task.id for task in await task_repo.list(list_id=week.id)] == [report.id]
+    assert [task.id for task in await task_repo.search("milk", board_id=work.id)] == [report.id]
+    assert len(await task_repo.search("milk")) == 2
+    assert await task_repo.search("milk", board_id="missing") == []
+    overdue = await task_repo.list_overdue("2024-12-20", "10:00:00", board_id=DEFAULT_BOARD_ID)
+    assert [task.id for task in overdue] == [home.id]
+    completed = await task_repo.complete_many(query="milk", board_id=work.id)
+    assert [task.id for task in completed] == [report.id]
+
+    # Moving a task to another board takes it out of its list
+    home.board_id, home.list_id = work.id, week.id
+    await task_repo.update(home)
+    assert len(await task_repo.list(list_id=week.id)) == 2
+
+    moved = []
+    task_repo.add_listener(lambda task_id, task: moved.append(task))
+    assert await board_repo.delete_list(week.id)
+    assert [task.list_id for task in moved] == [None, None]
+    assert await task_repo.list(list_id=week.id) == []
+
+    exported = [task async for batch in task_repo.iter_all(board_id=work.id) for task in batch]
+    assert {task.id for task in exported} == {home.id, report.id}
+    default_board = task_repo.iter_all(board_id=DEFAULT_BOARD_ID)
+    assert [task async for batch in default_board for task in batch] == []
+    assert await task_repo.count_completed(0, board_id=work.id) == (1, 1)
+    assert await task_repo.count_completed(0, board_id=DEFAULT_BOARD_ID) == (0, 0)
+
+    await board_repo.rename(work.id, "Office")
+    with pytest.raises(ValueError):
+        await board_repo.delete(DEFAULT_BOARD_ID)
+    assert await board_repo.delete(work.id)
+    assert await task_repo.list() == []
+    assert not await board_repo.delete(work.id)
+    assert board_writes == ["Work", "Work", "Work", "Office", None]
+
+
+@pytest.mark.asyncio
+async def test_manual_order(db, task_repo):
+    """Test that moves write one row and long keys are rebalanced in maintenance."""
+    board_repo = BoardRepository(db.conn, task_repo)
+    work = await board_repo.create(Board(name="Work"))
+    a, b, c = [
+        await task_repo.create(Task(title=title, device_id="test")) for title in "abc"
+    ]
+    e, d, x = [
+        Task(title="e", sort_key="a9", device_id="test"),
+        Task(title="d", sort_key="a1", device_id="test"),
+        Task(title="x", board_id=work.id, device_id="test"),
+    ]
+    await task_repo.bulk_create([e, d, x])
+
+    async def titles():
+        tasks = await task_repo.list(board_id=DEFAULT_BOARD_ID, manual_order=True)
+        return [task.title for task in tasks]
+
+    assert await titles() == ["a", "b", "c", "d", "e"]
+    with pytest.raises(ValueError):
+        await task_repo.list(manual_order=True)
+
+    moved = []
+    task_repo.add_listener(lambda task_id, task: moved.append(task))
+    before = db.conn.total_changes
+    task = await task_repo.move(c.id, after_id=a.id, device_id="phone")
+    assert db.conn.total_changes - before == 1
+    assert (task.version, task.device_id) == (c.version + 1, "phone")
+    assert moved == [task]
+    assert await titles() == ["a", "c", "b", "d", "e"]
+
+    await task_repo.move(a.id, before_id=b.id)
+    assert await titles() == ["c", "a", "b", "d", "e"]
+    await task_repo.move(b.id)
+    assert await titles() == ["b", "c", "a", "d", "e"]
+    await task_repo.move(b.id, after_id=e.id)
+    assert await titles() == ["c", "a", "d", "e", "b"]
+    assert await task_repo.move("missing", after_id=a.id) is None
+    for anchor in (a.id, "missing", x.id):
+        with pytest.raises(ValueError):
+            await task_repo.move(a.id, after_id=anchor)
+
+    # Editing keeps the position; another board appends the task there
+    a = await task_repo.get(a.id)
+    a.title = "a2"
+    await task_repo.update(a)
+    assert await titles() == ["c", "a2", "d", "e", "b"]
+    a.board_id = work.id
+    await task_repo.update(a)
+    work_tasks = await task_repo.list(board_id=work.id, manual_order=True)
+    assert [task.title for task in work_tasks] == ["x", "a2"]
+
+    # Dragging into the same gap over and over lengthens the keys
+    for _ in range(100):
+        await task_repo.move(b.id, after_id=c.id)
+        await task_repo.move(d.id, after_id=c.id)
+    order = await titles()
+    cursor = await db.execute("SELECT MAX(length(sort_key)) FROM tasks")
+    assert (await cursor.fetchone())[0] > 24
+
+    # Only the run of long keys is rewritten, as new versions
+    before = {task.id: task for task in await task_repo.list(board_id=DEFAULT_BOARD_ID)}
+    assert await task_repo.rebalance_sort_keys(0) == []
+    moved.clear()
+    rekeyed = await task_repo.rebalance_sort_keys(float("inf"))
+    assert {task.id for task in rekeyed} == {b.id, d.id}
+    assert moved == rekeyed
+    assert all(task.version > before[task.id].version for task in rekeyed)
+    assert await titles() == order
+    cursor = await db.execute("SELECT MAX(length(sort_key)) FROM tasks")
+    assert (await cursor.fetchone())[0] <= 8
+
+
+@pytest.mark.asyncio
+async def test_subtasks(db, task_repo):
+    """Test subtask trees, their progress counters and whole-tree writes."""
+    board_repo = BoardRepository(db.conn, task_repo)
+    work = await board_repo.create(Board(name="Work"))
+    trip = await task_repo.create(Task(title="Pack", device_id="test"))
+    items = [
+        await task_repo.create(Task(title=title, parent_id=trip.id, device_id="test"))
+        for title in ("Tent", "Stove", "Maps")
+    ]
+    fuel = await task_repo.create(Task(title="Fuel", parent_id=items[1].id, board_id=work.id))
+    assert fuel.board_id == DEFAULT_BOARD_ID
+    with pytest.raises(ValueError):
+        await task_repo.create(Task(title="Orphan", parent_id="missing"))
+
+    async def counters(task_id):
+        task = await task_repo.get(task_id)
+        return task.subtask_count, task.subtasks_done
+
+    assert await counters(trip.id) == (3, 0)
+    assert await counters(items[1].id) == (1, 0)
+
+    # Ticking a checklist item writes the item; the trigger keeps the count
+    items[0].completed = True
+    await task_repo.update(items[0])
+    assert await counters(trip.id) == (3, 1)
+    await task_repo.complete_many(task_ids=[items[1].id, items[2].id])
+    assert await counters(trip.id) == (3, 3)
+    await task_repo.complete_many(False, task_ids=[items[2].id])
+    assert await counters(trip.id) == (3, 2)
+
+    tree = await task_repo.get_subtree(trip.id)
+    assert [task.title for task in tree] == ["Pack", "Tent", "Stove", "Fuel", "Maps"]
+    assert tree[3].parent_id == items[1].id
+    assert await task_repo.get_subtree("missing") == []
+    top = await task_repo.list(top_level=True)
+    assert [task.title for task in top] == ["Pack"]
+
+    with pytest.raises(ValueError):
+        trip.parent_id = fuel.id
+        await task_repo.update(trip)
+    trip.parent_id = None
+
+    # Re-parenting moves the counters; moving the parent carries the tree
+    maps = await task_repo.get(items[2].id)
+    maps.parent_id = None
+    await task_repo.update(maps)
+    assert await counters(trip.id) == (2, 2)
+    trip.board_id = work.id
+    await task_repo.update(trip)
+    moved = await task_repo.list(board_id=work.id, manual_order=True)
+    assert [task.title for task in moved] == ["Pack", "Tent", "Stove", "Fuel"]
+
+    # Parent after child in one import
+    child = Task(title="Rope", parent_id="import-parent")
+    loop = Task(id="loop", title="Loop", parent_id="loop")
+    await task_repo.bulk_create([child, Task(id="import-parent", title="Gear"), loop])
+    assert (await task_repo.get(child.id)).parent_id == "import-parent"
+    assert await counters("import-parent") == (1, 0)
+    assert (await task_repo.get("loop")).parent_id is None
+
+    # Imported subtasks join their parent's board, new or existing parent
+    later = await board_repo.create_list(BoardList(board_id=DEFAULT_BOARD_ID, name="Later"))
+    plan = Task(id="plan", title="Plan", board_id=work.id)
+    step = Task(id="step", title="Step", parent_id="plan", list_id=later.id)
+    detail = Task(title="Detail", parent_id="step", board_id="unknown")
+    under_trip = Task(title="Spare pegs", parent_id=trip.id)
+    await task_repo.bulk_create([detail, step, plan, under_trip])
+    for task_id in (step.id, detail.id, under_trip.id):
+        imported = await task_repo.get(task_id)
+        assert (imported.board_id, imported.list_id) == (work.id, None)
+    await task_repo.delete(plan.id)
+    await task_repo.delete(under_trip.id)
+
+    # Archival waits for every subtask and takes them along
+    trip.completed = True
+    await task_repo.update(trip)
+    cutoff = to_epoch_ms("2100-01-01T00:00:00")
+    fuel.completed = False
+    assert await task_repo.archive_completed(cutoff) == 0
+    fuel = await task_repo.get(fuel.id)
+    fuel.completed = True
+    await task_repo.update(fuel)
+    stove = await task_repo.get(items[1].id)
+    assert (stove.subtask_count, stove.subtasks_done) == (1, 1)
+    assert await task_repo.archive_completed(cutoff) == 4
+    archived = await task_repo.list(board_id=work.id, include_archived=True)
+    assert {task.title: task.parent_id for task in archived}["Fuel"] == items[1].id
+
+    deleted = []
+    task_repo.add_listener(lambda task_id, task: deleted.append(task_id))
+    assert await task_repo.delete("import-parent")
+    assert sorted(deleted) == sorted(["import-parent", child.id])
+    assert await task_repo.get(child.id) is None
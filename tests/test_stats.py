@@ -0,0 +1,142 @@
+"""Tests for task statistics and the count sensors."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.haboard.database.models import DEFAULT_BOARD_ID, Board, Task
+from custom_components.haboard.database.repository import BoardRepository
+from custom_components.haboard.sensor import SENSORS, HABoardStatsCoordinator
+from custom_components.haboard.stats import SERIES_CACHE_SIZE, TaskStats
+
+NOW = datetime(2024, 12, 20, 10, 0, tzinfo=timezone.utc)
+
+
+async def _seed(task_repo):
+    for title, due_date, due_time, priority, tags in (
+        ("Last week", "2024-12-13", None, 3, ["home"]),
+        ("This morning", "2024-12-20", "08:00:00", 1, []),
+        ("Tonight", "2024-12-20", "18:00:00", 1, ["home"]),
+        ("Someday", None, None, 0, ["work"]),
+    ):
+        await task_repo.create(
+            Task(title=title, due_date=due_date, due_time=due_time, priority=priority, tags=tags)
+        )
+    for title, completed_at in (
+        ("Yesterday", datetime(2024, 12, 19, 23, 0, tzinfo=timezone.utc)),
+        ("Today", datetime(2024, 12, 20, 9, 0, tzinfo=timezone.utc)),
+        ("Two weeks ago", datetime(2024, 12, 6, 12, 0, tzinfo=timezone.utc)),
+    ):
+        await task_repo.create(
+            Task(
+                title=title,
+                completed=True,
+                completed_at=int(completed_at.timestamp() * 1000),
+                tags=["home"],
+            )
+        )
+
+
+@pytest.mark.asyncio
+async def test_counts_are_cached_until_a_write(task_repo):
+    """Test the counts, their breakdowns and the generation cache."""
+    await _seed(task_repo)
+    stats = TaskStats(task_repo)
+
+    counts = await stats.async_counts(NOW)
+    assert counts["open"] == 4
+    assert counts["overdue"] == 2
+    assert counts["due_today"] == 2
+    assert counts["completed"] == 3
+    assert counts["completed_today"] == 1
+    assert counts["by_priority"] == {
+        "0": {"open": 1, "overdue": 0},
+        "1": {"open": 2, "overdue": 1},
+        "2": {"open": 0, "overdue": 0},
+        "3": {"open": 1, "overdue": 1},
+    }
+    assert counts["by_tag"] == {
+        "home": {"open": 2, "completed": 3},
+        "work": {"open": 1, "completed": 0},
+    }
+
+    assert await stats.async_counts(NOW) is counts
+    await task_repo.complete_many(tag="work")
+    counts = await stats.async_counts(NOW)
+    assert counts["open"] == 3
+    assert counts["completed"] == 4
+
+
+@pytest.mark.asyncio
+async def test_counts_and_series_per_board(db, task_repo):
+    """Test that counts and series can be limited to one board."""
+    await _seed(task_repo)
+    work = await BoardRepository(db.conn, task_repo).create(Board(name="Work"))
+    await task_repo.create(Task(title="Report", due_date="2024-12-13", board_id=work.id))
+    await task_repo.create(
+        Task(
+            title="Filed",
+            completed=True,
+            completed_at=int(NOW.timestamp() * 1000),
+            board_id=work.id,
+            tags=["work"],
+        )
+    )
+    stats = TaskStats(task_repo)
+
+    counts = await stats.async_counts(NOW, work.id)
+    assert (counts["open"], counts["overdue"], counts["completed_today"]) == (1, 1, 1)
+    assert counts["by_tag"] == {
+        "home": {"open": 0, "completed": 0},
+        "work": {"open": 0, "completed": 1},
+    }
+    assert (await stats.async_counts(NOW))["open"] == 5
+    assert await stats.async_counts(NOW, work.id) is counts
+    for board_id in range(SERIES_CACHE_SIZE + 2):
+        await stats.async_counts(NOW, f"unknown-{board_id}")
+    assert len(stats._counts) == SERIES_CACHE_SIZE
+
+    series = await stats.async_series(NOW, 2, board_id=work.id)
+    assert [bucket["completed"] for bucket in series] == [0, 1]
+    series = await stats.async_series(NOW, 2, board_id=DEFAULT_BOARD_ID)
+    assert [bucket["completed"] for bucket in series] == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_completion_series(task_repo):
+    """Test completions bucketed by local day and week."""
+    await _seed(task_repo)
+    stats = TaskStats(task_repo)
+
+    daily = await stats.async_series(NOW, 3)
+    assert daily == [
+        {"start": "2024-12-18", "completed": 0},
+        {"start": "2024-12-19", "completed": 1},
+        {"start": "2024-12-20", "completed": 1},
+    ]
+    # In UTC+2, yesterday's 23:00 UTC completion falls on today
+    local = NOW.astimezone(timezone(timedelta(hours=2)))
+    assert [entry["completed"] for entry in await stats.async_series(local, 2)] == [0, 2]
+
+    weekly = await stats.async_series(NOW, 14, "week")
+    assert weekly == [
+        {"start": "2024-12-02", "completed": 1},
+        {"start": "2024-12-09", "completed": 0},
+        {"start": "2024-12-16", "completed": 2},
+    ]
+    with pytest.raises(ValueError):
+        await stats.async_series(NOW, 0)
+    with pytest.raises(ValueError):
+        await stats.async_series(NOW, 7, "year")
+
+
+@pytest.mark.asyncio
+async def test_sensor_values(hass, task_repo):
+    """Test that the coordinator feeds every sensor from one count."""
+    await _seed(task_repo)
+    coordinator = HABoardStatsCoordinator(hass, TaskStats(task_repo))
+    await coordinator.async_refresh()
+
+    values = {description.key: description.value_fn(coordinator.data) for description in SENSORS}
+    assert values["open"] == 4
+    assert SENSORS[0].attributes_fn(coordinator.data)["by_tag"] == {"home": 2, "work": 1}
+    coordinator.async_stop()
@@ -0,0 +1,162 @@
+"""Tests for the to-do list entities."""
+import asyncio
+
+import pytest
+
+from homeassistant.components.todo import TodoItem, TodoItemStatus
+
+from custom_components.haboard import todo
+from custom_components.haboard.database.models import DEFAULT_BOARD_ID, Board, Tag, Task
+from custom_components.haboard.todo import ALL_TASKS, TodoTaskCache, board_key
+
+COOLDOWN = 0.05
+
+
+@pytest.fixture
+async def cache(hass, task_repo, tag_repo, board_repo, monkeypatch):
+    """Loaded cache whose entities count their state writes."""
+    monkeypatch.setattr(todo, "STATE_WRITE_COOLDOWN", COOLDOWN)
+    added = []
+    cache = TodoTaskCache(
+        hass,
+        task_repo,
+        tag_repo,
+        board_repo,
+        "entry",
+        lambda entities: _attach(hass, entities, added),
+    )
+    _attach(hass, cache.async_start(await tag_repo.list(), await board_repo.list()), added)
+    await cache.async_load()
+    cache.added = added
+    yield cache
+    cache.async_stop()
+
+
+def _attach(hass, entities, added):
+    """Stand in for the entity platform: give entities an ID and count writes."""
+    for entity in entities:
+        entity.hass = hass
+        entity.entity_id = f"todo.haboard_{entity.tag or entity.board_id or 'all'}"
+        entity.writes = 0
+
+        def write(entity=entity):
+            entity.writes += 1
+
+        entity.async_write_ha_state = write
+        added.append(entity)
+
+
+async def _settle(hass):
+    await asyncio.sleep(COOLDOWN * 3)
+    await hass.async_block_till_done()
+
+
+def _entity(cache, key):
+    return next(entity for entity in cache.added if entity.key == key)
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_coalesces_state_writes(hass, task_repo, cache):
+    """Test that 500 imported tasks cause a couple of state writes per list."""
+    all_tasks = _entity(cache, ALL_TASKS)
+    await _settle(hass)
+    all_tasks.writes = 0
+
+    await task_repo.bulk_create(
+        [Task(title=f"Task {i}", tags=["chores"], device_id="test") for i in range(500)]
+    )
+    await _settle(hass)
+
+    assert 1 <= all_tasks.writes <= 2
+    chores = _entity(cache, "chores")
+    assert chores.state == 500
+    assert len(all_tasks.todo_items) == 500
+
+
+@pytest.mark.asyncio
+async def test_items_follow_task_writes(hass, task_repo, tag_repo, cache):
+    """Test that items, order and tag lists track creates, updates and deletes."""
+    later = await task_repo.create(
+        Task(title="Later", due_date="2030-01-02", tags=["home"], device_id="test")
+    )
+    sooner = await task_repo.create(
+        Task(title="Sooner", due_date="2030-01-01", due_time="08:30:00", device_id="test")
+    )
+    await _settle(hass)
+    all_tasks = _entity(cache, ALL_TASKS)
+    assert [item.summary for item in all_tasks.todo_items] == ["Sooner", "Later"]
+    assert all_tasks.todo_items[0].due.hour == 8
+    assert all_tasks.state == 2
+
+    sooner.completed = True
+    await task_repo.update(sooner)
+    later.tags = []
+    await task_repo.update(later)
+    await _settle(hass)
+    assert [item.summary for item in all_tasks.todo_items] == ["Later", "Sooner"]
+    assert all_tasks.todo_items[1].status == TodoItemStatus.COMPLETED
+    assert all_tasks.state == 1
+    assert _entity(cache, "home").state == 0
+
+    await task_repo.delete(later.id)
+    await _settle(hass)
+    assert [item.uid for item in all_tasks.todo_items] == [sooner.id]
+
+    home = await tag_repo.get_by_name("home")
+    await tag_repo.delete(home.id)
+    await _settle(hass)
+    assert "home" not in cache._entities
+
+
+@pytest.mark.asyncio
+async def test_entity_creates_and_completes_tasks(hass, task_repo, tag_repo, cache):
+    """Test the to-do services against the repository."""
+    await tag_repo.create(Tag(name="garden"))
+    await _settle(hass)
+    garden = _entity(cache, "garden")
+
+    await garden.async_create_todo_item(TodoItem(summary="Mow lawn"))
+    await _settle(hass)
+    (item,) = garden.todo_items
+    task = await task_repo.get(item.uid)
+    assert task.tags == ["garden"]
+
+    await garden.async_update_todo_item(
+        TodoItem(uid=item.uid, summary="Mow lawn", status=TodoItemStatus.COMPLETED)
+    )
+    await _settle(hass)
+    assert (await task_repo.get(item.uid)).completed
+    assert garden.state == 0
+
+    await garden.async_delete_todo_items([item.uid])
+    await _settle(hass)
+    assert garden.todo_items == []
+
+
+@pytest.mark.asyncio
+async def test_board_lists(hass, task_repo, board_repo, cache):
+    """Test that each board gets a list that follows the board and its tasks."""
+    default = _entity(cache, board_key(DEFAULT_BOARD_ID))
+    assert not default.entity_registry_enabled_default
+
+    work = await board_repo.create(Board(name="Work"))
+    await _settle(hass)
+    work_list = _entity(cache, board_key(work.id))
+    assert work_list.entity_registry_enabled_default
+    assert work_list.name == "HABoard Work"
+
+    await work_list.async_create_todo_item(TodoItem(summary="Write report"))
+    await task_repo.create(Task(title="Buy milk", device_id="test"))
+    await _settle(hass)
+    (item,) = work_list.todo_items
+    assert (await task_repo.get(item.uid)).board_id == work.id
+    assert [item.summary for item in default.todo_items] == ["Buy milk"]
+
+    await board_repo.rename(work.id, "Office")
+    await _settle(hass)
+    assert work_list.name == "HABoard Office"
+
+    await board_repo.delete(work.id)
+    await _settle(hass)
+    assert board_key(work.id) not in cache._entities
+    assert len(_entity(cache, ALL_TASKS).todo_items) == 1
@@ -0,0 +1,145 @@
+"""Tests for the HTTP API views."""
+import json
+import sqlite3
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+import pytest
+
+from homeassistant.components.http import KEY_AUTHENTICATED
+
+from custom_components.haboard.api import views
+from custom_components.haboard.api.views import ExportView, ImportView, TaskCompleteView
+from custom_components.haboard.const import DOMAIN
+from custom_components.haboard.database.models import Board, Task
+
+
+@web.middleware
+async def _authenticated(request, handler):
+    """Stand in for Home Assistant's auth middleware."""
+    request[KEY_AUTHENTICATED] = True
+    return await handler(request)
+
+
+@pytest.fixture
+async def client(hass, task_repo, tag_repo, board_repo):
+    """HTTP client for the views of one entry."""
+    hass.data[DOMAIN] = {
+        "entry": {"task_repo": task_repo, "tag_repo": tag_repo, "board_repo": board_repo}
+    }
+    app = web.Application(middlewares=[_authenticated])
+    app["hass"] = hass
+    for view in (ExportView(), ImportView(), TaskCompleteView()):
+        view.register(hass, app, app.router)
+    client = TestClient(TestServer(app))
+    await client.start_server()
+    yield client
+    await client.close()
+
+
+async def _import(client, body: str, fmt: str = "ndjson"):
+    response = await client.post(f"/api/haboard/import?format={fmt}", data=body.encode())
+    return response.status, [json.loads(line) for line in (await response.text()).splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_export_import_round_trip(client, task_repo):
+    """Test that an NDJSON export imports into the same tasks."""
+    task = await task_repo.create(Task(title="Buy milk", priority=2, tags=["home"]))
+
+    response = await client.get("/api/haboard/export?format=ndjson")
+    assert response.status == 200
+    assert response.headers["Content-Disposition"].endswith('haboard-export.ndjson"')
+    body = await response.text()
+    assert [json.loads(line)["id"] for line in body.splitlines()] == [task.id]
+
+    await task_repo.delete(task.id)
+    status, lines = await _import(client, body)
+    assert status == 200
+    assert lines[-1] == {"imported": 1, "skipped": 0, "done": True}
+    imported = await task_repo.get(task.id)
+    assert (imported.title, imported.priority, imported.tags) == ("Buy milk", 2, ["home"])
+
+    response = await client.get("/api/haboard/export?format=xml")
+    assert response.status == 400
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("fmt", "body"),
+    [
+        ("ndjson", '{"title": "a", "priority": 7}\n'),
+        ("ndjson", '{"title": "a", "priority": "high"}\n'),
+        ("ndjson", '{"title": "a", "tags": "xy"}\n'),
+        ("ndjson", '{"title": ["a"]}\n'),
+        ("csv", "title,priority\r\na,7\r\n"),
+    ],
+)
+async def test_import_rejects_invalid_fields(client, task_repo, fmt, body):
+    """Test that invalid fields are rejected before anything is stored."""
+    status, lines = await _import(client, body, fmt)
+    assert status == 400
+    assert "Invalid import data" in lines[0]["message"]
+    assert await task_repo.list() == []
+
+
+@pytest.mark.asyncio
+async def test_import_reports_errors_after_the_first_batch(client, task_repo):
+    """Test that errors after the response started end it with an error line."""
+    status, lines = await _import(
+        client, '{"title": "a"}\n{"title": "b", "priority": -1}\n'
+    )
+    assert status == 200
+    assert lines[-1]["imported"] == 0
+    assert "priority" in lines[-1]["error"]
+    assert await task_repo.list() == []
+
+
+@pytest.mark.asyncio
+async def test_import_reports_database_errors(client, task_repo, monkeypatch):
+    """Test that a batch the database rejects ends the stream with an error line."""
+
+    async def bulk_create(tasks):
+        raise sqlite3.IntegrityError("CHECK constraint failed")
+
+    monkeypatch.setattr(task_repo, "bulk_create", bulk_create)
+    status, lines = await _import(client, '{"title": "a"}\n')
+    assert status == 200
+    assert lines == [{"imported": 0, "skipped": 0, "error": "CHECK constraint failed"}]
+
+
+@pytest.mark.asyncio
+async def test_import_links_parents_from_later_batches(
+    client, task_repo, board_repo, monkeypatch
+):
+    """Test that a subtask exported before its parent keeps the link."""
+    monkeypatch.setattr(views, "IMPORT_BATCH_SIZE", 1)
+    board = await board_repo.create(Board(name="Work"))
+    parent = Task(title="Plan trip", board_id=board.id)
+    child = Task(title="Book hotel", parent_id=parent.id)
+    body = "".join(json.dumps(task.to_dict()) + "\n" for task in (child, parent))
+
+    status, lines = await _import(client, body)
+    assert status == 200
+    assert lines[-1] == {"imported": 2, "skipped": 0, "done": True}
+    imported = await task_repo.get(child.id)
+    assert (imported.parent_id, imported.board_id) == (parent.id, board.id)
+
+
+@pytest.mark.asyncio
+async def test_complete_a_task_that_goes_away(client, task_repo, monkeypatch):
+    """Test that a task deleted between read and update gives a 404."""
+    task = await task_repo.create(Task(title="Buy milk"))
+    response = await client.post(f"/api/haboard/tasks/{task.id}/complete", json={})
+    assert response.status == 200
+    assert (await response.json())["completed"]
+
+    await task_repo.delete(task.id)
+    reads = iter([task, None])
+
+    async def get(task_id):
+        return next(reads)
+
+    monkeypatch.setattr(task_repo, "get", get)
+    response = await client.post(f"/api/haboard/tasks/{task.id}/complete", json={})
+    assert response.status == 404